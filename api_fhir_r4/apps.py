@@ -21,6 +21,17 @@ class ApiFhirConfig(AppConfig):
         self.__configure_module(cfg)
         setup_yaml()
 
+        from api_fhir_r4.cache import bind_count_cache_signals, bind_location_index_signals, \
+            bind_code_system_cache_signals, bind_reference_resolver_signals, bind_response_cache_signals
+        bind_count_cache_signals()
+        bind_location_index_signals()
+        bind_code_system_cache_signals()
+        bind_reference_resolver_signals()
+        bind_response_cache_signals()
+
+        from api_fhir_r4.utils import bind_attachment_cache_signals
+        bind_attachment_cache_signals()
+
         from openIMIS.ExceptionHandlerRegistry import ExceptionHandlerRegistry
         from .exceptions.fhir_api_exception_handler import fhir_api_exception_handler
         ExceptionHandlerRegistry.register_exception_handler(MODULE_NAME, fhir_api_exception_handler)
@@ -0,0 +1,2 @@
+from api_fhir_r4.bulkExport.exportResources import BulkExportResource, get_export_resources
+from api_fhir_r4.bulkExport.exportJobRunner import BulkExportJobRunner, BulkExportJobTakenOver
@@ -0,0 +1,152 @@
+import logging
+import os
+import threading
+from datetime import timedelta
+
+from django.db import connection
+from django.utils import timezone
+
+from api_fhir_r4.bulkExport.exportResources import get_export_resources
+from api_fhir_r4.configurations import R4BulkExportConfig
+from api_fhir_r4.converters import ReferenceConverterMixin
+from api_fhir_r4.models import BulkExportJob
+from api_fhir_r4.utils import JsonUtils
+
+logger = logging.getLogger(__name__)
+
+
+class BulkExportJobTakenOver(Exception):
+    """
+    The job was resumed by another runner after its heartbeat became stale.
+    """
+
+
+class BulkExportJobRunner:
+    """
+    Writes resources of the job to NDJSON files, one file per resource type. Objects are read in chunks ordered
+    by primary key, after every chunk the file is flushed and the progress (last exported pk and file size)
+    is stored in the job. Interrupted job is resumed from the last stored chunk, anything written to the file
+    after it is truncated. The heartbeat is refreshed also while a chunk is converted, the runner stops when
+    the job is taken over by another one.
+    """
+
+    def __init__(self, job: BulkExportJob):
+        self.job = job
+        self.chunk_size = R4BulkExportConfig.get_bulk_export_chunk_size()
+        self.heartbeat_interval = timedelta(seconds=R4BulkExportConfig.get_bulk_export_stale_timeout() / 3)
+
+    @classmethod
+    def start(cls, job):
+        thread = threading.Thread(target=cls._run_in_thread, args=(job.id,), daemon=True,
+                                  name=f'fhir-bulk-export-{job.id}')
+        thread.start()
+
+    @classmethod
+    def resume_if_stale(cls, job):
+        """
+        Restarts the job if it's not finished and its progress wasn't updated for `stale_timeout` seconds.
+        Returns True if the job was restarted.
+        """
+        unfinished = (BulkExportJob.JobStatus.ACCEPTED, BulkExportJob.JobStatus.IN_PROGRESS)
+        if job.status not in unfinished:
+            return False
+        stale_before = timezone.now() - timedelta(seconds=R4BulkExportConfig.get_bulk_export_stale_timeout())
+        if job.heartbeat >= stale_before:
+            return False
+        # only one of concurrent status requests succeeds to take over the job, a runner which is still alive
+        # stops at its next update
+        taken_over = BulkExportJob.objects \
+            .filter(id=job.id, status__in=unfinished, heartbeat__lt=stale_before) \
+            .update(heartbeat=timezone.now())
+        if taken_over:
+            logger.warning(f'Resuming interrupted FHIR bulk export {job.id}')
+            cls.start(job)
+        return bool(taken_over)
+
+    @classmethod
+    def get_output_path(cls, job, resource_type):
+        return os.path.join(cls.get_job_directory(job), f'{resource_type}.ndjson')
+
+    @classmethod
+    def get_job_directory(cls, job):
+        return os.path.join(os.path.abspath(R4BulkExportConfig.get_bulk_export_storage_path()), str(job.id))
+
+    @classmethod
+    def _run_in_thread(cls, job_id):
+        try:
+            cls(BulkExportJob.objects.get(id=job_id)).run()
+        finally:
+            connection.close()
+
+    def run(self):
+        self._update_job(status=BulkExportJob.JobStatus.IN_PROGRESS)
+        try:
+            os.makedirs(self.get_job_directory(self.job), exist_ok=True)
+            resources = get_export_resources()
+            for resource_type in self.job.resource_types:
+                self.export_resource(resources[resource_type])
+            self._update_job(status=BulkExportJob.JobStatus.COMPLETED)
+        except BulkExportJobTakenOver:
+            logger.warning(f'FHIR bulk export {self.job.id} was taken over by another runner, stopping')
+        except Exception as e:
+            logger.exception(f'FHIR bulk export {self.job.id} failed')
+            try:
+                self._update_job(status=BulkExportJob.JobStatus.FAILED, error=str(e))
+            except BulkExportJobTakenOver:
+                pass
+
+    def export_resource(self, resource):
+        progress = {'count': 0, 'errors': 0, 'size': 0, 'last_pk': None, 'done': False,
+                    **self.job.progress.get(resource.resource_type, {})}
+        if progress['done']:
+            return
+
+        queryset = resource.get_queryset(self.job.user, self.job.since).order_by('pk')
+        with open(self.get_output_path(self.job, resource.resource_type), 'ab') as output:
+            output.truncate(progress['size'])
+            while True:
+                chunk_queryset = queryset if progress['last_pk'] is None else queryset.filter(pk__gt=progress['last_pk'])
+                chunk = resource.converter.prefetch_imis_objs(chunk_queryset[:self.chunk_size])
+                if not chunk:
+                    break
+                for imis_obj in chunk:
+                    self._refresh_heartbeat()
+                    line = self._to_ndjson_line(resource.converter, imis_obj)
+                    if line is None:
+                        progress['errors'] += 1
+                        continue
+                    output.write(line)
+                    progress['count'] += 1
+                output.flush()
+                os.fsync(output.fileno())
+                progress['size'] = output.tell()
+                progress['last_pk'] = chunk[-1].pk
+                self._save_progress(resource.resource_type, progress)
+        progress['done'] = True
+        self._save_progress(resource.resource_type, progress)
+
+    def _to_ndjson_line(self, converter, imis_obj):
+        try:
+            fhir_obj = converter.to_fhir_obj(imis_obj, ReferenceConverterMixin.UUID_REFERENCE_TYPE)
+            converter.build_fhir_meta(fhir_obj, imis_obj)
+            return JsonUtils.dumps(fhir_obj.dict()) + b'\n'
+        except Exception:
+            logger.exception(f'FHIR bulk export {self.job.id} failed to convert {imis_obj!r}')
+            return None
+
+    def _save_progress(self, resource_type, progress):
+        self.job.progress[resource_type] = dict(progress)
+        self._update_job(progress=self.job.progress)
+
+    def _refresh_heartbeat(self):
+        if timezone.now() - self.job.heartbeat >= self.heartbeat_interval:
+            self._update_job()
+
+    def _update_job(self, **fields):
+        fields['heartbeat'] = timezone.now()
+        # the last heartbeat of the runner is changed only by the runner resuming the job
+        updated = BulkExportJob.objects.filter(id=self.job.id, heartbeat=self.job.heartbeat).update(**fields)
+        if not updated:
+            raise BulkExportJobTakenOver()
+        for field, value in fields.items():
+            setattr(self.job, field, value)
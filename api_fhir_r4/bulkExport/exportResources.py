@@ -0,0 +1,84 @@
+from openIMIS.openimisapps import openimis_apps
+
+from api_fhir_r4.converters import PatientConverter, GroupConverter, CoverageConverter, ClaimConverter, \
+    LocationConverter, MedicationConverter, ActivityDefinitionConverter, InsurancePlanConverter
+from api_fhir_r4.permissions import FHIRApiInsureePermissions, FHIRApiGroupPermissions, \
+    FHIRApiCoverageRequestPermissions, FHIRApiClaimPermissions, FHIRApiHFPermissions, FHIRApiMedicationPermissions, \
+    FHIRApiActivityDefinitionPermissions, FHIRApiProductPermissions
+
+imis_modules = openimis_apps()
+
+
+class BulkExportResource:
+    """
+    Resource type available for the bulk export, with the queryset of exported IMIS objects and the converter.
+    """
+
+    def __init__(self, resource_type, queryset_getter, converter, permission_class, since_field='validity_from'):
+        self.resource_type = resource_type
+        self.converter = converter
+        self.permission_class = permission_class
+        self.since_field = since_field
+        self._queryset_getter = queryset_getter
+
+    def get_queryset(self, user, since=None):
+        queryset = self._queryset_getter(user)
+        if since:
+            queryset = queryset.filter(**{f'{self.since_field}__gte': since})
+        return queryset
+
+    def has_permission(self, user):
+        return user.has_perms(self.permission_class.permissions_get)
+
+
+def get_export_resources():
+    resources = []
+    if 'insuree' in imis_modules:
+        from insuree.models import Insuree, Family
+        from api_fhir_r4.views.fhir.group import GroupViewSet
+        resources.append(BulkExportResource(
+            'Patient',
+            lambda user: Insuree.get_queryset(None, user).filter(validity_to__isnull=True)
+                .select_related('gender', 'photo', 'family__location'),
+            PatientConverter, FHIRApiInsureePermissions))
+        resources.append(BulkExportResource(
+            'Group',
+            # the same aggregates as of the Group search, so families aren't counted one by one
+            lambda user: GroupViewSet.annotate_group_aggregates(Family.objects.filter(validity_to__isnull=True)),
+            GroupConverter, FHIRApiGroupPermissions))
+    if 'policy' in imis_modules:
+        from policy.models import Policy
+        resources.append(BulkExportResource(
+            'Coverage',
+            lambda user: Policy.get_queryset(None, user).filter(validity_to__isnull=True),
+            CoverageConverter, FHIRApiCoverageRequestPermissions))
+    if 'claim' in imis_modules:
+        from claim.models import Claim
+        resources.append(BulkExportResource(
+            'Claim',
+            lambda user: Claim.get_queryset(None, user).filter(validity_to__isnull=True)
+                .select_related('insuree', 'health_facility', 'admin'),
+            ClaimConverter, FHIRApiClaimPermissions))
+    if 'location' in imis_modules:
+        from location.models import Location
+        resources.append(BulkExportResource(
+            'Location',
+            lambda user: Location.get_queryset(None, user).filter(validity_to__isnull=True),
+            LocationConverter, FHIRApiHFPermissions))
+    if 'medical' in imis_modules:
+        from medical.models import Item, Service
+        resources.append(BulkExportResource(
+            'Medication',
+            lambda user: Item.get_queryset(None, user).filter(validity_to__isnull=True),
+            MedicationConverter, FHIRApiMedicationPermissions))
+        resources.append(BulkExportResource(
+            'ActivityDefinition',
+            lambda user: Service.get_queryset(None, user).filter(validity_to__isnull=True),
+            ActivityDefinitionConverter, FHIRApiActivityDefinitionPermissions))
+    if 'product' in imis_modules:
+        from product.models import Product
+        resources.append(BulkExportResource(
+            'InsurancePlan',
+            lambda user: Product.objects.filter(validity_to__isnull=True),
+            InsurancePlanConverter, FHIRApiProductPermissions))
+    return {resource.resource_type: resource for resource in resources}
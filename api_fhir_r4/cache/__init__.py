@@ -0,0 +1,6 @@
+from api_fhir_r4.cache.responseCache import FHIRResponseCache, bind_response_cache_signals
+from api_fhir_r4.cache.countCache import QueryCountCache, bind_count_cache_signals
+from api_fhir_r4.cache.locationIndex import LocationIndex, LocationNode, bind_location_index_signals
+from api_fhir_r4.cache.eligibilityCache import EligibilityCache
+from api_fhir_r4.cache.codeSystemCache import CodeSystemCache, CodeSystemEntry, bind_code_system_cache_signals
+from api_fhir_r4.cache.referenceResolver import ReferenceResolver, bind_reference_resolver_signals
@@ -0,0 +1,147 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import namedtuple
+
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save
+
+from api_fhir_r4.cache.countCache import QueryCountCache
+from api_fhir_r4.cache.generations import ProcessCacheValidity
+from api_fhir_r4.utils import FhirUtils, JsonUtils
+
+logger = logging.getLogger(__name__)
+
+CodeSystemEntry = namedtuple('CodeSystemEntry', ['rows', 'concepts', 'etag', 'last_modified', 'generation', 'bodies'])
+CodeSystemEntry.__doc__ = """
+Loaded code system. `rows` are (code, display) pairs in the order of the source data, `concepts` maps codes to
+displays, `bodies` keeps the rendered CodeSystem resource per URL it was requested by.
+"""
+
+
+class CodeSystemCache:
+    """
+    Process-wide cache of CodeSystem resources built from openIMIS reference data (diagnoses, professions etc.).
+    Concepts are loaded once and the JSON body of the resource is rendered once, requests are served without
+    queries. Code systems of a model are reloaded after the model is changed in the same process, changes done by
+    other processes are picked up through the generation of its table, see ProcessCacheValidity. Code systems
+    without a model are loaded once.
+    """
+    MAX_BODIES_PER_CODE_SYSTEM = 16
+    # models of code systems, changes are applied at once in the process which made them
+    CODE_SYSTEM_MODELS = [
+        ('medical', 'Diagnosis'),
+        ('insuree', 'Education'),
+        ('insuree', 'Profession'),
+        ('insuree', 'IdentificationType'),
+        ('insuree', 'Relation'),
+        ('insuree', 'FamilyType'),
+        ('insuree', 'ConfirmationType'),
+        ('location', 'HealthFacilityLegalForm'),
+    ]
+
+    _lock = threading.Lock()
+    _entries = {}
+    _validities = {}
+
+    @classmethod
+    def get_entry(cls, key, code_system, load_data, db_table=None):
+        """
+        Entry of the code system, `load_data` returns the source rows and is called only when the entry is
+        (re)loaded. `code_system` is the definition used by CodeSystemConverter (id, code and display fields, ...).
+        """
+        entry = cls._entries.get(key)
+        validity = cls._validities.setdefault(key, ProcessCacheValidity())
+        if entry is not None and (db_table is None or not validity.is_check_due()):
+            return entry
+        with cls._lock:
+            generation = cls._get_generation(db_table)
+            entry = cls._entries.get(key)
+            if entry is None or validity.is_reload_due(generation):
+                reloaded = cls._build_entry(code_system, load_data(), generation)
+                # unchanged data keeps Last-Modified and the rendered bodies
+                if entry is not None and entry.etag == reloaded.etag:
+                    reloaded = entry if entry.generation == generation else entry._replace(generation=generation)
+                entry = reloaded
+                cls._entries[key] = entry
+                validity.set_loaded(generation)
+            else:
+                validity.set_checked()
+            return entry
+
+    @classmethod
+    def get_body(cls, entry, code_system, url):
+        """
+        JSON body of the CodeSystem resource, rendered on the first request from the given URL.
+        """
+        body = entry.bodies.get(url)
+        if body is None:
+            from api_fhir_r4.converters import CodeSystemConverter
+            fhir_code_system = CodeSystemConverter.to_fhir_obj({
+                **code_system,
+                'url': url,
+                'code_field': 'code',
+                'display_field': 'display',
+                'data': [{'code': code, 'display': display} for code, display in entry.rows],
+            }, None)
+            body = JsonUtils.dumps(fhir_code_system.dict())
+            if len(entry.bodies) < cls.MAX_BODIES_PER_CODE_SYSTEM:
+                entry.bodies[url] = body
+        return body
+
+    @classmethod
+    def invalidate(cls, db_table=None):
+        with cls._lock:
+            if db_table is None:
+                cls._entries = {}
+            else:
+                cls._entries = {key: entry for key, entry in cls._entries.items()
+                                if entry.generation is None or entry.generation[0] != db_table}
+
+    @classmethod
+    def _get_generation(cls, db_table):
+        if db_table is None:
+            return None
+        try:
+            return db_table, QueryCountCache.get_table_generation(db_table)
+        except Exception as e:
+            logger.error(f'Reading generation of {db_table} failed: {e}')
+            return db_table, None
+
+    @classmethod
+    def _build_entry(cls, code_system, data, generation):
+        rows = []
+        concepts = {}
+        for item in data:
+            code = FhirUtils.get_attr(item, code_system['code_field'])
+            display = FhirUtils.get_attr(item, code_system['display_field'])
+            rows.append((code, display))
+            # historical versions of a record share its code, the current one is used by the operations
+            if str(code) not in concepts or getattr(item, 'validity_to', None) is None:
+                concepts[str(code)] = display
+        raw_etag = JsonUtils.dumps([code_system['id'], code_system.get('name'), rows])
+        return CodeSystemEntry(
+            rows=rows,
+            concepts=concepts,
+            etag=f'W/"{hashlib.md5(raw_etag).hexdigest()}"',
+            last_modified=int(time.time()),
+            generation=generation,
+            bodies={},
+        )
+
+
+def on_code_system_model_changed(sender, **kwargs):
+    CodeSystemCache.invalidate(sender._meta.db_table)
+
+
+def bind_code_system_cache_signals():
+    for app_label, model_name in CodeSystemCache.CODE_SYSTEM_MODELS:
+        try:
+            model = apps.get_model(app_label, model_name)
+        except LookupError:
+            continue
+        post_save.connect(on_code_system_model_changed, sender=model,
+                          dispatch_uid=f'api_fhir_r4_code_system_cache_post_save_{model_name}')
+        post_delete.connect(on_code_system_model_changed, sender=model,
+                            dispatch_uid=f'api_fhir_r4_code_system_cache_post_delete_{model_name}')
@@ -0,0 +1,183 @@
+import hashlib
+import logging
+import re
+import threading
+from collections import OrderedDict
+
+from django.apps import apps
+from django.core.cache import caches
+from django.core.exceptions import EmptyResultSet
+from django.db import connections, transaction
+from django.db.models.signals import post_delete, post_save
+
+from api_fhir_r4.cache.generations import CacheGenerations
+from api_fhir_r4.configurations import R4CountCacheConfig
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCountCache:
+    """
+    Cache of queryset counts. Key of an entry contains generations of all tables used by the query. Generation of
+    a table of `TRACKED_MODELS` is bumped when an instance of the model is saved or deleted and the change is
+    committed. Changes which don't send model signals (e.g. `QuerySet.update()`, `bulk_create` or stored
+    procedures) and changes of other tables are picked up after the configured timeout, which is kept short.
+    Entries created by the process are limited to `max_entries`, the least recently used ones are removed first.
+    """
+    KEY_PREFIX = 'query-count'
+    # models searched by the FHIR list views and the reference data kept by the process caches (LocationIndex,
+    # CodeSystemCache, ReferenceResolver, SubscriptionRegistry), which reload when the generation changes
+    TRACKED_MODELS = [
+        ('insuree', 'Insuree'),
+        ('insuree', 'Family'),
+        ('insuree', 'InsureePolicy'),
+        ('insuree', 'Education'),
+        ('insuree', 'Profession'),
+        ('insuree', 'IdentificationType'),
+        ('insuree', 'Relation'),
+        ('insuree', 'FamilyType'),
+        ('insuree', 'ConfirmationType'),
+        ('location', 'Location'),
+        ('location', 'HealthFacility'),
+        ('location', 'HealthFacilityLegalForm'),
+        ('claim', 'Claim'),
+        ('claim', 'ClaimItem'),
+        ('claim', 'ClaimService'),
+        ('claim', 'ClaimAdmin'),
+        ('claim', 'ClaimAttachment'),
+        ('claim', 'Feedback'),
+        ('core', 'Officer'),
+        ('policy', 'Policy'),
+        ('product', 'Product'),
+        ('medical', 'Diagnosis'),
+        ('medical', 'Item'),
+        ('medical', 'Service'),
+        ('invoice', 'Invoice'),
+        ('invoice', 'Bill'),
+        ('policyholder', 'PolicyHolder'),
+        ('api_fhir_r4', 'Subscription'),
+    ]
+    _QUOTED_IDENTIFIER = re.compile(r'["\[`](\w+)["\]`]')
+    _PLANNER_ESTIMATE_QUERIES = {
+        'postgresql': 'SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)',
+        'microsoft': 'SELECT SUM(rows) FROM sys.partitions WHERE object_id = OBJECT_ID(%s) AND index_id IN (0, 1)',
+    }
+
+    _lock = threading.Lock()
+    _recent_keys = OrderedDict()
+    _db_tables = None
+
+    @classmethod
+    def get_count(cls, queryset, real_count, timeout=None, cache_name=None):
+        estimate = cls.get_estimated_count(queryset)
+        if estimate is not None:
+            return estimate
+
+        try:
+            key = cls.get_key(queryset)
+        except EmptyResultSet:
+            return real_count()
+
+        cache_name = cache_name or R4CountCacheConfig.get_count_cache_name()
+        cache = caches[cache_name]
+        value = cache.get(key)
+        if value is None:
+            value = real_count()
+            cache.set(key, value, timeout if timeout is not None else R4CountCacheConfig.get_count_cache_timeout())
+        cls._register_key(cache_name, key)
+        return value
+
+    @classmethod
+    def get_key(cls, queryset):
+        sql = str(queryset.query)
+        generation_names = [cls._get_generation_name(table) for table in cls.get_query_tables(sql)]
+        generations = CacheGenerations.get_many(cls._get_generations_cache(), generation_names)
+        raw_key = f'{queryset.db}:{sql}:{sorted(generations.items())}'
+        return f'{cls.KEY_PREFIX}:{hashlib.md5(raw_key.encode("utf8")).hexdigest()}'
+
+    @classmethod
+    def get_query_tables(cls, sql):
+        # Tables are taken from the SQL, so also the ones used only by subqueries (e.g. Exists filters) are included
+        if cls._db_tables is None:
+            cls._db_tables = {model._meta.db_table for model in apps.get_models(include_auto_created=True)}
+        return sorted(set(cls._QUOTED_IDENTIFIER.findall(sql)) & cls._db_tables)
+
+    @classmethod
+    def invalidate_table(cls, db_table):
+        try:
+            CacheGenerations.bump(cls._get_generations_cache(), cls._get_generation_name(db_table))
+        except Exception as e:
+            logger.error(f'Invalidating query count cache for {db_table} failed: {e}')
+
+    @classmethod
+    def get_table_generation(cls, db_table):
+        return CacheGenerations.get(cls._get_generations_cache(), cls._get_generation_name(db_table))
+
+    @classmethod
+    def get_estimated_count(cls, queryset):
+        """
+        Planner estimate of the table size is used for counts of unfiltered querysets over tables larger than
+        the configured `estimate_threshold`. Returns None if estimate shouldn't be used.
+        """
+        threshold = R4CountCacheConfig.get_count_cache_estimate_threshold()
+        if threshold is None or not cls._is_unfiltered(queryset.query):
+            return None
+        estimate = cls._get_planner_estimate(queryset.model._meta.db_table, queryset.db)
+        return estimate if estimate is not None and estimate >= threshold else None
+
+    @classmethod
+    def _get_planner_estimate(cls, db_table, using):
+        connection = connections[using]
+        sql = cls._PLANNER_ESTIMATE_QUERIES.get(connection.vendor)
+        if not sql:
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [connection.ops.quote_name(db_table)])
+            row = cursor.fetchone()
+        # tables never analyzed have no (or negative) estimate
+        if not row or row[0] is None or row[0] < 0:
+            return None
+        return int(row[0])
+
+    @classmethod
+    def _is_unfiltered(cls, query):
+        return not query.where and not query.distinct and not query.combinator \
+            and query.low_mark == 0 and query.high_mark is None
+
+    @classmethod
+    def _register_key(cls, cache_name, key):
+        max_entries = R4CountCacheConfig.get_count_cache_max_entries()
+        evicted = []
+        with cls._lock:
+            cls._recent_keys[key] = cache_name
+            cls._recent_keys.move_to_end(key)
+            while max_entries and len(cls._recent_keys) > max_entries:
+                evicted.append(cls._recent_keys.popitem(last=False))
+        for evicted_key, evicted_cache_name in evicted:
+            caches[evicted_cache_name].delete(evicted_key)
+
+    @classmethod
+    def _get_generations_cache(cls):
+        return caches[R4CountCacheConfig.get_count_cache_name()]
+
+    @classmethod
+    def _get_generation_name(cls, db_table):
+        return f'{cls.KEY_PREFIX}:{db_table}'
+
+
+def on_model_changed(sender, using=None, **kwargs):
+    # bumped after the commit, otherwise a concurrent count could cache the old total under the new generation
+    db_table = sender._meta.db_table
+    transaction.on_commit(lambda: QueryCountCache.invalidate_table(db_table), using=using)
+
+
+def bind_count_cache_signals():
+    for app_label, model_name in QueryCountCache.TRACKED_MODELS:
+        try:
+            model = apps.get_model(app_label, model_name)
+        except LookupError:
+            continue
+        post_save.connect(on_model_changed, sender=model,
+                          dispatch_uid=f'api_fhir_r4_count_cache_post_save_{app_label}_{model_name}')
+        post_delete.connect(on_model_changed, sender=model,
+                            dispatch_uid=f'api_fhir_r4_count_cache_post_delete_{app_label}_{model_name}')
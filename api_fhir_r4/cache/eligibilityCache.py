@@ -0,0 +1,88 @@
+import hashlib
+import json
+import logging
+
+from django.core.cache import caches
+
+from api_fhir_r4.cache.generations import CacheGenerations
+from api_fhir_r4.configurations import R4CoverageEligibilityConfiguration
+
+logger = logging.getLogger(__name__)
+
+
+class EligibilityCache:
+    """
+    Short living cache of eligibility evaluations, keyed by (chf_id, service_code, item_code). Entry keys contain
+    the global generation and the generation of the insuree, so changes of policies drop all the entries and
+    claims drop the entries of the claimed insuree only.
+    """
+    KEY_PREFIX = 'fhir-eligibility'
+
+    @classmethod
+    def is_enabled(cls):
+        return bool(R4CoverageEligibilityConfiguration.get_eligibility_cache_timeout())
+
+    @classmethod
+    def get_cache(cls):
+        return caches[R4CoverageEligibilityConfiguration.get_eligibility_cache_name()]
+
+    @classmethod
+    def get_keys(cls, keys):
+        """
+        Cache keys of the (chf_id, service_code, item_code) keys. Keys have to be taken before the evaluation and
+        used to store its result, so an evaluation running during an invalidation isn't stored as a valid one.
+        """
+        if not cls.is_enabled() or not keys:
+            return {}
+        try:
+            names = [cls.KEY_PREFIX] + [cls._get_generation_name(chf_id) for chf_id in {key[0] for key in keys}]
+            generations = CacheGenerations.get_many(cls.get_cache(), names)
+        except Exception as e:
+            logger.error(f'Reading eligibility cache generations failed: {e}')
+            return {}
+        global_generation = generations[cls.KEY_PREFIX]
+        cache_keys = {}
+        for key in keys:
+            raw_key = json.dumps([global_generation, generations[cls._get_generation_name(key[0])], *key])
+            cache_keys[key] = f'{cls.KEY_PREFIX}:{hashlib.md5(raw_key.encode("utf8")).hexdigest()}'
+        return cache_keys
+
+    @classmethod
+    def get_many(cls, cache_keys):
+        if not cache_keys:
+            return {}
+        try:
+            entries = cls.get_cache().get_many(list(cache_keys.values()))
+        except Exception as e:
+            logger.error(f'Reading eligibility cache failed: {e}')
+            return {}
+        return {key: entries[cache_key] for key, cache_key in cache_keys.items() if cache_key in entries}
+
+    @classmethod
+    def set_many(cls, cache_keys, evaluations):
+        entries = {cache_keys[key]: evaluation for key, evaluation in evaluations.items() if key in cache_keys}
+        if not entries:
+            return
+        try:
+            cls.get_cache().set_many(entries, R4CoverageEligibilityConfiguration.get_eligibility_cache_timeout())
+        except Exception as e:
+            logger.error(f'Storing eligibility evaluations failed: {e}')
+
+    @classmethod
+    def invalidate(cls, chf_ids=None):
+        """
+        Drops entries of the given insurees, or all the entries if no chf_id is given.
+        """
+        if not cls.is_enabled():
+            return
+        names = [cls._get_generation_name(chf_id) for chf_id in chf_ids] if chf_ids else [cls.KEY_PREFIX]
+        try:
+            cache = cls.get_cache()
+            for name in names:
+                CacheGenerations.bump(cache, name)
+        except Exception as e:
+            logger.error(f'Invalidating eligibility cache failed: {e}')
+
+    @classmethod
+    def _get_generation_name(cls, chf_id):
+        return f'{cls.KEY_PREFIX}:{chf_id}'
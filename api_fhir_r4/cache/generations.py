@@ -0,0 +1,93 @@
+import time
+
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+from api_fhir_r4.configurations import R4CountCacheConfig
+
+
+class CacheGenerations:
+    """
+    Generation counters kept in the Django cache. A generation is a part of the keys of dependent entries, bumping
+    it makes all of them unreachable at once, they are removed by the cache after their timeout.
+    """
+    KEY_PREFIX = 'fhir-generation'
+
+    @classmethod
+    def get(cls, cache, name):
+        return cls.get_many(cache, [name])[name]
+
+    @classmethod
+    def get_many(cls, cache, names):
+        keys = {cls._get_key(name): name for name in names}
+        generations = cache.get_many(list(keys))
+        for key in keys:
+            if key not in generations:
+                cache.add(key, cls._new_generation(), None)
+                generations[key] = cache.get(key)
+        return {name: generations[key] for key, name in keys.items()}
+
+    @classmethod
+    def bump(cls, cache, name):
+        key = cls._get_key(name)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, cls._new_generation(), None)
+
+    @classmethod
+    def is_process_local(cls, cache):
+        # generations kept in the memory of a process aren't bumped by changes done in the other processes
+        return isinstance(cache, (LocMemCache, DummyCache))
+
+    @classmethod
+    def _get_key(cls, name):
+        return f'{cls.KEY_PREFIX}:{name}'
+
+    @classmethod
+    def _new_generation(cls):
+        # Counter evicted from the cache must not fall back to a value used before, entries from that
+        # generation could be still stored.
+        return time.time_ns()
+
+
+class ProcessCacheValidity:
+    """
+    Tells when data kept in the memory of the process (e.g. LocationIndex) has to be reloaded. Changes of the data
+    bump the generation of its table in the count cache, the generation is checked at most every
+    `GENERATION_CHECK_INTERVAL` seconds. Changes done by other processes are visible through the generation only if
+    the count cache is shared by the processes (e.g. Redis, Memcached), with a process local cache the data is also
+    reloaded every `process_cache_max_age` seconds of R4_fhir_count_cache_config.
+    """
+    GENERATION_CHECK_INTERVAL = 5
+
+    def __init__(self):
+        self.generation = None
+        self.checked_at = None
+        self.expires_at = None
+
+    def is_check_due(self):
+        now = time.monotonic()
+        return self.checked_at is None or now - self.checked_at >= self.GENERATION_CHECK_INTERVAL \
+            or (self.expires_at is not None and now >= self.expires_at)
+
+    def is_reload_due(self, generation):
+        return self.checked_at is None or generation != self.generation \
+            or (self.expires_at is not None and time.monotonic() >= self.expires_at)
+
+    def set_loaded(self, generation):
+        now = time.monotonic()
+        max_age = self.get_max_age()
+        self.generation = generation
+        self.checked_at = now
+        self.expires_at = now + max_age if max_age is not None else None
+
+    def set_checked(self):
+        self.checked_at = time.monotonic()
+
+    @classmethod
+    def get_max_age(cls):
+        if not CacheGenerations.is_process_local(caches[R4CountCacheConfig.get_count_cache_name()]):
+            return None
+        return R4CountCacheConfig.get_count_cache_process_max_age()
@@ -0,0 +1,119 @@
+import logging
+import threading
+from collections import namedtuple, defaultdict
+
+from django.db.models.signals import post_delete, post_save
+
+from api_fhir_r4.cache.countCache import QueryCountCache
+from api_fhir_r4.cache.generations import ProcessCacheValidity
+
+logger = logging.getLogger(__name__)
+
+LocationNode = namedtuple('LocationNode', ['id', 'uuid', 'code', 'name', 'type', 'parent_id'])
+
+
+class LocationIndex:
+    """
+    Process-wide index of active locations. The location tree is loaded once and kept in memory, so addresses
+    and location references are built without per-row queries. Index is reloaded after locations are changed in
+    the same process, changes done by other processes are picked up through the generation of the locations table,
+    see ProcessCacheValidity.
+    """
+    _lock = threading.Lock()
+    _state = None
+    _validity = ProcessCacheValidity()
+
+    @classmethod
+    def get_by_id(cls, location_id):
+        return cls._get_state()['by_id'].get(location_id) if location_id is not None else None
+
+    @classmethod
+    def get_by_uuid(cls, uuid):
+        return cls._get_state()['by_uuid'].get(str(uuid).lower()) if uuid else None
+
+    @classmethod
+    def get_by_code(cls, code):
+        return cls._get_state()['by_code'].get(code) if code else None
+
+    @classmethod
+    def filter_by_name(cls, name, parent_name, location_type=None):
+        nodes = cls._get_state()['by_name'].get((name, parent_name), [])
+        return [node for node in nodes if location_type is None or node.type == location_type]
+
+    @classmethod
+    def get_related_location(cls, imis_obj, field_name):
+        """
+        Location referenced by `field_name` FK of the IMIS object, indexed node is used if available, otherwise the
+        related object is loaded (e.g. location created after the last reload or not saved yet).
+        """
+        return cls.get_by_id(getattr(imis_obj, f'{field_name}_id', None)) or getattr(imis_obj, field_name)
+
+    @classmethod
+    def get_ancestor(cls, location, levels):
+        node = cls.get_by_id(location.id)
+        for _ in range(levels):
+            node = cls.get_by_id(node.parent_id) if node else None
+        if node:
+            return node
+
+        if isinstance(location, LocationNode):
+            from location.models import Location
+            location = Location.objects.get(id=location.id)
+        for _ in range(levels):
+            location = location.parent
+        return location
+
+    @classmethod
+    def invalidate(cls):
+        with cls._lock:
+            cls._state = None
+
+    @classmethod
+    def _get_state(cls):
+        state = cls._state
+        if state is not None and not cls._validity.is_check_due():
+            return state
+        with cls._lock:
+            generation = cls._get_generation()
+            if cls._state is None or cls._validity.is_reload_due(generation):
+                cls._state = cls._load()
+                cls._validity.set_loaded(generation)
+            else:
+                cls._validity.set_checked()
+            return cls._state
+
+    @classmethod
+    def _get_generation(cls):
+        from location.models import Location
+        try:
+            return QueryCountCache.get_table_generation(Location._meta.db_table)
+        except Exception as e:
+            logger.error(f'Reading locations generation failed: {e}')
+            return None
+
+    @classmethod
+    def _load(cls):
+        from location.models import Location
+        rows = Location.objects.filter(validity_to__isnull=True) \
+            .values_list('id', 'uuid', 'code', 'name', 'type', 'parent_id')
+        by_id = {row[0]: LocationNode(*row) for row in rows}
+        by_name = defaultdict(list)
+        for node in by_id.values():
+            parent = by_id.get(node.parent_id)
+            by_name[(node.name, parent.name if parent else None)].append(node)
+        return {
+            'by_id': by_id,
+            'by_uuid': {str(node.uuid).lower(): node for node in by_id.values()},
+            'by_code': {node.code: node for node in by_id.values()},
+            'by_name': dict(by_name),
+        }
+
+
+def on_location_changed(sender, **kwargs):
+    LocationIndex.invalidate()
+
+
+def bind_location_index_signals():
+    from location.models import Location
+    post_save.connect(on_location_changed, sender=Location, dispatch_uid='api_fhir_r4_location_index_post_save')
+    post_delete.connect(on_location_changed, sender=Location, dispatch_uid='api_fhir_r4_location_index_post_delete')
@@ -0,0 +1,140 @@
+import contextvars
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save
+
+from api_fhir_r4.cache.countCache import QueryCountCache
+from api_fhir_r4.cache.generations import ProcessCacheValidity
+from api_fhir_r4.configurations import R4ReferenceCacheConfig
+
+logger = logging.getLogger(__name__)
+
+
+class ReferenceResolver:
+    """
+    Resolves references and codes of lookup tables for inbound writes (`to_imis_obj`), `get(model, **lookup)`
+    behaves as `model.objects.get(**lookup)`.
+
+    Objects of reference data models (`CACHED_MODELS`) are kept in the process memory, up to `max_entries` with
+    the least recently used removed first. Entries of a model are dropped when an instance of the model is saved
+    or deleted, changes done by other processes are picked up through the generation of its table, see
+    ProcessCacheValidity. Objects of other models are kept only within the request scope, e.g. all entries of
+    a Bundle which reference the same health facility share one query.
+    """
+    CACHED_MODELS = [
+        ('insuree', 'Education'),
+        ('insuree', 'Profession'),
+        ('insuree', 'IdentificationType'),
+        ('insuree', 'Relation'),
+        ('insuree', 'FamilyType'),
+        ('insuree', 'ConfirmationType'),
+        ('medical', 'Diagnosis'),
+        ('medical', 'Item'),
+        ('medical', 'Service'),
+        ('location', 'HealthFacilityLegalForm'),
+    ]
+
+    _lock = threading.Lock()
+    _entries = OrderedDict()
+    _validities = {}
+    _cached_labels = {f'{app_label}.{model_name}' for app_label, model_name in CACHED_MODELS}
+    _request_scope = contextvars.ContextVar('api_fhir_r4_reference_request_scope', default=None)
+
+    @classmethod
+    def get(cls, model, **lookup):
+        if not R4ReferenceCacheConfig.get_reference_cache_enabled():
+            return model.objects.get(**lookup)
+        key = (model._meta.label, tuple(sorted(
+            (field, value if value is None else str(value)) for field, value in lookup.items())))
+        if model._meta.label in cls._cached_labels:
+            return cls._get_cached(model, key, lookup)
+
+        scope = cls._request_scope.get()
+        if scope is None:
+            return model.objects.get(**lookup)
+        if key not in scope:
+            scope[key] = model.objects.get(**lookup)
+        return scope[key]
+
+    @classmethod
+    @contextmanager
+    def request_scope(cls):
+        """
+        Scope of objects resolved within a request, nested scopes (e.g. entries of a Bundle) use the outer one.
+        """
+        if cls._request_scope.get() is not None:
+            yield
+            return
+        token = cls._request_scope.set({})
+        try:
+            yield
+        finally:
+            cls._request_scope.reset(token)
+
+    @classmethod
+    def clear_request_scope(cls):
+        scope = cls._request_scope.get()
+        if scope is not None:
+            scope.clear()
+
+    @classmethod
+    def invalidate(cls, model=None):
+        with cls._lock:
+            if model is None:
+                cls._entries.clear()
+                return
+            label = model._meta.label
+            for key in [key for key in cls._entries if key[0] == label]:
+                del cls._entries[key]
+
+    @classmethod
+    def _get_cached(cls, model, key, lookup):
+        cls._check_generation(model)
+        with cls._lock:
+            if key in cls._entries:
+                cls._entries.move_to_end(key)
+                return cls._entries[key]
+
+        obj = model.objects.get(**lookup)
+        max_entries = R4ReferenceCacheConfig.get_reference_cache_max_entries()
+        with cls._lock:
+            cls._entries[key] = obj
+            while max_entries and len(cls._entries) > max_entries:
+                cls._entries.popitem(last=False)
+        return obj
+
+    @classmethod
+    def _check_generation(cls, model):
+        validity = cls._validities.setdefault(model._meta.label, ProcessCacheValidity())
+        if not validity.is_check_due():
+            return
+        try:
+            current = QueryCountCache.get_table_generation(model._meta.db_table)
+        except Exception as e:
+            logger.error(f'Reading generation of {model._meta.db_table} failed: {e}')
+            current = validity.generation
+        if validity.is_reload_due(current):
+            cls.invalidate(model)
+            validity.set_loaded(current)
+        else:
+            validity.set_checked()
+
+
+def on_reference_model_changed(sender, **kwargs):
+    ReferenceResolver.invalidate(sender)
+
+
+def bind_reference_resolver_signals():
+    for app_label, model_name in ReferenceResolver.CACHED_MODELS:
+        try:
+            model = apps.get_model(app_label, model_name)
+        except LookupError:
+            continue
+        post_save.connect(on_reference_model_changed, sender=model,
+                          dispatch_uid=f'api_fhir_r4_reference_resolver_post_save_{model_name}')
+        post_delete.connect(on_reference_model_changed, sender=model,
+                            dispatch_uid=f'api_fhir_r4_reference_resolver_post_delete_{model_name}')
@@ -0,0 +1,139 @@
+import hashlib
+import json
+import logging
+
+from django.apps import apps
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils.http import parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+
+from api_fhir_r4.cache.generations import CacheGenerations
+from api_fhir_r4.configurations import R4ResponseCacheConfig
+from api_fhir_r4.utils import ConditionalRequestUtils
+
+logger = logging.getLogger(__name__)
+
+
+class FHIRResponseCache:
+    """
+    Cache of read and search responses. Every resource type has a generation counter which is a part of the entry
+    key. Invalidation bumps the counter, so all entries of the resource type become unreachable at once and
+    expire after the configured timeout. Counters are bumped after the commit of the change, otherwise a concurrent
+    read could store the old data under the new generation.
+    """
+    KEY_PREFIX = 'fhir-response'
+    SCOPE_RIGHTS = 'rights'
+    # Resource types of models changed without service signals (e.g. products), invalidated by model signals
+    MODEL_RESOURCE_TYPES = {
+        ('product', 'Product'): ('InsurancePlan',),
+    }
+
+    @classmethod
+    def is_enabled(cls):
+        return R4ResponseCacheConfig.get_response_cache_enabled()
+
+    @classmethod
+    def get_cache(cls):
+        return caches[R4ResponseCacheConfig.get_response_cache_name()]
+
+    @classmethod
+    def wrap_handler(cls, resource_type, handler):
+        def cached_handler(request, *args, **kwargs):
+            cache = cls.get_cache()
+            key = cls.get_key(resource_type, request)
+            entry = cache.get(key)
+            if entry is not None:
+                return cls.build_response(request, entry)
+
+            response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK or not isinstance(response, Response):
+                return response
+            entry = cls.build_entry(response)
+            cache.set(key, entry, R4ResponseCacheConfig.get_response_cache_timeout())
+            return cls.build_response(request, entry, response)
+
+        return cached_handler
+
+    @classmethod
+    def invalidate(cls, *resource_types):
+        if not cls.is_enabled():
+            return
+        transaction.on_commit(lambda: cls._bump_generations(resource_types))
+
+    @classmethod
+    def _bump_generations(cls, resource_types):
+        try:
+            cache = cls.get_cache()
+            for resource_type in resource_types:
+                CacheGenerations.bump(cache, cls._get_generation_name(resource_type))
+        except Exception as e:
+            logger.error(f'Invalidating FHIR response cache failed: {e}')
+
+    @classmethod
+    def get_key(cls, resource_type, request):
+        query = sorted((key, sorted(values)) for key, values in request.query_params.lists())
+        raw_key = json.dumps([request.path, query, cls.get_scope(request.user)])
+        generation = CacheGenerations.get(cls.get_cache(), cls._get_generation_name(resource_type))
+        return f'{cls.KEY_PREFIX}:{resource_type}:{generation}:' \
+               f'{hashlib.md5(raw_key.encode("utf8")).hexdigest()}'
+
+    @classmethod
+    def get_scope(cls, user):
+        # With `rights` scope users with the same set of rights and districts share the entries, by default entries
+        # are per user
+        if R4ResponseCacheConfig.get_response_cache_scope() == cls.SCOPE_RIGHTS:
+            rights = sorted(str(right) for right in (getattr(user, 'rights', None) or []))
+            return f'{cls.SCOPE_RIGHTS}:{",".join(rights)}:{cls.get_location_scope(user)}'
+        return f'user:{user.pk}'
+
+    @classmethod
+    def get_location_scope(cls, user):
+        """
+        Districts of the user, resources like Patient or Location are restricted by them.
+        """
+        imis_user = getattr(user, '_u', None)
+        if imis_user is None:
+            return ''
+        from location.models import UserDistrict
+        districts = sorted(str(district.location_id) for district in UserDistrict.get_user_districts(imis_user))
+        return ','.join(districts)
+
+    @classmethod
+    def build_entry(cls, response):
+        # validators produced by the view are served, cached responses carry the same ones as uncached
+        return {
+            'data': response.data,
+            'etag': response.get('ETag'),
+            'last_modified': parse_http_date_safe(response.get('Last-Modified', '')),
+        }
+
+    @classmethod
+    def build_response(cls, request, entry, response=None):
+        if ConditionalRequestUtils.is_not_modified(request, entry['etag'], entry['last_modified']):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        elif response is None:
+            response = Response(entry['data'])
+        return ConditionalRequestUtils.set_validators(response, entry['etag'], entry['last_modified'])
+
+    @classmethod
+    def _get_generation_name(cls, resource_type):
+        return f'{cls.KEY_PREFIX}:{resource_type}'
+
+
+def on_response_cache_model_changed(sender, **kwargs):
+    FHIRResponseCache.invalidate(*FHIRResponseCache.MODEL_RESOURCE_TYPES[(sender._meta.app_label, sender.__name__)])
+
+
+def bind_response_cache_signals():
+    for app_label, model_name in FHIRResponseCache.MODEL_RESOURCE_TYPES:
+        try:
+            model = apps.get_model(app_label, model_name)
+        except LookupError:
+            continue
+        post_save.connect(on_response_cache_model_changed, sender=model,
+                          dispatch_uid=f'api_fhir_r4_response_cache_post_save_{model_name}')
+        post_delete.connect(on_response_cache_model_changed, sender=model,
+                            dispatch_uid=f'api_fhir_r4_response_cache_post_delete_{model_name}')
@@ -10,7 +10,12 @@ from api_fhir_r4.configurations import (
     R4OrganisationConfig,
     R4CoverageConfig,
     R4SubscriptionConfig,
-    R4PaymentNoticeConfig
+    R4PaymentNoticeConfig,
+    R4ResponseCacheConfig,
+    R4CountCacheConfig,
+    R4BulkExportConfig,
+    R4ReferenceCacheConfig,
+    R4RequestTimingConfig
 )
 
 
@@ -59,3 +64,23 @@ class R4ApiFhirConfig(BaseApiFhirConfiguration):
     @classmethod
     def get_payment_notice_configuration(cls):
         return R4PaymentNoticeConfig
+
+    @classmethod
+    def get_response_cache_configuration(cls):
+        return R4ResponseCacheConfig
+
+    @classmethod
+    def get_count_cache_configuration(cls):
+        return R4CountCacheConfig
+
+    @classmethod
+    def get_bulk_export_configuration(cls):
+        return R4BulkExportConfig
+
+    @classmethod
+    def get_reference_cache_configuration(cls):
+        return R4ReferenceCacheConfig
+
+    @classmethod
+    def get_request_timing_configuration(cls):
+        return R4RequestTimingConfig
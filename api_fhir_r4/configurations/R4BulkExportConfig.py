@@ -0,0 +1,23 @@
+from api_fhir_r4.configurations import BulkExportConfiguration
+from api_fhir_r4.defaultConfig import DEFAULT_CFG
+
+
+class R4BulkExportConfig(BulkExportConfiguration):
+    _config = 'R4_fhir_bulk_export_config'
+
+    @classmethod
+    def build_configuration(cls, cfg):
+        cls.get_config().R4_fhir_bulk_export_config = cfg.get(
+            'R4_fhir_bulk_export_config', DEFAULT_CFG['R4_fhir_bulk_export_config'])
+
+    @classmethod
+    def get_bulk_export_storage_path(cls):
+        return cls.get_config_attribute('R4_fhir_bulk_export_config').get('storage_path', 'fhir_bulk_export')
+
+    @classmethod
+    def get_bulk_export_chunk_size(cls):
+        return cls.get_config_attribute('R4_fhir_bulk_export_config').get('chunk_size', 500)
+
+    @classmethod
+    def get_bulk_export_stale_timeout(cls):
+        return cls.get_config_attribute('R4_fhir_bulk_export_config').get('stale_timeout', 600)
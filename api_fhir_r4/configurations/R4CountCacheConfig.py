@@ -0,0 +1,31 @@
+from api_fhir_r4.configurations import CountCacheConfiguration
+from api_fhir_r4.defaultConfig import DEFAULT_CFG
+
+
+class R4CountCacheConfig(CountCacheConfiguration):
+    _config = 'R4_fhir_count_cache_config'
+
+    @classmethod
+    def build_configuration(cls, cfg):
+        cls.get_config().R4_fhir_count_cache_config = cfg.get(
+            'R4_fhir_count_cache_config', DEFAULT_CFG['R4_fhir_count_cache_config'])
+
+    @classmethod
+    def get_count_cache_name(cls):
+        return cls.get_config_attribute('R4_fhir_count_cache_config').get('cache_name', 'default')
+
+    @classmethod
+    def get_count_cache_timeout(cls):
+        return cls.get_config_attribute('R4_fhir_count_cache_config').get('timeout', 60)
+
+    @classmethod
+    def get_count_cache_max_entries(cls):
+        return cls.get_config_attribute('R4_fhir_count_cache_config').get('max_entries', 1000)
+
+    @classmethod
+    def get_count_cache_estimate_threshold(cls):
+        return cls.get_config_attribute('R4_fhir_count_cache_config').get('estimate_threshold', None)
+
+    @classmethod
+    def get_count_cache_process_max_age(cls):
+        return cls.get_config_attribute('R4_fhir_count_cache_config').get('process_cache_max_age', 60)
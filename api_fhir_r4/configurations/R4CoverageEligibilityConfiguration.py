@@ -97,3 +97,15 @@ class R4CoverageEligibilityConfiguration(CoverageEligibilityConfiguration):
     @classmethod
     def get_fhir_active_policy_status(cls):
         return cls.get_config_attribute("R4_fhir_coverage_eligibility_config").get('fhir_active_policy_status', ('A', 2))
+
+    @classmethod
+    def get_eligibility_cache_name(cls):
+        return cls.get_config_attribute("R4_fhir_coverage_eligibility_config").get('cache_name', 'default')
+
+    @classmethod
+    def get_eligibility_cache_timeout(cls):
+        return cls.get_config_attribute("R4_fhir_coverage_eligibility_config").get('cache_timeout', 60)
+
+    @classmethod
+    def get_eligibility_max_batch_size(cls):
+        return cls.get_config_attribute("R4_fhir_coverage_eligibility_config").get('max_batch_size', 100)
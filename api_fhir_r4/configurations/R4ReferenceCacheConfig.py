@@ -0,0 +1,19 @@
+from api_fhir_r4.configurations import ReferenceCacheConfiguration
+from api_fhir_r4.defaultConfig import DEFAULT_CFG
+
+
+class R4ReferenceCacheConfig(ReferenceCacheConfiguration):
+    _config = 'R4_fhir_reference_cache_config'
+
+    @classmethod
+    def build_configuration(cls, cfg):
+        cls.get_config().R4_fhir_reference_cache_config = cfg.get(
+            'R4_fhir_reference_cache_config', DEFAULT_CFG['R4_fhir_reference_cache_config'])
+
+    @classmethod
+    def get_reference_cache_enabled(cls):
+        return cls.get_config_attribute('R4_fhir_reference_cache_config').get('enabled', True)
+
+    @classmethod
+    def get_reference_cache_max_entries(cls):
+        return cls.get_config_attribute('R4_fhir_reference_cache_config').get('max_entries', 5000)
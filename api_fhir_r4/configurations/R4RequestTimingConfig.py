@@ -0,0 +1,27 @@
+from api_fhir_r4.configurations import RequestTimingConfiguration
+from api_fhir_r4.defaultConfig import DEFAULT_CFG
+
+
+class R4RequestTimingConfig(RequestTimingConfiguration):
+    _config = 'R4_fhir_request_timing_config'
+
+    @classmethod
+    def build_configuration(cls, cfg):
+        cls.get_config().R4_fhir_request_timing_config = cfg.get(
+            'R4_fhir_request_timing_config', DEFAULT_CFG['R4_fhir_request_timing_config'])
+
+    @classmethod
+    def get_request_timing_enabled(cls):
+        return cls.get_config_attribute('R4_fhir_request_timing_config').get('enabled', True)
+
+    @classmethod
+    def get_request_timing_header_enabled(cls):
+        return cls.get_config_attribute('R4_fhir_request_timing_config').get('server_timing_header', True)
+
+    @classmethod
+    def get_request_timing_log_enabled(cls):
+        return cls.get_config_attribute('R4_fhir_request_timing_config').get('log_enabled', False)
+
+    @classmethod
+    def get_request_timing_sample_size(cls):
+        return cls.get_config_attribute('R4_fhir_request_timing_config').get('sample_size', 1000)
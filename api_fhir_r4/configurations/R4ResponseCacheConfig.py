@@ -0,0 +1,28 @@
+from api_fhir_r4.configurations import ResponseCacheConfiguration
+from api_fhir_r4.defaultConfig import DEFAULT_CFG
+
+
+class R4ResponseCacheConfig(ResponseCacheConfiguration):
+    _config = 'R4_fhir_response_cache_config'
+
+    @classmethod
+    def build_configuration(cls, cfg):
+        # configurations stored before the response cache was introduced don't contain this section
+        cls.get_config().R4_fhir_response_cache_config = cfg.get(
+            'R4_fhir_response_cache_config', DEFAULT_CFG['R4_fhir_response_cache_config'])
+
+    @classmethod
+    def get_response_cache_enabled(cls):
+        return cls.get_config_attribute('R4_fhir_response_cache_config').get('enabled', False)
+
+    @classmethod
+    def get_response_cache_name(cls):
+        return cls.get_config_attribute('R4_fhir_response_cache_config').get('cache_name', 'default')
+
+    @classmethod
+    def get_response_cache_timeout(cls):
+        return cls.get_config_attribute('R4_fhir_response_cache_config').get('timeout', 300)
+
+    @classmethod
+    def get_response_cache_scope(cls):
+        return cls.get_config_attribute('R4_fhir_response_cache_config').get('scope', 'user')
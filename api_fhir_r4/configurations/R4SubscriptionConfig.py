@@ -45,3 +45,43 @@ class R4SubscriptionConfig(SubscriptionConfiguration):
     def get_fhir_sub_criteria_key_resource_type(cls):
         return cls.get_config_attribute('R4_fhir_subscription_config').get('get_fhir_sub_criteria_key_resource_type',
                                                                            'resource_type')
+
+    @classmethod
+    def get_subscription_outbox_enabled(cls):
+        return cls.get_config_attribute('R4_fhir_subscription_config').get('outbox_enabled', False)
+
+    @classmethod
+    def get_subscription_outbox_batch_size(cls):
+        return cls.get_config_attribute('R4_fhir_subscription_config').get('outbox_batch_size', 100)
+
+    @classmethod
+    def get_subscription_outbox_poll_interval(cls):
+        return cls.get_config_attribute('R4_fhir_subscription_config').get('outbox_poll_interval', 2)
+
+    @classmethod
+    def get_subscription_outbox_max_attempts(cls):
+        return cls.get_config_attribute('R4_fhir_subscription_config').get('outbox_max_attempts', 8)
+
+    @classmethod
+    def get_subscription_outbox_retry_delay(cls):
+        return cls.get_config_attribute('R4_fhir_subscription_config').get('outbox_retry_delay', 30)
+
+    @classmethod
+    def get_subscription_outbox_max_retry_delay(cls):
+        return cls.get_config_attribute('R4_fhir_subscription_config').get('outbox_max_retry_delay', 3600)
+
+    @classmethod
+    def get_subscription_outbox_lease_timeout(cls):
+        return cls.get_config_attribute('R4_fhir_subscription_config').get('outbox_lease_timeout', 300)
+
+    @classmethod
+    def get_subscription_outbox_endpoint_concurrency(cls):
+        return cls.get_config_attribute('R4_fhir_subscription_config').get('outbox_endpoint_concurrency', 4)
+
+    @classmethod
+    def get_subscription_outbox_request_timeout(cls):
+        return cls.get_config_attribute('R4_fhir_subscription_config').get('outbox_request_timeout', 30)
+
+    @classmethod
+    def get_subscription_outbox_batch_linger(cls):
+        return cls.get_config_attribute('R4_fhir_subscription_config').get('outbox_batch_linger', 10)
@@ -375,6 +375,18 @@ class CoverageEligibilityConfiguration(BaseConfiguration):  # pragma: no cover
     def get_fhir_status_map(cls):
         raise NotImplementedError('`get_fhir_status_map()` must be implemented.')
 
+    @classmethod
+    def get_eligibility_cache_name(cls):
+        raise NotImplementedError('`get_eligibility_cache_name()` must be implemented.')
+
+    @classmethod
+    def get_eligibility_cache_timeout(cls):
+        raise NotImplementedError('`get_eligibility_cache_timeout()` must be implemented.')
+
+    @classmethod
+    def get_eligibility_max_batch_size(cls):
+        raise NotImplementedError('`get_eligibility_max_batch_size()` must be implemented.')
+
 
 class CommunicationRequestConfiguration(BaseConfiguration):  # pragma: no cover
 
@@ -555,6 +567,46 @@ class SubscriptionConfiguration(BaseConfiguration):
     def get_fhir_sub_criteria_key_resource_type(cls):
         raise NotImplementedError('`get_fhir_sub_criteria_key_resource_type()` must be implemented.')
 
+    @classmethod
+    def get_subscription_outbox_enabled(cls):
+        raise NotImplementedError('`get_subscription_outbox_enabled()` must be implemented.')
+
+    @classmethod
+    def get_subscription_outbox_batch_size(cls):
+        raise NotImplementedError('`get_subscription_outbox_batch_size()` must be implemented.')
+
+    @classmethod
+    def get_subscription_outbox_poll_interval(cls):
+        raise NotImplementedError('`get_subscription_outbox_poll_interval()` must be implemented.')
+
+    @classmethod
+    def get_subscription_outbox_max_attempts(cls):
+        raise NotImplementedError('`get_subscription_outbox_max_attempts()` must be implemented.')
+
+    @classmethod
+    def get_subscription_outbox_retry_delay(cls):
+        raise NotImplementedError('`get_subscription_outbox_retry_delay()` must be implemented.')
+
+    @classmethod
+    def get_subscription_outbox_max_retry_delay(cls):
+        raise NotImplementedError('`get_subscription_outbox_max_retry_delay()` must be implemented.')
+
+    @classmethod
+    def get_subscription_outbox_lease_timeout(cls):
+        raise NotImplementedError('`get_subscription_outbox_lease_timeout()` must be implemented.')
+
+    @classmethod
+    def get_subscription_outbox_endpoint_concurrency(cls):
+        raise NotImplementedError('`get_subscription_outbox_endpoint_concurrency()` must be implemented.')
+
+    @classmethod
+    def get_subscription_outbox_request_timeout(cls):
+        raise NotImplementedError('`get_subscription_outbox_request_timeout()` must be implemented.')
+
+    @classmethod
+    def get_subscription_outbox_batch_linger(cls):
+        raise NotImplementedError('`get_subscription_outbox_batch_linger()` must be implemented.')
+
 
 class PaymentNoticeConfiguration(BaseConfiguration):
     @classmethod
@@ -586,6 +638,108 @@ class PaymentNoticeConfiguration(BaseConfiguration):
         raise NotImplementedError('`get_fhir_payment_notice_payment_status_cleared()` must be implemented.')
 
 
+class ResponseCacheConfiguration(BaseConfiguration):
+    @classmethod
+    def build_configuration(cls, cfg):
+        raise NotImplementedError('`build_configuration()` must be implemented.')
+
+    @classmethod
+    def get_response_cache_enabled(cls):
+        raise NotImplementedError('`get_response_cache_enabled()` must be implemented.')
+
+    @classmethod
+    def get_response_cache_name(cls):
+        raise NotImplementedError('`get_response_cache_name()` must be implemented.')
+
+    @classmethod
+    def get_response_cache_timeout(cls):
+        raise NotImplementedError('`get_response_cache_timeout()` must be implemented.')
+
+    @classmethod
+    def get_response_cache_scope(cls):
+        raise NotImplementedError('`get_response_cache_scope()` must be implemented.')
+
+
+class CountCacheConfiguration(BaseConfiguration):
+    @classmethod
+    def build_configuration(cls, cfg):
+        raise NotImplementedError('`build_configuration()` must be implemented.')
+
+    @classmethod
+    def get_count_cache_name(cls):
+        raise NotImplementedError('`get_count_cache_name()` must be implemented.')
+
+    @classmethod
+    def get_count_cache_timeout(cls):
+        raise NotImplementedError('`get_count_cache_timeout()` must be implemented.')
+
+    @classmethod
+    def get_count_cache_max_entries(cls):
+        raise NotImplementedError('`get_count_cache_max_entries()` must be implemented.')
+
+    @classmethod
+    def get_count_cache_estimate_threshold(cls):
+        raise NotImplementedError('`get_count_cache_estimate_threshold()` must be implemented.')
+
+    @classmethod
+    def get_count_cache_process_max_age(cls):
+        raise NotImplementedError('`get_count_cache_process_max_age()` must be implemented.')
+
+
+class BulkExportConfiguration(BaseConfiguration):
+    @classmethod
+    def build_configuration(cls, cfg):
+        raise NotImplementedError('`build_configuration()` must be implemented.')
+
+    @classmethod
+    def get_bulk_export_storage_path(cls):
+        raise NotImplementedError('`get_bulk_export_storage_path()` must be implemented.')
+
+    @classmethod
+    def get_bulk_export_chunk_size(cls):
+        raise NotImplementedError('`get_bulk_export_chunk_size()` must be implemented.')
+
+    @classmethod
+    def get_bulk_export_stale_timeout(cls):
+        raise NotImplementedError('`get_bulk_export_stale_timeout()` must be implemented.')
+
+
+class ReferenceCacheConfiguration(BaseConfiguration):
+    @classmethod
+    def build_configuration(cls, cfg):
+        raise NotImplementedError('`build_configuration()` must be implemented.')
+
+    @classmethod
+    def get_reference_cache_enabled(cls):
+        raise NotImplementedError('`get_reference_cache_enabled()` must be implemented.')
+
+    @classmethod
+    def get_reference_cache_max_entries(cls):
+        raise NotImplementedError('`get_reference_cache_max_entries()` must be implemented.')
+
+
+class RequestTimingConfiguration(BaseConfiguration):
+    @classmethod
+    def build_configuration(cls, cfg):
+        raise NotImplementedError('`build_configuration()` must be implemented.')
+
+    @classmethod
+    def get_request_timing_enabled(cls):
+        raise NotImplementedError('`get_request_timing_enabled()` must be implemented.')
+
+    @classmethod
+    def get_request_timing_header_enabled(cls):
+        raise NotImplementedError('`get_request_timing_header_enabled()` must be implemented.')
+
+    @classmethod
+    def get_request_timing_log_enabled(cls):
+        raise NotImplementedError('`get_request_timing_log_enabled()` must be implemented.')
+
+    @classmethod
+    def get_request_timing_sample_size(cls):
+        raise NotImplementedError('`get_request_timing_sample_size()` must be implemented.')
+
+
 class BaseApiFhirConfiguration(BaseConfiguration):  # pragma: no cover
 
     @classmethod
@@ -601,6 +755,11 @@ class BaseApiFhirConfiguration(BaseConfiguration):  # pragma: no cover
         cls.get_organisation_configuration().build_configuration(cfg)
         cls.get_subscription_configuration().build_configuration(cfg)
         cls.get_payment_notice_configuration().build_configuration(cfg)
+        cls.get_response_cache_configuration().build_configuration(cfg)
+        cls.get_count_cache_configuration().build_configuration(cfg)
+        cls.get_bulk_export_configuration().build_configuration(cfg)
+        cls.get_reference_cache_configuration().build_configuration(cfg)
+        cls.get_request_timing_configuration().build_configuration(cfg)
 
     @classmethod
     def get_identifier_configuration(cls):
@@ -646,6 +805,26 @@ class BaseApiFhirConfiguration(BaseConfiguration):  # pragma: no cover
     def get_payment_notice_configuration(cls):
         raise NotImplementedError('`get_payment_notice_configuration()` must be implemented.')
 
+    @classmethod
+    def get_response_cache_configuration(cls):
+        raise NotImplementedError('`get_response_cache_configuration()` must be implemented.')
+
+    @classmethod
+    def get_count_cache_configuration(cls):
+        raise NotImplementedError('`get_count_cache_configuration()` must be implemented.')
+
+    @classmethod
+    def get_bulk_export_configuration(cls):
+        raise NotImplementedError('`get_bulk_export_configuration()` must be implemented.')
+
+    @classmethod
+    def get_reference_cache_configuration(cls):
+        raise NotImplementedError('`get_reference_cache_configuration()` must be implemented.')
+
+    @classmethod
+    def get_request_timing_configuration(cls):
+        raise NotImplementedError('`get_request_timing_configuration()` must be implemented.')
+
 
 from api_fhir_r4.configurations.generalConfiguration import GeneralConfiguration
 from api_fhir_r4.configurations.R4IdentifierConfig import R4IdentifierConfig
@@ -660,6 +839,11 @@ from api_fhir_r4.configurations.R4OrganisationConfig import R4OrganisationConfig
 from api_fhir_r4.configurations.R4CoverageConfig import R4CoverageConfig
 from api_fhir_r4.configurations.R4SubscriptionConfig import R4SubscriptionConfig
 from api_fhir_r4.configurations.R4PaymentNoticeConfig import R4PaymentNoticeConfig
+from api_fhir_r4.configurations.R4ResponseCacheConfig import R4ResponseCacheConfig
+from api_fhir_r4.configurations.R4CountCacheConfig import R4CountCacheConfig
+from api_fhir_r4.configurations.R4BulkExportConfig import R4BulkExportConfig
+from api_fhir_r4.configurations.R4ReferenceCacheConfig import R4ReferenceCacheConfig
+from api_fhir_r4.configurations.R4RequestTimingConfig import R4RequestTimingConfig
 # all specific configurations have to be imported before R4ApiFhirConfig
 from api_fhir_r4.configurations.R4ApiFhirConfig import R4ApiFhirConfig
 from api_fhir_r4.configurations.moduleConfiguration import ModuleConfiguration
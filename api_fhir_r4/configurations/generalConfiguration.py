@@ -17,6 +17,8 @@ class GeneralConfiguration(BaseConfiguration):
         config.default_value_of_location_care_type = cfg['default_value_of_location_care_type']
         config.default_response_page_size = cfg['default_response_page_size']
         config.claim_rule_engine_validation = cfg['claim_rule_engine_validation']
+        config.stream_response_page_size = cfg.get(
+            'stream_response_page_size', DEFAULT_CFG['stream_response_page_size'])
 
     @classmethod
     def get_default_audit_user_id(cls):
@@ -54,6 +56,10 @@ class GeneralConfiguration(BaseConfiguration):
     def get_default_response_page_size(cls):
         return cls.get_config_attribute("default_response_page_size")
 
+    @classmethod
+    def get_stream_response_page_size(cls):
+        return cls.get_config_attribute("stream_response_page_size")
+
     @classmethod
     def get_claim_rule_engine_validation(cls):
         return cls.get_config_attribute("claim_rule_engine_validation")
@@ -85,7 +85,9 @@ class ContainedContentSerializerMixin:
 
     def _add_contained_references(self, fhir_obj: FHIRAbstractModel):
         for field in self.fhir_object_reference_fields(fhir_obj):
-            field.reference = self._create_contained_reference(field.reference)
+            # references of elements not selected by `_elements`/`_summary` aren't built
+            if field is not None:
+                field.reference = self._create_contained_reference(field.reference)
 
     def _create_contained_reference(self, base_reference):
         # Contained references are made by adding hash
@@ -1,13 +1,17 @@
+import datetime as py_datetime
 from abc import ABC
 from typing import Union
 
-from django.db.models import Model
+from django.db.models import Model, prefetch_related_objects
+from django.utils import timezone
 from fhir.resources.extension import Extension
+from fhir.resources.meta import Meta
 from fhir.resources.money import Money
 from fhir.resources.quantity import Quantity
 
 import core
 from api_fhir_r4.configurations import R4IdentifierConfig
+from api_fhir_r4.element_selection import ElementSelection
 from api_fhir_r4.exceptions import FHIRRequestProcessException
 from fhir.resources.codeableconcept import CodeableConcept
 from fhir.resources.contactpoint import ContactPoint
@@ -19,6 +23,13 @@ from api_fhir_r4.configurations import GeneralConfiguration
 
 
 class BaseFHIRConverter(ABC):
+    # elements built by `build_fhir_*` steps of to_fhir_obj, steps are skipped when none of them is selected
+    fhir_element_steps = {}
+    # elements returned for `_summary=true`, all elements are returned if not set
+    fhir_summary_elements = None
+    # whether ETag/Last-Modified of the root row cover the resource, False if it's built also from related rows
+    # changing independently of it (conditional reads can't tell when such a resource changed)
+    fhir_validators_supported = True
 
     @classmethod
     def to_fhir_obj(cls, obj, reference_type):
@@ -28,6 +39,85 @@ class BaseFHIRConverter(ABC):
     def to_imis_obj(cls, data, audit_user_id):
         raise NotImplementedError('`toImisObj()` must be implemented.')  # pragma: no cover
 
+    @classmethod
+    def to_fhir_objs(cls, imis_objs, reference_type):
+        imis_objs = cls.prefetch_imis_objs(imis_objs)
+        return [cls.to_fhir_obj(imis_obj, reference_type) for imis_obj in imis_objs]
+
+    @classmethod
+    def get_fhir_prefetch_lookups(cls):
+        """
+        Lookups (names or Prefetch objects) of relations used by to_fhir_obj. They are loaded once for the whole
+        batch in prefetch_imis_objs, relations already prefetched or selected by the view are reused.
+        """
+        return []
+
+    @classmethod
+    def prefetch_imis_objs(cls, imis_objs):
+        imis_objs = list(imis_objs)
+        lookups = cls.get_fhir_prefetch_lookups()
+        if lookups and imis_objs and all(isinstance(imis_obj, Model) for imis_obj in imis_objs):
+            prefetch_related_objects(imis_objs, *lookups)
+        return imis_objs
+
+    @classmethod
+    def is_fhir_step_selected(cls, step_name, selection=None):
+        """
+        Whether the step builds any element selected by `_summary` or `_elements`. Selection of the resource being
+        converted is used if not given, views pass the selection of the request.
+        """
+        selection = selection or ElementSelection.for_converter(cls)
+        elements = cls.fhir_element_steps.get(step_name)
+        if selection is None or elements is None:
+            return True
+        return any(selection.includes(element, cls.fhir_summary_elements) for element in elements)
+
+    @classmethod
+    def build_fhir_step(cls, step, *args):
+        if cls.is_fhir_step_selected(step.__name__):
+            step(*args)
+
+    @classmethod
+    def get_active_related(cls, imis_obj, related_name):
+        """
+        Returns related objects without validity_to set. Prefetched cache is used if the relation was prefetched,
+        otherwise the database is queried.
+        """
+        if related_name in getattr(imis_obj, '_prefetched_objects_cache', {}):
+            return [related for related in getattr(imis_obj, related_name).all() if related.validity_to is None]
+        return list(getattr(imis_obj, related_name).filter(validity_to__isnull=True))
+
+    @classmethod
+    def build_fhir_meta(cls, fhir_obj, imis_obj):
+        last_updated = cls.get_imis_obj_last_updated(imis_obj)
+        if last_updated is None:
+            return
+        if not fhir_obj.meta:
+            fhir_obj.meta = Meta.construct()
+        fhir_obj.meta.lastUpdated = last_updated
+        fhir_obj.meta.versionId = cls.get_imis_obj_version_id(imis_obj)
+
+    @classmethod
+    def get_imis_obj_last_updated(cls, imis_obj):
+        # Versioned IMIS entities get new validity_from on every update, history models track date_updated
+        last_updated = getattr(imis_obj, 'date_updated', None) or getattr(imis_obj, 'validity_from', None)
+        if not isinstance(last_updated, py_datetime.date):
+            return None
+        if not isinstance(last_updated, py_datetime.datetime):
+            last_updated = py_datetime.datetime.combine(last_updated, py_datetime.time.min)
+        last_updated = py_datetime.datetime.combine(last_updated.date(), last_updated.time(), last_updated.tzinfo)
+        if timezone.is_naive(last_updated):
+            last_updated = timezone.make_aware(last_updated)
+        return last_updated
+
+    @classmethod
+    def get_imis_obj_version_id(cls, imis_obj):
+        version = getattr(imis_obj, 'version', None)
+        if isinstance(version, int):
+            return str(version)
+        last_updated = cls.get_imis_obj_last_updated(imis_obj)
+        return last_updated.strftime('%Y%m%d%H%M%S%f') if last_updated else None
+
     @classmethod
     def get_fhir_code_identifier_type(cls):
         raise NotImplementedError('get_fhir_code_identifier_type() must be implemented')
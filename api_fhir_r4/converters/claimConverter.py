@@ -1,4 +1,3 @@
-import base64
 import hashlib
 import re
 from urllib.parse import urljoin
@@ -6,14 +5,16 @@ from urllib.parse import urljoin
 from typing import Type
 
 from claim.services import ClaimElementSubmit
-from claim.apps import ClaimConfig
 from claim.models import Claim, ClaimItem, ClaimService, ClaimAttachment
+from django.db.models import Prefetch
+from insuree.models import InsureePolicy
 
 from api_fhir_r4.containedResources.converterUtils import get_from_contained_or_by_reference
 from api_fhir_r4.mapping.claimMapping import ClaimPriorityMapping, ClaimVisitTypeMapping
 from medical.models import Diagnosis
 from django.utils.translation import gettext as _
 
+from api_fhir_r4.cache import ReferenceResolver
 from api_fhir_r4.configurations import R4IdentifierConfig, R4ClaimConfig, GeneralConfiguration
 from api_fhir_r4.converters import BaseFHIRConverter, ReferenceConverterMixin, MedicationConverter, \
     ActivityDefinitionConverter
@@ -25,30 +26,74 @@ from fhir.resources.attachment import Attachment
 from fhir.resources.period import Period
 from fhir.resources.claim import ClaimDiagnosis, ClaimSupportingInfo, ClaimItem as FHIRClaimItem
 
-from api_fhir_r4.utils import TimeUtils, FhirUtils, DbManagerUtils
+from api_fhir_r4.utils import TimeUtils, FhirUtils, DbManagerUtils, AttachmentUtils
 
 
 class ClaimConverter(BaseFHIRConverter, ReferenceConverterMixin):
+    fhir_element_steps = {
+        'build_fhir_identifiers': ('identifier',),
+        'build_fhir_provider': ('provider',),
+        'build_fhir_patient': ('patient',),
+        'build_fhir_enterer': ('enterer',),
+        'build_fhir_type': ('type',),
+        'build_fhir_priority': ('priority',),
+        'build_fhir_insurance': ('insurance',),
+        'build_fhir_billable_period': ('billablePeriod',),
+        'build_fhir_diagnoses': ('diagnosis',),
+        'build_fhir_total': ('total',),
+        'build_fhir_items': ('item',),
+        'build_fhir_supporting_info': ('supportingInfo',),
+        'build_fhir_attachments': ('supportingInfo',),
+    }
+    fhir_summary_elements = ('identifier', 'status', 'type', 'use', 'patient', 'created', 'provider', 'priority',
+                             'insurance')
 
     @classmethod
     def to_fhir_obj(cls, imis_claim, reference_type=ReferenceConverterMixin.UUID_REFERENCE_TYPE):
         fhir_claim = cls.build_fhir_obj_with_required_fields(imis_claim)
-        cls.build_fhir_identifiers(fhir_claim, imis_claim)
+        cls.build_fhir_step(cls.build_fhir_identifiers, fhir_claim, imis_claim)
         cls.build_fhir_pk(fhir_claim, imis_claim, reference_type)
-        cls.build_fhir_provider(fhir_claim, imis_claim, reference_type)
-        cls.build_fhir_patient(fhir_claim, imis_claim, reference_type)
-        cls.build_fhir_enterer(fhir_claim, imis_claim, reference_type)
-        cls.build_fhir_type(fhir_claim, imis_claim)
-        cls.build_fhir_priority(fhir_claim)
-        cls.build_fhir_insurance(fhir_claim, imis_claim, reference_type)
-        cls.build_fhir_billable_period(fhir_claim, imis_claim)
-        cls.build_fhir_diagnoses(fhir_claim, imis_claim)
-        cls.build_fhir_total(fhir_claim, imis_claim)
-        cls.build_fhir_items(fhir_claim, imis_claim, reference_type)
-        cls.build_fhir_supporting_info(fhir_claim, imis_claim)
-        cls.build_fhir_attachments(fhir_claim, imis_claim)
+        cls.build_fhir_step(cls.build_fhir_provider, fhir_claim, imis_claim, reference_type)
+        cls.build_fhir_step(cls.build_fhir_patient, fhir_claim, imis_claim, reference_type)
+        cls.build_fhir_step(cls.build_fhir_enterer, fhir_claim, imis_claim, reference_type)
+        cls.build_fhir_step(cls.build_fhir_type, fhir_claim, imis_claim)
+        cls.build_fhir_step(cls.build_fhir_priority, fhir_claim)
+        cls.build_fhir_step(cls.build_fhir_insurance, fhir_claim, imis_claim, reference_type)
+        cls.build_fhir_step(cls.build_fhir_billable_period, fhir_claim, imis_claim)
+        cls.build_fhir_step(cls.build_fhir_diagnoses, fhir_claim, imis_claim)
+        cls.build_fhir_step(cls.build_fhir_total, fhir_claim, imis_claim)
+        cls.build_fhir_step(cls.build_fhir_items, fhir_claim, imis_claim, reference_type)
+        cls.build_fhir_step(cls.build_fhir_supporting_info, fhir_claim, imis_claim)
+        cls.build_fhir_step(cls.build_fhir_attachments, fhir_claim, imis_claim)
         return fhir_claim
 
+    @classmethod
+    def get_fhir_prefetch_lookups(cls):
+        lookups = ['insuree', 'health_facility', 'admin', 'icd', 'icd_1', 'icd_2', 'icd_3', 'icd_4']
+        if cls.is_fhir_step_selected('build_fhir_items'):
+            lookups += cls.get_fhir_items_prefetch_lookups()
+        if cls.is_fhir_step_selected('build_fhir_insurance'):
+            lookups += cls.get_fhir_insurance_prefetch_lookups()
+        if cls.is_fhir_step_selected('build_fhir_attachments'):
+            # documents are loaded only for `attachmentData`, size and hash are cached by AttachmentUtils
+            lookups.append(Prefetch('attachments', queryset=ClaimAttachment.objects.defer('document')))
+        return lookups
+
+    @classmethod
+    def get_fhir_items_prefetch_lookups(cls):
+        return [
+            Prefetch('items', queryset=ClaimItem.objects.filter(validity_to__isnull=True).select_related('item')),
+            Prefetch('services',
+                     queryset=ClaimService.objects.filter(validity_to__isnull=True).select_related('service')),
+        ]
+
+    @classmethod
+    def get_fhir_insurance_prefetch_lookups(cls):
+        return [
+            Prefetch('insuree__insuree_policies',
+                     queryset=InsureePolicy.objects.filter(validity_to__isnull=True).select_related('policy')),
+        ]
+
     @classmethod
     def to_imis_obj(cls, fhir_claim, audit_user_id):
         errors = []
@@ -193,7 +238,7 @@ class ClaimConverter(BaseFHIRConverter, ReferenceConverterMixin):
 
     @classmethod
     def get_imis_diagnosis_by_code(cls, icd_code):
-        return Diagnosis.objects.get(code=icd_code)
+        return ReferenceResolver.get(Diagnosis, code=icd_code)
 
     @classmethod
     def get_imis_diagnosis_code(cls, diagnosis):
@@ -282,7 +327,7 @@ class ClaimConverter(BaseFHIRConverter, ReferenceConverterMixin):
 
     @classmethod
     def build_fhir_items_for_imis_items(cls, fhir_claim, imis_claim, reference_type):
-        for claim_item in imis_claim.items.filter(validity_to=None).all():
+        for claim_item in cls.get_active_related(imis_claim, 'items'):
             if claim_item:
                 item_type = R4ClaimConfig.get_fhir_claim_item_code()
                 cls.build_fhir_item(fhir_claim, claim_item.item.code, item_type, claim_item, reference_type)
@@ -316,7 +361,7 @@ class ClaimConverter(BaseFHIRConverter, ReferenceConverterMixin):
 
     @classmethod
     def build_fhir_items_for_imis_services(cls, fhir_claim, imis_claim, reference_type):
-        for claim_service in imis_claim.services.filter(validity_to=None).all():
+        for claim_service in cls.get_active_related(imis_claim, 'services'):
             if claim_service:
                 item_type = R4ClaimConfig.get_fhir_claim_service_code()
                 cls.build_fhir_item(fhir_claim, claim_service.service.code, item_type, claim_service, reference_type)
@@ -454,7 +499,7 @@ class ClaimConverter(BaseFHIRConverter, ReferenceConverterMixin):
 
     @classmethod
     def build_fhir_attachments(cls, fhir_claim, imis_claim):
-        attachments = ClaimAttachment.objects.filter(claim=imis_claim)
+        attachments = imis_claim.attachments.all()
 
         if not fhir_claim.supportingInfo:
             fhir_claim.supportingInfo = []
@@ -484,24 +529,31 @@ class ClaimConverter(BaseFHIRConverter, ReferenceConverterMixin):
 
     @classmethod
     def build_fhir_value_attachment(cls, imis_attachment):
+        # Content is served by the Binary endpoint, inline data is added only on request (see add_attachment_data)
         attachment = Attachment.construct()
         attachment.creation = imis_attachment.date.isoformat()
-        attachment.data = cls.get_attachment_content(imis_attachment)
+        attachment.url = cls.get_attachment_binary_url(imis_attachment)
+        attachment.size, attachment.hash = AttachmentUtils.get_size_and_hash(imis_attachment)
         attachment.contentType = imis_attachment.mime
         attachment.title = imis_attachment.filename
         return attachment
 
     @classmethod
-    def get_attachment_content(cls, imis_attachment):
-        file_root = ClaimConfig.claim_attachments_root_path
+    def get_attachment_binary_url(cls, imis_attachment):
+        return f'Binary/{imis_attachment.id}'
 
-        if file_root and imis_attachment.url:
-            with open('%s/%s' % (ClaimConfig.claim_attachments_root_path, imis_attachment.url), "rb") as file:
-                return base64.b64encode(file.read())
-        elif not imis_attachment.url and imis_attachment.document:
-            return imis_attachment.document
-        else:
-            return None
+    @classmethod
+    def add_attachment_data(cls, fhir_claim, imis_claim):
+        binary_urls = {cls.get_attachment_binary_url(attachment): attachment
+                       for attachment in imis_claim.attachments.all()}
+        for supporting_info in fhir_claim.supportingInfo or []:
+            attachment = supporting_info.valueAttachment
+            if attachment and attachment.url in binary_urls:
+                attachment.data = cls.get_attachment_content(binary_urls[attachment.url])
+
+    @classmethod
+    def get_attachment_content(cls, imis_attachment):
+        return AttachmentUtils.get_base64_content(imis_attachment)
 
     @classmethod
     def build_attachment_from_value(cls, valueAttachment: Attachment):
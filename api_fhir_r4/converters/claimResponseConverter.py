@@ -1,8 +1,9 @@
 from claim.models import Feedback, ClaimItem, ClaimService, Claim, ClaimAdmin
-from django.db.models import Subquery
+from django.db.models import Prefetch, Subquery
 from medical.models import Item, Service
 import core
 
+from api_fhir_r4.cache import ReferenceResolver
 from api_fhir_r4.configurations import GeneralConfiguration, R4ClaimConfig
 from api_fhir_r4.converters import BaseFHIRConverter, CommunicationRequestConverter, ReferenceConverterMixin
 from api_fhir_r4.converters.claimConverter import ClaimConverter
@@ -22,6 +23,18 @@ from api_fhir_r4.utils import TimeUtils, FhirUtils
 
 class ClaimResponseConverter(BaseFHIRConverter):
 
+    # adjudication is stored on the claim items and services
+    fhir_validators_supported = False
+
+    @classmethod
+    def get_fhir_prefetch_lookups(cls):
+        return [
+            'insuree', 'admin', 'feedback',
+            Prefetch('items', queryset=ClaimItem.objects.filter(validity_to__isnull=True).select_related('item')),
+            Prefetch('services',
+                     queryset=ClaimService.objects.filter(validity_to__isnull=True).select_related('service')),
+        ]
+
     @classmethod
     def to_fhir_obj(cls, imis_claim, reference_type=ReferenceConverterMixin.UUID_REFERENCE_TYPE):
         fhir_claim_response = {}
@@ -176,7 +189,7 @@ class ClaimResponseConverter(BaseFHIRConverter):
             if fhir_claim_response.communicationRequest:
                 request = fhir_claim_response.communicationRequest[0]
                 _, feedback_id = request.reference.split("/")
-                imis_claim.feedback = Feedback.objects.get(uuid=feedback_id)
+                imis_claim.feedback = ReferenceResolver.get(Feedback, uuid=feedback_id)
         except Feedback.DoesNotExist:
             pass
 
@@ -234,14 +247,14 @@ class ClaimResponseConverter(BaseFHIRConverter):
 
     @classmethod
     def build_fhir_items_for_imis_services(cls, fhir_claim_response, imis_claim, reference_type):
-        for claim_service in imis_claim.services.filter(validity_to=None).all():
+        for claim_service in cls.get_active_related(imis_claim, 'services'):
             if claim_service:
                 item_type = R4ClaimConfig.get_fhir_claim_service_code()
                 cls.build_fhir_item(fhir_claim_response, claim_service, item_type, claim_service.rejection_reason, imis_claim, reference_type)
 
     @classmethod
     def build_fhir_items_for_imis_items(cls, fhir_claim_response, imis_claim, reference_type):
-        for claim_item in imis_claim.items.filter(validity_to=None).all():
+        for claim_item in cls.get_active_related(imis_claim, 'items'):
             if claim_item:
                 item_type = R4ClaimConfig.get_fhir_claim_item_code()
                 cls.build_fhir_item(fhir_claim_response, claim_item, item_type, claim_item.rejection_reason, imis_claim, reference_type)
@@ -273,10 +286,10 @@ class ClaimResponseConverter(BaseFHIRConverter):
         _, resource_id = extension.valueReference.reference.split("/")
 
         if extension.valueReference.type == 'Medication':
-            imis_item = Item.objects.get(uuid=resource_id)
+            imis_item = ReferenceResolver.get(Item, uuid=resource_id)
             claim_item = ClaimItem.objects.get(claim=imis_claim, item=imis_item)
         elif extension.valueReference.type == 'ActivityDefinition':
-            imis_service = Service.objects.get(uuid=resource_id)
+            imis_service = ReferenceResolver.get(Service, uuid=resource_id)
             claim_item = ClaimService.objects.get(claim=imis_claim, service=imis_service)
         else:
             raise FHIRRequestProcessException(F"Unknnown serviced item type: {extension.url}")
@@ -498,7 +511,7 @@ class ClaimResponseConverter(BaseFHIRConverter):
         if fhir_claim_response.requestor is not None:
             requestor = fhir_claim_response.requestor
             _, claim_admin_uuid = requestor.reference.split("/")
-            imis_claim.admin = ClaimAdmin.objects.get(uuid=claim_admin_uuid)
+            imis_claim.admin = ReferenceResolver.get(ClaimAdmin, uuid=claim_admin_uuid)
 
     @classmethod
     def build_fhir_request(cls, fhir_claim_response: ClaimResponse, imis_claim: Claim, reference_type):
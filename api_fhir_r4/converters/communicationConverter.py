@@ -1,3 +1,4 @@
+from api_fhir_r4.cache import ReferenceResolver
 from api_fhir_r4.configurations import GeneralConfiguration, R4CommunicationRequestConfig as Config
 from api_fhir_r4.converters import BaseFHIRConverter, ReferenceConverterMixin
 from api_fhir_r4.exceptions import FHIRException
@@ -124,7 +125,7 @@ class CommunicationConverter(BaseFHIRConverter, ReferenceConverterMixin):
     def build_imis_about(cls, imis_feedback, fhir_communication, errors):
         claim_uuid = cls.__get_claim_reference(fhir_communication.about[0].reference)
         try:
-            imis_feedback.claim = Claim.objects.get(uuid=claim_uuid, validity_to__isnull=True)
+            imis_feedback.claim = ReferenceResolver.get(Claim, uuid=claim_uuid, validity_to__isnull=True)
         except Exception:
             raise FHIRException(
                 _('Claim does not exist')
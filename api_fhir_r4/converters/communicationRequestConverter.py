@@ -22,6 +22,10 @@ class CommunicationRequestConverter(BaseFHIRConverter, ReferenceConverterMixin):
         cls.build_fhir_payloads(fhir_communication_request)
         return fhir_communication_request
 
+    @classmethod
+    def get_fhir_prefetch_lookups(cls):
+        return ['insuree', 'admin']
+
     @classmethod
     def get_reference_obj_id(cls, imis_claim):
         return imis_claim.uuid
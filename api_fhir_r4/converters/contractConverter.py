@@ -2,6 +2,7 @@ import core
 
 from django.db.models import Q
 from django.utils.translation import gettext as _
+from api_fhir_r4.cache import ReferenceResolver
 from api_fhir_r4.configurations import GeneralConfiguration, R4CoverageConfig
 from api_fhir_r4.converters import BaseFHIRConverter, ReferenceConverterMixin
 from api_fhir_r4.converters.patientConverter import PatientConverter
@@ -24,6 +25,9 @@ from api_fhir_r4.utils import DbManagerUtils, TimeUtils
 
 
 class ContractConverter(BaseFHIRConverter, ReferenceConverterMixin):
+    # insurees and premiums of the policy change without a new version of it
+    fhir_validators_supported = False
+
     @classmethod
     def to_fhir_obj(cls, imis_policy, reference_type=ReferenceConverterMixin.UUID_REFERENCE_TYPE):
         fhir_contract = Contract.construct()
@@ -342,7 +346,7 @@ class ContractConverter(BaseFHIRConverter, ReferenceConverterMixin):
     def build_imis_author(cls, fhir_contract, imis_policy, errors):
         if fhir_contract.author:
             reference = fhir_contract.author.reference.split("Practitioner/", 2)
-            imis_policy.officer = Officer.objects.get(uuid=reference[1])
+            imis_policy.officer = ReferenceResolver.get(Officer, uuid=reference[1])
         else:
             cls.valid_condition(not fhir_contract.author, _('Missing  `author` attribute'), errors)
 
@@ -377,7 +381,7 @@ class ContractConverter(BaseFHIRConverter, ReferenceConverterMixin):
                         if signer.type.text == 'HeadOfFamily':
                             reference = signer.party.reference.split("/", 2)
                             try:
-                                insuree = Insuree.objects.get(uuid=reference[1])
+                                insuree = ReferenceResolver.get(Insuree, uuid=reference[1])
                                 if insuree.head:
                                     imis_policy.family= Family.objects.filter(head_insuree=insuree).first()
                                 else:
@@ -386,7 +390,7 @@ class ContractConverter(BaseFHIRConverter, ReferenceConverterMixin):
                                 cls.valid_condition(True, _('Missing  `Family head provided does not exist` attribute'),errors)
                         elif signer.type.text == 'EnrolmentOfficer':
                             reference = signer.party.reference.split("/", 2)
-                            imis_policy.officer = Officer.objects.get(uuid=reference[1])
+                            imis_policy.officer = ReferenceResolver.get(Officer, uuid=reference[1])
                         else:
                             pass
                 else:
@@ -405,7 +409,7 @@ class ContractConverter(BaseFHIRConverter, ReferenceConverterMixin):
                             for item in asset.typeReference:
                                if item.reference is not None:
                                    reference = item.reference.split("Patient/", 2)
-                                   obj = Insuree.objects.get(uuid=reference[1])
+                                   obj = ReferenceResolver.get(Insuree, uuid=reference[1])
                                    if imis_policy.family_id is not None:
                                        if obj.family == imis_policy.family:
                                            if type(insurees) is not list:
@@ -435,7 +439,7 @@ class ContractConverter(BaseFHIRConverter, ReferenceConverterMixin):
                                 if item.entityReference is not None:
                                     if item.entityReference.reference is not None:
                                         reference = item.entityReference.reference.split("InsurancePlan/", 2)
-                                        imis_policy.product = Product.objects.get(uuid=reference[1])
+                                        imis_policy.product = ReferenceResolver.get(Product, uuid=reference[1])
                                 if item.net is not None:
                                     if item.net.value is not None:
                                         imis_policy.value = item.net.value
@@ -14,6 +14,9 @@ from api_fhir_r4.utils import TimeUtils
 
 class CoverageConverter(BaseFHIRConverter, ReferenceConverterMixin):
 
+    # benefits are built from the product items and services
+    fhir_validators_supported = False
+
     @classmethod
     def to_fhir_obj(cls, imis_policy, reference_type=ReferenceConverterMixin.UUID_REFERENCE_TYPE):
         fhir_coverage = Coverage.construct()
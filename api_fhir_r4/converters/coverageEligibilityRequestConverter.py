@@ -1,4 +1,5 @@
-from django.db import connection
+from itertools import zip_longest
+
 from fhir.resources.coverageeligibilityresponse import (
     CoverageEligibilityResponse as FHIRCoverageEligibilityResponse,
     CoverageEligibilityResponseInsuranceItem,
@@ -8,10 +9,7 @@ from fhir.resources.coverageeligibilityresponse import (
 from fhir.resources.money import Money
 from fhir.resources.period import Period
 
-from api_fhir_r4.configurations import (
-    GeneralConfiguration,
-    R4CoverageEligibilityConfiguration as Config
-)
+from api_fhir_r4.configurations import GeneralConfiguration
 from api_fhir_r4.converters import (
     BaseFHIRConverter,
     PatientConverter,
@@ -20,36 +18,22 @@ from api_fhir_r4.converters import (
 from api_fhir_r4.defaultConfig import DEFAULT_CFG
 from api_fhir_r4.models import CoverageEligibilityRequestV2 as FHIRCoverageEligibilityRequest
 from api_fhir_r4.utils import TimeUtils
-from claim.models import (
-    ClaimService,
-    ClaimItem
-)
-from insuree.models import (
-    Insuree,
-    InsureePolicy
-)
-from medical.models import (
-    Item,
-    Service
-)
-from policy.models import Policy
-from policy.services import (
-    EligibilityRequest,
-    EligibilityResponse
-)
-from product.models import Product, ProductService, ProductItem
+from policy.services import EligibilityRequest
 
 
 class CoverageEligibilityRequestConverter(BaseFHIRConverter):
 
     @classmethod
-    def to_fhir_obj(cls, coverage_eligibility_response, coverage_eligibility_request,
-                    reference_type=ReferenceConverterMixin.UUID_REFERENCE_TYPE):
-        fhir_response = cls.build_fhir_obligatory_fields(coverage_eligibility_request)
-        fhir_response.patient = cls.build_fhir_patient(coverage_eligibility_request.chf_id)
-        for item in coverage_eligibility_response.items:
-            if item.status in Config.get_fhir_active_policy_status():
-                cls.build_fhir_insurance(fhir_response, item, coverage_eligibility_request)
+    def to_fhir_obj(cls, evaluations, reference_type=ReferenceConverterMixin.UUID_REFERENCE_TYPE):
+        """
+        Builds the response from the evaluations (CoverageEligibilityEvaluation) of all the services and items
+        requested by one CoverageEligibilityRequest.
+        """
+        evaluation = evaluations[0]
+        fhir_response = cls.build_fhir_obligatory_fields(evaluation)
+        fhir_response.patient = evaluation.patient
+        for insurance in evaluation.insurances:
+            cls.build_fhir_insurance(fhir_response, insurance, evaluations)
         return fhir_response
 
     @classmethod
@@ -60,7 +44,20 @@ class CoverageEligibilityRequestConverter(BaseFHIRConverter):
         return EligibilityRequest(chf_id, service_code, item_code)
 
     @classmethod
-    def build_fhir_obligatory_fields(cls, coverage_eligibility_request):
+    def to_imis_objs(cls, fhir_coverage_eligibility_request, audit_user_id):
+        """
+        One EligibilityRequest for every requested service and item, services and items are paired in the order
+        of the request, as the enquiry evaluates one service and one item at once.
+        """
+        fhir_coverage_eligibility_request = FHIRCoverageEligibilityRequest(**fhir_coverage_eligibility_request)
+        chf_id = cls.build_imis_chf(fhir_coverage_eligibility_request)
+        item_codes, service_codes = cls.build_imis_item_service_codes(fhir_coverage_eligibility_request)
+        return [EligibilityRequest(chf_id, service_code, item_code)
+                for service_code, item_code in zip_longest(service_codes, item_codes)] \
+            or [EligibilityRequest(chf_id, None, None)]
+
+    @classmethod
+    def build_fhir_obligatory_fields(cls, evaluation):
         fhir_eligibility_response = {"status": 'active', "outcome": 'complete'}
 
         default_insurance_organisation = DEFAULT_CFG['R4_fhir_insurance_organisation_config']
@@ -68,7 +65,7 @@ class CoverageEligibilityRequestConverter(BaseFHIRConverter):
         reference_insurer = {"reference": f'Organization/{resource_id}'}
         fhir_eligibility_response["insurer"] = reference_insurer
 
-        reference_patient = {"reference": f'Patient/{coverage_eligibility_request.chf_id}'}
+        reference_patient = {"reference": f'Patient/{evaluation.chf_id}'}
         fhir_eligibility_response['patient'] = reference_patient
 
         reference_coverage_eligibility_request = {"reference": f'CoverageEligibilityRequest'}
@@ -79,122 +76,25 @@ class CoverageEligibilityRequestConverter(BaseFHIRConverter):
         return FHIRCoverageEligibilityResponse(**fhir_eligibility_response)
 
     @classmethod
-    def build_fhir_patient(cls, chf_id):
-        insuree = Insuree.objects.filter(chf_id=chf_id, validity_to__isnull=True)
-        if insuree.count() == 1:
-            insuree = insuree.first()
-            reference = PatientConverter.build_fhir_resource_reference(
-                insuree,
-                type='Patient',
-                display=chf_id
-            )
-            return reference
-
-    @classmethod
-    def build_fhir_insurance(cls, fhir_response, item, request):
+    def build_fhir_insurance(cls, fhir_response, insurance, evaluations):
         result = CoverageEligibilityResponseInsurance.construct()
-        cls.build_fhir_coverage(result, item.policy_uuid)
-        cls.build_fhir_benefit_period(result, item.start_date, item.expiry_date)
-        # get the data from SP
-        try:
-            with connection.cursor() as cur:
-                sql = """\
-                            DECLARE @MinDateService DATE, @MinDateItem DATE,
-                                    @ServiceLeft INT, @ItemLeft INT,
-                                    @isItemOK BIT, @isServiceOK BIT;
-                            EXEC [dbo].[uspServiceItemEnquiry] @CHFID = %s, @ServiceCode = %s, @ItemCode = %s,
-                                 @MinDateService = @MinDateService OUTPUT, @MinDateItem = @MinDateItem OUTPUT,
-                                 @ServiceLeft = @ServiceLeft OUTPUT, @ItemLeft = @ItemLeft OUTPUT,
-                                 @isItemOK = @isItemOK OUTPUT, @isServiceOK = @isServiceOK OUTPUT;
-                            SELECT @MinDateService, @MinDateItem, @ServiceLeft, @ItemLeft, @isItemOK, @isServiceOK
-                        """
-                cur.execute(sql, (request.chf_id,
-                                  request.service_code,
-                                  request.item_code))
-                res = cur.fetchone()  # retrieve the stored proc @Result table
-
-                (prod_id, total_admissions_left, total_visits_left, total_consultations_left, total_surgeries_left,
-                 total_deliveries_left, total_antenatal_left, consultation_amount_left, surgery_amount_left,
-                 delivery_amount_left,
-                 hospitalization_amount_left, antenatal_amount_left) = res
-                cur.nextset()
-                (min_date_service, min_date_item, service_left,
-                 item_left, is_item_ok, is_service_ok) = cur.fetchone()
-                response_eligibility_sp = EligibilityResponse(
-                    eligibility_request=request,
-                    prod_id=prod_id or None,
-                    total_admissions_left=total_admissions_left or 0,
-                    total_visits_left=total_visits_left or 0,
-                    total_consultations_left=total_consultations_left or 0,
-                    total_surgeries_left=total_surgeries_left or 0,
-                    total_deliveries_left=total_deliveries_left or 0,
-                    total_antenatal_left=total_antenatal_left or 0,
-                    consultation_amount_left=consultation_amount_left or 0.0,
-                    surgery_amount_left=surgery_amount_left or 0.0,
-                    delivery_amount_left=delivery_amount_left or 0.0,
-                    hospitalization_amount_left=hospitalization_amount_left or 0.0,
-                    antenatal_amount_left=antenatal_amount_left or 0.0,
-                    min_date_service=min_date_service,
-                    min_date_item=min_date_item,
-                    service_left=service_left or 0,
-                    item_left=item_left or 0,
-                    is_item_ok=is_item_ok is True,
-                    is_service_ok=is_service_ok is True
-                )
-        except Exception:
-            response_eligibility_sp = EligibilityResponse(
-                eligibility_request=None,
-                prod_id=None,
-                total_admissions_left=0,
-                total_visits_left=0,
-                total_consultations_left=0,
-                total_surgeries_left=0,
-                total_deliveries_left=0,
-                total_antenatal_left=0,
-                consultation_amount_left=0.0,
-                surgery_amount_left=0.0,
-                delivery_amount_left=0.0,
-                hospitalization_amount_left=0.0,
-                antenatal_amount_left=0.0,
-                min_date_service=None,
-                min_date_item=None,
-                service_left=0,
-                item_left=0,
-                is_item_ok=False,
-                is_service_ok=False
-            )
-
+        result.coverage = insurance.coverage
+        cls.build_fhir_benefit_period(result, insurance.start_date, insurance.expiry_date)
         # build coverag item - product/benefit
         result.item = []
-        cls.build_fhir_benefit_item_element(result, response_eligibility_sp)
-        # check services and items etc
-        prod_service = ProductService.objects\
-            .filter(product=prod_id, validity_to=None, service__code=request.service_code).first()
-        prod_item = ProductItem.objects\
-            .filter(product=prod_id, validity_to=None, item__code=request.item_code).first()
-        # build coverage item - service
-        if prod_service:
-            cls.build_fhir_benefit_item_service_element(result, response_eligibility_sp, prod_service.service)
-        # build coverage item - item
-        if prod_item:
-            cls.build_fhir_benefit_item_item_element(result, response_eligibility_sp, prod_item.item)
+        cls.build_fhir_benefit_item_element(result, evaluations[0])
+        for evaluation in evaluations:
+            # build coverage item - service
+            if evaluation.service_covered:
+                cls.build_fhir_benefit_item_service_element(result, evaluation.enquiry, evaluation.service_code)
+            # build coverage item - item
+            if evaluation.item_covered:
+                cls.build_fhir_benefit_item_item_element(result, evaluation.enquiry, evaluation.item_code)
         if type(fhir_response.insurance) is not list:
             fhir_response.insurance = [result]
         else:
             fhir_response.insurance.append(result)
 
-    @classmethod
-    def build_fhir_coverage(cls, insurance, policy_uuid):
-        # Due to circular dependency import has to be done inside of method
-        from api_fhir_r4.converters import CoverageConverter
-        policy = Policy.objects.filter(uuid=policy_uuid, validity_to__isnull=True).first()
-        reference_coverage = CoverageConverter.build_fhir_resource_reference(
-            policy,
-            type='Coverage',
-            display=policy.uuid
-        )
-        insurance.coverage = reference_coverage
-
     @classmethod
     def build_fhir_benefit_period(cls, insurance, start_date, expiry_date):
         benefit_period = Period.construct()
@@ -203,7 +103,8 @@ class CoverageEligibilityRequestConverter(BaseFHIRConverter):
         insurance.benefitPeriod = benefit_period
 
     @classmethod
-    def build_fhir_benefit_item_element(cls, insurance, response):
+    def build_fhir_benefit_item_element(cls, insurance, evaluation):
+        response = evaluation.enquiry
         item = CoverageEligibilityResponseInsuranceItem.construct()
         system = F"{GeneralConfiguration.get_system_base_url()}CodeSystem/coverage-item-category"
         item.category = cls.build_codeable_concept(
@@ -211,7 +112,8 @@ class CoverageEligibilityRequestConverter(BaseFHIRConverter):
             code="benefit",
             display="Benefit Package"
         )
-        cls.__build_item_product_name(fhir_item=item, prod_id=response.prod_id)
+        item.name = evaluation.product_name
+        item.description = evaluation.product_code
         item.benefit = []
         if response.total_admissions_left:
             cls.build_fhir_int_item_benefit_element(
@@ -293,7 +195,7 @@ class CoverageEligibilityRequestConverter(BaseFHIRConverter):
         insurance.item.append(item)
 
     @classmethod
-    def build_fhir_benefit_item_item_element(cls, insurance, response, stored_item):
+    def build_fhir_benefit_item_item_element(cls, insurance, response, item_code):
         item = CoverageEligibilityResponseInsuranceItem.construct()
         system = F"{GeneralConfiguration.get_system_base_url()}CodeSystem/coverage-item-category"
         item.category = cls.build_codeable_concept(
@@ -316,13 +218,12 @@ class CoverageEligibilityRequestConverter(BaseFHIRConverter):
                 display="Items left",
                 value=response.service_left
             )
-        code = stored_item.code
-        item.productOrService = cls.build_simple_codeable_concept(code)
+        item.productOrService = cls.build_simple_codeable_concept(item_code)
         item.excluded = not response.is_service_ok
         insurance.item.append(item)
 
     @classmethod
-    def build_fhir_benefit_item_service_element(cls, insurance, response, stored_service):
+    def build_fhir_benefit_item_service_element(cls, insurance, response, service_code):
         item = CoverageEligibilityResponseInsuranceItem.construct()
         system = F"{GeneralConfiguration.get_system_base_url()}CodeSystem/coverage-item-category"
         item.category = cls.build_codeable_concept(
@@ -345,8 +246,7 @@ class CoverageEligibilityRequestConverter(BaseFHIRConverter):
                 display="Services left",
                 value=response.item_left
             )
-        code = stored_service.code
-        item.productOrService = cls.build_simple_codeable_concept(code)
+        item.productOrService = cls.build_simple_codeable_concept(service_code)
         item.excluded = not response.is_item_ok
         insurance.item.append(item)
 
@@ -409,6 +309,18 @@ class CoverageEligibilityRequestConverter(BaseFHIRConverter):
                     service_code = item.productOrService.text
         return item_code, service_code
 
+    @classmethod
+    def build_imis_item_service_codes(cls, fhir_coverage_eligibility_request):
+        service_codes = []
+        item_codes = []
+        for item in fhir_coverage_eligibility_request.item or []:
+            type_service = cls.__get_code_from_codeable_concept_by_coding_code(item.category)
+            if type_service == 'item':
+                item_codes.append(item.productOrService.text)
+            if type_service == 'service':
+                service_codes.append(item.productOrService.text)
+        return item_codes, service_codes
+
     @classmethod
     def __get_code_from_codeable_concept_by_coding_code(cls, codeable_concept):
         service_code = None
@@ -417,18 +329,3 @@ class CoverageEligibilityRequestConverter(BaseFHIRConverter):
             if coding:
                 service_code = coding.code
         return service_code
-
-    @classmethod
-    def __get_coverage_data(cls, response):
-        policy = InsureePolicy.objects.filter(
-            insuree__chf_id=response.eligibility_request.chf_id,
-            validity_to__isnull=True).first().policy
-        product = Product.objects.get(id=response.prod_id, validity_to__isnull=True)
-        return policy, product
-
-    @classmethod
-    def __build_item_product_name(cls, fhir_item, prod_id):
-        product_queryset = Product.objects.all().filter(id=prod_id, validity_to=None)
-        product = product_queryset.first()
-        fhir_item.name = product.name
-        fhir_item.description = product.code
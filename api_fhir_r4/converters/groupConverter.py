@@ -5,6 +5,7 @@ from fhir.resources.humanname import HumanName
 from insuree.models import Insuree, InsureePolicy, Family, FamilyType, ConfirmationType
 from policy.models import Policy
 from location.models import Location
+from api_fhir_r4.cache import LocationIndex, ReferenceResolver
 from api_fhir_r4.configurations import R4IdentifierConfig, GeneralConfiguration
 from api_fhir_r4.converters import BaseFHIRConverter, ReferenceConverterMixin
 from api_fhir_r4.converters.locationConverter import LocationConverter
@@ -17,6 +18,9 @@ from api_fhir_r4.exceptions import FHIRException
 
 class GroupConverter(BaseFHIRConverter, ReferenceConverterMixin):
 
+    # members and their policies change without a new version of the family
+    fhir_validators_supported = False
+
     @classmethod
     def to_fhir_obj(cls, imis_family, reference_type=ReferenceConverterMixin.UUID_REFERENCE_TYPE):
         fhir_family = {}
@@ -142,8 +146,16 @@ class GroupConverter(BaseFHIRConverter, ReferenceConverterMixin):
         # according to the IMIS profile - always 'Person' value
         fhir_family['type'] = "Person"
 
+    @classmethod
+    def get_fhir_prefetch_lookups(cls):
+        return ['members']
+
     @classmethod
     def build_fhir_active(cls, fhir_family, imis_family):
+        # annotated by GroupViewSet for list requests
+        if hasattr(imis_family, 'has_active_policy'):
+            fhir_family.active = bool(imis_family.has_active_policy)
+            return
         number_of_active_policy = InsureePolicy.objects.filter(
             Q(insuree__family__uuid=imis_family.uuid),
             Q(policy__status=Policy.STATUS_ACTIVE),
@@ -157,6 +169,9 @@ class GroupConverter(BaseFHIRConverter, ReferenceConverterMixin):
 
     @classmethod
     def build_fhir_quantity(cls, fhir_family, imis_family):
+        if hasattr(imis_family, 'active_members_count'):
+            fhir_family.quantity = imis_family.active_members_count
+            return
         quantity = Insuree.objects.filter(
             family__uuid=imis_family.uuid, validity_to__isnull=True).count()
         fhir_family.quantity = quantity
@@ -219,19 +234,23 @@ class GroupConverter(BaseFHIRConverter, ReferenceConverterMixin):
                             value = cls.get_location_reference(
                                 ext.valueReference.reference)
                             if value:
-                                try:
-                                    imis_family.location = Location.objects.get(
-                                        uuid=value, validity_to__isnull=True)
-                                except Location.DoesNotExist:
-                                    imis_family.location = None
+                                location = LocationIndex.get_by_uuid(value)
+                                if location:
+                                    imis_family.location_id = location.id
+                                else:
+                                    try:
+                                        imis_family.location = ReferenceResolver.get(
+                                            Location, uuid=value, validity_to__isnull=True)
+                                    except Location.DoesNotExist:
+                                        imis_family.location = None
 
             elif extension.url == f"{GeneralConfiguration.get_system_base_url()}StructureDefinition/group-poverty-status":
                 imis_family.poverty = extension.valueBoolean
 
             elif extension.url == f"{GeneralConfiguration.get_system_base_url()}StructureDefinition/group-type":
                 try:
-                    imis_family.family_type = FamilyType.objects.get(
-                        code=extension.valueCodeableConcept.coding[0].code)
+                    imis_family.family_type = ReferenceResolver.get(
+                        FamilyType, code=extension.valueCodeableConcept.coding[0].code)
                 except:
                     imis_family.family_type = None
 
@@ -241,8 +260,8 @@ class GroupConverter(BaseFHIRConverter, ReferenceConverterMixin):
                         if ext.url == "number":
                             fhir_family.confirmation_no = ext.valueString
                         if ext.url == "type":
-                            fhir_family.confirmation_type = ConfirmationType.objects.get(
-                                code=ext.valueCodeableConcept.coding[0].code)
+                            fhir_family.confirmation_type = ReferenceResolver.get(
+                                ConfirmationType, code=ext.valueCodeableConcept.coding[0].code)
                 except:
                     imis_family.confirmation_no = None
                     imis_family.confirmation_type = None
@@ -259,22 +278,23 @@ class GroupConverter(BaseFHIRConverter, ReferenceConverterMixin):
         extension.url = f"{GeneralConfiguration.get_system_base_url()}StructureDefinition/group-address"
         family_address = cls.build_fhir_address(
             imis_family.address, "home", "physical")
-        if imis_family.location:
-            family_address.state = imis_family.location.parent.parent.parent.name
-            family_address.district = imis_family.location.parent.parent.name
+        if imis_family.location_id or imis_family.location:
+            location = LocationIndex.get_related_location(imis_family, 'location')
+            family_address.state = LocationIndex.get_ancestor(location, 3).name
+            family_address.district = LocationIndex.get_ancestor(location, 2).name
             # municipality extension
             extension_address = Extension.construct()
             extension_address.url = f"{GeneralConfiguration.get_system_base_url()}StructureDefinition/address-municipality"
-            extension_address.valueString = imis_family.location.parent.name
+            extension_address.valueString = LocationIndex.get_ancestor(location, 1).name
             family_address.extension = [extension_address]
 
             # address location reference extension
             extension_address = Extension.construct()
             extension_address.url = f"{GeneralConfiguration.get_system_base_url()}StructureDefinition/address-location-reference"
             extension_address.valueReference = LocationConverter\
-                .build_fhir_resource_reference(imis_family.location, 'Location', reference_type=reference_type)
+                .build_fhir_resource_reference(location, 'Location', reference_type=reference_type)
             family_address.extension.append(extension_address)
-            family_address.city = imis_family.location.name
+            family_address.city = location.name
         extension.valueAddress = family_address
 
     @classmethod
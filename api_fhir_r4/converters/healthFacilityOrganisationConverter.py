@@ -1,11 +1,12 @@
 import logging
 
 from django.core.exceptions import MultipleObjectsReturned
-from location.models import HealthFacility, Location, HealthFacilityLegalForm
+from location.models import HealthFacility, HealthFacilityLegalForm
 from claim.models import ClaimAdmin
 from fhir.resources.address import Address
 
 from api_fhir_r4.configurations import GeneralConfiguration, R4IdentifierConfig
+from api_fhir_r4.cache import LocationIndex, ReferenceResolver
 from api_fhir_r4.converters import BaseFHIRConverter, ReferenceConverterMixin, LocationConverter, PersonConverterMixin
 from fhir.resources.organization import Organization
 from fhir.resources.organization import OrganizationContact
@@ -127,8 +128,9 @@ class HealthFacilityOrganisationConverter(BaseFHIRConverter, PersonConverterMixi
             address.line = [imis_organisation.address]
 
         # Hospitals are expected to be on district level
-        address.district = imis_organisation.location.name
-        address.state = imis_organisation.location.parent.name
+        location = LocationIndex.get_related_location(imis_organisation, 'location')
+        address.district = location.name
+        address.state = LocationIndex.get_ancestor(location, 1).name
         address.type = 'physical'
         address.extension = [cls._build_address_ext(imis_organisation, reference_type)]
 
@@ -319,7 +321,7 @@ class HealthFacilityOrganisationConverter(BaseFHIRConverter, PersonConverterMixi
                 'codes': HealthFacilityOrganizationTypeMapping.LEGAL_FORM_MAPPING.keys()},
             errors)
         if value:
-            legal_form = HealthFacilityLegalForm.objects.get(code=value)
+            legal_form = ReferenceResolver.get(HealthFacilityLegalForm, code=value)
             imis_hf.legal_form = legal_form
         else:
             cls.valid_condition(True, _("Extension with HF legal form not found"), errors)
@@ -336,27 +338,21 @@ class HealthFacilityOrganisationConverter(BaseFHIRConverter, PersonConverterMixi
     @classmethod
     def build_imis_parent_location_id(cls, imis_hf, fhir_hf, errors):
         address = fhir_hf.address[0]
-        matching_locations = Location.objects \
-            .filter(
-                validity_to__isnull=True,
-                name=address.district,
-                parent__name=address.state,
-                type="D"  # HF is expected to be at district level
-            ).distinct()\
-            .all()
-
-        if matching_locations.count() != 1:
+        # HF is expected to be at district level
+        matching_locations = LocationIndex.filter_by_name(address.district, address.state, location_type="D")
+
+        if len(matching_locations) != 1:
             msg = cls.__get_invalid_location_msg(address, matching_locations)
-            cls.valid_condition(matching_locations.count() == 1, msg, errors)
+            cls.valid_condition(len(matching_locations) == 1, msg, errors)
             return
         else:
-            imis_hf.location = matching_locations.first()
+            imis_hf.location_id = matching_locations[0].id
 
     @classmethod
     def __get_invalid_location_msg(cls, address, matching_locations):
-        count = matching_locations.count()
+        count = len(matching_locations)
         if count == 0:
             return _(F"No matching location for district {address.district}, state {address.state}.")
         elif count > 1:
             return _(F"More than one matching location district {address.district}, state {address.state}:\n"
-                     F"{matching_locations}.")
+                     F"{[location.code for location in matching_locations]}.")
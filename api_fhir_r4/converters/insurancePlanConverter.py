@@ -3,6 +3,7 @@ import core
 from django.utils.translation import gettext as _
 from location.models import Location
 from product.models import Product
+from api_fhir_r4.cache import ReferenceResolver
 from api_fhir_r4.configurations import GeneralConfiguration, R4IdentifierConfig
 from api_fhir_r4.converters import BaseFHIRConverter, ReferenceConverterMixin
 from api_fhir_r4.converters.locationConverter import LocationConverter
@@ -159,7 +160,7 @@ class InsurancePlanConverter(BaseFHIRConverter, ReferenceConverterMixin):
             coverage_area = fhir_insurance_plan.coverageArea[0]
             value = cls.__get_location_reference(coverage_area.reference)
             if value:
-                imis_product.location = Location.objects.get(uuid=value)
+                imis_product.location = ReferenceResolver.get(Location, uuid=value)
 
     @classmethod
     def __get_location_reference(cls, location):
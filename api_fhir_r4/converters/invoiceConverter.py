@@ -13,6 +13,9 @@ from invoice.models import Invoice
 
 
 class GenericInvoiceConverter(BaseFHIRConverter, ReferenceConverterMixin):
+    # line items change without a new version of the invoice
+    fhir_validators_supported = False
+
     @classmethod
     def to_imis_obj(cls, data, audit_user_id):
         raise NotImplementedError('to_imis_obj() not implemented.')
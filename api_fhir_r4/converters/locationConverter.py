@@ -2,6 +2,7 @@ from django.utils.translation import gettext as _
 from django.utils.translation import gettext
 from location.models import Location
 
+from api_fhir_r4.cache import ReferenceResolver
 from api_fhir_r4.configurations import R4IdentifierConfig, R4LocationConfig
 from api_fhir_r4.converters import BaseFHIRConverter, ReferenceConverterMixin
 from fhir.resources.location import Location as FHIRLocation
@@ -147,9 +148,9 @@ class LocationConverter(BaseFHIRConverter, ReferenceConverterMixin):
 
             try:
                 if cls._is_code_reference(fhir_location.partOf):
-                    location = Location.objects.get(code=reference, validity_to__isnull=True)
+                    location = ReferenceResolver.get(Location, code=reference, validity_to__isnull=True)
                 else:
-                    location = Location.objects.get(uuid=reference)
+                    location = ReferenceResolver.get(Location, uuid=reference)
                 imis_location.parent = location
             except Location.DoesNotExist:
                 errors.append(
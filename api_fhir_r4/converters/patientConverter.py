@@ -8,6 +8,7 @@ from fhir.resources.address import Address
 from insuree.models import Insuree, Gender, Education, Profession, Family, \
     InsureePhoto, Relation, IdentificationType
 from location.models import Location, HealthFacility
+from api_fhir_r4.cache import LocationIndex, ReferenceResolver
 from api_fhir_r4.configurations import R4IdentifierConfig, GeneralConfiguration, R4MaritalConfig
 from api_fhir_r4.converters import BaseFHIRConverter, PersonConverterMixin, ReferenceConverterMixin
 from api_fhir_r4.converters.groupConverter import GroupConverter
@@ -23,22 +24,37 @@ from api_fhir_r4.utils import TimeUtils, DbManagerUtils
 
 
 class PatientConverter(BaseFHIRConverter, PersonConverterMixin, ReferenceConverterMixin):
+    fhir_element_steps = {
+        'build_human_names': ('name',),
+        'build_fhir_identifiers': ('identifier',),
+        'build_fhir_birth_date': ('birthDate',),
+        'build_fhir_gender': ('gender',),
+        'build_fhir_marital_status': ('maritalStatus',),
+        'build_fhir_telecom': ('telecom',),
+        'build_fhir_addresses': ('address',),
+        'build_fhir_extentions': ('extension',),
+        'build_fhir_contact': ('contact',),
+        'build_fhir_photo': ('photo',),
+        'build_fhir_general_practitioner': ('generalPractitioner',),
+    }
+    fhir_summary_elements = ('identifier', 'active', 'name', 'telecom', 'gender', 'birthDate', 'deceasedBoolean',
+                             'deceasedDateTime', 'address', 'managingOrganization', 'link')
 
     @classmethod
     def to_fhir_obj(cls, imis_insuree, reference_type=ReferenceConverterMixin.UUID_REFERENCE_TYPE):
         fhir_patient = Patient.construct()
         cls.build_fhir_pk(fhir_patient, imis_insuree, reference_type)
-        cls.build_human_names(fhir_patient, imis_insuree)
-        cls.build_fhir_identifiers(fhir_patient, imis_insuree)
-        cls.build_fhir_birth_date(fhir_patient, imis_insuree)
-        cls.build_fhir_gender(fhir_patient, imis_insuree)
-        cls.build_fhir_marital_status(fhir_patient, imis_insuree)
-        cls.build_fhir_telecom(fhir_patient, imis_insuree)
-        cls.build_fhir_addresses(fhir_patient, imis_insuree, reference_type)
-        cls.build_fhir_extentions(fhir_patient, imis_insuree, reference_type)
-        cls.build_fhir_contact(fhir_patient, imis_insuree)
-        cls.build_fhir_photo(fhir_patient, imis_insuree)
-        cls.build_fhir_general_practitioner(fhir_patient, imis_insuree, reference_type)
+        cls.build_fhir_step(cls.build_human_names, fhir_patient, imis_insuree)
+        cls.build_fhir_step(cls.build_fhir_identifiers, fhir_patient, imis_insuree)
+        cls.build_fhir_step(cls.build_fhir_birth_date, fhir_patient, imis_insuree)
+        cls.build_fhir_step(cls.build_fhir_gender, fhir_patient, imis_insuree)
+        cls.build_fhir_step(cls.build_fhir_marital_status, fhir_patient, imis_insuree)
+        cls.build_fhir_step(cls.build_fhir_telecom, fhir_patient, imis_insuree)
+        cls.build_fhir_step(cls.build_fhir_addresses, fhir_patient, imis_insuree, reference_type)
+        cls.build_fhir_step(cls.build_fhir_extentions, fhir_patient, imis_insuree, reference_type)
+        cls.build_fhir_step(cls.build_fhir_contact, fhir_patient, imis_insuree)
+        cls.build_fhir_step(cls.build_fhir_photo, fhir_patient, imis_insuree)
+        cls.build_fhir_step(cls.build_fhir_general_practitioner, fhir_patient, imis_insuree, reference_type)
         return fhir_patient
 
     @classmethod
@@ -86,35 +102,39 @@ class PatientConverter(BaseFHIRConverter, PersonConverterMixin, ReferenceConvert
     @classmethod
     def build_imis_extentions(cls, imis_insuree, fhir_patient, errors):
         cls._validate_fhir_extension_is_exist(fhir_patient)
+        structure_definition_url = f"{GeneralConfiguration.get_system_base_url()}StructureDefinition/"
         for extension in fhir_patient.extension:
-            if extension.url == f"{GeneralConfiguration.get_system_base_url()}StructureDefinition/patient-is-head":
+            if extension.url == f"{structure_definition_url}patient-is-head":
                 imis_insuree.head = extension.valueBoolean
 
-            elif extension.url == f"{GeneralConfiguration.get_system_base_url()}StructureDefinition/patient-education-level":
+            elif extension.url == f"{structure_definition_url}patient-education-level":
                 try:
-                    imis_insuree.education = Education.objects.get(id=extension.valueCodeableConcept.coding[0].code)
+                    imis_insuree.education = ReferenceResolver.get(
+                        Education, id=extension.valueCodeableConcept.coding[0].code)
                 except Exception:
                     imis_insuree.education = None
 
-            elif extension.url == f"{GeneralConfiguration.get_system_base_url()}StructureDefinition/patient-profession":
+            elif extension.url == f"{structure_definition_url}patient-profession":
                 try:
-                    imis_insuree.profession = Profession.objects.get(id=extension.valueCodeableConcept.coding[0].code)
+                    imis_insuree.profession = ReferenceResolver.get(
+                        Profession, id=extension.valueCodeableConcept.coding[0].code)
                 except Exception:
                     imis_insuree.profession = None
 
-            elif extension.url == f"{GeneralConfiguration.get_system_base_url()}StructureDefinition/patient-card-issued":
+            elif extension.url == f"{structure_definition_url}patient-card-issued":
                 try:
                     imis_insuree.card_issued = extension.valueBoolean
                 except Exception:
                     imis_insuree.card_issued = False
 
-            elif extension.url == f"{GeneralConfiguration.get_system_base_url()}StructureDefinition/patient-identification":
+            elif extension.url == f"{structure_definition_url}patient-identification":
                 try:
                     for ext in extension.extension:
                         if ext.url == "number":
                             imis_insuree.passport = ext.valueString
                         if ext.url == "type":
-                            imis_insuree.type_of_id = IdentificationType.objects.get(code=ext.valueCodeableConcept.coding[0].code)
+                            imis_insuree.type_of_id = ReferenceResolver.get(
+                                IdentificationType, code=ext.valueCodeableConcept.coding[0].code)
                 except Exception:
                     imis_insuree.passport = None
                     imis_insuree.type_of_id = None
@@ -250,7 +270,7 @@ class PatientConverter(BaseFHIRConverter, PersonConverterMixin, ReferenceConvert
                             if "CodeSystem/patient-contact-relationship" in coding.system:
                                 relationship_name = coding.display
                     try:
-                        relation = Relation.objects.get(relation=relationship_name)
+                        relation = ReferenceResolver.get(Relation, relation=relationship_name)
                         imis_insuree.relationship = relation
                     except:
                         pass
@@ -322,10 +342,10 @@ class PatientConverter(BaseFHIRConverter, PersonConverterMixin, ReferenceConvert
         addresses = []
 
         # If family doesn't have location assigned then use family location
-        if imis_insuree.current_village:
+        if imis_insuree.current_village_id or imis_insuree.current_village:
             insuree_address = cls._build_insuree_address(imis_insuree, reference_type)
             addresses.append(insuree_address)
-        elif imis_insuree.family and imis_insuree.family.location:
+        elif imis_insuree.family and (imis_insuree.family.location_id or imis_insuree.family.location):
             family_address = cls._build_insuree_family_address(imis_insuree.family, reference_type)
             addresses.append(family_address)
 
@@ -358,15 +378,14 @@ class PatientConverter(BaseFHIRConverter, PersonConverterMixin, ReferenceConvert
 
     @classmethod
     def _add_insuree_address(cls, imis_insuree, fhir_address):
-        imis_insuree.current_village = cls.__get_location_from_address(fhir_address)
+        imis_insuree.current_village_id = cls.__get_location_id_from_address(fhir_address)
         if fhir_address.text:
             imis_insuree.current_address = fhir_address.text
 
     @classmethod
     def _add_family_address(cls, imis_insuree, fhir_address):
-        family_location = cls.__get_location_from_address(fhir_address)
         # Additional attribute for purpose of creating new family
-        imis_insuree.family_location = family_location
+        imis_insuree.family_location_id = cls.__get_location_id_from_address(fhir_address)
         if fhir_address.text:
             imis_insuree.family_address = fhir_address.text
 
@@ -519,7 +538,7 @@ class PatientConverter(BaseFHIRConverter, PersonConverterMixin, ReferenceConvert
 
         hf_uuid = cls.get_resource_id_from_reference(fhir_patient.generalPractitioner[0])
         try:
-            health_facility = HealthFacility.objects.get(uuid=hf_uuid)
+            health_facility = ReferenceResolver.get(HealthFacility, uuid=hf_uuid)
             imis_insuree.health_facility = health_facility
         except HealthFacility.DoesNotExist:
             raise FHIRException(F"Invalid location reference, {hf_uuid} doesn't match any HealthFacility.")
@@ -676,7 +695,7 @@ class PatientConverter(BaseFHIRConverter, PersonConverterMixin, ReferenceConvert
             if "StructureDefinition/address-location-reference" in ext.url:
                 location_uuid = LocationConverter.get_resource_id_from_reference(ext.valueReference)
                 try:
-                    location = Location.objects.get(uuid=location_uuid)
+                    location = ReferenceResolver.get(Location, uuid=location_uuid)
                     imis_insuree.current_village = location
                 except Location.DoesNotExist as e:
                     raise FHIRException(f"Invalid location reference, {location_uuid} doesn't match any location.")
@@ -688,7 +707,7 @@ class PatientConverter(BaseFHIRConverter, PersonConverterMixin, ReferenceConvert
     @classmethod
     def _build_insuree_family_address(cls, imis_insuree_family: Family, reference_type):
         return cls.__build_address_of_use(
-            address_location=imis_insuree_family.location,
+            address_location=LocationIndex.get_related_location(imis_insuree_family, 'location'),
             use='home',
             location_text=imis_insuree_family.address,
             reference_type=reference_type
@@ -697,7 +716,7 @@ class PatientConverter(BaseFHIRConverter, PersonConverterMixin, ReferenceConvert
     @classmethod
     def _build_insuree_address(cls, imis_insuree, reference_type):
         return cls.__build_address_of_use(
-            address_location=imis_insuree.current_village,
+            address_location=LocationIndex.get_related_location(imis_insuree, 'current_village'),
             use='temp',
             location_text=imis_insuree.current_address,
             reference_type=reference_type
@@ -733,15 +752,15 @@ class PatientConverter(BaseFHIRConverter, PersonConverterMixin, ReferenceConvert
 
     @classmethod
     def __state_name_from_physical_location(cls, insuree_family_location):
-        return insuree_family_location.parent.parent.parent.name
+        return LocationIndex.get_ancestor(insuree_family_location, 3).name
 
     @classmethod
     def __district_name_from_physical_location(cls, insuree_family_location):
-        return insuree_family_location.parent.parent.name
+        return LocationIndex.get_ancestor(insuree_family_location, 2).name
 
     @classmethod
     def __municipality_from_family_location(cls, insuree_family_location):
-        return insuree_family_location.parent.name
+        return LocationIndex.get_ancestor(insuree_family_location, 1).name
 
     @classmethod
     def __village_name_from_physical_location(cls, insuree_family_location):
@@ -762,14 +781,22 @@ class PatientConverter(BaseFHIRConverter, PersonConverterMixin, ReferenceConvert
 
     @classmethod
     def __get_location_from_address(cls, fhir_patient_address):
-        try:
-            location_reference = next((
-                ext for ext in fhir_patient_address.extension if 'address-location-reference' in ext.url
-            ))
-            location_uuid = LocationConverter.get_resource_id_from_reference(location_reference.valueReference)
-            return Location.objects.get(uuid=location_uuid)
-        except Location.DoesNotExist as e:
+        return ReferenceResolver.get(Location, id=cls.__get_location_id_from_address(fhir_patient_address))
+
+    @classmethod
+    def __get_location_id_from_address(cls, fhir_patient_address):
+        location_reference = next((
+            ext for ext in fhir_patient_address.extension if 'address-location-reference' in ext.url
+        ))
+        location_uuid = LocationConverter.get_resource_id_from_reference(location_reference.valueReference)
+        location = LocationIndex.get_by_uuid(location_uuid)
+        if location:
+            return location.id
+        # Location created after the last reload of the index
+        location_id = Location.objects.filter(uuid=location_uuid).values_list('id', flat=True).first()
+        if location_id is None:
             raise FHIRException(f"Invalid location reference, {location_uuid} doesn't match any location.")
+        return location_id
 
     @classmethod
     def __get_family_address_from_fhir_patient(cls, fhir_patient) -> Address:
@@ -11,6 +11,7 @@ DEFAULT_CFG = {
     "default_value_of_location_offline_attribute": False,
     "default_value_of_location_care_type": "B",
     "default_response_page_size": 10,
+    "stream_response_page_size": 100,
     "claim_rule_engine_validation": True,
     "R4_fhir_identifier_type_config": {
         "system": "https://openimis.github.io/openimis_fhir_r4_ig/CodeSystem/openimis-identifiers",
@@ -110,7 +111,10 @@ DEFAULT_CFG = {
         "fhir_is_service_ok_code": "is_service_ok",
         "fhir_balance_code": "balance",
         "fhir_balance_default_category": "medical",
-        "fhir_active_policy_status": ("A", 2)
+        "fhir_active_policy_status": ("A", 2),
+        "cache_name": "default",
+        "cache_timeout": 60,
+        "max_batch_size": 100
     },
     "R4_fhir_communication_request_config": {
         "fhir_care_rendered_code": "CareRendered",
@@ -185,7 +189,17 @@ DEFAULT_CFG = {
         "fhir_sub_status_off": "off",
         "fhir_sub_status_active": "active",
         "get_fhir_sub_criteria_key_resource": "resource",
-        "get_fhir_sub_criteria_key_resource_type": "resource_type"
+        "get_fhir_sub_criteria_key_resource_type": "resource_type",
+        "outbox_enabled": False,
+        "outbox_batch_size": 100,
+        "outbox_poll_interval": 2,
+        "outbox_max_attempts": 8,
+        "outbox_retry_delay": 30,
+        "outbox_max_retry_delay": 3600,
+        "outbox_lease_timeout": 300,
+        "outbox_endpoint_concurrency": 4,
+        "outbox_request_timeout": 30,
+        "outbox_batch_linger": 10
     },
     "R4_fhir_payment_notice_config": {
         "get_fhir_payment_notice_status_active": "active",
@@ -195,4 +209,32 @@ DEFAULT_CFG = {
         "fhir_payment_notice_payment_status_paid": "paid",
         "fhir_payment_notice_payment_status_cleared": "cleared"
     },
+    "R4_fhir_response_cache_config": {
+        "enabled": False,
+        "cache_name": "default",
+        "timeout": 300,
+        "scope": "user"
+    },
+    "R4_fhir_count_cache_config": {
+        "cache_name": "default",
+        "timeout": 60,
+        "max_entries": 1000,
+        "estimate_threshold": None,
+        "process_cache_max_age": 60
+    },
+    "R4_fhir_bulk_export_config": {
+        "storage_path": "fhir_bulk_export",
+        "chunk_size": 500,
+        "stale_timeout": 600
+    },
+    "R4_fhir_reference_cache_config": {
+        "enabled": True,
+        "max_entries": 5000
+    },
+    "R4_fhir_request_timing_config": {
+        "enabled": True,
+        "server_timing_header": True,
+        "log_enabled": False,
+        "sample_size": 1000
+    },
 }
@@ -0,0 +1,120 @@
+import contextvars
+from contextlib import contextmanager
+
+from rest_framework.exceptions import ValidationError
+
+
+class ElementSelection:
+    """
+    Elements of resources requested with the FHIR `_summary` and `_elements` parameters. The selection of the
+    request is active while the response is built. Converters skip `build_fhir_*` steps whose elements
+    (BaseFHIRConverter.fhir_element_steps) are not selected, the remaining unselected elements are removed from
+    the representation.
+    """
+    SUMMARY_QUERY_PARAM = '_summary'
+    ELEMENTS_QUERY_PARAM = '_elements'
+
+    SUMMARY_TRUE = 'true'
+    SUMMARY_TEXT = 'text'
+    SUMMARY_DATA = 'data'
+    SUMMARY_COUNT = 'count'
+    SUMMARY_FALSE = 'false'
+    SUMMARY_VALUES = (SUMMARY_TRUE, SUMMARY_TEXT, SUMMARY_DATA, SUMMARY_COUNT, SUMMARY_FALSE)
+
+    # elements returned for every selection
+    MANDATORY_ELEMENTS = frozenset(('resourceType', 'id', 'meta'))
+    SUBSETTED_TAG = {'system': 'http://terminology.hl7.org/CodeSystem/v3-ObservationValue', 'code': 'SUBSETTED'}
+
+    _current = contextvars.ContextVar('api_fhir_r4_element_selection', default=(None, None))
+
+    def __init__(self, summary=None, elements=None):
+        self.summary = summary
+        self.elements = frozenset(elements) if elements is not None else None
+
+    @classmethod
+    def from_request(cls, request, strict=True):
+        """
+        Selection of the request, None if all elements are requested. Invalid `_summary` raises ValidationError,
+        or is ignored if not `strict`.
+        """
+        summary = request.GET.get(cls.SUMMARY_QUERY_PARAM)
+        elements = request.GET.get(cls.ELEMENTS_QUERY_PARAM)
+        if summary is not None:
+            summary = summary.strip().lower()
+            if summary not in cls.SUMMARY_VALUES:
+                if strict:
+                    raise ValidationError({
+                        cls.SUMMARY_QUERY_PARAM: f"Has to be one of {', '.join(cls.SUMMARY_VALUES)}"})
+                summary = None
+        if summary == cls.SUMMARY_FALSE:
+            summary = None
+        if elements is not None:
+            elements = [element.strip() for element in elements.split(',') if element.strip()]
+        if summary is None and not elements:
+            return None
+        # _elements is ignored with _summary, as both can't be combined
+        return cls(summary=summary, elements=elements if summary is None else None)
+
+    @classmethod
+    def current(cls):
+        """
+        Selection of the request being processed, None while a resource is being converted.
+        """
+        selection, converter = cls._current.get()
+        return selection if converter is None else None
+
+    @classmethod
+    def for_converter(cls, converter):
+        """
+        Selection of the resource being converted by the converter. Other resources converted at the same time
+        (contained resources, subscription notifications) are built complete.
+        """
+        selection, active_converter = cls._current.get()
+        if active_converter is None or not issubclass(converter, active_converter):
+            return None
+        return selection
+
+    @classmethod
+    @contextmanager
+    def activate(cls, selection, converter=None):
+        """
+        Activates the selection for the request, or for the resource converted by `converter`.
+        """
+        token = cls._current.set((selection, converter))
+        try:
+            yield selection
+        finally:
+            cls._current.reset(token)
+
+    @property
+    def is_count(self):
+        return self.summary == self.SUMMARY_COUNT
+
+    def includes(self, element, summary_elements=None):
+        """
+        Whether the element is selected. `summary_elements` are the elements of the resource returned for
+        `_summary=true`, all elements are returned if they're not known.
+        """
+        if element in self.MANDATORY_ELEMENTS:
+            return True
+        if self.elements is not None:
+            return element in self.elements
+        if self.summary == self.SUMMARY_TEXT:
+            return element == 'text'
+        if self.summary == self.SUMMARY_TRUE:
+            return summary_elements is None or element in summary_elements
+        if self.summary == self.SUMMARY_DATA:
+            return element != 'text'
+        return True
+
+    def filter_resource(self, resource, summary_elements=None):
+        """
+        Removes elements which are not selected from the resource representation, the resource is tagged
+        as SUBSETTED if any was removed.
+        """
+        filtered = {key: value for key, value in resource.items() if self.includes(key, summary_elements)}
+        if len(filtered) != len(resource):
+            meta = dict(filtered.get('meta') or {})
+            meta['tag'] = [*(meta.get('tag') or []), self.SUBSETTED_TAG]
+            filtered['meta'] = meta
+        return filtered
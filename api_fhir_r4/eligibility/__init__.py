@@ -0,0 +1,2 @@
+from api_fhir_r4.eligibility.eligibilityEvaluator import CoverageEligibilityEvaluator, CoverageEligibilityEvaluation, \
+    EvaluatedInsurance
@@ -0,0 +1,240 @@
+import logging
+from collections import namedtuple
+
+from django.db import connection
+
+from api_fhir_r4.cache import EligibilityCache
+from api_fhir_r4.configurations import R4CoverageEligibilityConfiguration as Config
+from api_fhir_r4.converters import PatientConverter, CoverageConverter
+from insuree.models import Insuree, InsureePolicy
+from policy.services import EligibilityResponse
+from product.models import Product, ProductService, ProductItem
+
+logger = logging.getLogger(__name__)
+
+CoverageEligibilityEvaluation = namedtuple('CoverageEligibilityEvaluation', [
+    'chf_id', 'service_code', 'item_code', 'patient', 'insurances', 'enquiry', 'product_code', 'product_name',
+    'service_covered', 'item_covered', 'fallback'
+], defaults=(False,))
+CoverageEligibilityEvaluation.__doc__ = """
+Result of the eligibility evaluation of one (chf_id, service_code, item_code) request. `enquiry` is the
+EligibilityResponse of uspServiceItemEnquiry, `service_covered` and `item_covered` tell if the requested codes
+are covered by the product returned by the enquiry. `fallback` is set if the enquiry failed and empty benefits
+are used, such evaluations aren't cached.
+"""
+
+EvaluatedInsurance = namedtuple('EvaluatedInsurance', ['coverage', 'start_date', 'expiry_date'])
+
+
+class CoverageEligibilityEvaluator:
+    """
+    Evaluates many eligibility requests at once. Insurees, policies, products and product services/items of all
+    requests are loaded with a fixed number of queries, uspServiceItemEnquiry is executed once for every distinct
+    request of an insuree with an active policy. Evaluations are kept in the EligibilityCache.
+    """
+
+    def __init__(self, user):
+        self.user = user
+
+    def evaluate(self, eligibility_requests):
+        """
+        Returns evaluations in the order of `eligibility_requests`.
+        """
+        keys = [self.get_key(request) for request in eligibility_requests]
+        distinct_keys = list(dict.fromkeys(keys))
+        cache_keys = EligibilityCache.get_keys(distinct_keys)
+        evaluations = EligibilityCache.get_many(cache_keys)
+        missing_keys = [key for key in distinct_keys if key not in evaluations]
+        if missing_keys:
+            evaluated = self.evaluate_keys(missing_keys)
+            EligibilityCache.set_many(
+                cache_keys, {key: evaluation for key, evaluation in evaluated.items() if not evaluation.fallback})
+            evaluations.update(evaluated)
+
+        # Evaluations are shared by all users, visibility of insurees is checked on every request
+        visible_chf_ids = self.get_visible_chf_ids({key[0] for key in distinct_keys})
+        return [evaluations[key] if key[0] in visible_chf_ids else self.build_empty_evaluation(key) for key in keys]
+
+    @classmethod
+    def get_key(cls, eligibility_request):
+        return eligibility_request.chf_id, eligibility_request.service_code, eligibility_request.item_code
+
+    def get_visible_chf_ids(self, chf_ids):
+        return set(Insuree.get_queryset(None, self.user)
+                   .filter(chf_id__in=chf_ids, validity_to__isnull=True)
+                   .values_list('chf_id', flat=True))
+
+    def evaluate_keys(self, keys):
+        insurees = self._get_insurees({key[0] for key in keys})
+        insurances = self._get_insurances(insurees.values())
+        enquiries = {
+            key: self._run_service_item_enquiry(key) for key in keys
+            if key[0] in insurees and insurances.get(insurees[key[0]].id)
+        }
+        failed_keys = {key for key, enquiry in enquiries.items() if enquiry is None}
+        enquiries.update({key: self._build_default_enquiry() for key in failed_keys})
+        products = self._get_products({enquiry.prod_id for enquiry in enquiries.values() if enquiry.prod_id})
+        covered_services = self._get_covered_codes(
+            ProductService, 'service__code', products, {key[1] for key in enquiries if key[1]})
+        covered_items = self._get_covered_codes(
+            ProductItem, 'item__code', products, {key[2] for key in enquiries if key[2]})
+
+        evaluations = {}
+        for key in keys:
+            chf_id, service_code, item_code = key
+            insuree = insurees.get(chf_id)
+            enquiry = enquiries.get(key)
+            if insuree is None or enquiry is None:
+                evaluations[key] = self.build_empty_evaluation(key, insuree)
+                continue
+            product = products.get(enquiry.prod_id)
+            evaluations[key] = CoverageEligibilityEvaluation(
+                chf_id=chf_id,
+                service_code=service_code,
+                item_code=item_code,
+                patient=self._build_patient_reference(insuree),
+                insurances=insurances[insuree.id],
+                enquiry=enquiry,
+                product_code=product.code if product else None,
+                product_name=product.name if product else None,
+                service_covered=(enquiry.prod_id, service_code) in covered_services,
+                item_covered=(enquiry.prod_id, item_code) in covered_items,
+                fallback=key in failed_keys,
+            )
+        return evaluations
+
+    @classmethod
+    def build_empty_evaluation(cls, key, insuree=None):
+        chf_id, service_code, item_code = key
+        return CoverageEligibilityEvaluation(
+            chf_id=chf_id,
+            service_code=service_code,
+            item_code=item_code,
+            patient=cls._build_patient_reference(insuree) if insuree else None,
+            insurances=[],
+            enquiry=None,
+            product_code=None,
+            product_name=None,
+            service_covered=False,
+            item_covered=False,
+        )
+
+    def _get_insurees(self, chf_ids):
+        insurees = {}
+        duplicated = set()
+        for insuree in Insuree.objects.filter(chf_id__in=chf_ids, validity_to__isnull=True):
+            if insuree.chf_id in insurees:
+                duplicated.add(insuree.chf_id)
+            insurees[insuree.chf_id] = insuree
+        # Ambiguous chf_id isn't resolved to any of the insurees
+        return {chf_id: insuree for chf_id, insuree in insurees.items() if chf_id not in duplicated}
+
+    def _get_insurances(self, insurees):
+        active_statuses = [status for status in Config.get_fhir_active_policy_status() if isinstance(status, int)]
+        insuree_policies = InsureePolicy.objects \
+            .filter(insuree__in=list(insurees), validity_to__isnull=True,
+                    policy__validity_to__isnull=True, policy__status__in=active_statuses) \
+            .select_related('policy') \
+            .order_by('insuree_id', 'policy__expiry_date', 'policy_id')
+        insurances = {}
+        for insuree_policy in insuree_policies:
+            policy = insuree_policy.policy
+            insurances.setdefault(insuree_policy.insuree_id, []).append(EvaluatedInsurance(
+                coverage=CoverageConverter.build_fhir_resource_reference(
+                    policy, type='Coverage', display=policy.uuid),
+                start_date=policy.start_date,
+                expiry_date=policy.expiry_date,
+            ))
+        return insurances
+
+    def _get_products(self, prod_ids):
+        if not prod_ids:
+            return {}
+        return {product.id: product for product in Product.objects.filter(id__in=prod_ids, validity_to=None)}
+
+    def _get_covered_codes(self, model, code_field, products, codes):
+        if not products or not codes:
+            return set()
+        return set(model.objects
+                   .filter(product_id__in=list(products), validity_to=None, **{f'{code_field}__in': codes})
+                   .values_list('product_id', code_field))
+
+    def _run_service_item_enquiry(self, key):
+        """
+        Returns EligibilityResponse of uspServiceItemEnquiry, None if the enquiry failed.
+        """
+        chf_id, service_code, item_code = key
+        try:
+            with connection.cursor() as cur:
+                sql = """\
+                            DECLARE @MinDateService DATE, @MinDateItem DATE,
+                                    @ServiceLeft INT, @ItemLeft INT,
+                                    @isItemOK BIT, @isServiceOK BIT;
+                            EXEC [dbo].[uspServiceItemEnquiry] @CHFID = %s, @ServiceCode = %s, @ItemCode = %s,
+                                 @MinDateService = @MinDateService OUTPUT, @MinDateItem = @MinDateItem OUTPUT,
+                                 @ServiceLeft = @ServiceLeft OUTPUT, @ItemLeft = @ItemLeft OUTPUT,
+                                 @isItemOK = @isItemOK OUTPUT, @isServiceOK = @isServiceOK OUTPUT;
+                            SELECT @MinDateService, @MinDateItem, @ServiceLeft, @ItemLeft, @isItemOK, @isServiceOK
+                        """
+                cur.execute(sql, (chf_id, service_code, item_code))
+                res = cur.fetchone()  # retrieve the stored proc @Result table
+
+                (prod_id, total_admissions_left, total_visits_left, total_consultations_left, total_surgeries_left,
+                 total_deliveries_left, total_antenatal_left, consultation_amount_left, surgery_amount_left,
+                 delivery_amount_left,
+                 hospitalization_amount_left, antenatal_amount_left) = res
+                cur.nextset()
+                (min_date_service, min_date_item, service_left,
+                 item_left, is_item_ok, is_service_ok) = cur.fetchone()
+                return EligibilityResponse(
+                    eligibility_request=None,
+                    prod_id=prod_id or None,
+                    total_admissions_left=total_admissions_left or 0,
+                    total_visits_left=total_visits_left or 0,
+                    total_consultations_left=total_consultations_left or 0,
+                    total_surgeries_left=total_surgeries_left or 0,
+                    total_deliveries_left=total_deliveries_left or 0,
+                    total_antenatal_left=total_antenatal_left or 0,
+                    consultation_amount_left=consultation_amount_left or 0.0,
+                    surgery_amount_left=surgery_amount_left or 0.0,
+                    delivery_amount_left=delivery_amount_left or 0.0,
+                    hospitalization_amount_left=hospitalization_amount_left or 0.0,
+                    antenatal_amount_left=antenatal_amount_left or 0.0,
+                    min_date_service=min_date_service,
+                    min_date_item=min_date_item,
+                    service_left=service_left or 0,
+                    item_left=item_left or 0,
+                    is_item_ok=is_item_ok is True,
+                    is_service_ok=is_service_ok is True
+                )
+        except Exception as e:
+            logger.warning(f'Service and item enquiry of `{chf_id}` failed, empty benefits are used: {e}')
+            return None
+
+    @classmethod
+    def _build_default_enquiry(cls):
+        return EligibilityResponse(
+            eligibility_request=None,
+            prod_id=None,
+            total_admissions_left=0,
+            total_visits_left=0,
+            total_consultations_left=0,
+            total_surgeries_left=0,
+            total_deliveries_left=0,
+            total_antenatal_left=0,
+            consultation_amount_left=0.0,
+            surgery_amount_left=0.0,
+            delivery_amount_left=0.0,
+            hospitalization_amount_left=0.0,
+            antenatal_amount_left=0.0,
+            min_date_service=None,
+            min_date_item=None,
+            service_left=0,
+            item_left=0,
+            is_item_ok=False,
+            is_service_ok=False
+        )
+
+    @classmethod
+    def _build_patient_reference(cls, insuree):
+        return PatientConverter.build_fhir_resource_reference(insuree, type='Patient', display=insuree.chf_id)
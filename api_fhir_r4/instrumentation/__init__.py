@@ -0,0 +1,3 @@
+from api_fhir_r4.instrumentation.requestTiming import RequestTiming
+from api_fhir_r4.instrumentation.latencyAggregates import LatencyAggregates
+from api_fhir_r4.instrumentation.middleware import FHIRRequestTimingMiddleware
@@ -0,0 +1,65 @@
+import math
+import threading
+from collections import defaultdict, deque
+
+from api_fhir_r4.configurations import R4RequestTimingConfig
+
+
+class LatencyAggregates:
+    """
+    Latencies of FHIR requests by resource type, kept in the process memory. For every resource type and phase
+    the most recent `sample_size` samples are kept, percentiles are computed from them on demand. Every process
+    has its own aggregates.
+    """
+    PERCENTILES = (50, 95, 99)
+    SQL_COUNT = 'sql_count'
+
+    _lock = threading.Lock()
+    _samples = defaultdict(dict)
+    _request_counts = defaultdict(int)
+
+    @classmethod
+    def record(cls, timing):
+        resource_type = timing.resource_type or ''
+        sample_size = R4RequestTimingConfig.get_request_timing_sample_size()
+        values = {**timing.get_durations_ms(), cls.SQL_COUNT: timing.sql_count}
+        with cls._lock:
+            cls._request_counts[resource_type] += 1
+            samples = cls._samples[resource_type]
+            for name, value in values.items():
+                if name not in samples or samples[name].maxlen != sample_size:
+                    samples[name] = deque(samples.get(name, ()), maxlen=sample_size)
+                samples[name].append(value)
+
+    @classmethod
+    def get_summary(cls):
+        """
+        Request count and percentiles of the phase durations (ms) and of the number of queries by resource type.
+        """
+        with cls._lock:
+            snapshot = {resource_type: (cls._request_counts[resource_type],
+                                        {name: sorted(values) for name, values in samples.items()})
+                        for resource_type, samples in cls._samples.items()}
+        return {
+            resource_type: {
+                'requests': count,
+                'phases': {name: cls._get_percentiles(values) for name, values in samples.items()
+                           if name != cls.SQL_COUNT},
+                cls.SQL_COUNT: cls._get_percentiles(samples.get(cls.SQL_COUNT, [])),
+            }
+            for resource_type, (count, samples) in snapshot.items()
+        }
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._samples.clear()
+            cls._request_counts.clear()
+
+    @classmethod
+    def _get_percentiles(cls, sorted_values):
+        if not sorted_values:
+            return {}
+        # nearest-rank percentile
+        return {f'p{percentile}': sorted_values[max(math.ceil(percentile / 100 * len(sorted_values)) - 1, 0)]
+                for percentile in cls.PERCENTILES}
@@ -0,0 +1,67 @@
+import logging
+
+from api_fhir_r4.configurations import GeneralConfiguration, R4RequestTimingConfig
+from api_fhir_r4.instrumentation.latencyAggregates import LatencyAggregates
+from api_fhir_r4.instrumentation.requestTiming import RequestTiming
+from api_fhir_r4.utils import JsonUtils
+
+logger = logging.getLogger(__name__)
+
+
+class FHIRRequestTimingMiddleware:
+    """
+    Measures requests of the FHIR API. Durations of the phases are returned in the `Server-Timing` header,
+    recorded in LatencyAggregates and optionally logged as JSON. Streamed Bundles are measured until the response
+    starts. Enabled by adding `api_fhir_r4.instrumentation.FHIRRequestTimingMiddleware` to MIDDLEWARE.
+    """
+    HEADER = 'Server-Timing'
+    # service base, where batch and transaction Bundles are posted
+    ROOT_RESOURCE_TYPE = 'Bundle'
+    # endpoints not registered in the router
+    EXTRA_RESOURCE_TYPES = ('Binary', '$export', '$timing', 'docs')
+    # requests of unknown paths are aggregated together, so the number of aggregates stays bounded
+    OTHER_RESOURCE_TYPE = 'other'
+
+    _resource_types = None
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        resource_type = self.get_resource_type(request)
+        if resource_type is None or not R4RequestTimingConfig.get_request_timing_enabled():
+            return self.get_response(request)
+
+        timing = RequestTiming(resource_type)
+        with RequestTiming.activate(timing):
+            response = self.get_response(request)
+        timing.finish()
+
+        if R4RequestTimingConfig.get_request_timing_header_enabled():
+            response[self.HEADER] = timing.build_server_timing_header()
+        LatencyAggregates.record(timing)
+        if R4RequestTimingConfig.get_request_timing_log_enabled():
+            logger.info(JsonUtils.dumps({
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                **timing.to_log_record(),
+            }).decode('utf8'))
+        return response
+
+    def get_resource_type(self, request):
+        base_url = GeneralConfiguration.get_base_url()
+        if not request.path.startswith(base_url):
+            return None
+        resource_type = request.path[len(base_url):].split('/')[0]
+        if not resource_type:
+            return self.ROOT_RESOURCE_TYPE
+        return resource_type if resource_type in self.get_resource_types() else self.OTHER_RESOURCE_TYPE
+
+    @classmethod
+    def get_resource_types(cls):
+        if cls._resource_types is None:
+            from api_fhir_r4.urls import router
+            cls._resource_types = frozenset(
+                [prefix.split('/')[0] for prefix, _, _ in router.registry] + list(cls.EXTRA_RESOURCE_TYPES))
+        return cls._resource_types
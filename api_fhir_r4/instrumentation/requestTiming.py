@@ -0,0 +1,105 @@
+import contextvars
+import time
+from collections import defaultdict
+from contextlib import contextmanager, ExitStack
+
+from django.db import connections
+
+
+class RequestTiming:
+    """
+    Durations of the phases of the FHIR request being processed. Phases are measured by hooks in the view,
+    pagination, serializers and renderers while the timing is active (see FHIRRequestTimingMiddleware), hooks do
+    nothing otherwise. Phases overlap, e.g. queries run by converters count in both `sql` and `convert`.
+    """
+    PHASE_TOTAL = 'total'
+    PHASE_VIEW = 'view'
+    PHASE_SQL = 'sql'
+    PHASE_COUNT = 'count'
+    PHASE_CONVERT = 'convert'
+    PHASE_DICT = 'dict'
+    PHASE_RENDER = 'render'
+    PHASES = (PHASE_TOTAL, PHASE_VIEW, PHASE_SQL, PHASE_COUNT, PHASE_CONVERT, PHASE_DICT, PHASE_RENDER)
+
+    _current = contextvars.ContextVar('api_fhir_r4_request_timing', default=None)
+
+    def __init__(self, resource_type=None):
+        self.resource_type = resource_type
+        self.durations = defaultdict(float)
+        # requests without queries report `sql` too
+        self.durations[self.PHASE_SQL] = 0.0
+        self.sql_count = 0
+        self._active_phases = set()
+        self._started = time.perf_counter()
+
+    @classmethod
+    def current(cls):
+        return cls._current.get()
+
+    @classmethod
+    @contextmanager
+    def activate(cls, timing):
+        """
+        Activates the timing for the request, queries of all database connections are measured as `sql`.
+        """
+        token = cls._current.set(timing)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timing._measure_query))
+                yield timing
+        finally:
+            cls._current.reset(token)
+
+    @classmethod
+    @contextmanager
+    def phase(cls, name):
+        """
+        Measures the phase of the active timing. Nested measurements of the same phase (e.g. conversion of
+        contained resources) are counted once.
+        """
+        timing = cls._current.get()
+        if timing is None or name in timing._active_phases:
+            yield
+            return
+        timing._active_phases.add(name)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            timing._active_phases.discard(name)
+            timing.add(name, time.perf_counter() - started)
+
+    def add(self, name, duration):
+        self.durations[name] += duration
+
+    def finish(self):
+        self.durations[self.PHASE_TOTAL] = time.perf_counter() - self._started
+        return self
+
+    def _measure_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_count += 1
+            self.add(self.PHASE_SQL, time.perf_counter() - started)
+
+    def get_durations_ms(self):
+        return {name: round(self.durations[name] * 1000, 3) for name in self.PHASES if name in self.durations}
+
+    def build_server_timing_header(self):
+        metrics = []
+        for name, duration in self.get_durations_ms().items():
+            metric = f'{name};dur={duration}'
+            if name == self.PHASE_SQL:
+                metric += f';desc="{self.sql_count} queries"'
+            metrics.append(metric)
+        return ', '.join(metrics)
+
+    def to_log_record(self):
+        return {
+            'resource_type': self.resource_type,
+            'durations_ms': self.get_durations_ms(),
+            'sql_count': self.sql_count,
+        }
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from api_fhir_r4.subscriptions.notificationWorker import SubscriptionNotificationWorker
+
+
+class Command(BaseCommand):
+    help = "Delivers FHIR subscription notifications stored in the outbox."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help='Deliver notifications which are due and exit, e.g. when run by cron.')
+        parser.add_argument('--poll-interval', type=float, default=None,
+                            help='Seconds to wait when the outbox is empty, R4_fhir_subscription_config '
+                                 'outbox_poll_interval by default.')
+
+    def handle(self, *args, **options):
+        worker = SubscriptionNotificationWorker()
+        if options['once']:
+            processed = worker.run_once()
+            self.stdout.write(f'Processed {processed} notifications')
+            return
+        try:
+            worker.run_forever(options['poll_interval'])
+        except KeyboardInterrupt:
+            worker.stop()
@@ -0,0 +1,35 @@
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('api_fhir_r4', '0006_add_subsription_perms_imis_admin'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BulkExportJob',
+            fields=[
+                ('id', models.UUIDField(db_column='UUID', default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('status', models.SmallIntegerField(choices=[(0, 'accepted'), (1, 'in-progress'), (2, 'completed'), (3, 'failed')], db_column='Status', default=0)),
+                ('resource_types', models.JSONField(db_column='ResourceTypes')),
+                ('since', models.DateTimeField(db_column='Since', null=True)),
+                ('request_url', models.TextField(db_column='RequestUrl')),
+                ('transaction_time', models.DateTimeField(db_column='TransactionTime', default=django.utils.timezone.now)),
+                ('heartbeat', models.DateTimeField(db_column='Heartbeat', default=django.utils.timezone.now)),
+                ('progress', models.JSONField(db_column='Progress', default=dict)),
+                ('error', models.TextField(db_column='Error', default=None, null=True)),
+                ('user', models.ForeignKey(db_column='UserUUID', on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'tblFHIRBulkExportJob',
+                'managed': True,
+            },
+        ),
+    ]
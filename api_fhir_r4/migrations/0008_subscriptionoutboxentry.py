@@ -0,0 +1,43 @@
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_fhir_r4', '0007_bulkexportjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='subscriptionnotificationresult',
+            name='dead_letter',
+            field=models.BooleanField(db_column='DeadLetter', default=False),
+        ),
+        migrations.CreateModel(
+            name='SubscriptionOutboxEntry',
+            fields=[
+                ('id', models.UUIDField(db_column='UUID', default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('resource_type', models.CharField(db_column='ResourceType', max_length=64)),
+                ('resource_id', models.CharField(db_column='ResourceId', max_length=64, null=True)),
+                ('payload', models.TextField(db_column='Payload')),
+                ('status', models.SmallIntegerField(choices=[(0, 'pending'), (1, 'dead-letter')], db_column='Status', default=0)),
+                ('attempts', models.IntegerField(db_column='Attempts', default=0)),
+                ('created', models.DateTimeField(db_column='Created', default=django.utils.timezone.now)),
+                ('next_attempt', models.DateTimeField(db_column='NextAttempt', default=django.utils.timezone.now)),
+                ('lease_id', models.UUIDField(db_column='LeaseUUID', null=True)),
+                ('last_error', models.TextField(db_column='LastError', default=None, null=True)),
+                ('subscription', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='outbox_entries', to='api_fhir_r4.subscription')),
+            ],
+            options={
+                'db_table': 'tblFHIRSubscriptionOutbox',
+                'managed': True,
+            },
+        ),
+        migrations.AddIndex(
+            model_name='subscriptionoutboxentry',
+            index=models.Index(fields=['status', 'next_attempt'], name='fhir_sub_outbox_due_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_fhir_r4', '0008_subscriptionoutboxentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='subscription',
+            name='batch_size',
+            field=models.IntegerField(blank=True, db_column='BatchSize', null=True),
+        ),
+        migrations.AddField(
+            model_name='subscription',
+            name='batch_linger',
+            field=models.IntegerField(blank=True, db_column='BatchLinger', null=True),
+        ),
+        migrations.AddField(
+            model_name='subscription',
+            name='batch_bundle_type',
+            field=models.CharField(blank=True, choices=[('history', 'history'), ('subscription-notification', 'subscription-notification')], db_column='BatchBundleType', max_length=32, null=True),
+        ),
+        migrations.AddField(
+            model_name='historicalsubscription',
+            name='batch_size',
+            field=models.IntegerField(blank=True, db_column='BatchSize', null=True),
+        ),
+        migrations.AddField(
+            model_name='historicalsubscription',
+            name='batch_linger',
+            field=models.IntegerField(blank=True, db_column='BatchLinger', null=True),
+        ),
+        migrations.AddField(
+            model_name='historicalsubscription',
+            name='batch_bundle_type',
+            field=models.CharField(blank=True, choices=[('history', 'history'), ('subscription-notification', 'subscription-notification')], db_column='BatchBundleType', max_length=32, null=True),
+        ),
+    ]
@@ -1,18 +1,15 @@
-import logging
 from abc import abstractmethod, ABC
 from typing import List
 
-from django.core.exceptions import ObjectDoesNotExist, FieldError
 from django.http import Http404
 
-from rest_framework import mixins
+from rest_framework import mixins, status
 
-from api_fhir_r4.model_retrievers import GenericModelRetriever
+from api_fhir_r4.model_retrievers import GenericModelRetriever, IdentifierLookupPlanner
 from rest_framework.response import Response
 
 from api_fhir_r4.multiserializer.mixins import MultiSerializerUpdateModelMixin, MultiSerializerRetrieveModelMixin
-
-logger = logging.getLogger(__name__)
+from api_fhir_r4.utils import ConditionalRequestUtils
 
 
 class GenericMultiIdentifierMixin(ABC):
@@ -25,23 +22,24 @@ class GenericMultiIdentifierMixin(ABC):
         pass
 
     def _get_object_with_first_valid_retriever(self, identifier):
-        for retriever in self.retrievers:
-            if retriever.identifier_validator(identifier):
-                try:
-                    queryset = retriever.retriever_additional_queryset_filtering(self.get_queryset())
-                    resource = retriever.get_model_object(queryset, identifier)
-
-                    # May raise a permission denied
-                    self.check_object_permissions(self.request, resource)
-                    return retriever.serializer_reference_type, resource
-                except ObjectDoesNotExist as e:
-                    logger.exception(
-                        F"Failed to retrieve object from queryset {self.get_queryset()} using"
-                        F"identifier {identifier} for matching retriever: {retriever}"
-                    )
-
-        # Raise Http404 if resource couldn't be fetched with any of the retrievers
-        raise Http404(f"Resource for identifier {identifier} not found")
+        retriever, resource = IdentifierLookupPlanner.resolve(self.get_queryset(), self.retrievers, identifier)
+        if resource is None:
+            raise Http404(f"Resource for identifier {identifier} not found")
+
+        # May raise a permission denied
+        self.check_object_permissions(self.request, resource)
+        return retriever.serializer_reference_type, resource
+
+    def _get_conditional_response(self, converter, instance, get_data):
+        """
+        Response for the conditional read, the resource is not built if the client already has its current version.
+        """
+        etag, last_modified = ConditionalRequestUtils.get_resource_validators(converter, instance, self.request)
+        if ConditionalRequestUtils.is_not_modified(self.request, etag, last_modified):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(get_data())
+        return ConditionalRequestUtils.set_validators(response, etag, last_modified)
 
 
 class MultiIdentifierRetrieverMixin(mixins.RetrieveModelMixin, GenericMultiIdentifierMixin, ABC):
@@ -49,7 +47,8 @@ class MultiIdentifierRetrieverMixin(mixins.RetrieveModelMixin, GenericMultiIdent
     def retrieve(self, request, *args, **kwargs):
         ref_type, instance = self._get_object_with_first_valid_retriever(kwargs['identifier'])
         serializer = self.get_serializer(instance, reference_type=ref_type)
-        return Response(serializer.data)
+        return self._get_conditional_response(
+            getattr(serializer, 'fhirConverter', None), instance, lambda: serializer.data)
 
 
 class MultiIdentifierUpdateMixin(mixins.UpdateModelMixin, GenericMultiIdentifierMixin, ABC):
@@ -72,24 +71,13 @@ class MultiIdentifierUpdateMixin(mixins.UpdateModelMixin, GenericMultiIdentifier
 class GenericMultiIdentifierForManySerializers(GenericMultiIdentifierMixin, ABC):
 
     def _get_object_with_first_valid_retriever(self, queryset, identifier):
-        for retriever in self.retrievers:
-            if retriever.identifier_validator(identifier):
-                try:
-                    queryset = retriever.retriever_additional_queryset_filtering(queryset)
-                    resource = retriever.get_model_object(queryset, identifier)
-
-                    # May raise a permission denied
-                    self.check_object_permissions(self.request, resource)
-                    return retriever.serializer_reference_type, resource
-                except ObjectDoesNotExist:
-                    logger.exception(
-                        F"Failed to retrieve object from queryset {queryset} using"
-                        F"identifier {identifier} for matching retriever: {retriever}"
-                    )
-                except FieldError:
-                    logger.exception(F"Failed to retrieve object from queryset {queryset} using"
-                                     F"{self.lookup_field}, field does not available for given model {queryset.model}")
-        return None, None
+        retriever, resource = IdentifierLookupPlanner.resolve(queryset, self.retrievers, identifier)
+        if resource is None:
+            return None, None
+
+        # May raise a permission denied
+        self.check_object_permissions(self.request, resource)
+        return retriever.serializer_reference_type, resource
 
 
 class MultiIdentifierUpdateManySerializersMixin(MultiSerializerUpdateModelMixin,
@@ -118,11 +106,12 @@ class MultiIdentifierRetrieveManySerializersMixin(MultiSerializerRetrieveModelMi
             if instance:
                 serializer = serializer(instance, reference_type=ref_type)
                 if serializer.data:
-                    retrieved.append(serializer.data)
+                    retrieved.append((serializer, instance))
 
         if len(retrieved) > 1:
             raise ValueError("Ambiguous retrieve result, object found for multiple serializers.")
         if len(retrieved) == 0:
             raise Http404(f"Resource for identifier {kwargs['identifier']} not found")
 
-        return Response(retrieved[0])
+        serializer, instance = retrieved[0]
+        return self._get_conditional_response(serializer.fhirConverter, instance, lambda: serializer.data)
@@ -1,14 +1,41 @@
+import logging
+import operator
 import uuid
 from abc import ABC, abstractmethod, abstractproperty
+from functools import reduce
 from typing import Union
 
+from django.core.exceptions import FieldError, ObjectDoesNotExist
 from django.db.models.query import QuerySet
-from django.db.models import Model
+from django.db.models import Model, Q, Case, When, Value, IntegerField
 
 from api_fhir_r4.converters import ReferenceConverterMixin
 
+logger = logging.getLogger(__name__)
+
+
+class IdentifierKind:
+    UUID = 'uuid'
+    INTEGER = 'integer'
+    CODE = 'code'
+
+    @classmethod
+    def classify(cls, identifier_value):
+        if isinstance(identifier_value, int):
+            return cls.INTEGER
+        try:
+            uuid.UUID(str(identifier_value))
+            return cls.UUID
+        except ValueError:
+            pass
+        if str(identifier_value).isdigit():
+            return cls.INTEGER
+        return cls.CODE
+
 
 class GenericModelRetriever(ABC):
+    # kinds of identifiers (IdentifierKind) the retriever can be used for
+    identifier_kinds = (IdentifierKind.UUID, IdentifierKind.INTEGER, IdentifierKind.CODE)
 
     @property
     @abstractmethod
@@ -29,19 +56,32 @@ class GenericModelRetriever(ABC):
     def identifier_validator(cls, identifier_value) -> bool:
         pass
 
+    @classmethod
+    def get_additional_filter(cls) -> Q:
+        # Filter the retriever adds to the queryset, by default the queryset is not changed
+        return Q()
+
     @classmethod
     def retriever_additional_queryset_filtering(cls, queryset):
-        # By default no additional changes are made in queryset
-        return queryset
+        return queryset.filter(cls.get_additional_filter())
+
+    @classmethod
+    def is_eligible(cls, identifier_kind, identifier_value) -> bool:
+        return identifier_kind in cls.identifier_kinds
+
+    @classmethod
+    def get_lookup(cls, identifier_value) -> dict:
+        return {cls.identifier_field: identifier_value}
 
     @classmethod
     def get_model_object(cls, queryset: QuerySet, identifier_value) -> Model:
-        return queryset.get(**{cls.identifier_field: identifier_value})
+        return queryset.get(**cls.get_lookup(identifier_value))
 
 
 class UUIDIdentifierModelRetriever(GenericModelRetriever):
     identifier_field = 'uuid'
     serializer_reference_type = ReferenceConverterMixin.UUID_REFERENCE_TYPE
+    identifier_kinds = (IdentifierKind.UUID,)
 
     @classmethod
     def identifier_validator(cls, identifier_value):
@@ -59,6 +99,7 @@ class UUIDIdentifierModelRetriever(GenericModelRetriever):
 class DatabaseIdentifierModelRetriever(GenericModelRetriever):
     identifier_field = 'id'
     serializer_reference_type = ReferenceConverterMixin.DB_ID_REFERENCE_TYPE
+    identifier_kinds = (IdentifierKind.INTEGER,)
 
     @classmethod
     def identifier_validator(cls, identifier_value):
@@ -88,10 +129,84 @@ class CHFIdentifierModelRetriever(CodeIdentifierModelRetriever):
         return isinstance(identifier_value, str) and len(identifier_value) <= 12
 
     @classmethod
-    def get_model_object(cls, queryset: QuerySet, identifier_value) -> Model:
-        return queryset.get(**{cls.identifier_field: identifier_value, 'validity_to__isnull': True})
+    def is_eligible(cls, identifier_kind, identifier_value) -> bool:
+        return super().is_eligible(identifier_kind, identifier_value) and cls.identifier_validator(identifier_value)
+
+    @classmethod
+    def get_lookup(cls, identifier_value) -> dict:
+        return {cls.identifier_field: identifier_value, 'validity_to__isnull': True}
 
 
 class GroupIdentifierModelRetriever(CHFIdentifierModelRetriever):
     identifier_field = 'head_insuree_id__chf_id'
 
+
+
+class IdentifierLookupPlanner:
+    """
+    Resolves an identifier with the retrievers of a view in a single query. The identifier is classified once
+    (IdentifierKind), lookups of the retrievers eligible for it, each with the additional filtering of its retriever,
+    are OR'd and the object matched by the first of them, in the order of the retrievers, is returned.
+    """
+    _PRECEDENCE_ANNOTATION = '_identifier_lookup_precedence'
+    # (model, retriever) -> whether the lookup fields of the retriever exist on the model
+    _valid_lookups = {}
+
+    @classmethod
+    def resolve(cls, queryset: QuerySet, retrievers, identifier_value):
+        """
+        Returns the matching retriever and object, (None, None) if the object doesn't exist. Raises
+        MultipleObjectsReturned if the lookup of the matching retriever isn't unique, as `queryset.get` would.
+        """
+        identifier_kind = IdentifierKind.classify(identifier_value)
+        eligible = [retriever for retriever in retrievers
+                    if retriever.is_eligible(identifier_kind, identifier_value)
+                    and cls._is_lookup_valid(queryset, retriever, identifier_value)]
+        if not eligible:
+            return None, None
+
+        if len(eligible) == 1:
+            retriever = eligible[0]
+            try:
+                return retriever, retriever.get_model_object(
+                    retriever.retriever_additional_queryset_filtering(queryset), identifier_value)
+            except ObjectDoesNotExist:
+                return None, None
+
+        lookups = [cls._get_retriever_filter(queryset, retriever, identifier_value) for retriever in eligible]
+        precedence = Case(*[When(lookup, then=Value(index)) for index, lookup in enumerate(lookups)],
+                          output_field=IntegerField())
+        candidates = list(queryset.filter(reduce(operator.or_, lookups))
+                          .annotate(**{cls._PRECEDENCE_ANNOTATION: precedence})
+                          .order_by(cls._PRECEDENCE_ANNOTATION)[:2])
+        if not candidates:
+            return None, None
+        first_precedence = getattr(candidates[0], cls._PRECEDENCE_ANNOTATION)
+        if len(candidates) > 1 and getattr(candidates[1], cls._PRECEDENCE_ANNOTATION) == first_precedence:
+            raise queryset.model.MultipleObjectsReturned(
+                f"More than one {queryset.model.__name__} returned for identifier {identifier_value}")
+        return eligible[first_precedence], candidates[0]
+
+    @classmethod
+    def _get_retriever_filter(cls, queryset, retriever, identifier_value):
+        lookup = Q(**retriever.get_lookup(identifier_value)) & retriever.get_additional_filter()
+        if retriever.retriever_additional_queryset_filtering.__func__ \
+                is not GenericModelRetriever.retriever_additional_queryset_filtering.__func__:
+            # queryset filtering which can't be expressed as a filter is kept as a subquery
+            filtered = retriever.retriever_additional_queryset_filtering(queryset.model._base_manager.all())
+            lookup &= Q(pk__in=filtered.values('pk'))
+        return lookup
+
+    @classmethod
+    def _is_lookup_valid(cls, queryset, retriever, identifier_value):
+        key = (queryset.model, retriever)
+        if key not in cls._valid_lookups:
+            try:
+                # fields are resolved when the filter is added, no query is made
+                queryset.model._base_manager.filter(**retriever.get_lookup(identifier_value))
+                cls._valid_lookups[key] = True
+            except FieldError:
+                logger.warning(f"Retriever {retriever.__name__} can't be used for {queryset.model.__name__}, "
+                               f"lookup field is not available")
+                cls._valid_lookups[key] = False
+        return cls._valid_lookups[key]
@@ -0,0 +1,34 @@
+import uuid
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext as _
+
+
+class BulkExportJob(models.Model):
+    class JobStatus(models.IntegerChoices):
+        ACCEPTED = 0, _('accepted')
+        IN_PROGRESS = 1, _('in-progress')
+        COMPLETED = 2, _('completed')
+        FAILED = 3, _('failed')
+
+    id = models.UUIDField(primary_key=True, db_column='UUID', default=uuid.uuid4, editable=False)
+    status = models.SmallIntegerField(db_column='Status', null=False, choices=JobStatus.choices,
+                                      default=JobStatus.ACCEPTED)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, db_column='UserUUID', on_delete=models.DO_NOTHING,
+                             related_name='+', null=False)
+    resource_types = models.JSONField(db_column='ResourceTypes', null=False)
+    since = models.DateTimeField(db_column='Since', null=True)
+    request_url = models.TextField(db_column='RequestUrl', null=False)
+    transaction_time = models.DateTimeField(db_column='TransactionTime', null=False, default=timezone.now)
+    # time of the last recorded progress, used to detect jobs interrupted by a crash
+    heartbeat = models.DateTimeField(db_column='Heartbeat', null=False, default=timezone.now)
+    # {resource type: {'count', 'errors', 'size', 'last_pk', 'done'}}, size is the length of the output file
+    # after the last completed chunk
+    progress = models.JSONField(db_column='Progress', null=False, default=dict)
+    error = models.TextField(db_column='Error', null=True, default=None)
+
+    class Meta:
+        managed = True
+        db_table = 'tblFHIRBulkExportJob'
@@ -2,6 +2,7 @@ import uuid
 
 from django.db import models
 from django.db.models import F
+from django.utils import timezone
 from django.utils.translation import gettext as _
 from django_cryptography.fields import encrypt
 
@@ -18,12 +19,25 @@ class Subscription(HistoryBusinessModel):
     class SubscriptionChannel(models.IntegerChoices):
         REST_HOOK = 0, _("rest-hook")
 
+    class NotificationBundleType(models.TextChoices):
+        HISTORY = 'history', _('history')
+        SUBSCRIPTION_NOTIFICATION = 'subscription-notification', _('subscription-notification')
+
     status = models.SmallIntegerField(db_column='Status', null=False, choices=SubscriptionStatus.choices)
     channel = models.SmallIntegerField(db_column='Channel', null=False, choices=SubscriptionChannel.choices)
     endpoint = models.CharField(db_column='Endpoint', max_length=255, null=False)
     headers = encrypt(models.TextField(db_column='Headers', max_length=255, null=True))
     criteria = models.JSONField(db_column='Criteria', null=True)
     expiring = models.DateTimeField(db_column='Expiring', null=False)
+    # without batch_size every notification is sent separately, otherwise notifications are sent in Bundles
+    batch_size = models.IntegerField(db_column='BatchSize', null=True, blank=True)
+    batch_linger = models.IntegerField(db_column='BatchLinger', null=True, blank=True)
+    batch_bundle_type = models.CharField(db_column='BatchBundleType', max_length=32, null=True, blank=True,
+                                         choices=NotificationBundleType.choices)
+
+    @property
+    def is_batched(self):
+        return bool(self.batch_size)
 
     class Meta:
         managed = True
@@ -45,9 +59,41 @@ class SubscriptionNotificationResult(models.Model):
     notified_successfully = models.BooleanField(blank=False, null=False)
     notification_time = DateTimeField(db_column='Expiring', null=False, default=ad_datetime.AdDatetime.now)
     error = models.TextField(blank=False, null=True, default=None)
+    # set for the last failed attempt of a notification which won't be retried anymore
+    dead_letter = models.BooleanField(db_column='DeadLetter', null=False, default=False)
 
     objects = SubscriptionNotificationResultManager()
 
     class Meta:
         managed = True
         db_table = 'tblSubscriptionNotificationResult'
+
+
+class SubscriptionOutboxEntry(models.Model):
+    """
+    Notification waiting for the delivery to the subscriber. Entries are written together with the notified change
+    and delivered by the subscription worker, delivered entries are removed.
+    """
+    class EntryStatus(models.IntegerChoices):
+        PENDING = 0, _('pending')
+        DEAD_LETTER = 1, _('dead-letter')
+
+    id = models.UUIDField(primary_key=True, db_column='UUID', default=uuid.uuid4, editable=False)
+    subscription = models.ForeignKey(
+        Subscription, on_delete=models.CASCADE, related_name='outbox_entries', null=False)
+    resource_type = models.CharField(db_column='ResourceType', max_length=64, null=False)
+    resource_id = models.CharField(db_column='ResourceId', max_length=64, null=True)
+    payload = models.TextField(db_column='Payload', null=False)
+    status = models.SmallIntegerField(db_column='Status', null=False, choices=EntryStatus.choices,
+                                      default=EntryStatus.PENDING)
+    attempts = models.IntegerField(db_column='Attempts', null=False, default=0)
+    created = models.DateTimeField(db_column='Created', null=False, default=timezone.now)
+    # time of the next delivery attempt, while the entry is claimed by a worker it's the end of the lease
+    next_attempt = models.DateTimeField(db_column='NextAttempt', null=False, default=timezone.now)
+    lease_id = models.UUIDField(db_column='LeaseUUID', null=True)
+    last_error = models.TextField(db_column='LastError', null=True, default=None)
+
+    class Meta:
+        managed = True
+        db_table = 'tblFHIRSubscriptionOutbox'
+        indexes = [models.Index(fields=['status', 'next_attempt'], name='fhir_sub_outbox_due_idx')]
@@ -7,6 +7,7 @@ which allows mixin classes to be composed in interesting ways.
 import logging
 from abc import ABC, abstractmethod
 from collections import defaultdict
+from functools import lru_cache
 from itertools import chain
 from typing import Dict, Type, Callable, Iterable, Tuple, List
 
@@ -20,12 +21,18 @@ from django.http import Http404
 from django.db.models.query import QuerySet
 from django.core.exceptions import ObjectDoesNotExist, FieldError
 
+from api_fhir_r4.paginations import CachedCountQueryset
 from api_fhir_r4.permissions import FHIRApiPermissions
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=None)
 def _MultiserializerPermissionClassWrapper(PermissionClass):
+    """
+    Permission class checking permissions against the queryset of a serializer. Wrappers are built once
+    per permission class.
+    """
     def has_permission(self, request, view, queryset):
         if getattr(view, '_ignore_model_permissions', False):
             return True
@@ -41,6 +48,12 @@ def _MultiserializerPermissionClassWrapper(PermissionClass):
     return permission_class
 
 
+@lru_cache(maxsize=None)
+def _get_multiserializer_permission(PermissionClass):
+    # Permission classes are stateless, one instance is shared by all requests
+    return _MultiserializerPermissionClassWrapper(PermissionClass)()
+
+
 class GenericMultiSerializerViewsetMixin(ABC):
 
     @property
@@ -81,16 +94,39 @@ class GenericMultiSerializerViewsetMixin(ABC):
         """
         raise NotImplementedError('serializers method has to return dictionary of serializers')
 
+    def get_serializers(self):
+        """
+        `serializers` evaluated once per request, querysets of the serializers are built only once.
+        """
+        return self._get_request_memo('serializers', lambda: self.serializers)
+
     def get_eligible_serializers(self) -> List[Type[Serializer]]:
+        return self._get_request_memo('eligible_serializers', self._build_eligible_serializers)
+
+    def _build_eligible_serializers(self):
         eligible = []
         context = self.get_serializer_context()
 
         eligible_from_permissions = self._get_eligible_from_user_permissions()
-        for serializer, (queryset, eligibility_validator, permission_class) in self.serializers.items():
+        for serializer, (queryset, eligibility_validator, permission_class) in self.get_serializers().items():
             if eligibility_validator(context) and serializer in eligible_from_permissions:
                 eligible.append(serializer)
         return eligible
 
+    def _get_request_memo(self, key, factory):
+        """
+        Value computed once per request. Views are instantiated for every request, the request is compared
+        anyway in case the view is reused.
+        """
+        request = getattr(self, 'request', None)
+        memo = getattr(self, '_multiserializer_request_memo', None)
+        if memo is None or memo[0] is not request:
+            memo = (request, {})
+            self._multiserializer_request_memo = memo
+        if key not in memo[1]:
+            memo[1][key] = factory()
+        return memo[1][key]
+
     def _aggregate_results(self, results):
         """
         It's expected for serializers to aggregate output data in format that will be accepted by
@@ -141,8 +177,9 @@ class GenericMultiSerializerViewsetMixin(ABC):
             self._raise_multiple_eligible_serializers()
 
     def get_eligible_serializers_iterator(self):
+        serializers = self.get_serializers()
         for serializer in self.get_eligible_serializers():
-            yield serializer, self.serializers[serializer]
+            yield serializer, serializers[serializer]
 
     def _raise_no_eligible_serializer(self):
         raise AssertionError("Failed to match serializer eligible for given request")
@@ -151,12 +188,13 @@ class GenericMultiSerializerViewsetMixin(ABC):
         raise AssertionError("Ambiguous request, more than one serializer is eligible for given action")
 
     def _get_eligible_from_user_permissions(self):
+        return self._get_request_memo('eligible_from_permissions', self._build_eligible_from_user_permissions)
+
+    def _build_eligible_from_user_permissions(self):
         eligible_serializers = []
-        for serializer, (queryset, eligibility_validator, permission_classes) in self.serializers.items():
-            permission_classes = [
-                _MultiserializerPermissionClassWrapper(perm_cls)() for perm_cls in permission_classes
-            ]
-            if all([p.has_permission(self.request, self, queryset) for p in permission_classes]):
+        for serializer, (queryset, eligibility_validator, permission_classes) in self.get_serializers().items():
+            permissions = [_get_multiserializer_permission(perm_cls) for perm_cls in permission_classes]
+            if all(p.has_permission(self.request, self, queryset) for p in permissions):
                 eligible_serializers.append(serializer)
 
         if len(eligible_serializers) == 0:
@@ -204,14 +242,20 @@ class MultiSerializerCreateModelMixin(GenericMultiSerializerViewsetMixin, ABC):
 
 
 class _JoinedQuerysets:
+    """
+    Read only sequence over multiple querysets (or lists), used as paginator input in multiserializer views.
+    Every part is counted once, offsets of the parts are cached and slices are pushed down only to
+    the parts overlapping with the requested range, so the page cost doesn't depend on table sizes.
+    """
     def __init__(self, *qs):
         self.querysets = qs
+        self._part_sizes = None
 
     def __iter__(self):
-        return chain(self.querysets)
+        return chain(*self.querysets)
 
     def __len__(self):
-        return sum([len(qs) for qs in self.querysets])
+        return self.count()
 
     def __getitem__(self, k):
         if not isinstance(k, (int, slice)):
@@ -221,31 +265,20 @@ class _JoinedQuerysets:
 
     def __get_queryset_for_item(self, k):
         if isinstance(k, int):
-            return self.__get_queryset_for_index(k)
+            index = k + self.count() if k < 0 else k
+            qs, qs_idx = self.__get_queryset_for_index(index)
+            return qs[qs_idx]
         else:
             # slice
             if k.step:
                 raise ValidationError("Step not supported in joined queryset context.")
-            start, end = int(k.start) if k else None, int(k.stop) if k else None
-            intersection = [None, None]
+            start = int(k.start) if k.start is not None else 0
+            end = int(k.stop) if k.stop is not None else self.count()
             final_query = []
-            if start:
-                start_qs, qs_idx = self.__get_queryset_for_index(start)
-                intersection[0] = self.querysets.index(start_qs) + 1
-                start_qs = start_qs.all()[qs_idx:]
-            if end:
-                end_qs, qs_idx = self.__get_queryset_for_index(end)
-                intersection[1] = self.querysets.index(end_qs)
-                end_qs = end_qs.all()[:qs_idx]
-
-            if start:
-                final_query.append(start_qs)
-
-            final_query.extend(self.querysets[intersection[0]:intersection[1]])
-
-            if end:
-                final_query.append(end_qs)
-
+            for qs, offset, size in self.__parts_with_offsets():
+                part_start, part_end = max(start - offset, 0), min(end - offset, size)
+                if part_start < part_end:
+                    final_query.append(qs[part_start:part_end])
             return list(chain(*final_query))
 
     def __get_queryset_for_index(self, k):
@@ -258,19 +291,29 @@ class _JoinedQuerysets:
             Tuple of queryset and index k relative for given queryset
 
         """
-        next_queryset_last_index = 0
-        for qs in self.querysets:
-            qs_len = qs.count()
-            next_queryset_last_index += qs_len
-            if k < next_queryset_last_index:
-                index_in_queryset = k - (next_queryset_last_index - qs_len)
-                return qs, index_in_queryset
-            if k == next_queryset_last_index:
-                return qs, 0
+        for qs, offset, size in self.__parts_with_offsets():
+            if k < offset + size:
+                return qs, k - offset
         raise IndexError(f"for index {k}")
 
+    def __parts_with_offsets(self):
+        offset = 0
+        for qs, size in zip(self.querysets, self.__get_part_sizes()):
+            yield qs, offset, size
+            offset += size
+
+    def __get_part_sizes(self):
+        if self._part_sizes is None:
+            self._part_sizes = [self.__count_part(qs) for qs in self.querysets]
+        return self._part_sizes
+
+    def __count_part(self, qs):
+        if isinstance(qs, QuerySet):
+            return CachedCountQueryset(qs).count()
+        return len(qs)
+
     def count(self):
-        return sum([qs.count() for qs in self.querysets])
+        return sum(self.__get_part_sizes())
 
 
 class MultiSerializerListModelMixin(GenericMultiSerializerViewsetMixin, ABC):
@@ -330,10 +373,8 @@ class MultiSerializerListModelMixin(GenericMultiSerializerViewsetMixin, ABC):
         elif len(querysets) == 1:
             return querysets[0]
         else:
-            # Inefficient due to pulling every entry and not only paginated chunk
-            chained = _JoinedQuerysets(*querysets)
-            # Chain doesn't provide len, but it's required by paginator
-            return chained
+            # Only parts overlapping with the requested page are fetched
+            return _JoinedQuerysets(*querysets)
 
 
 class MultiSerializerRetrieveModelMixin(GenericMultiSerializerViewsetMixin, ABC):
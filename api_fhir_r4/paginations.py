@@ -1,10 +1,18 @@
-import hashlib
+import base64
+import json
 import urllib
+from api_fhir_r4.cache import QueryCountCache
 from api_fhir_r4.configurations import GeneralConfiguration
+from api_fhir_r4.element_selection import ElementSelection
+from api_fhir_r4.instrumentation import RequestTiming
+from api_fhir_r4.utils import JsonUtils
 from fhir.resources.bundle import Bundle, BundleEntry, BundleLink
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import ValidationError
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
-from django.core.cache import caches
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from django.db.models import Q
 from django.db.models.query import QuerySet
 
 
@@ -13,18 +21,90 @@ class FhirBundleResultsSetPagination(PageNumberPagination):
     page_size = GeneralConfiguration.get_default_response_page_size()
     page_query_param = 'page-offset'
     page_size_query_param = '_count'
+    # Presence of this parameter (also with empty value) switches the request to keyset (cursor) pagination.
+    cursor_query_param = '_cursor'
+
+    def __init__(self):
+        self.cursor_mode = False
+        self.count_mode = False
+        self.next_position = None
+        self.total_count = None
+        # `_include`/`_revinclude` of the view, loaded for objects of the page
+        self.search_includes = None
+        self.page_objects = []
+        self._include_entries = None
 
     def get_paginated_response(self, data):
+        if self.count_mode:
+            return Response(self.build_count_bundle().dict())
+        if self.is_streaming_response():
+            return self.get_streaming_response(data)
         return Response(self.build_bundle_set(data).dict())
 
+    def is_streaming_response(self):
+        stream_page_size = GeneralConfiguration.get_stream_response_page_size()
+        request = getattr(self, 'request', None)
+        if stream_page_size is None or request is None or self.count_mode:
+            return False
+        page_size = self.get_page_size(request)
+        return page_size is not None and page_size >= stream_page_size
+
+    def get_streaming_response(self, data):
+        # included resources are loaded within the view, errors aren't raised while the response is written
+        self.get_include_entries()
+        content_type = getattr(self.request, 'accepted_media_type', None) or 'application/json'
+        renderer = getattr(self.request, 'accepted_renderer', None)
+        options = renderer.get_dumps_options(self.request) if hasattr(renderer, 'get_dumps_options') else 0
+        return StreamingHttpResponse(self.stream_bundle_set(data, options), content_type=content_type)
+
+    def stream_bundle_set(self, data, options=0):
+        """
+        Writes the Bundle incrementally, envelope first and then entries one by one. The page is already converted
+        by the view (conversion errors are handled there), only the JSON serialization is streamed. Entries are not
+        validated with BundleEntry model, output is the same as of build_bundle_set(). `options` of the renderer
+        (e.g. indentation of `_pretty`) are applied to every part.
+        """
+        envelope = Bundle.construct()
+        envelope.type = "searchset"
+        envelope.total = self.get_total_count()
+        self.build_bundle_links(envelope)
+        # closing brace of the envelope is replaced by the entry array
+        envelope_json = JsonUtils.dumps(envelope.dict(), options)
+        yield envelope_json[:envelope_json.rindex(b'}')].rstrip() + b',"entry":['
+        index = -1
+        for index, obj in enumerate(data):
+            entry = {}
+            full_url = self.build_full_url_for_resource(obj)
+            if full_url:
+                entry['fullUrl'] = full_url
+            entry['resource'] = obj
+            self.build_search_mode(entry, 'match')
+            yield (b',' if index else b'') + JsonUtils.dumps(entry, options)
+        for entry in self.get_include_entries():
+            index += 1
+            yield (b',' if index else b'') + JsonUtils.dumps(entry, options)
+        yield b']}'
+
     def build_bundle_set(self, data):
         bundle = Bundle.construct()
         bundle.type = "searchset"
-        bundle.total = self.page.paginator.count
+        bundle.total = self.get_total_count()
         self.build_bundle_links(bundle)
         self.build_bundle_entry(bundle, data)
         return bundle
 
+    def build_count_bundle(self):
+        bundle = Bundle.construct()
+        bundle.type = "searchset"
+        bundle.total = self.total_count
+        self.build_bundle_link(bundle, "self", self.request.build_absolute_uri())
+        return bundle
+
+    def get_total_count(self):
+        if self.cursor_mode or self.count_mode:
+            return self.total_count
+        return self.page.paginator.count
+
     def build_bundle_links(self, bundle):
         self.build_bundle_link(bundle, "self", self.request.build_absolute_uri())
         next_link = self.get_next_link()
@@ -50,8 +130,40 @@ class FhirBundleResultsSetPagination(PageNumberPagination):
             entry = {}
             entry['fullUrl'] = self.build_full_url_for_resource(obj)
             entry['resource'] = obj
+            self.build_search_mode(entry, 'match')
             bundle_entry = BundleEntry(**entry)
             bundle.entry.append(bundle_entry)
+        for entry in self.get_include_entries():
+            bundle.entry.append(BundleEntry(**entry))
+
+    def build_search_mode(self, entry, mode):
+        # search mode tells matches from included resources, it's only set when resources are included
+        if self.search_includes is not None:
+            entry['search'] = {'mode': mode}
+
+    def get_include_entries(self):
+        """
+        Entries of resources requested with `_include`/`_revinclude`, loaded once for the whole page.
+        """
+        if self.search_includes is None:
+            return []
+        if self._include_entries is None:
+            self._include_entries = []
+            for resource_type, resource in self.search_includes.load(self.page_objects, self.request):
+                entry = {}
+                full_url = self.build_full_url_for_included_resource(resource_type, resource)
+                if full_url:
+                    entry['fullUrl'] = full_url
+                entry['resource'] = resource
+                self.build_search_mode(entry, 'include')
+                self._include_entries.append(entry)
+        return self._include_entries
+
+    def build_full_url_for_included_resource(self, resource_type, fhir_object):
+        resource_pk = self.get_object_pk(fhir_object)
+        if not resource_pk:
+            return None
+        return self.request.build_absolute_uri(f'{GeneralConfiguration.get_base_url()}{resource_type}/{resource_pk}')
 
     def build_full_url_for_resource(self, fhir_object):
         url = None
@@ -76,32 +188,198 @@ class FhirBundleResultsSetPagination(PageNumberPagination):
         o = urlparse(url)
         return o._replace(query=None).geturl()
 
-    def paginate_queryset(self, queryset, *args, **kwargs):
-        if isinstance(queryset, QuerySet) and hasattr(queryset, 'count'):
-            queryset = CachedCountQueryset(queryset)
-        return super().paginate_queryset(queryset, *args, **kwargs)
+    def paginate_queryset(self, queryset, request, view=None):
+        selection = ElementSelection.from_request(request, strict=False)
+        self.count_mode = selection is not None and selection.is_count
+        if self.count_mode:
+            # `_summary=count`, only the total is returned and no resource is converted
+            self.request = request
+            self.total_count = self.count_all(queryset)
+            return []
+        self.search_includes = getattr(view, 'search_includes', None)
+        self.cursor_mode = self.cursor_query_param in request.query_params
+        if self.cursor_mode:
+            page = self.paginate_queryset_by_cursor(queryset, request)
+        else:
+            if isinstance(queryset, QuerySet) and hasattr(queryset, 'count'):
+                queryset = CachedCountQueryset(queryset)
+            page = super().paginate_queryset(queryset, request, view=view)
+        self.page_objects = page or []
+        return page
+
+    def count_all(self, queryset):
+        if isinstance(queryset, QuerySet):
+            return CachedCountQueryset(queryset).count()
+        if hasattr(queryset, 'querysets'):
+            with RequestTiming.phase(RequestTiming.PHASE_COUNT):
+                return queryset.count()
+        return len(queryset)
+
+    def paginate_queryset_by_cursor(self, queryset, request):
+        """
+        Keyset pagination, instead of OFFSET the page is resumed from the last seen (ordering value, pk) pair
+        encoded in the opaque `_cursor` parameter. Works for plain querysets, joined multiserializer querysets
+        (every part is paged in sequence) and in-memory lists (position is a list offset).
+        """
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        position = self.decode_cursor(request.query_params[self.cursor_query_param])
+        if isinstance(queryset, QuerySet):
+            self.total_count = CachedCountQueryset(queryset).count()
+            page, self.next_position = KeysetPaginator([queryset]).get_page(position, page_size)
+        elif hasattr(queryset, 'querysets'):
+            with RequestTiming.phase(RequestTiming.PHASE_COUNT):
+                self.total_count = queryset.count()
+            page, self.next_position = KeysetPaginator(queryset.querysets).get_page(position, page_size)
+        else:
+            self.total_count = len(queryset)
+            offset = position.get('o', 0) if position else 0
+            page = list(queryset[offset:offset + page_size])
+            self.next_position = {'o': offset + page_size} if offset + page_size < self.total_count else None
+        return page
+
+    def get_next_link(self):
+        if not self.cursor_mode:
+            return super().get_next_link()
+        if not self.next_position:
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
 
+    def get_previous_link(self):
+        if not self.cursor_mode:
+            return super().get_previous_link()
+        # Keyset pages can only be walked forward, client should keep track of the previous cursors.
+        return None
 
-def CachedCountQueryset(queryset, timeout=60*60, cache_name='default'):
+    @classmethod
+    def encode_cursor(cls, position):
+        payload = json.dumps(position, default=str, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode('utf8')).decode('ascii')
+
+    def decode_cursor(self, cursor):
+        if not cursor:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf8'))
+        except (TypeError, ValueError, UnicodeError):
+            raise ValidationError({self.cursor_query_param: 'Invalid cursor'})
+        if not isinstance(position, dict):
+            raise ValidationError({self.cursor_query_param: 'Invalid cursor'})
+        return position
+
+
+class KeysetPaginator:
     """
-        Return copy of queryset with queryset.count() wrapped to cache result for `timeout` seconds.
+    Pages over sequence of querysets using (ordering field, pk) keyset. Position is a dict with index of the
+    queryset (`p`), ordering value (`v`) and pk (`k`) of the last returned row. Parts that are plain lists
+    use offset (`o`) instead of the keyset.
+    """
+    default_ordering_field = 'validity_from'
+
+    def __init__(self, querysets):
+        self.querysets = list(querysets)
+
+    def get_page(self, position, page_size):
+        part_index = position.get('p', 0) if position else 0
+        page = []
+        next_position = None
+        while part_index < len(self.querysets) and len(page) < page_size:
+            resumed_position = position if position and position.get('p', 0) == part_index else None
+            remaining = page_size - len(page)
+            if isinstance(self.querysets[part_index], QuerySet):
+                rows, next_position = self.__get_queryset_rows(part_index, resumed_position, remaining)
+            else:
+                rows, next_position = self.__get_list_rows(part_index, resumed_position, remaining)
+            page.extend(rows)
+            if next_position:
+                break
+            part_index += 1
+
+        if next_position is None and len(page) == page_size:
+            # page ended at the end of a part, the next page starts at the next part with any rows
+            next_part_index = self.__get_next_part_with_rows(part_index)
+            if next_part_index is not None:
+                next_position = {'p': next_part_index}
+        return page, next_position
+
+    def __get_next_part_with_rows(self, part_index):
+        for index in range(part_index, len(self.querysets)):
+            part = self.querysets[index]
+            if part.exists() if isinstance(part, QuerySet) else len(part) > 0:
+                return index
+        return None
+
+    def __get_queryset_rows(self, part_index, position, limit):
+        queryset = self.querysets[part_index]
+        field, descending = self.get_ordering(queryset)
+        queryset = queryset.order_by(*self.__ordering_expression(field, descending))
+        if position and 'k' in position:
+            queryset = self.filter_after(queryset, field, descending, position.get('v'), position['k'])
+        # Fetching one additional row tells if the next page exists without additional COUNT
+        rows = list(queryset[:limit + 1])
+        if len(rows) > limit:
+            return rows[:limit], self.get_position(part_index, field, rows[limit - 1])
+        return rows, None
+
+    def __get_list_rows(self, part_index, position, limit):
+        # Parts which are not querysets (e.g. entries from module configuration) are paged by offset
+        offset = position.get('o', 0) if position else 0
+        rows = list(self.querysets[part_index][offset:offset + limit + 1])
+        if len(rows) > limit:
+            return rows[:limit], {'p': part_index, 'o': offset + limit}
+        return rows, None
+
+    def get_ordering(self, queryset):
+        ordering = [o for o in queryset.query.order_by if isinstance(o, str)]
+        if not ordering and self.__has_field(queryset.model, self.default_ordering_field):
+            ordering = [self.default_ordering_field]
+        if not ordering:
+            return None, False
+        field = ordering[0]
+        descending = field.startswith('-')
+        field = field.lstrip('-')
+        return (None if field in ('pk', 'id') else field), descending
+
+    def filter_after(self, queryset, field, descending, value, pk):
+        lookup = 'lt' if descending else 'gt'
+        if field is None:
+            return queryset.filter(**{f'pk__{lookup}': pk})
+        return queryset.filter(Q(**{f'{field}__{lookup}': value}) | Q(**{field: value, f'pk__{lookup}': pk}))
+
+    def get_position(self, part_index, field, obj):
+        position = {'p': part_index, 'k': obj.pk}
+        if field is not None:
+            value = obj
+            for attribute in field.split('__'):
+                value = getattr(value, attribute)
+            position['v'] = value
+        return position
+
+    def __ordering_expression(self, field, descending):
+        prefix = '-' if descending else ''
+        if field is None:
+            return [f'{prefix}pk']
+        return [f'{prefix}{field}', f'{prefix}pk']
+
+    def __has_field(self, model, field_name):
+        return any(field.name == field_name for field in model._meta.get_fields())
+
+
+def CachedCountQueryset(queryset, timeout=None, cache_name=None):
+    """
+        Return copy of queryset with queryset.count() served from QueryCountCache. Cached value is dropped as soon as
+        any of the tables used by the query changes, `timeout` and `cache_name` default to R4_fhir_count_cache_config.
     """
-    cache = caches[cache_name]
     queryset = queryset._chain()
     real_count = queryset.count
 
     def count(queryset):
-        cache_key = 'query-count:' + hashlib.md5(str(queryset.query).encode('utf8')).hexdigest()
-
-        # return existing value, if any
-        value = cache.get(cache_key)
-        if value is not None:
-            return value
-
-        # cache new value
-        value = real_count()
-        cache.set(cache_key, value, timeout)
-        return value
+        with RequestTiming.phase(RequestTiming.PHASE_COUNT):
+            return QueryCountCache.get_count(queryset, real_count, timeout=timeout, cache_name=cache_name)
 
     queryset.count = count.__get__(queryset, type(queryset))
-    return queryset
\ No newline at end of file
+    return queryset
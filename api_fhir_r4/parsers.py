@@ -0,0 +1,21 @@
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+from api_fhir_r4.utils import JsonUtils
+
+
+class FHIRJSONParser(BaseParser):
+    """
+    Parses FHIR JSON request bodies with orjson.
+    """
+    media_type = 'application/fhir+json'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return JsonUtils.loads(stream.read())
+        except ValueError as e:
+            raise ParseError(f'JSON parse error - {e}')
+
+
+class FHIRApplicationJSONParser(FHIRJSONParser):
+    media_type = 'application/json'
@@ -20,6 +20,8 @@ class FHIRApiPermissions(DjangoModelPermissions):
     permissions_delete = []
 
     def __init__(self):
+        # copy of the map shared by DjangoModelPermissions, instances of different classes can be used at once
+        self.perms_map = dict(self.perms_map)
         self.perms_map['GET'] = self.permissions_get
         self.perms_map['POST'] = self.permissions_post
         self.perms_map['PUT'] = self.permissions_put
@@ -0,0 +1,64 @@
+import orjson
+from rest_framework.exceptions import NotAcceptable
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.renderers import BaseRenderer
+
+from api_fhir_r4.instrumentation import RequestTiming
+from api_fhir_r4.utils import JsonUtils
+
+
+class FHIRJSONRenderer(BaseRenderer):
+    """
+    Renders FHIR resources with orjson, the representation (pydantic `.dict()`) is written directly to bytes.
+    `_pretty=true` indents the output.
+    """
+    media_type = 'application/fhir+json'
+    format = 'json'
+    charset = None
+    pretty_query_param = '_pretty'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        options = self.get_dumps_options((renderer_context or {}).get('request'))
+        with RequestTiming.phase(RequestTiming.PHASE_RENDER):
+            return JsonUtils.dumps(data, options)
+
+    @classmethod
+    def get_dumps_options(cls, request):
+        """
+        orjson options of the request, also used by streamed Bundles which bypass the renderer.
+        """
+        options = orjson.OPT_NON_STR_KEYS
+        if request is not None and request.query_params.get(cls.pretty_query_param, '').lower() == 'true':
+            options |= orjson.OPT_INDENT_2
+        return options
+
+
+class FHIRApplicationJSONRenderer(FHIRJSONRenderer):
+    media_type = 'application/json'
+
+
+class FHIRContentNegotiation(DefaultContentNegotiation):
+    """
+    Content negotiation with the FHIR `_format` parameter, which takes precedence over the Accept header.
+    """
+    format_query_param = '_format'
+    format_media_types = {
+        'json': 'application/fhir+json',
+        'application/json': 'application/json',
+        'application/fhir+json': 'application/fhir+json',
+        'application/json+fhir': 'application/fhir+json',
+    }
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        requested_format = request.query_params.get(self.format_query_param)
+        if not requested_format:
+            return super().select_renderer(request, renderers, format_suffix)
+        # unescaped `+` of the media type is decoded as a space
+        requested_format = requested_format.split(';')[0].strip().replace(' ', '+').lower()
+        media_type = self.format_media_types.get(requested_format)
+        for renderer in renderers:
+            if renderer.media_type == media_type:
+                return renderer, renderer.media_type
+        raise NotAcceptable(available_renderers=renderers)
@@ -0,0 +1,188 @@
+from django.db.models import Q
+
+from api_fhir_r4.converters import ClaimConverter, ReferenceConverterMixin
+from api_fhir_r4.element_selection import ElementSelection
+from api_fhir_r4.permissions import FHIRApiInsureePermissions, FHIRApiGroupPermissions, \
+    FHIRApiCoverageRequestPermissions, FHIRApiClaimPermissions, FHIRApiHealthServicePermissions, \
+    FHIRApiPractitionerPermissions, FHIRApiProductPermissions
+from api_fhir_r4.serializers import PatientSerializer, GroupSerializer, ClaimSerializer, \
+    HealthFacilityOrganisationSerializer, ClaimAdminPractitionerSerializer, InsurancePlanSerializer
+from api_fhir_r4.serializers.coverageSerializer import CoverageSerializer
+from claim.models import Claim, ClaimAdmin
+from insuree.models import Insuree, Family
+from location.models import HealthFacility
+from policy.models import Policy
+from product.models import Product
+
+
+class SearchIncludeTarget:
+    """
+    Resource type loaded by `_include`/`_revinclude`, with the queryset of IMIS objects and the serializer.
+    """
+
+    def __init__(self, resource_type, queryset_getter, serializer, permission_class):
+        self.resource_type = resource_type
+        self.serializer = serializer
+        self.permission_class = permission_class
+        self._queryset_getter = queryset_getter
+
+    def get_queryset(self, user):
+        return self._queryset_getter(user)
+
+    def has_permission(self, user):
+        return user.has_perms(self.permission_class.permissions_get)
+
+
+class SearchInclude:
+    """
+    Supported `_include`/`_revinclude` value. `page_filter` returns Q of the target objects related to
+    the IMIS objects of the page, `reference_type` is the one used by references to the target.
+    """
+
+    def __init__(self, target, page_filter, reference_type=ReferenceConverterMixin.UUID_REFERENCE_TYPE):
+        self.target = target
+        self.page_filter = page_filter
+        self.reference_type = reference_type
+
+
+def _group_queryset(user):
+    from api_fhir_r4.views.fhir.group import GroupViewSet
+    return GroupViewSet.annotate_group_aggregates(Family.objects.filter(validity_to__isnull=True))
+
+
+PATIENT = SearchIncludeTarget(
+    'Patient',
+    lambda user: Insuree.get_queryset(None, user).filter(validity_to__isnull=True)
+        .select_related('gender', 'photo', 'family__location'),
+    PatientSerializer, FHIRApiInsureePermissions)
+GROUP = SearchIncludeTarget('Group', _group_queryset, GroupSerializer, FHIRApiGroupPermissions)
+CLAIM = SearchIncludeTarget(
+    'Claim',
+    lambda user: Claim.get_queryset(None, user).filter(validity_to__isnull=True)
+        .select_related('insuree', 'health_facility', 'admin', 'icd', 'icd_1', 'icd_2', 'icd_3', 'icd_4')
+        .prefetch_related(*ClaimConverter.get_fhir_items_prefetch_lookups(),
+                          *ClaimConverter.get_fhir_insurance_prefetch_lookups()),
+    ClaimSerializer, FHIRApiClaimPermissions)
+COVERAGE = SearchIncludeTarget(
+    'Coverage',
+    lambda user: Policy.get_queryset(None, user).filter(validity_to__isnull=True)
+        .select_related('family__head_insuree', 'product'),
+    CoverageSerializer, FHIRApiCoverageRequestPermissions)
+ORGANIZATION = SearchIncludeTarget(
+    'Organization',
+    lambda user: HealthFacility.objects.filter(validity_to__isnull=True),
+    HealthFacilityOrganisationSerializer, FHIRApiHealthServicePermissions)
+PRACTITIONER = SearchIncludeTarget(
+    'Practitioner',
+    lambda user: ClaimAdmin.objects.filter(validity_to__isnull=True),
+    ClaimAdminPractitionerSerializer, FHIRApiPractitionerPermissions)
+INSURANCE_PLAN = SearchIncludeTarget(
+    'InsurancePlan',
+    lambda user: Product.objects.filter(validity_to__isnull=True),
+    InsurancePlanSerializer, FHIRApiProductPermissions)
+
+
+def _coverage_head_insurees(policies):
+    # Coverage references the head of the policy family by its CHF ID
+    return Q(id__in=Family.objects.filter(id__in={policy.family_id for policy in policies}).values('head_insuree_id'))
+
+
+# `_include` values supported by searches of the resource type
+SEARCH_INCLUDES = {
+    'Claim': {
+        'Claim:patient': SearchInclude(PATIENT, lambda claims: Q(id__in={claim.insuree_id for claim in claims})),
+        'Claim:provider': SearchInclude(
+            ORGANIZATION, lambda claims: Q(id__in={claim.health_facility_id for claim in claims})),
+        'Claim:enterer': SearchInclude(PRACTITIONER, lambda claims: Q(id__in={claim.admin_id for claim in claims})),
+    },
+    'Coverage': {
+        'Coverage:beneficiary': SearchInclude(
+            PATIENT, _coverage_head_insurees, ReferenceConverterMixin.CODE_REFERENCE_TYPE),
+        'Coverage:policy-holder': SearchInclude(
+            PATIENT, _coverage_head_insurees, ReferenceConverterMixin.CODE_REFERENCE_TYPE),
+        # Coverage.class holds the code of the product, openIMIS specific parameter
+        'Coverage:insurance-plan': SearchInclude(
+            INSURANCE_PLAN, lambda policies: Q(id__in={policy.product_id for policy in policies})),
+    },
+    'Group': {
+        'Group:member': SearchInclude(PATIENT, lambda families: Q(family_id__in={family.id for family in families})),
+    },
+}
+
+# `_revinclude` values supported by searches of the resource type
+SEARCH_REVINCLUDES = {
+    'Patient': {
+        'Claim:patient': SearchInclude(CLAIM, lambda insurees: Q(insuree_id__in={insuree.id for insuree in insurees})),
+        'Coverage:beneficiary': SearchInclude(
+            COVERAGE, lambda insurees: Q(family__head_insuree_id__in={insuree.id for insuree in insurees})),
+        'Group:member': SearchInclude(GROUP, lambda insurees: Q(id__in={insuree.family_id for insuree in insurees})),
+    },
+}
+
+
+class SearchIncludes:
+    """
+    `_include` and `_revinclude` of the search request. Resources related to the whole page are loaded at once,
+    with one query for every resource type, and returned as `search.mode=include` entries of the Bundle.
+    """
+    INCLUDE_QUERY_PARAM = '_include'
+    REVINCLUDE_QUERY_PARAM = '_revinclude'
+
+    def __init__(self, includes):
+        self.includes = list(includes)
+
+    @classmethod
+    def is_requested(cls, request):
+        return cls.INCLUDE_QUERY_PARAM in request.GET or cls.REVINCLUDE_QUERY_PARAM in request.GET
+
+    @classmethod
+    def from_request(cls, request, resource_type):
+        """
+        Includes of the search of `resource_type`, None if no supported include is requested. Unsupported values
+        are ignored, as the FHIR search allows.
+        """
+        if resource_type is None or not cls.is_requested(request):
+            return None
+        includes = []
+        for query_param, supported in ((cls.INCLUDE_QUERY_PARAM, SEARCH_INCLUDES),
+                                       (cls.REVINCLUDE_QUERY_PARAM, SEARCH_REVINCLUDES)):
+            for value in request.GET.getlist(query_param):
+                include = cls._get_supported(value, supported.get(resource_type, {}))
+                if include is not None and include not in includes:
+                    includes.append(include)
+        return cls(includes) if includes else None
+
+    @classmethod
+    def _get_supported(cls, value, supported):
+        # value is `[source type]:[search parameter]` with optional `:[target type]`
+        parts = value.strip().split(':')
+        include = supported.get(':'.join(parts[:2]))
+        if include is None or len(parts) > 3 or (len(parts) == 3 and parts[2] != include.target.resource_type):
+            return None
+        return include
+
+    def load(self, page, request):
+        """
+        Included resources of the page IMIS objects as (resource type, representation) pairs. Resources the user
+        can't read are skipped.
+        """
+        page = list(page)
+        if not page:
+            return []
+        filters = {}
+        for include in self.includes:
+            if not include.target.has_permission(request.user):
+                continue
+            key = (include.target, include.reference_type)
+            page_filter = include.page_filter(page)
+            filters[key] = filters[key] | page_filter if key in filters else page_filter
+
+        resources = []
+        # `_summary`/`_elements` apply to the matched resources, included ones are complete
+        with ElementSelection.activate(None):
+            for (target, reference_type), page_filter in filters.items():
+                queryset = target.get_queryset(request.user).filter(page_filter)
+                serializer = target.serializer(
+                    queryset, many=True, reference_type=reference_type, context={'request': request})
+                resources.extend((target.resource_type, resource) for resource in serializer.data)
+        return resources
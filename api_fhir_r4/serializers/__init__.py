@@ -1,12 +1,16 @@
 import logging
 from typing import Union
 
+from django.db.models import Manager
 from django.http.response import HttpResponseBase
 from fhir.resources.fhirabstractmodel import FHIRAbstractModel
 from rest_framework import serializers
+from rest_framework.utils.serializer_helpers import ReturnDict
 
 from api_fhir_r4.configurations import GeneralConfiguration
 from api_fhir_r4.converters import BaseFHIRConverter, OperationOutcomeConverter, ReferenceConverterMixin
+from api_fhir_r4.element_selection import ElementSelection
+from api_fhir_r4.instrumentation import RequestTiming
 from core.models import User, TechnicalUser
 
 
@@ -14,20 +18,64 @@ from core.models import User, TechnicalUser
 logger = logging.getLogger(__name__)
 
 
+class BaseFHIRListSerializer(serializers.ListSerializer):
+    """
+    Prepares the whole page of IMIS objects with the converter batch lookups before the child representations
+    are built, so relations required by the conversion are loaded in a fixed number of queries per page.
+    """
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, Manager) else data
+        with self.child.activate_element_selection():
+            iterable = self.child.fhirConverter.prefetch_imis_objs(iterable)
+        representations = []
+        for item in iterable:
+            with self.child.activate_element_selection():
+                representation = self.child.to_representation(item)
+            representations.append(self.child.filter_selected_elements(representation))
+        return representations
+
+
 class BaseFHIRSerializer(serializers.Serializer):
     fhirConverter = BaseFHIRConverter()
 
+    class Meta:
+        list_serializer_class = BaseFHIRListSerializer
+
     def __init__(self, *args, **kwargs):
         self._reference_type = kwargs.pop('reference_type', ReferenceConverterMixin.UUID_REFERENCE_TYPE)
+        # `_summary`/`_elements` of the request, serializers created during the conversion build complete resources
+        self.element_selection = ElementSelection.current()
         super().__init__(*args, **kwargs)
 
+    @property
+    def data(self):
+        with self.activate_element_selection():
+            data = super().data
+        if self.element_selection is None or not isinstance(data, dict):
+            return data
+        return ReturnDict(self.filter_selected_elements(data), serializer=self)
+
+    def activate_element_selection(self):
+        return ElementSelection.activate(self.element_selection, type(self.fhirConverter))
+
+    def filter_selected_elements(self, representation):
+        if self.element_selection is None or not isinstance(representation, dict) \
+                or representation.get('resourceType') in (None, 'OperationOutcome'):
+            return representation
+        return self.element_selection.filter_resource(representation, self.fhirConverter.fhir_summary_elements)
+
     def to_representation(self, obj):
         try:
             if isinstance(obj, HttpResponseBase):
                 return OperationOutcomeConverter.to_fhir_obj(obj).dict()
             elif isinstance(obj, FHIRAbstractModel):
                 return obj.dict()
-            return self.fhirConverter.to_fhir_obj(obj, self.reference_type).dict()
+            with RequestTiming.phase(RequestTiming.PHASE_CONVERT):
+                fhir_obj = self.fhirConverter.to_fhir_obj(obj, self.reference_type)
+                self.fhirConverter.build_fhir_meta(fhir_obj, obj)
+            with RequestTiming.phase(RequestTiming.PHASE_DICT):
+                return fhir_obj.dict()
         except Exception as e:
             from django.conf import settings
             if settings.DEBUG:
@@ -10,7 +10,7 @@ from django.http import HttpResponseForbidden
 from django.http.response import HttpResponseBase
 from django.shortcuts import get_object_or_404
 
-from api_fhir_r4.configurations import R4ClaimConfig, GeneralConfiguration
+from api_fhir_r4.configurations import GeneralConfiguration
 from api_fhir_r4.converters import ClaimResponseConverter, OperationOutcomeConverter, ReferenceConverterMixin as r
 from api_fhir_r4.converters.claimConverter import ClaimConverter
 from fhir.resources.fhirabstractmodel import FHIRAbstractModel
@@ -28,7 +28,7 @@ class ClaimSerializer(ContainedContentSerializerMixin, BaseFHIRSerializer):
             fhir_obj.patient,
             fhir_obj.provider,
             fhir_obj.enterer,
-            *[item.extension[0].valueReference for item in fhir_obj.item]
+            *[item.extension[0].valueReference for item in fhir_obj.item or []]
         ]
 
     def create(self, validated_data):
@@ -51,7 +51,9 @@ class ClaimSerializer(ContainedContentSerializerMixin, BaseFHIRSerializer):
             return obj.dict()
 
         fhir_obj = self.fhirConverter.to_fhir_obj(obj, self._reference_type)
-        self.remove_attachment_data(fhir_obj)
+        self.fhirConverter.build_fhir_meta(fhir_obj, obj)
+        if self.context.get('attachment_data', False):
+            self.fhirConverter.add_attachment_data(fhir_obj, obj)
         
         if self.context.get('contained', None):
             self._add_contained_references(fhir_obj)
@@ -61,12 +63,6 @@ class ClaimSerializer(ContainedContentSerializerMixin, BaseFHIRSerializer):
             fhir_dict['contained'] = self._create_contained_obj_dict(obj)
         return fhir_dict
 
-    def remove_attachment_data(self, fhir_obj):
-        if hasattr(self.parent, 'many') and self.parent.many is True:
-            attachments = self.__get_attachments(fhir_obj)
-            for next_attachment in attachments:
-                next_attachment.data = None
-
     @property
     def reference_type(self):
         return super().reference_type
@@ -79,10 +75,6 @@ class ClaimSerializer(ContainedContentSerializerMixin, BaseFHIRSerializer):
             self._reference_type = reference_type
             self.__set_contained_resource_reference_types(reference_type)
 
-    def __get_attachments(self, fhir_obj):
-        attachment_category = R4ClaimConfig.get_fhir_claim_attachment_code()
-        return [a.valueAttachment for a in fhir_obj.supportingInfo if a.category.text == attachment_category]
-
     def __set_contained_resource_reference_types(self, reference_type):
         self._contained_definitions.update_reference_type(reference_type)
 
@@ -1,10 +1,11 @@
 import logging
-from policy.services import EligibilityRequest, EligibilityService, EligibilityResponse, StoredProcEligibilityService
-from policy.services import ByInsureeRequest, ByInsureeService, ByInsureeResponse
+from api_fhir_r4.configurations import R4CoverageEligibilityConfiguration
 from api_fhir_r4.converters import CoverageEligibilityRequestConverter
+from api_fhir_r4.eligibility import CoverageEligibilityEvaluator
 from api_fhir_r4.serializers import BaseFHIRSerializer
 from django.http.response import HttpResponseBase
 from fhir.resources.fhirabstractmodel import FHIRAbstractModel
+from rest_framework.exceptions import ValidationError
 from api_fhir_r4.converters import OperationOutcomeConverter
 
 
@@ -18,28 +19,51 @@ class CoverageEligibilityRequestSerializer(BaseFHIRSerializer):
             return OperationOutcomeConverter.to_fhir_obj(obj).dict()
         elif isinstance(obj, FHIRAbstractModel):
             return obj.dict()
-        return CoverageEligibilityRequestConverter.to_fhir_obj(obj[0], obj[1]).dict()
+        return CoverageEligibilityRequestConverter.to_fhir_obj(obj).dict()
+
+    def to_internal_value(self, data):
+        return {'eligibility_requests': self.fhirConverter.to_imis_objs(data, None)}
 
     def create(self, validated_data):
-        eligibility_request_sp = EligibilityRequest(
-            chf_id=validated_data.get('chf_id'),
-            service_code=validated_data.get('service_code'),
-            item_code=validated_data.get('item_code')
-        )
-        eligibility_request = ByInsureeRequest(chf_id=validated_data.get('chf_id'))
         request = self.context.get("request")
-        try:
-            response = ByInsureeService(request.user).request(eligibility_request)
-        except TypeError:
-            self.logger.warning('The insuree with chfid `{}` is not connected with policy. '
-                                'The default eligibility response will be used.'
-                                .format(validated_data.get('chfid')))
-            response = self.create_default_eligibility_response()
-        output_response = [response, eligibility_request_sp]
-        return output_response
-
-    def create_default_eligibility_response(self):
-        return ByInsureeResponse(
-            by_insuree_request=None,
-            items=[]
-        )
+        return CoverageEligibilityEvaluator(request.user).evaluate(validated_data['eligibility_requests'])
+
+    def create_batch(self, bundle):
+        """
+        Evaluates all CoverageEligibilityRequest entries of the batch Bundle at once, entries which can't be
+        parsed get an OperationOutcome in the batch-response and don't affect the others.
+        """
+        entries = self.__get_batch_entries(bundle)
+        requests_per_entry = []
+        for index, entry in enumerate(entries):
+            resource = entry.get('resource') if isinstance(entry, dict) else None
+            try:
+                if not isinstance(resource, dict) or resource.get('resourceType') != 'CoverageEligibilityRequest':
+                    raise ValueError(f'Bundle.entry[{index}].resource has to be a CoverageEligibilityRequest')
+                requests_per_entry.append(self.fhirConverter.to_imis_objs(resource, None))
+            except Exception as e:
+                requests_per_entry.append(e)
+
+        request = self.context.get("request")
+        evaluations = iter(CoverageEligibilityEvaluator(request.user).evaluate([
+            eligibility_request for entry_requests in requests_per_entry if isinstance(entry_requests, list)
+            for eligibility_request in entry_requests
+        ]))
+        response_entries = []
+        for entry_requests in requests_per_entry:
+            if isinstance(entry_requests, Exception):
+                outcome = OperationOutcomeConverter.build_for_400_bad_request(str(entry_requests))
+                response_entries.append({'response': {'status': '400 Bad Request', 'outcome': outcome.dict()}})
+            else:
+                resource = self.to_representation([next(evaluations) for _ in entry_requests])
+                response_entries.append({'resource': resource, 'response': {'status': '200 OK'}})
+        return {'resourceType': 'Bundle', 'type': 'batch-response', 'entry': response_entries}
+
+    def __get_batch_entries(self, bundle):
+        if bundle.get('type') != 'batch':
+            raise ValidationError('Only batch Bundle of CoverageEligibilityRequest resources is accepted')
+        entries = bundle.get('entry') or []
+        max_batch_size = R4CoverageEligibilityConfiguration.get_eligibility_max_batch_size()
+        if max_batch_size and len(entries) > max_batch_size:
+            raise ValidationError(f'Bundle can contain up to {max_batch_size} entries, {len(entries)} given')
+        return entries
@@ -49,16 +49,16 @@ class PatientSerializer(BaseFHIRSerializer):
     def _clean_data(self, validated_data):
         validated_data.pop('_state', None)
         validated_data.pop('family_address', None)
-        validated_data.pop('family_location', None)
+        validated_data.pop('family_location_id', None)
         return validated_data
 
     def _create_patient_family(self, obj, validated_data):
         audit_user_id = validated_data['audit_user_id']
-        family_location = validated_data.get('family_location', None)
+        family_location_id = validated_data.get('family_location_id', None)
         family_address = validated_data.get('family_address', None)
 
         obj.family = Family.objects.create(
-            location=family_location,
+            location_id=family_location_id,
             address=family_address,
             head_insuree=obj,
             audit_user_id=audit_user_id
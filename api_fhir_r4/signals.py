@@ -4,6 +4,7 @@ from django.core.exceptions import ObjectDoesNotExist
 
 from api_fhir_r4.converters import PatientConverter, GroupConverter, ClaimAdminPractitionerConverter, BillInvoiceConverter, CoverageConverter, ClaimConverter, InvoiceConverter, \
     HealthFacilityOrganisationConverter, MedicationConverter, ActivityDefinitionConverter, LocationConverter
+from api_fhir_r4.cache import FHIRResponseCache, LocationIndex, EligibilityCache
 from api_fhir_r4.mapping.invoiceMapping import InvoiceTypeMapping, BillTypeMapping
 from api_fhir_r4.subscriptions.notificationManager import RestSubscriptionNotificationManager
 from api_fhir_r4.subscriptions.subscriptionCriteriaFilter import SubscriptionCriteriaFilter
@@ -19,6 +20,7 @@ imis_modules = openimis_apps()
 def bind_service_signals():
     if 'insuree' in imis_modules:
         def on_insuree_create_or_update(**kwargs):
+            FHIRResponseCache.invalidate('Patient', 'Group')
             model = kwargs.get('result', None)
             if model:
                 notify_subscribers(model, PatientConverter(), 'Patient', None)
@@ -30,6 +32,7 @@ def bind_service_signals():
         )
 
         def on_family_create_or_update(**kwargs):
+            FHIRResponseCache.invalidate('Group', 'Patient')
             model = kwargs.get('result', None)
             if model:
                 notify_subscribers(model, GroupConverter(), 'Group', None)
@@ -42,12 +45,16 @@ def bind_service_signals():
 
     if 'location' in imis_modules:
         def on_hf_create_or_update(**kwargs):
+            # health facilities are served as Location resources with physicalType `si`
+            FHIRResponseCache.invalidate('Location')
             model = kwargs.get('result', None)
             if model:
                 notify_subscribers(
                     model, HealthFacilityOrganisationConverter(), 'Organization', 'bus')
             
         def on_location_create_or_update(**kwargs):
+            LocationIndex.invalidate()
+            FHIRResponseCache.invalidate('Location', 'Patient', 'Group')
             model = kwargs.get('result', None)
             if model:
                 notify_subscribers(
@@ -109,6 +116,8 @@ def bind_service_signals():
 
     if 'policy' in imis_modules:
         def on_policy_create_or_update(**kwargs):
+            FHIRResponseCache.invalidate('Group')
+            EligibilityCache.invalidate()
             model = kwargs.get('result', None)
             if model:
                 notify_subscribers(
@@ -128,6 +137,10 @@ def bind_service_signals():
             model = kwargs.get('result', None)
 
             if model:
+                # Claimed services and items are counted by the eligibility enquiry of the insuree
+                insuree = getattr(model, 'insuree', None)
+                if insuree:
+                    EligibilityCache.invalidate([insuree.chf_id])
                 notify_subscribers(
                     model, ClaimConverter(), 'Claim', None)
 
@@ -155,12 +168,14 @@ def bind_service_signals():
 
     if 'medical' in imis_modules:
         def on_medication_item_create_or_update(**kwargs):
+            FHIRResponseCache.invalidate('Medication')
             model = kwargs.get('result', None)
             if model:
                 notify_subscribers(
                     model, MedicationConverter(), 'Medication', None)
 
         def on_medication_service_create_or_update(**kwargs):
+            FHIRResponseCache.invalidate('ActivityDefinition')
             model = kwargs.get('result', None)
             if model:
                 notify_subscribers(
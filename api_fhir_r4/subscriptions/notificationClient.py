@@ -51,6 +51,19 @@ class AbstractAsyncSubscriptionNotificationClient(
             result = await asyncio.gather(*tasks)
             return result
 
+    def normalize_payload(self, payload: NOTIFICATION_CONTENT_TYPE) -> CLIENT_ACCEPTABLE_CONTENT_TYPE:
+        """
+        Payload in the form sent to subscribers, notifications are stored in the outbox in this form.
+        """
+        return self._normalize_payload(payload)
+
+    async def send_notification_async(self, content: CLIENT_ACCEPTABLE_CONTENT_TYPE, subscriber: Subscription,
+                                      client_session: aiohttp.ClientSession) -> NOTIFICATION_OUTPUT_TYPE:
+        """
+        Sends already normalized content to a single subscriber using the session owned by the caller.
+        """
+        return await self._send_notification_async(content, subscriber, client_session)
+
     @abstractmethod
     def _normalize_payload(self, payload: NOTIFICATION_CONTENT_TYPE) -> CLIENT_ACCEPTABLE_CONTENT_TYPE:
         """
@@ -1,16 +1,23 @@
 
+import logging
+from datetime import timedelta
 from typing import Union, List, Tuple, Iterable
 
 from django.core.exceptions import ValidationError
 from django.core.validators import URLValidator
+from django.db.models import Min
+from django.utils import timezone
 
 import core.datetimes.ad_datetime
+from api_fhir_r4.configurations import R4SubscriptionConfig
 from api_fhir_r4.converters import BaseFHIRConverter, ReferenceConverterMixin
-from api_fhir_r4.models import Subscription, SubscriptionNotificationResult
+from api_fhir_r4.models import Subscription, SubscriptionNotificationResult, SubscriptionOutboxEntry
 from api_fhir_r4.subscriptions.notificationClient import RestSubscriptionNotificationClient, \
     SubscriberNotificationOutput
 from core.models import HistoryModel, VersionedModel
 
+logger = logging.getLogger(__name__)
+
 
 class RestSubscriptionNotificationManager:
 
@@ -26,10 +33,78 @@ class RestSubscriptionNotificationManager:
             -> Iterable[SubscriptionNotificationResult]:
         fhir_content = self._resource_to_fhir(imis_resource)
         valid, rejected = self._validate_subscribers(subscribers)
+        if R4SubscriptionConfig.get_subscription_outbox_enabled():
+            # Delivered by the subscription worker, the caller doesn't wait for the subscribers
+            self.enqueue_notifications(imis_resource, fhir_content, valid)
+            return self._handle_notification_results(rejected)
+        batched = [str(subscriber.id) for subscriber in valid if subscriber.is_batched]
+        if batched:
+            logger.warning(f'Subscriptions {", ".join(batched)} are batched but the outbox is disabled, '
+                           f'their notifications are sent one by one')
         result = self.client.propagate_notifications(fhir_content, valid)
         combined_result = [*result, *rejected]
         return self._handle_notification_results(combined_result)
 
+    def enqueue_notifications(self, imis_resource: Union[HistoryModel, VersionedModel], fhir_content: dict,
+                              subscribers: List[Subscription]) -> List[SubscriptionOutboxEntry]:
+        if not subscribers:
+            return []
+        payload = self.client.normalize_payload(fhir_content)
+        if isinstance(payload, bytes):
+            payload = payload.decode('utf-8')
+        resource_type = fhir_content.get('resourceType')
+        resource_id = getattr(imis_resource, 'uuid', None)
+        resource_id = str(resource_id) if resource_id else None
+        entries = [
+            self._enqueue_batched_notification(subscriber, resource_type, resource_id, payload)
+            for subscriber in subscribers if subscriber.is_batched
+        ]
+        return entries + SubscriptionOutboxEntry.objects.bulk_create([
+            SubscriptionOutboxEntry(
+                subscription=subscriber,
+                resource_type=resource_type,
+                resource_id=resource_id,
+                payload=payload,
+            ) for subscriber in subscribers if not subscriber.is_batched
+        ])
+
+    def _enqueue_batched_notification(self, subscriber: Subscription, resource_type: str, resource_id: str,
+                                      payload: str) -> SubscriptionOutboxEntry:
+        """
+        Notifications of a batched subscription wait in the outbox for `batch_linger` seconds after the first one, or
+        until `batch_size` of them is pending. A notification of a resource which already waits replaces the pending
+        one, so the subscriber gets only the last state of the resource.
+        """
+        now = timezone.now()
+        # entries which weren't claimed by a worker nor attempted yet form the current batch window
+        window = SubscriptionOutboxEntry.objects.filter(
+            subscription=subscriber, status=SubscriptionOutboxEntry.EntryStatus.PENDING,
+            lease_id__isnull=True, attempts=0)
+        entry = window.filter(resource_type=resource_type, resource_id=resource_id).order_by('created').first() \
+            if resource_id else None
+        if entry and window.filter(id=entry.id).update(payload=payload, created=now):
+            entry.payload, entry.created = payload, now
+            return entry
+
+        window_end = window.aggregate(window_end=Min('next_attempt'))['window_end']
+        if window_end is None:
+            linger = subscriber.batch_linger
+            if linger is None:
+                linger = R4SubscriptionConfig.get_subscription_outbox_batch_linger()
+            window_end = now + timedelta(seconds=linger)
+        entry = SubscriptionOutboxEntry.objects.create(
+            subscription=subscriber,
+            resource_type=resource_type,
+            resource_id=resource_id,
+            payload=payload,
+            created=now,
+            next_attempt=window_end,
+        )
+        if window_end > now and window.count() >= subscriber.batch_size:
+            window.update(next_attempt=now)
+            entry.next_attempt = now
+        return entry
+
     def _validate_subscribers(self, subscribers: List[Subscription]) \
             -> Tuple[List[Subscription], List[SubscriberNotificationOutput]]:
         url_validator = URLValidator()
@@ -55,15 +130,17 @@ class RestSubscriptionNotificationManager:
 
     def _handle_notification_results(self, notification_result: Iterable[SubscriberNotificationOutput])\
             -> Iterable[SubscriptionNotificationResult]:
-        return [self.__save_result_in_db(result) for result in notification_result]
+        return [self.save_notification_result(result) for result in notification_result]
 
-    def __save_result_in_db(self, result: SubscriberNotificationOutput):
+    @classmethod
+    def save_notification_result(cls, result: SubscriberNotificationOutput, dead_letter: bool = False):
         new_entry = SubscriptionNotificationResult(
             subscription=result.subscription,
             error=str(
                 result.reason_of_failure) if result.reason_of_failure else None,
             notified_successfully=result.notification_success,
-            notification_time=core.datetimes.ad_datetime.AdDatetime.now()
+            notification_time=core.datetimes.ad_datetime.AdDatetime.now(),
+            dead_letter=dead_letter
         )
         new_entry.save()
         return new_entry
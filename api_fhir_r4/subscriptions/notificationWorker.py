@@ -0,0 +1,253 @@
+import asyncio
+import logging
+import random
+import uuid
+from datetime import timedelta
+
+import aiohttp
+import orjson
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from django.utils import timezone
+
+from api_fhir_r4.configurations import R4SubscriptionConfig
+from api_fhir_r4.models import Subscription, SubscriptionOutboxEntry
+from api_fhir_r4.subscriptions.notificationClient import RestSubscriptionNotificationClient, \
+    SubscriberNotificationOutput
+from api_fhir_r4.subscriptions.notificationManager import RestSubscriptionNotificationManager
+
+logger = logging.getLogger(__name__)
+
+
+class SubscriptionNotificationWorker:
+    """
+    Delivers notifications from the subscription outbox. One HTTP session is kept for the lifetime of the worker,
+    requests to the same endpoint are limited by `outbox_endpoint_concurrency`. Failed deliveries are retried with
+    exponential backoff, after `outbox_max_attempts` the entry is left in the dead-letter state.
+
+    Entries are claimed with a lease, so several workers can drain the same outbox. Entries of a worker which
+    stopped during the delivery are retried after `outbox_lease_timeout`. The lease is renewed right before every
+    delivery, so entries waiting for a busy endpoint aren't claimed again; entries whose lease was meanwhile taken
+    over by another worker are left to it.
+
+    Entries of batched subscriptions are sent together, up to `batch_size` of them in one Bundle.
+    """
+
+    def __init__(self, client: RestSubscriptionNotificationClient = None):
+        self.client = client or RestSubscriptionNotificationClient()
+        self._endpoint_semaphores = {}
+        self._stopped = False
+
+    def run_forever(self, poll_interval=None):
+        poll_interval = poll_interval or R4SubscriptionConfig.get_subscription_outbox_poll_interval()
+        asyncio.run(self._run_forever(poll_interval))
+
+    def run_once(self):
+        """
+        Delivers notifications which are due until the outbox is drained, returns the number of processed entries.
+        """
+        return asyncio.run(self._run_once())
+
+    def stop(self):
+        self._stopped = True
+
+    async def _run_forever(self, poll_interval):
+        self._endpoint_semaphores = {}
+        async with self._open_session() as session:
+            while not self._stopped:
+                try:
+                    processed = await self.drain(session)
+                except Exception as e:
+                    logger.error(f'Processing of the subscription outbox failed: {e}')
+                    processed = 0
+                if not processed:
+                    await asyncio.sleep(poll_interval)
+
+    async def _run_once(self):
+        self._endpoint_semaphores = {}
+        async with self._open_session() as session:
+            return await self.drain(session)
+
+    async def drain(self, session: aiohttp.ClientSession):
+        processed = 0
+        while not self._stopped:
+            entries = await sync_to_async(self.claim_due_entries)()
+            if not entries:
+                break
+            results = await asyncio.gather(*(self.deliver_batch(batch, session)
+                                             for batch in self.group_entries(entries)),
+                                           return_exceptions=True)
+            for result in results:
+                # entry stays leased and is retried when the lease ends
+                if isinstance(result, Exception):
+                    logger.error(f'Delivery of subscription notification failed: {result}')
+            processed += len(entries)
+        return processed
+
+    def claim_due_entries(self):
+        close_old_connections()
+        now = timezone.now()
+        due_ids = list(SubscriptionOutboxEntry.objects
+                       .filter(status=SubscriptionOutboxEntry.EntryStatus.PENDING, next_attempt__lte=now)
+                       .order_by('next_attempt')
+                       .values_list('id', flat=True)[:R4SubscriptionConfig.get_subscription_outbox_batch_size()])
+        if not due_ids:
+            return []
+        lease_id = uuid.uuid4()
+        lease_end = now + timedelta(seconds=R4SubscriptionConfig.get_subscription_outbox_lease_timeout())
+        # Entries claimed meanwhile by another worker have the next attempt moved to the end of its lease
+        SubscriptionOutboxEntry.objects \
+            .filter(id__in=due_ids, status=SubscriptionOutboxEntry.EntryStatus.PENDING, next_attempt__lte=now) \
+            .update(lease_id=lease_id, next_attempt=lease_end)
+        return list(SubscriptionOutboxEntry.objects.filter(lease_id=lease_id).select_related('subscription'))
+
+    def renew_lease(self, entries):
+        """
+        Extends the lease of claimed entries by `outbox_lease_timeout`, returns False if the lease of any of them
+        was lost (taken over by another worker or the entry was removed).
+        """
+        close_old_connections()
+        lease_end = timezone.now() + timedelta(seconds=R4SubscriptionConfig.get_subscription_outbox_lease_timeout())
+        renewed = SubscriptionOutboxEntry.objects \
+            .filter(id__in=[entry.id for entry in entries], lease_id=entries[0].lease_id,
+                    status=SubscriptionOutboxEntry.EntryStatus.PENDING) \
+            .update(next_attempt=lease_end)
+        return renewed == len(entries)
+
+    @classmethod
+    def group_entries(cls, entries):
+        """
+        Splits claimed entries into deliveries, every entry of a subscription without batching is delivered alone.
+        """
+        batches = []
+        batched = {}
+        for entry in entries:
+            if entry.subscription.is_batched:
+                batched.setdefault(entry.subscription_id, []).append(entry)
+            else:
+                batches.append([entry])
+        for subscription_entries in batched.values():
+            subscription_entries.sort(key=lambda entry: entry.created)
+            batch_size = subscription_entries[0].subscription.batch_size
+            batches.extend(subscription_entries[start:start + batch_size]
+                           for start in range(0, len(subscription_entries), batch_size))
+        return batches
+
+    async def deliver(self, entry: SubscriptionOutboxEntry, session: aiohttp.ClientSession):
+        await self.deliver_batch([entry], session)
+
+    async def deliver_batch(self, entries, session: aiohttp.ClientSession):
+        subscription = entries[0].subscription
+        if not self.is_subscription_active(subscription):
+            await sync_to_async(self._delete_entries)(entries)
+            return
+        payload = self.build_bundle_payload(entries) if subscription.is_batched else entries[0].payload
+        async with self._get_endpoint_semaphore(subscription.endpoint):
+            if not await sync_to_async(self.renew_lease)(entries):
+                return
+            output = await self.client.send_notification_async(payload, subscription, session)
+        await sync_to_async(self.record_batch_result)(entries, output)
+
+    @classmethod
+    def build_bundle_payload(cls, entries):
+        """
+        Bundle of the notifications, stored payloads are embedded without parsing. When an entry of the same
+        resource is in the batch more times (e.g. a retried one), only the latest is sent.
+        """
+        latest = {}
+        for entry in sorted(entries, key=lambda entry: entry.created):
+            latest[(entry.resource_type, entry.resource_id or str(entry.id))] = entry
+        subscription = entries[0].subscription
+        bundle_type = subscription.batch_bundle_type or Subscription.NotificationBundleType.HISTORY
+        bundle_entries = [cls._build_bundle_entry(entry, bundle_type) for entry in latest.values()]
+        if bundle_type == Subscription.NotificationBundleType.SUBSCRIPTION_NOTIFICATION:
+            bundle_entries.insert(0, orjson.dumps({'resource': cls._build_subscription_status(
+                subscription, latest.values())}).decode('utf-8'))
+        bundle = orjson.dumps({
+            'resourceType': 'Bundle',
+            'id': str(uuid.uuid4()),
+            'type': bundle_type,
+            'timestamp': timezone.now().isoformat(),
+        }).decode('utf-8')
+        return f'{bundle[:-1]},"entry":[{",".join(bundle_entries)}]}}'
+
+    @classmethod
+    def _build_bundle_entry(cls, entry, bundle_type):
+        entry_fields = {'fullUrl': f'{entry.resource_type}/{entry.resource_id}'} if entry.resource_id else {}
+        if bundle_type == Subscription.NotificationBundleType.HISTORY:
+            entry_fields['request'] = {'method': 'PUT', 'url': entry_fields.get('fullUrl', entry.resource_type)}
+            entry_fields['response'] = {'status': '200'}
+        entry_json = orjson.dumps(entry_fields).decode('utf-8')
+        separator = ',' if entry_fields else ''
+        return f'{{"resource":{entry.payload}{separator}{entry_json[1:]}'
+
+    @classmethod
+    def _build_subscription_status(cls, subscription, entries):
+        return {
+            'resourceType': 'SubscriptionStatus',
+            'status': 'active',
+            'type': 'event-notification',
+            'subscription': {'reference': f'Subscription/{subscription.id}'},
+            'notificationEvent': [
+                {'eventNumber': str(number),
+                 'timestamp': entry.created.isoformat(),
+                 'focus': {'reference': f'{entry.resource_type}/{entry.resource_id}'}}
+                for number, entry in enumerate(entries, start=1) if entry.resource_id
+            ],
+        }
+
+    def record_result(self, entry: SubscriptionOutboxEntry, output: SubscriberNotificationOutput):
+        self.record_batch_result([entry], output)
+
+    def record_batch_result(self, entries, output: SubscriberNotificationOutput):
+        """
+        All entries of the batch share the result of the delivery, one result is saved for the batch.
+        """
+        if output.notification_success:
+            self._delete_entries(entries)
+            RestSubscriptionNotificationManager.save_notification_result(output)
+            return
+
+        attempts = max(entry.attempts for entry in entries) + 1
+        dead_letter = attempts >= R4SubscriptionConfig.get_subscription_outbox_max_attempts()
+        next_attempt = timezone.now() + self.get_retry_delay(attempts)
+        for entry in entries:
+            entry.attempts = attempts
+            entry.lease_id = None
+            entry.last_error = str(output.reason_of_failure) if output.reason_of_failure else None
+            if dead_letter:
+                entry.status = SubscriptionOutboxEntry.EntryStatus.DEAD_LETTER
+                logger.warning(f'Notification {entry.id} of subscription {entry.subscription_id} '
+                               f'not delivered after {entry.attempts} attempts')
+            else:
+                entry.next_attempt = next_attempt
+        SubscriptionOutboxEntry.objects.bulk_update(
+            entries, ['attempts', 'lease_id', 'last_error', 'status', 'next_attempt'])
+        RestSubscriptionNotificationManager.save_notification_result(output, dead_letter=dead_letter)
+
+    @classmethod
+    def _delete_entries(cls, entries):
+        SubscriptionOutboxEntry.objects.filter(id__in=[entry.id for entry in entries]).delete()
+
+    @classmethod
+    def get_retry_delay(cls, attempts):
+        delay = min(R4SubscriptionConfig.get_subscription_outbox_retry_delay() * 2 ** (attempts - 1),
+                    R4SubscriptionConfig.get_subscription_outbox_max_retry_delay())
+        # jitter spreads retries of notifications which failed together, e.g. when the endpoint was down
+        return timedelta(seconds=delay * random.uniform(0.5, 1))
+
+    @classmethod
+    def is_subscription_active(cls, subscription: Subscription):
+        return subscription.status == Subscription.SubscriptionStatus.ACTIVE \
+            and not subscription.is_deleted \
+            and subscription.expiring > timezone.now()
+
+    def _get_endpoint_semaphore(self, endpoint):
+        if endpoint not in self._endpoint_semaphores:
+            self._endpoint_semaphores[endpoint] = asyncio.Semaphore(
+                R4SubscriptionConfig.get_subscription_outbox_endpoint_concurrency())
+        return self._endpoint_semaphores[endpoint]
+
+    def _open_session(self):
+        timeout = aiohttp.ClientTimeout(total=R4SubscriptionConfig.get_subscription_outbox_request_timeout())
+        return aiohttp.ClientSession(timeout=timeout)
@@ -4,7 +4,7 @@ from urllib import parse
 
 from fhir.resources.subscription import Subscription as FHIRSubscription
 
-from api_fhir_r4.configurations import R4SubscriptionConfig
+from api_fhir_r4.configurations import R4SubscriptionConfig, GeneralConfiguration
 from api_fhir_r4.converters import BaseFHIRConverter, ReferenceConverterMixin
 from api_fhir_r4.exceptions import FHIRException
 from api_fhir_r4.mapping.subscriptionMapping import SubscriptionChannelMapping, SubscriptionStatusMapping
@@ -16,6 +16,11 @@ class SubscriptionConverter(BaseFHIRConverter):
     _error_unknown_imis_value = f'Unknown imis `%(attr)s`: %(val)s'
     _error_invalid_attr = f'Missing or invalid `%(attr)s` attribute'
     _error_forbidden_attr = f'`%(attr)s` attribute forbidden'
+    _error_batch_without_outbox = 'Batched notifications require `outbox_enabled` of the subscription configuration'
+
+    _BATCH_SIZE_URL = 'maxBatchSize'
+    _BATCH_LINGER_URL = 'maxLinger'
+    _BATCH_BUNDLE_TYPE_URL = 'bundleType'
 
     @classmethod
     def to_fhir_obj(cls, imis_subscription, reference_type=ReferenceConverterMixin.UUID_REFERENCE_TYPE):
@@ -27,6 +32,7 @@ class SubscriptionConverter(BaseFHIRConverter):
         cls._build_fhir_criteria(fhir_subscription, imis_subscription)
         cls._build_fhir_error(fhir_subscription, imis_subscription)
         cls._build_fhir_channel(fhir_subscription, imis_subscription)
+        cls._build_fhir_notification_batch(fhir_subscription, imis_subscription)
         return FHIRSubscription.parse_obj(fhir_subscription)
 
     @classmethod
@@ -41,12 +47,17 @@ class SubscriptionConverter(BaseFHIRConverter):
         cls._build_imis_channel_type(imis_subscription, fhir_subscription)
         cls._build_imis_channel_endpoint(imis_subscription, fhir_subscription)
         cls._build_imis_channel_header(imis_subscription, fhir_subscription)
+        cls._build_imis_notification_batch(imis_subscription, fhir_subscription)
         return Subscription(**imis_subscription)
 
     @classmethod
     def get_fhir_code_identifier_type(cls):
         return FHIRException("Subscription resource does not contain code identifier")
 
+    @classmethod
+    def get_notification_batch_extension_url(cls):
+        return f'{GeneralConfiguration.get_system_base_url()}StructureDefinition/subscription-notification-batch'
+
     @classmethod
     def _build_fhir_id(cls, fhir_subscription, imis_subscription):
         fhir_subscription['id'] = str(imis_subscription.id)
@@ -93,6 +104,21 @@ class SubscriptionConverter(BaseFHIRConverter):
         cls._build_fhir_channel_header(fhir_channel, imis_subscription)
         fhir_subscription['channel'] = fhir_channel
 
+    @classmethod
+    def _build_fhir_notification_batch(cls, fhir_subscription, imis_subscription):
+        if not imis_subscription.is_batched:
+            return
+        batch_extensions = [{'url': cls._BATCH_SIZE_URL, 'valuePositiveInt': imis_subscription.batch_size}]
+        if imis_subscription.batch_linger is not None:
+            batch_extensions.append({'url': cls._BATCH_LINGER_URL, 'valueUnsignedInt': imis_subscription.batch_linger})
+        if imis_subscription.batch_bundle_type:
+            batch_extensions.append(
+                {'url': cls._BATCH_BUNDLE_TYPE_URL, 'valueCode': imis_subscription.batch_bundle_type})
+        fhir_subscription['extension'] = [{
+            'url': cls.get_notification_batch_extension_url(),
+            'extension': batch_extensions
+        }]
+
     @classmethod
     def _build_fhir_channel_type(cls, fhir_channel, imis_subscription):
         if imis_subscription.channel in SubscriptionChannelMapping.to_fhir_channel:
@@ -177,3 +203,28 @@ class SubscriptionConverter(BaseFHIRConverter):
     def _build_imis_channel_header(cls, imis_subscription, fhir_subscription):
         if fhir_subscription.channel.header:
             imis_subscription['headers'] = fhir_subscription.channel.header[0]
+
+    @classmethod
+    def _build_imis_notification_batch(cls, imis_subscription, fhir_subscription):
+        batch_extension = cls.get_fhir_extension_by_url(
+            fhir_subscription.extension or [], cls.get_notification_batch_extension_url())
+        if not batch_extension:
+            return
+        # batches are assembled in the outbox, without it every notification would be sent separately
+        if not R4SubscriptionConfig.get_subscription_outbox_enabled():
+            raise FHIRException(cls._error_batch_without_outbox)
+        batch_extensions = batch_extension.extension or []
+        batch_size = cls.get_fhir_extension_by_url(batch_extensions, cls._BATCH_SIZE_URL)
+        if not batch_size or not batch_size.valuePositiveInt:
+            raise FHIRException(cls._error_invalid_attr % {'attr': f'extension.{cls._BATCH_SIZE_URL}'})
+        imis_subscription['batch_size'] = batch_size.valuePositiveInt
+
+        batch_linger = cls.get_fhir_extension_by_url(batch_extensions, cls._BATCH_LINGER_URL)
+        if batch_linger and batch_linger.valueUnsignedInt is not None:
+            imis_subscription['batch_linger'] = batch_linger.valueUnsignedInt
+
+        bundle_type = cls.get_fhir_extension_by_url(batch_extensions, cls._BATCH_BUNDLE_TYPE_URL)
+        if bundle_type:
+            if bundle_type.valueCode not in Subscription.NotificationBundleType.values:
+                raise FHIRException(cls._error_invalid_attr % {'attr': f'extension.{cls._BATCH_BUNDLE_TYPE_URL}'})
+            imis_subscription['batch_bundle_type'] = bundle_type.valueCode
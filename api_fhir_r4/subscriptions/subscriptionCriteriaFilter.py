@@ -1,10 +1,6 @@
 from typing import Union
 
-from django.db.models import Q
-
-from api_fhir_r4.configurations import R4SubscriptionConfig
-from api_fhir_r4.models import Subscription
-from core.datetimes.ad_datetime import datetime
+from api_fhir_r4.subscriptions.subscriptionRegistry import SubscriptionRegistry, SubscriptionCriteriaMatcher
 from core.models import HistoryModel, VersionedModel
 
 
@@ -16,46 +12,7 @@ class SubscriptionCriteriaFilter:
         self.imis_resource = imis_resource
 
     def get_filtered_subscriptions(self):
-        subscriptions = self._get_all_active_subscriptions()
-        return self._get_matching_subscriptions(subscriptions)
-
-    def _get_all_active_subscriptions(self):
-        queryset = Subscription.objects.filter(status=Subscription.SubscriptionStatus.ACTIVE.value,
-                                               expiring__gt=datetime.now(), is_deleted=False)
-
-        if self.fhir_resource_name:
-
-            # Previous
-            # queryset = queryset.filter(criteria__jsoncontains={
-            #     R4SubscriptionConfig.get_fhir_sub_criteria_key_resource(): self.fhir_resource_name})
-            query_params = {
-                f"criteria__{R4SubscriptionConfig.get_fhir_sub_criteria_key_resource()}": self.fhir_resource_name}
-
-            queryset = queryset.filter(**query_params)
-
-        # if self.fhir_resource_type_name:
-        #     # previous
-        #     # queryset = queryset.filter(
-        #     #     ~Q(criteria__jsoncontainskey=R4SubscriptionConfig.get_fhir_sub_criteria_key_resource_type() | Q(
-        #     #         criteria__jsoncontains={
-        #     #             R4SubscriptionConfig.get_fhir_sub_criteria_key_resource_type(): self.fhir_resource_type_name})))
-        #     query_params = {
-        #         f"criteria__{R4SubscriptionConfig.get_fhir_sub_criteria_key_resource_type()}": self.fhir_resource_type_name}
-        #     # queryset = queryset.filter(
-        #     #     ~Q(criteria__jsoncontainskey=R4SubscriptionConfig.get_fhir_sub_criteria_key_resource_type() | Q(**query_params)))
-        #     queryset = queryset.filter(**query_params)
-        return queryset.all()
-
-    def _get_matching_subscriptions(self, subscriptions):
-        return [subscription for subscription in subscriptions
-                if self._is_matching_subscription(subscription)]
-
-    def _is_matching_subscription(self, sub):
-        criteria = {criteria: sub.criteria[criteria] for criteria in sub.criteria if
-                    criteria != R4SubscriptionConfig.get_fhir_sub_criteria_key_resource()
-                    and criteria != R4SubscriptionConfig.get_fhir_sub_criteria_key_resource_type()}
-        return not criteria or self._is_resource_matching_criteria(criteria)
-
-    def _is_resource_matching_criteria(self, criteria):
-        criteria['uuid'] = self.imis_resource.uuid
-        return type(self.imis_resource).objects.filter(**criteria).exists()
+        candidates = SubscriptionRegistry.get_candidates(self.fhir_resource_name, self.fhir_resource_type_name)
+        if not candidates:
+            return []
+        return SubscriptionCriteriaMatcher(self.imis_resource).get_matching(candidates)
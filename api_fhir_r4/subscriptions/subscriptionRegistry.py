@@ -0,0 +1,169 @@
+import logging
+import threading
+from collections import namedtuple, defaultdict
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import connection
+from django.db.models import Exists
+
+from api_fhir_r4.cache import QueryCountCache
+from api_fhir_r4.cache.generations import ProcessCacheValidity
+from api_fhir_r4.configurations import R4SubscriptionConfig
+from api_fhir_r4.models import Subscription
+from core.datetimes.ad_datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+RegisteredSubscription = namedtuple('RegisteredSubscription', ['subscription', 'resource_type', 'criteria'])
+
+
+class SubscriptionRegistry:
+    """
+    Process-wide registry of active subscriptions, indexed by the subscribed resource and resource type. It's
+    reloaded after subscriptions are changed through the API of the same process, changes done by other processes
+    are picked up through the generation of the subscription table, see ProcessCacheValidity.
+    """
+    _lock = threading.Lock()
+    _state = None
+    _validity = ProcessCacheValidity()
+
+    @classmethod
+    def get_candidates(cls, resource_name, resource_type_name=None):
+        """
+        Subscriptions of the resource which are not expired. Subscriptions restricted to a resource type are
+        included only if the type matches, events without a type are matched by all subscriptions of the resource.
+        """
+        by_type = cls._get_state().get(resource_name, {})
+        if resource_type_name:
+            registered = by_type.get(None, []) + by_type.get(resource_type_name, [])
+        else:
+            registered = [entry for entries in by_type.values() for entry in entries]
+        now = datetime.now()
+        return [entry for entry in registered if entry.subscription.expiring > now]
+
+    @classmethod
+    def invalidate(cls):
+        with cls._lock:
+            cls._state = None
+
+    @classmethod
+    def _get_state(cls):
+        state = cls._state
+        if state is not None and not cls._validity.is_check_due():
+            return state
+        with cls._lock:
+            generation = cls._get_generation()
+            if cls._state is None or cls._validity.is_reload_due(generation):
+                cls._state = cls._load()
+                cls._validity.set_loaded(generation)
+            else:
+                cls._validity.set_checked()
+            return cls._state
+
+    @classmethod
+    def _get_generation(cls):
+        try:
+            return QueryCountCache.get_table_generation(Subscription._meta.db_table)
+        except Exception as e:
+            logger.error(f'Reading subscriptions generation failed: {e}')
+            return None
+
+    @classmethod
+    def _load(cls):
+        resource_key = R4SubscriptionConfig.get_fhir_sub_criteria_key_resource()
+        resource_type_key = R4SubscriptionConfig.get_fhir_sub_criteria_key_resource_type()
+        state = defaultdict(lambda: defaultdict(list))
+        subscriptions = Subscription.objects.filter(
+            status=Subscription.SubscriptionStatus.ACTIVE.value, is_deleted=False)
+        for subscription in subscriptions:
+            criteria = subscription.criteria or {}
+            if not criteria.get(resource_key):
+                continue
+            extra_criteria = {key: value for key, value in criteria.items()
+                              if key not in (resource_key, resource_type_key)}
+            resource_type = criteria.get(resource_type_key)
+            state[criteria[resource_key]][resource_type].append(
+                RegisteredSubscription(subscription, resource_type, extra_criteria))
+        return {resource: dict(by_type) for resource, by_type in state.items()}
+
+
+class SubscriptionCriteriaMatcher:
+    """
+    Matches criteria of subscriptions against the changed IMIS object. Equality criteria on fields of the object
+    are compared in memory, all the remaining criteria (lookups, related fields) are evaluated by a single query.
+    """
+    _EXACT_LOOKUP = '__exact'
+
+    def __init__(self, imis_resource):
+        self.imis_resource = imis_resource
+        self.model = type(imis_resource)
+
+    def get_matching(self, registered_subscriptions):
+        matching = []
+        database_criteria = {}
+        for entry in registered_subscriptions:
+            in_memory_result = self.match_in_memory(entry.criteria)
+            if in_memory_result is None:
+                database_criteria[entry.subscription.id] = entry.criteria
+            elif in_memory_result:
+                matching.append(entry.subscription)
+
+        if database_criteria:
+            matched_ids = self.match_in_database(database_criteria)
+            matching.extend(entry.subscription for entry in registered_subscriptions
+                            if entry.subscription.id in matched_ids)
+        return matching
+
+    def match_in_memory(self, criteria):
+        """
+        Returns True or False, or None if some of the criteria can't be evaluated without the database.
+        """
+        for key, value in criteria.items():
+            field_value = self._get_comparable_values(key, value)
+            if field_value is None:
+                return None
+            actual, expected = field_value
+            if actual != expected:
+                return False
+        return True
+
+    def match_in_database(self, criteria_by_subscription):
+        annotations = {}
+        for subscription_id, criteria in criteria_by_subscription.items():
+            try:
+                annotations[f'matches_{len(annotations)}'] = (subscription_id, Exists(
+                    self.model.objects.filter(uuid=self.imis_resource.uuid, **criteria)))
+            except Exception as e:
+                logger.error(f'Invalid criteria of subscription {subscription_id}: {e}')
+        if not annotations:
+            return set()
+        try:
+            row = self.model.objects.filter(pk=self.imis_resource.pk) \
+                .values(**{name: expression for name, (_, expression) in annotations.items()}).first()
+        except Exception as e:
+            logger.error(f'Evaluating subscription criteria failed: {e}')
+            return set()
+        if not row:
+            return set()
+        return {subscription_id for name, (subscription_id, _) in annotations.items() if row[name]}
+
+    def _get_comparable_values(self, key, value):
+        field_name = key[:-len(self._EXACT_LOOKUP)] if key.endswith(self._EXACT_LOOKUP) else key
+        if '__' in field_name:
+            return None
+        try:
+            field = self.model._meta.get_field(field_name)
+        except FieldDoesNotExist:
+            return None
+        if not field.concrete or field.many_to_many:
+            return None
+        target_field = field.target_field if field.is_relation else field
+        try:
+            expected = target_field.to_python(value)
+        except ValidationError:
+            return None
+        actual = getattr(self.imis_resource, field.attname)
+        if isinstance(actual, str) and isinstance(expected, str) and connection.vendor == 'microsoft':
+            # default collation of openIMIS databases on SQL Server is case insensitive
+            return actual.casefold(), expected.casefold()
+        return actual, expected
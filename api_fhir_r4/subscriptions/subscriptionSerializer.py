@@ -51,6 +51,9 @@ class SubscriptionSerializer(BaseFHIRSerializer):
         copied_data = {key: value for key, value in deepcopy(
             validated_data).items() if value is not None}
         copied_data['id'] = instance.id
+        # batching is disabled by an update without the batch extension
+        for field in ('batch_size', 'batch_linger', 'batch_bundle_type'):
+            copied_data[field] = validated_data.get(field)
         del copied_data['_state'], copied_data['_original_state']
         result = service.update(copied_data)
         return self.get_result_object(result)
@@ -15,6 +15,7 @@ from api_fhir_r4.tests.mixin.fhirApiReadTestMixin import FhirApiReadTestMixin
 from api_fhir_r4.tests.mixin.fhirApiCreateTestMixin import FhirApiCreateTestMixin
 from api_fhir_r4.tests.mixin.fhirApiUpdateTestMixin import FhirApiUpdateTestMixin
 from api_fhir_r4.tests.mixin.fhirApiDeleteTestMixin import FhirApiDeleteTestMixin
+from api_fhir_r4.tests.mixin.fhirApiQueryCountTestMixin import FhirApiQueryCountTestMixin
 from api_fhir_r4.tests.mixin.insurancePlanTestMixin import InsurancePlanTestMixin
 from api_fhir_r4.tests.mixin.medicationTestMixin import MedicationTestMixin
 from api_fhir_r4.tests.mixin.contractTestMixin import ContractTestMixin
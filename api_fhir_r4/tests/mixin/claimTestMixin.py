@@ -1,6 +1,10 @@
-from claim.models import Claim, ClaimItem, ClaimService
+import base64
+
+from claim.models import Claim, ClaimItem, ClaimService, ClaimAttachment
 from insuree.test_helpers import create_test_insuree
 from medical.models import Diagnosis
+from policy.test_helpers import create_test_policy
+from product.test_helpers import create_test_product
 
 from api_fhir_r4.configurations import R4IdentifierConfig, R4ClaimConfig
 from api_fhir_r4.converters import PatientConverter, HealthFacilityOrganisationConverter, \
@@ -67,6 +71,12 @@ class ClaimTestMixin(GenericTestMixin):
 
     _ADMIN_AUDIT_USER_ID = -1
 
+    # claims created by create_test_claims
+    _TEST_CLAIMS_CODE_PREFIX = 'TC'
+    _TEST_CLAIMS_CHF_ID_PREFIX = 'TCI'
+    _TEST_CLAIMS_PRODUCT_CODE = 'TCP01'
+    _TEST_CLAIMS_ATTACHMENT_CONTENT = b'test claim attachment'
+
     def setUp(self):
         super(ClaimTestMixin, self).setUp()
         self._TEST_DIAGNOSIS_CODE = Diagnosis()
@@ -86,6 +96,44 @@ class ClaimTestMixin(GenericTestMixin):
         self._TEST_ITEM = self.create_test_claim_item()
         self._TEST_SERVICE = self.create_test_claim_service()
 
+    def create_test_claims(self, count):
+        """
+        Saved claims of separate insurees covered by a policy, each claim has an item, a service and an attachment.
+        """
+        product = create_test_product(self._TEST_CLAIMS_PRODUCT_CODE)
+        claims = []
+        for index in range(count):
+            insuree = create_test_insuree(custom_props={'chf_id': f'{self._TEST_CLAIMS_CHF_ID_PREFIX}{index:05}'})
+            create_test_policy(product, insuree)
+            claim = Claim.objects.create(
+                code=f'{self._TEST_CLAIMS_CODE_PREFIX}{index:05}',
+                insuree=insuree,
+                health_facility=self._TEST_HF,
+                admin=self._TEST_CLAIM_ADMIN,
+                icd=self._TEST_DIAGNOSIS_CODE,
+                date_from=self._TEST_DATE_FROM,
+                date_to=self._TEST_DATE_TO,
+                date_claimed=TimeUtils.str_to_date(self._TEST_DATE_CLAIMED),
+                claimed=self._TEST_CLAIMED,
+                visit_type=self._TEST_VISIT_TYPE,
+                status=self._TEST_STATUS,
+                audit_user_id=self._ADMIN_AUDIT_USER_ID,
+            )
+            ClaimItem.objects.create(
+                claim=claim, item=self._TEST_ITEM.item, status=Claim.STATUS_ENTERED, availability=True,
+                qty_provided=self._TEST_ITEM_QUANTITY_PROVIDED, price_asked=self._TEST_ITEM_PRICE_ASKED,
+                audit_user_id=self._ADMIN_AUDIT_USER_ID)
+            ClaimService.objects.create(
+                claim=claim, service=self._TEST_SERVICE.service, status=Claim.STATUS_ENTERED, availability=True,
+                qty_provided=self._TEST_SERVICE_QUANTITY_PROVIDED, price_asked=self._TEST_SERVICE_PRICE_ASKED,
+                audit_user_id=self._ADMIN_AUDIT_USER_ID)
+            ClaimAttachment.objects.create(
+                claim=claim, title='Test attachment', filename='test.txt', mime='text/plain',
+                date=self._TEST_DATE_FROM,
+                document=base64.b64encode(self._TEST_CLAIMS_ATTACHMENT_CONTENT).decode('ascii'))
+            claims.append(claim)
+        return claims
+
     def create_test_health_facility(self):
         location = LocationTestMixin().create_test_imis_instance()
         location.save()
@@ -0,0 +1,52 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from api_fhir_r4.configurations import GeneralConfiguration
+
+
+class FhirApiQueryCountTestMixin(object):
+    """
+    Guards list endpoints against N+1 queries. A page is expected to be loaded in a bounded number of queries,
+    which doesn't grow with the number of returned resources.
+    """
+    _QUERY_COUNT_PAGE_SIZE = 10
+    _MAX_QUERIES_PER_PAGE = 25
+    # additional queries allowed for a full page compared to a page with one resource
+    _MAX_QUERIES_PER_PAGE_GROWTH = 2
+
+    def login(self):
+        raise NotImplementedError()
+
+    def get_registered_list_urls(self):
+        """
+        (basename, url) of all viewsets registered in the module router which provide the list action.
+        """
+        from api_fhir_r4.urls import router
+        for prefix, viewset, basename in router.registry:
+            if basename != 'login' and hasattr(viewset, 'list'):
+                yield basename, f'{GeneralConfiguration.get_base_url()}{prefix}/'
+
+    def get_page_query_count(self, url, page_size, **params):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, data={'_count': page_size, **params}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, f'{url}: {response.content[:500]}')
+        returned = len(response.json().get('entry') or [])
+        return len(context.captured_queries), returned, context.captured_queries
+
+    def assertMaxQueriesPerPage(self, url, max_queries=None, **params):
+        max_queries = max_queries if max_queries is not None else self._MAX_QUERIES_PER_PAGE
+        query_count, _, queries = self.get_page_query_count(url, self._QUERY_COUNT_PAGE_SIZE, **params)
+        self.assertLessEqual(query_count, max_queries, self._format_queries(url, queries))
+
+    def assertQueryCountIndependentOfPageSize(self, url, **params):
+        single_count, _, _ = self.get_page_query_count(url, 1, **params)
+        page_count, returned, queries = self.get_page_query_count(url, self._QUERY_COUNT_PAGE_SIZE, **params)
+        if returned < 2:
+            # not enough data to detect queries done per resource
+            return
+        self.assertLessEqual(page_count, single_count + self._MAX_QUERIES_PER_PAGE_GROWTH,
+                             self._format_queries(url, queries))
+
+    def _format_queries(self, url, queries):
+        return f'{url} executed {len(queries)} queries:\n' + '\n'.join(query['sql'] for query in queries)
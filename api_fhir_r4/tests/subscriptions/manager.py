@@ -1,8 +1,10 @@
 import datetime
+from unittest import mock
 
 from asynctest import MagicMock
 from django.test import TestCase
 
+from api_fhir_r4.configurations import R4SubscriptionConfig
 from api_fhir_r4.converters import ClaimConverter, ReferenceConverterMixin
 from api_fhir_r4.models import Subscription, SubscriptionNotificationResult
 from api_fhir_r4.subscriptions.notificationClient import RestSubscriptionNotificationClient, \
@@ -35,6 +37,7 @@ class TestSubscriptionNotificationManager(CommunicationTestMixin, LogInMixin, Te
         self._test_resource = self.create_test_claim()
         self._test_converter = ClaimConverter()
 
+    @mock.patch.object(R4SubscriptionConfig, 'get_subscription_outbox_enabled', mock.Mock(return_value=False))
     def test_sending_claim_notification(self):
         mocked_client = MagicMock()
         mocked_client.propagate_notifications = MagicMock()
@@ -0,0 +1,26 @@
+from rest_framework.test import APITestCase
+
+from api_fhir_r4.configurations import GeneralConfiguration
+from api_fhir_r4.tests import ClaimTestMixin, GenericFhirAPITestMixin, FhirApiQueryCountTestMixin
+
+
+class ListQueryCountAPITests(ClaimTestMixin, GenericFhirAPITestMixin, FhirApiQueryCountTestMixin, APITestCase):
+    base_url = GeneralConfiguration.get_base_url() + 'Patient/'
+    # Endpoints which need more queries per page than the default budget
+    _MAX_QUERIES_PER_ENDPOINT = {}
+
+    def setUp(self):
+        super(ListQueryCountAPITests, self).setUp()
+        # full pages of claims with items and services, insurees with families and policies
+        self.create_test_claims(self._QUERY_COUNT_PAGE_SIZE)
+        self.login()
+
+    def test_list_query_count_bounded(self):
+        for basename, url in self.get_registered_list_urls():
+            with self.subTest(endpoint=basename):
+                self.assertMaxQueriesPerPage(url, self._MAX_QUERIES_PER_ENDPOINT.get(basename))
+
+    def test_list_query_count_independent_of_page_size(self):
+        for basename, url in self.get_registered_list_urls():
+            with self.subTest(endpoint=basename):
+                self.assertQueryCountIndependentOfPageSize(url)
@@ -0,0 +1,151 @@
+import base64
+import hashlib
+import uuid
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api_fhir_r4.configurations import GeneralConfiguration
+from api_fhir_r4.tests import ClaimTestMixin, GenericFhirAPITestMixin
+from api_fhir_r4.utils import AttachmentUtils, DbManagerUtils
+from api_fhir_r4.views.fhir import BinaryView
+from claim.models import ClaimAttachment
+from core.forms import User
+from core.services import create_or_update_interactive_user, create_or_update_core_user
+
+
+class BinaryViewRangeTestCase(TestCase):
+    _SIZE = 100
+
+    def test_whole_content(self):
+        self.assertIsNone(BinaryView()._get_range(None, self._SIZE))
+        self.assertIsNone(BinaryView()._get_range('bytes=0-10,20-30', self._SIZE))
+
+    def test_ranges(self):
+        view = BinaryView()
+        self.assertEqual((0, 9), view._get_range('bytes=0-9', self._SIZE))
+        self.assertEqual((90, 99), view._get_range('bytes=90-', self._SIZE))
+        self.assertEqual((80, 99), view._get_range('bytes=-20', self._SIZE))
+        self.assertEqual((50, 99), view._get_range('bytes=50-500', self._SIZE))
+
+    def test_unsatisfiable_range(self):
+        self.assertFalse(BinaryView()._get_range('bytes=100-', self._SIZE))
+        self.assertFalse(BinaryView()._get_range('bytes=20-10', self._SIZE))
+
+    def test_stream_range(self):
+        content = AttachmentUtils.open(_document_attachment(b'0123456789'))
+        self.assertEqual(b'345', b''.join(BinaryView()._stream_range(content, 3, 5)))
+
+
+class AttachmentUtilsTestCase(TestCase):
+
+    def test_size_and_hash_of_document(self):
+        content = b'test attachment content'
+        size, content_hash = AttachmentUtils.get_size_and_hash(_document_attachment(content))
+        self.assertEqual(len(content), size)
+        self.assertEqual(base64.b64encode(hashlib.sha1(content).digest()).decode('ascii'), content_hash)
+
+    def test_attachment_without_content(self):
+        attachment = SimpleNamespace(id=uuid.uuid4(), url=None, document=None)
+        self.assertEqual((None, None), AttachmentUtils.get_size_and_hash(attachment))
+        self.assertIsNone(AttachmentUtils.open(attachment))
+
+    def test_size_and_hash_of_deferred_document_cached(self):
+        content = b'deferred attachment content'
+        document = base64.b64encode(content).decode('ascii')
+
+        class DeferredAttachment(SimpleNamespace):
+            objects = mock.Mock()
+
+            def get_deferred_fields(self):
+                return {'document'}
+
+        objects = DeferredAttachment.objects
+        objects.filter.return_value.values_list.return_value.first.return_value = document
+        attachment = DeferredAttachment(id=uuid.uuid4(), url=None)
+        first = AttachmentUtils.get_size_and_hash(attachment)
+        second = AttachmentUtils.get_size_and_hash(attachment)
+        self.assertEqual(len(content), first[0])
+        self.assertEqual(first, second)
+        objects.filter.assert_called_once_with(id=attachment.id)
+
+
+class BinaryAPITests(ClaimTestMixin, GenericFhirAPITestMixin, APITestCase):
+    base_url = GeneralConfiguration.get_base_url() + 'Claim/'
+    _TEST_CONTENT = b'0123456789 test attachment content'
+    _TEST_NO_RIGHTS_USER_NAME = 'TestBinaryNoRights'
+
+    def setUp(self):
+        super(BinaryAPITests, self).setUp()
+        self._TEST_CLAIM = self.create_test_imis_instance()
+        self._TEST_ATTACHMENT = ClaimAttachment.objects.create(
+            claim=self._TEST_CLAIM, title='Test attachment', filename='test.txt', mime='text/plain',
+            date=self._TEST_DATE_FROM, document=base64.b64encode(self._TEST_CONTENT).decode('ascii'))
+
+    def _binary_url(self, attachment_id):
+        return f'{GeneralConfiguration.get_base_url()}Binary/{attachment_id}'
+
+    def _get_attachments(self, resource):
+        return [info['valueAttachment'] for info in resource.get('supportingInfo', []) if 'valueAttachment' in info]
+
+    def _login_without_rights(self):
+        user = DbManagerUtils.get_object_or_none(User, username=self._TEST_NO_RIGHTS_USER_NAME)
+        if user is None:
+            data = {'username': self._TEST_NO_RIGHTS_USER_NAME, 'last_name': self._TEST_NO_RIGHTS_USER_NAME,
+                    'other_names': self._TEST_NO_RIGHTS_USER_NAME, 'password': 'TestPasswordTest2',
+                    'user_types': 'INTERACTIVE', 'language': 'en', 'roles': []}
+            i_user, _ = create_or_update_interactive_user(
+                user_id=None, data=data, audit_user_id=999, connected=False)
+            create_or_update_core_user(user_uuid=None, username=self._TEST_NO_RIGHTS_USER_NAME, i_user=i_user)
+            user = DbManagerUtils.get_object_or_none(User, username=self._TEST_NO_RIGHTS_USER_NAME)
+        self.client.force_authenticate(user=user)
+
+    def test_get_content(self):
+        self.login()
+        response = self.client.get(self._binary_url(self._TEST_ATTACHMENT.id))
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual('text/plain', response['Content-Type'])
+        self.assertEqual(self._TEST_CONTENT, b''.join(response.streaming_content))
+
+    def test_get_range(self):
+        self.login()
+        response = self.client.get(self._binary_url(self._TEST_ATTACHMENT.id), HTTP_RANGE='bytes=2-5')
+        self.assertEqual(status.HTTP_206_PARTIAL_CONTENT, response.status_code)
+        self.assertEqual(f'bytes 2-5/{len(self._TEST_CONTENT)}', response['Content-Range'])
+        self.assertEqual(self._TEST_CONTENT[2:6], b''.join(response.streaming_content))
+
+    def test_get_unknown_attachment(self):
+        self.login()
+        response = self.client.get(self._binary_url(uuid.uuid4()))
+        self.assertEqual(status.HTTP_404_NOT_FOUND, response.status_code)
+
+    def test_get_without_claim_rights(self):
+        self._login_without_rights()
+        response = self.client.get(self._binary_url(self._TEST_ATTACHMENT.id))
+        self.assertEqual(status.HTTP_403_FORBIDDEN, response.status_code)
+
+    def test_claim_attachment_data_on_request(self):
+        self.login()
+        expected_data = base64.b64encode(self._TEST_CONTENT).decode('ascii')
+        for url in (self.base_url, f'{self.base_url}{self._TEST_CLAIM.uuid}/'):
+            with self.subTest(url=url):
+                response = self.client.get(url, format='json')
+                self.assertEqual(status.HTTP_200_OK, response.status_code)
+                resource = response.json()
+                resource = resource['entry'][0]['resource'] if resource['resourceType'] == 'Bundle' else resource
+                attachment = self._get_attachments(resource)[0]
+                self.assertNotIn('data', attachment)
+                self.assertEqual(f'Binary/{self._TEST_ATTACHMENT.id}', attachment['url'])
+                self.assertEqual(len(self._TEST_CONTENT), attachment['size'])
+
+                response = self.client.get(url, data={'attachmentData': 'true'}, format='json')
+                resource = response.json()
+                resource = resource['entry'][0]['resource'] if resource['resourceType'] == 'Bundle' else resource
+                self.assertEqual(expected_data, self._get_attachments(resource)[0]['data'])
+
+
+def _document_attachment(content):
+    return SimpleNamespace(id=uuid.uuid4(), url=None, document=base64.b64encode(content).decode('ascii'))
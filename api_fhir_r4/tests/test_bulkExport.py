@@ -0,0 +1,112 @@
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+from core.models import User
+from location.models import Location
+
+from api_fhir_r4.bulkExport import BulkExportJobRunner, BulkExportResource, BulkExportJobTakenOver, \
+    get_export_resources
+from api_fhir_r4.configurations import R4BulkExportConfig
+from api_fhir_r4.models import BulkExportJob
+
+
+class _TestLocationConverter:
+
+    @classmethod
+    def prefetch_imis_objs(cls, imis_objs):
+        return list(imis_objs)
+
+    @classmethod
+    def to_fhir_obj(cls, imis_obj, reference_type):
+        return SimpleNamespace(dict=lambda: {'resourceType': 'Location', 'id': imis_obj.code})
+
+    @classmethod
+    def build_fhir_meta(cls, fhir_obj, imis_obj):
+        pass
+
+
+class BulkExportJobRunnerTestCase(TestCase):
+    _TEST_CODES = ['BE1', 'BE2', 'BE3', 'BE4', 'BE5']
+
+    def setUp(self):
+        self.storage_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.storage_path)
+        for code in self._TEST_CODES:
+            Location(code=code, name=code, type='R').save()
+        self.resource = BulkExportResource(
+            'Location',
+            lambda user: Location.objects.filter(code__in=self._TEST_CODES),
+            _TestLocationConverter, None)
+        user = User.objects.create_superuser(username='TestBulkExport', password='TestBulkExport')
+        self.job = BulkExportJob.objects.create(
+            user=user, resource_types=['Location'], request_url='/api_fhir_r4/$export',
+            status=BulkExportJob.JobStatus.IN_PROGRESS)
+
+    def _run_export(self, stale_timeout=60):
+        with mock.patch.object(R4BulkExportConfig, 'get_bulk_export_storage_path',
+                               mock.Mock(return_value=self.storage_path)), \
+                mock.patch.object(R4BulkExportConfig, 'get_bulk_export_chunk_size', mock.Mock(return_value=2)), \
+                mock.patch.object(R4BulkExportConfig, 'get_bulk_export_stale_timeout',
+                                  mock.Mock(return_value=stale_timeout)):
+            os.makedirs(BulkExportJobRunner.get_job_directory(self.job), exist_ok=True)
+            BulkExportJobRunner(self.job).export_resource(self.resource)
+            with open(BulkExportJobRunner.get_output_path(self.job, 'Location'), 'rb') as output:
+                return output.read().splitlines(keepends=True)
+
+    def _make_stale(self):
+        self.job.heartbeat = timezone.now() - timedelta(hours=1)
+        BulkExportJob.objects.filter(id=self.job.id).update(heartbeat=self.job.heartbeat)
+
+    def test_export_writes_ndjson(self):
+        exported = [json.loads(line)['id'] for line in self._run_export()]
+        self.assertEqual(sorted(self._TEST_CODES), sorted(exported))
+        progress = self.job.progress['Location']
+        self.assertTrue(progress['done'])
+        self.assertEqual(len(self._TEST_CODES), progress['count'])
+
+    def test_export_resumed_from_last_chunk(self):
+        exported = self._run_export()
+        # Simulate crash after the first chunk was saved, lines written after it are dropped on resume
+        first_chunk_pk = Location.objects.filter(code__in=self._TEST_CODES).order_by('pk')[1].pk
+        self.job.progress = {'Location': {'count': 2, 'errors': 0, 'size': len(b''.join(exported[:2])),
+                                          'last_pk': first_chunk_pk, 'done': False}}
+
+        self.assertEqual(exported, self._run_export())
+        self.assertEqual(len(self._TEST_CODES), self.job.progress['Location']['count'])
+
+    def test_heartbeat_refreshed_within_chunk(self):
+        with mock.patch.object(BulkExportJobRunner, '_update_job', autospec=True,
+                               side_effect=BulkExportJobRunner._update_job) as update_job:
+            self._run_export(stale_timeout=0)
+        # every converted object refreshes the heartbeat, besides the progress of the chunks
+        heartbeats = [call for call in update_job.call_args_list if not call.kwargs]
+        self.assertEqual(len(self._TEST_CODES), len(heartbeats))
+
+    def test_runner_stops_when_taken_over(self):
+        BulkExportJob.objects.filter(id=self.job.id).update(heartbeat=timezone.now() + timedelta(seconds=1))
+        with self.assertRaises(BulkExportJobTakenOver):
+            self._run_export()
+        self.assertEqual({}, BulkExportJob.objects.get(id=self.job.id).progress)
+
+    @mock.patch.object(BulkExportJobRunner, 'start')
+    def test_stale_job_resumed_once(self, start):
+        self._make_stale()
+        stale_job = BulkExportJob.objects.get(id=self.job.id)
+        self.assertTrue(BulkExportJobRunner.resume_if_stale(stale_job))
+        # concurrent status request holding the same stale state
+        self.assertFalse(BulkExportJobRunner.resume_if_stale(BulkExportJob.objects.get(id=self.job.id)))
+        self.assertFalse(BulkExportJobRunner.resume_if_stale(stale_job))
+        start.assert_called_once()
+
+    def test_group_export_annotated(self):
+        # converter reads the aggregates instead of counting members of every exported family
+        queryset = get_export_resources()['Group'].get_queryset(None)
+        self.assertIn('has_active_policy', queryset.query.annotations)
+        self.assertIn('active_members_count', queryset.query.annotations)
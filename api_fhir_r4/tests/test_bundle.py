@@ -0,0 +1,146 @@
+import copy
+from unittest import mock
+
+from django.http import HttpResponse
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from api_fhir_r4.cache import ReferenceResolver
+from api_fhir_r4.configurations import GeneralConfiguration
+from api_fhir_r4.tests import GenericFhirAPITestMixin
+from medical.models import Item
+from api_fhir_r4.views.fhir.bundle import BundleView, BundleEntryDispatcher
+
+
+class BundleViewTestCase(TestCase):
+    _TEST_URL = '/api_fhir_r4/'
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+
+    def test_entry_url_resolved_against_base(self):
+        dispatcher = BundleEntryDispatcher(Request(self.factory.post(self._TEST_URL)))
+        self.assertEqual(('/api_fhir_r4/Patient/', 'name=test'), dispatcher._get_path_and_query('Patient?name=test'))
+        self.assertEqual(('/api_fhir_r4/Claim/1/', ''), dispatcher._get_path_and_query('/Claim/1'))
+        self.assertEqual(('/api_fhir_r4/Claim/1/', ''),
+                         dispatcher._get_path_and_query('http://localhost/api_fhir_r4/Claim/1/'))
+
+    def test_transaction_order(self):
+        entries = [{'request': {'method': method, 'url': 'Patient'}} for method in ('GET', 'PUT', 'POST', 'DELETE')]
+        ordered = sorted(entries, key=BundleView()._get_transaction_order)
+        self.assertEqual(['DELETE', 'POST', 'PUT', 'GET'], [entry['request']['method'] for entry in ordered])
+
+    def test_invalid_bundle(self):
+        view = BundleView()
+        with self.assertRaises(ValidationError):
+            view._get_bundle_entries({'resourceType': 'Patient'})
+        with self.assertRaises(ValidationError):
+            view._get_bundle_entries({'resourceType': 'Bundle', 'type': 'searchset'})
+        with self.assertRaises(ValidationError):
+            view._get_bundle_entries({'resourceType': 'Bundle', 'type': 'batch', 'entry': [{'resource': {}}]})
+
+        bundle_type, entries = view._get_bundle_entries({
+            'resourceType': 'Bundle', 'type': 'batch', 'entry': [{'request': {'method': 'GET', 'url': 'Patient'}}]
+        })
+        self.assertEqual('batch', bundle_type)
+        self.assertEqual(1, len(entries))
+
+    def test_request_scope_cleared_after_change(self):
+        dispatcher = BundleEntryDispatcher(Request(self.factory.post(self._TEST_URL)))
+        match = mock.Mock(args=(), kwargs={})
+        for method, status_code, cleared in (('GET', 200, False), ('POST', 201, True), ('PUT', 400, False)):
+            with self.subTest(method=method, status_code=status_code):
+                match.func.return_value = HttpResponse(status=status_code)
+                with mock.patch('api_fhir_r4.views.fhir.bundle.resolve', return_value=match), \
+                        mock.patch.object(ReferenceResolver, 'clear_request_scope') as clear_request_scope:
+                    dispatcher.dispatch({'request': {'method': method, 'url': 'Patient'}})
+                self.assertEqual(cleared, clear_request_scope.called)
+
+    def test_server_error_outcome(self):
+        dispatcher = BundleEntryDispatcher(Request(self.factory.post(self._TEST_URL)))
+        match = mock.Mock(args=(), kwargs={})
+        match.func.side_effect = RuntimeError('connection to 10.0.0.5 refused')
+        with mock.patch('api_fhir_r4.views.fhir.bundle.resolve', return_value=match):
+            entry = dispatcher.dispatch({'request': {'method': 'GET', 'url': 'Patient'}})
+        self.assertEqual(status.HTTP_500_INTERNAL_SERVER_ERROR, entry['status_code'])
+        outcome = entry['response']['outcome']
+        self.assertEqual('Internal server error', outcome['issue'][0]['details']['text'])
+        self.assertNotIn('10.0.0.5', str(outcome))
+
+
+class BundleAPITests(GenericFhirAPITestMixin, APITestCase):
+    base_url = GeneralConfiguration.get_base_url()
+    _test_json_path = '/test/test_medication.json'
+
+    def _medication(self, code):
+        resource = copy.deepcopy(self._test_request_data)
+        resource['identifier'][0]['value'] = code
+        return resource
+
+    def _invalid_medication(self):
+        # medication without item code is rejected by the converter
+        resource = copy.deepcopy(self._test_request_data)
+        resource['identifier'] = []
+        return resource
+
+    def _bundle(self, bundle_type, *entries):
+        return {'resourceType': 'Bundle', 'type': bundle_type, 'entry': [
+            {'request': {'method': method, 'url': url}, **({'resource': resource} if resource else {})}
+            for method, url, resource in entries
+        ]}
+
+    def _post(self, bundle):
+        return self.client.post(self.base_url, data=bundle, format='json')
+
+    def _entry_status_codes(self, response):
+        return [int(entry['response']['status'].split(' ')[0]) for entry in response.json()['entry']]
+
+    def test_get_should_required_login(self):
+        response = self._post(self._bundle('batch', ('GET', 'Medication', None)))
+        self.assertEqual(status.HTTP_401_UNAUTHORIZED, response.status_code)
+
+    def test_batch(self):
+        self.login()
+        response = self._post(self._bundle(
+            'batch',
+            ('POST', 'Medication', self._medication('TBB01')),
+            ('POST', 'Medication', self._invalid_medication()),
+            ('GET', 'Medication?_count=10', None),
+        ))
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual('batch-response', response.json()['type'])
+        created, failed, searched = self._entry_status_codes(response)
+        self.assertEqual(status.HTTP_201_CREATED, created)
+        self.assertGreaterEqual(failed, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(status.HTTP_200_OK, searched)
+        # failed entry doesn't affect the others
+        self.assertTrue(Item.objects.filter(code='TBB01', validity_to__isnull=True).exists())
+        self.assertEqual('OperationOutcome', response.json()['entry'][1]['response']['outcome']['resourceType'])
+
+    def test_transaction(self):
+        self.login()
+        response = self._post(self._bundle(
+            'transaction',
+            ('GET', 'Medication', None),
+            ('POST', 'Medication', self._medication('TBT01')),
+            ('POST', 'Medication', self._medication('TBT02')),
+        ))
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual('transaction-response', response.json()['type'])
+        self.assertEqual([status.HTTP_200_OK, status.HTTP_201_CREATED, status.HTTP_201_CREATED],
+                         self._entry_status_codes(response))
+        self.assertEqual(2, Item.objects.filter(code__in=['TBT01', 'TBT02'], validity_to__isnull=True).count())
+
+    def test_failed_transaction_rolled_back(self):
+        self.login()
+        response = self._post(self._bundle(
+            'transaction',
+            ('POST', 'Medication', self._medication('TBT03')),
+            ('POST', 'Medication', self._invalid_medication()),
+        ))
+        self.assertGreaterEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual('OperationOutcome', response.json()['resourceType'])
+        self.assertFalse(Item.objects.filter(code='TBT03').exists())
@@ -1,3 +1,7 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api_fhir_r4.converters import ReferenceConverterMixin
 from api_fhir_r4.converters.claimConverter import ClaimConverter
 from api_fhir_r4.models import ClaimV2 as Claim
 from api_fhir_r4.tests import ClaimTestMixin
@@ -11,3 +15,27 @@ class ClaimConverterTestCase(ClaimTestMixin,
     converter = ClaimConverter
     fhir_resource = Claim
     json_repr = 'test/test_claim.json'
+
+
+class ClaimConverterQueryCountTestCase(ClaimTestMixin):
+    _TEST_CLAIM_COUNT = 5
+
+    def _load_claims(self, claims):
+        # relations are left to the converter, as for the pages of views which don't prefetch them
+        from claim.models import Claim as ImisClaim
+        return list(ImisClaim.objects.filter(id__in=[claim.id for claim in claims]).order_by('id'))
+
+    def _convert(self, claims):
+        return ClaimConverter.to_fhir_objs(self._load_claims(claims), ReferenceConverterMixin.UUID_REFERENCE_TYPE)
+
+    def test_query_count_independent_of_claim_count(self):
+        claims = self.create_test_claims(self._TEST_CLAIM_COUNT)
+        # process caches (locations, attachment hashes, ...) are filled by the first conversion
+        self._convert(claims)
+
+        with CaptureQueriesContext(connection) as context:
+            self._convert(claims[:1])
+        with self.assertNumQueries(len(context.captured_queries)):
+            fhir_claims = self._convert(claims)
+        self.assertEqual(self._TEST_CLAIM_COUNT, len(fhir_claims))
+        self.assertTrue(all(len(fhir_claim.item) == 2 for fhir_claim in fhir_claims))
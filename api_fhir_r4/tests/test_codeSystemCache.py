@@ -0,0 +1,82 @@
+import json
+from unittest import mock
+
+from django.test import TestCase
+
+from api_fhir_r4.cache import CodeSystemCache, QueryCountCache
+from api_fhir_r4.cache.generations import ProcessCacheValidity
+
+
+class CodeSystemCacheTestCase(TestCase):
+    _TEST_KEY = 'test-code-system'
+    _TEST_DB_TABLE = 'tblTestCodeSystem'
+    _TEST_CODE_SYSTEM = {
+        'code_field': 'code',
+        'display_field': 'name',
+        'id': 'test-code-system',
+        'name': 'TestCS',
+        'title': 'Test Code System',
+        'description': 'Code system used by tests.',
+    }
+    _TEST_DATA = [{'code': 'A00', 'name': 'Cholera'}, {'code': 'A01', 'name': 'Typhoid'}]
+
+    def setUp(self):
+        super().setUp()
+        CodeSystemCache.invalidate()
+        self._load_data = mock.Mock(return_value=self._TEST_DATA)
+
+    def tearDown(self):
+        CodeSystemCache.invalidate()
+        super().tearDown()
+
+    def _get_entry(self, db_table=None):
+        return CodeSystemCache.get_entry(self._TEST_KEY, self._TEST_CODE_SYSTEM, self._load_data, db_table)
+
+    def test_concepts(self):
+        entry = self._get_entry()
+        self.assertEqual({'A00': 'Cholera', 'A01': 'Typhoid'}, entry.concepts)
+
+    def test_data_loaded_once(self):
+        first = self._get_entry()
+        second = self._get_entry()
+        self.assertIs(first, second)
+        self._load_data.assert_called_once()
+
+    def test_body_rendered_once(self):
+        entry = self._get_entry()
+        body = CodeSystemCache.get_body(entry, self._TEST_CODE_SYSTEM, 'http://test/CodeSystem/test-code-system/')
+        self.assertIs(body, CodeSystemCache.get_body(
+            entry, self._TEST_CODE_SYSTEM, 'http://test/CodeSystem/test-code-system/'))
+        resource = json.loads(body)
+        self.assertEqual('CodeSystem', resource['resourceType'])
+        self.assertEqual('http://test/CodeSystem/test-code-system/', resource['url'])
+        self.assertEqual(['A00', 'A01'], [concept['code'] for concept in resource['concept']])
+
+    def test_reloaded_after_invalidation(self):
+        first = self._get_entry(self._TEST_DB_TABLE)
+        CodeSystemCache.invalidate(self._TEST_DB_TABLE)
+        self._load_data.return_value = self._TEST_DATA[:1]
+        second = self._get_entry(self._TEST_DB_TABLE)
+        self.assertNotEqual(first.etag, second.etag)
+        self.assertEqual({'A00': 'Cholera'}, second.concepts)
+
+    @mock.patch.object(ProcessCacheValidity, 'GENERATION_CHECK_INTERVAL', 0)
+    def test_reloaded_after_generation_change(self):
+        with mock.patch.object(QueryCountCache, 'get_table_generation', mock.Mock(return_value=1)):
+            self._get_entry(self._TEST_DB_TABLE)
+            self._get_entry(self._TEST_DB_TABLE)
+        self._load_data.assert_called_once()
+        with mock.patch.object(QueryCountCache, 'get_table_generation', mock.Mock(return_value=2)):
+            self._get_entry(self._TEST_DB_TABLE)
+        self.assertEqual(2, self._load_data.call_count)
+
+    @mock.patch.object(ProcessCacheValidity, 'GENERATION_CHECK_INTERVAL', 0)
+    @mock.patch.object(ProcessCacheValidity, 'get_max_age', mock.Mock(return_value=0))
+    def test_reloaded_after_max_age(self):
+        with mock.patch.object(QueryCountCache, 'get_table_generation', mock.Mock(return_value=1)):
+            first = self._get_entry(self._TEST_DB_TABLE)
+            self.assertIs(first, self._get_entry(self._TEST_DB_TABLE))
+            self._load_data.return_value = self._TEST_DATA[:1]
+            second = self._get_entry(self._TEST_DB_TABLE)
+        self.assertEqual(3, self._load_data.call_count)
+        self.assertEqual({'A00': 'Cholera'}, second.concepts)
@@ -0,0 +1,58 @@
+import datetime
+from types import SimpleNamespace
+
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory
+
+from api_fhir_r4.converters import BaseFHIRConverter
+from api_fhir_r4.utils import ConditionalRequestUtils
+from api_fhir_r4.views.filters.requestParameterFilter import QuerysetSinceParameter
+
+
+class ConditionalRequestsTestCase(TestCase):
+    _TEST_URL = '/api_fhir_r4/Patient/'
+    _TEST_VALIDITY_FROM = datetime.datetime(2022, 3, 4, 10, 20, 30)
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.imis_obj = SimpleNamespace(validity_from=self._TEST_VALIDITY_FROM)
+
+    def test_version_from_validity_from(self):
+        last_updated = BaseFHIRConverter.get_imis_obj_last_updated(self.imis_obj)
+        self.assertIsNotNone(last_updated.tzinfo)
+        self.assertEqual('20220304102030000000', BaseFHIRConverter.get_imis_obj_version_id(self.imis_obj))
+
+    def test_not_modified(self):
+        etag, last_modified = ConditionalRequestUtils.get_resource_validators(BaseFHIRConverter, self.imis_obj)
+        request = self.factory.get(self._TEST_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertTrue(ConditionalRequestUtils.is_not_modified(request, etag, last_modified))
+        request = self.factory.get(self._TEST_URL, HTTP_IF_NONE_MATCH='W/"1"')
+        self.assertFalse(ConditionalRequestUtils.is_not_modified(request, etag, last_modified))
+
+    def test_validators_without_update_tracking(self):
+        self.assertEqual((None, None), ConditionalRequestUtils.get_resource_validators(BaseFHIRConverter, object()))
+
+    def test_validators_of_representation(self):
+        etag, _ = ConditionalRequestUtils.get_resource_validators(
+            BaseFHIRConverter, self.imis_obj, self.factory.get(self._TEST_URL))
+        contained_etag, _ = ConditionalRequestUtils.get_resource_validators(
+            BaseFHIRConverter, self.imis_obj, self.factory.get(self._TEST_URL, {'contained': 'true'}))
+        summary_etag, _ = ConditionalRequestUtils.get_resource_validators(
+            BaseFHIRConverter, self.imis_obj, self.factory.get(self._TEST_URL, {'_summary': 'true', 'page': '2'}))
+        self.assertEqual('W/"20220304102030000000"', etag)
+        self.assertEqual(3, len({etag, contained_etag, summary_etag}))
+        request = self.factory.get(self._TEST_URL, {'contained': 'true'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertFalse(ConditionalRequestUtils.is_not_modified(request, contained_etag, None))
+
+    def test_validators_of_resources_built_from_related_rows(self):
+        class RelatedRowsConverter(BaseFHIRConverter):
+            fhir_validators_supported = False
+
+        self.assertEqual((None, None), ConditionalRequestUtils.get_resource_validators(
+            RelatedRowsConverter, self.imis_obj))
+
+    def test_since_parameter(self):
+        since_filter = QuerysetSinceParameter('validity_from').build_filter('2022-03-04')
+        self.assertEqual(datetime.datetime(2022, 3, 4), since_filter.value)
+        with self.assertRaises(ValueError):
+            QuerysetSinceParameter('validity_from').build_filter('yesterday')
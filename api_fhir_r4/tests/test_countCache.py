@@ -0,0 +1,57 @@
+from unittest import mock
+
+from django.test import TestCase
+from location.models import Location
+
+from api_fhir_r4.cache import QueryCountCache
+from api_fhir_r4.cache.generations import CacheGenerations, ProcessCacheValidity
+from api_fhir_r4.configurations import R4CountCacheConfig
+from api_fhir_r4.paginations import CachedCountQueryset
+from api_fhir_r4.tests import LocationTestMixin
+
+
+class QueryCountCacheTestCase(TestCase):
+
+    def setUp(self):
+        self.queryset = Location.objects.filter(validity_to__isnull=True, code='TEST-COUNT-CACHE')
+
+    def test_count_cached_until_table_changes(self):
+        real_count = mock.Mock(return_value=3)
+        self.assertEqual(3, QueryCountCache.get_count(self.queryset, real_count))
+        self.assertEqual(3, QueryCountCache.get_count(self.queryset, real_count))
+        self.assertEqual(1, real_count.call_count)
+
+        QueryCountCache.invalidate_table(Location._meta.db_table)
+        QueryCountCache.get_count(self.queryset, real_count)
+        self.assertEqual(2, real_count.call_count)
+
+    def test_table_invalidated_after_commit(self):
+        location = LocationTestMixin().create_test_imis_instance()
+        generation = QueryCountCache.get_table_generation(Location._meta.db_table)
+        with self.captureOnCommitCallbacks(execute=True):
+            location.save()
+            self.assertEqual(generation, QueryCountCache.get_table_generation(Location._meta.db_table))
+        self.assertNotEqual(generation, QueryCountCache.get_table_generation(Location._meta.db_table))
+
+    def test_query_tables(self):
+        sql = str(Location.objects.filter(parent__code='TEST-COUNT-CACHE').query)
+        self.assertEqual([Location._meta.db_table], QueryCountCache.get_query_tables(sql))
+
+    def test_cached_count_queryset(self):
+        self.assertEqual(self.queryset.count(), CachedCountQueryset(self.queryset).count())
+
+    @mock.patch.object(R4CountCacheConfig, 'get_count_cache_max_entries', mock.Mock(return_value=1))
+    def test_max_entries(self):
+        other_queryset = Location.objects.filter(code='TEST-COUNT-CACHE-OTHER')
+        real_count = mock.Mock(return_value=1)
+        QueryCountCache.get_count(self.queryset, real_count)
+        QueryCountCache.get_count(other_queryset, real_count)
+        QueryCountCache.get_count(self.queryset, real_count)
+        self.assertEqual(3, real_count.call_count)
+
+    @mock.patch.object(R4CountCacheConfig, 'get_count_cache_process_max_age', mock.Mock(return_value=30))
+    def test_process_cache_max_age(self):
+        with mock.patch.object(CacheGenerations, 'is_process_local', mock.Mock(return_value=True)):
+            self.assertEqual(30, ProcessCacheValidity.get_max_age())
+        with mock.patch.object(CacheGenerations, 'is_process_local', mock.Mock(return_value=False)):
+            self.assertIsNone(ProcessCacheValidity.get_max_age())
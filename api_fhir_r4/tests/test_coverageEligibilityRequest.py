@@ -31,6 +31,13 @@ class CoverageEligibilityRequestConverterTestCase(CoverageEligibilityRequestTest
         imis_coverage_eligibility_request = CoverageEligibilityRequestConverter.to_imis_obj(fhir_coverage_eligibility_request.dict(), None)
         self.verify_imis_instance(imis_coverage_eligibility_request)
 
+    def test_to_imis_objs(self):
+        fhir_coverage_eligibility_request = self.create_test_fhir_instance()
+        imis_coverage_eligibility_requests = CoverageEligibilityRequestConverter.to_imis_objs(
+            fhir_coverage_eligibility_request.dict(), None)
+        self.assertEqual(1, len(imis_coverage_eligibility_requests))
+        self.verify_imis_instance(imis_coverage_eligibility_requests[0])
+
     def test_create_object_from_json(self):
         dict_coverage_eligibility_response = json.loads(self._test_coverage_eligibility_response_json_representation)
         fhir_coverage_eligibility_response = CoverageEligibilityResponse(**dict_coverage_eligibility_response)
@@ -0,0 +1,63 @@
+from unittest import mock
+
+from django.test import TestCase, RequestFactory
+from rest_framework.exceptions import ValidationError
+
+from api_fhir_r4.converters import PatientConverter, GroupConverter
+from api_fhir_r4.element_selection import ElementSelection
+
+
+class ElementSelectionTestCase(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.factory = RequestFactory()
+
+    def _from_query(self, query, strict=True):
+        return ElementSelection.from_request(self.factory.get(f'/Patient/?{query}'), strict)
+
+    def test_from_request(self):
+        self.assertIsNone(self._from_query(''))
+        self.assertIsNone(self._from_query('_summary=false'))
+        self.assertTrue(self._from_query('_summary=count').is_count)
+        self.assertEqual({'name', 'gender'}, self._from_query('_elements=name,gender').elements)
+
+    def test_invalid_summary(self):
+        with self.assertRaises(ValidationError):
+            self._from_query('_summary=everything')
+        self.assertIsNone(self._from_query('_summary=everything', strict=False))
+
+    def test_filter_resource(self):
+        selection = self._from_query('_elements=name')
+        resource = {'resourceType': 'Patient', 'id': '1', 'name': [{'text': 'Test'}], 'photo': [{}]}
+        filtered = selection.filter_resource(resource)
+        self.assertEqual(['resourceType', 'id', 'name', 'meta'], list(filtered))
+        self.assertEqual([ElementSelection.SUBSETTED_TAG], filtered['meta']['tag'])
+
+    def test_summary_elements(self):
+        selection = self._from_query('_summary=true')
+        self.assertTrue(selection.includes('name', PatientConverter.fhir_summary_elements))
+        self.assertFalse(selection.includes('photo', PatientConverter.fhir_summary_elements))
+        self.assertTrue(selection.includes('photo'))
+
+    def test_steps_selected_for_converted_resource_only(self):
+        selection = self._from_query('_elements=name')
+        with ElementSelection.activate(selection, PatientConverter):
+            self.assertTrue(PatientConverter.is_fhir_step_selected('build_human_names'))
+            self.assertFalse(PatientConverter.is_fhir_step_selected('build_fhir_photo'))
+            # steps which aren't declared are always built
+            self.assertTrue(PatientConverter.is_fhir_step_selected('build_fhir_pk'))
+        with ElementSelection.activate(selection, GroupConverter):
+            self.assertTrue(PatientConverter.is_fhir_step_selected('build_fhir_photo'))
+        with ElementSelection.activate(selection):
+            self.assertTrue(PatientConverter.is_fhir_step_selected('build_fhir_photo'))
+            self.assertIs(selection, ElementSelection.current())
+
+    def test_skipped_steps_not_executed(self):
+        step = mock.Mock()
+        step.__name__ = 'build_fhir_photo'
+        with ElementSelection.activate(self._from_query('_elements=name'), PatientConverter):
+            PatientConverter.build_fhir_step(step, None, None)
+        step.assert_not_called()
+        PatientConverter.build_fhir_step(step, None, None)
+        step.assert_called_once_with(None, None)
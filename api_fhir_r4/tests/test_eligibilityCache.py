@@ -0,0 +1,198 @@
+import json
+import os
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import TestCase
+from rest_framework.exceptions import ValidationError
+
+from api_fhir_r4.cache import EligibilityCache
+from api_fhir_r4.configurations import R4CoverageEligibilityConfiguration
+from api_fhir_r4.eligibility import CoverageEligibilityEvaluator
+from api_fhir_r4.serializers import CoverageEligibilityRequestSerializer
+from insuree.test_helpers import create_test_insuree
+from medical.test_helpers import create_test_item, create_test_service
+from policy.models import Policy
+from policy.services import EligibilityRequest
+from policy.test_helpers import create_test_policy
+from product.test_helpers import create_test_product, create_test_product_item, create_test_product_service
+
+
+class EligibilityCacheTestCase(TestCase):
+    _TEST_KEY = ('chfid', 'STEST', 'ITEST')
+    _TEST_OTHER_KEY = ('other_chfid', 'STEST', None)
+
+    def setUp(self):
+        EligibilityCache.invalidate()
+
+    def _store(self, *keys):
+        cache_keys = EligibilityCache.get_keys(list(keys))
+        EligibilityCache.set_many(cache_keys, {key: f'evaluation of {key[0]}' for key in keys})
+
+    def _get(self, *keys):
+        return EligibilityCache.get_many(EligibilityCache.get_keys(list(keys)))
+
+    def test_round_trip(self):
+        self._store(self._TEST_KEY)
+        self.assertEqual({self._TEST_KEY: 'evaluation of chfid'}, self._get(self._TEST_KEY, self._TEST_OTHER_KEY))
+
+    def test_insuree_invalidation(self):
+        self._store(self._TEST_KEY, self._TEST_OTHER_KEY)
+        EligibilityCache.invalidate(['chfid'])
+        self.assertEqual([self._TEST_OTHER_KEY], list(self._get(self._TEST_KEY, self._TEST_OTHER_KEY)))
+
+    def test_global_invalidation(self):
+        self._store(self._TEST_KEY, self._TEST_OTHER_KEY)
+        EligibilityCache.invalidate()
+        self.assertEqual({}, self._get(self._TEST_KEY, self._TEST_OTHER_KEY))
+
+    def test_evaluation_during_invalidation_not_stored(self):
+        cache_keys = EligibilityCache.get_keys([self._TEST_KEY])
+        EligibilityCache.invalidate(['chfid'])
+        EligibilityCache.set_many(cache_keys, {self._TEST_KEY: 'outdated'})
+        self.assertEqual({}, self._get(self._TEST_KEY))
+
+
+class CoverageEligibilityEvaluatorTestCase(TestCase):
+
+    def setUp(self):
+        EligibilityCache.invalidate()
+        self.evaluator = CoverageEligibilityEvaluator(mock.Mock())
+
+    def _evaluate_keys(self, keys):
+        return {key: CoverageEligibilityEvaluator.build_empty_evaluation(key) for key in keys}
+
+    @mock.patch.object(CoverageEligibilityEvaluator, 'get_visible_chf_ids', mock.Mock(return_value={'chfid'}))
+    def test_distinct_requests_evaluated_once(self):
+        requests = [
+            EligibilityRequest('chfid', 'STEST', None),
+            EligibilityRequest('chfid', 'STEST', None),
+            EligibilityRequest('chfid', None, 'ITEST'),
+        ]
+        with mock.patch.object(CoverageEligibilityEvaluator, 'evaluate_keys',
+                               side_effect=self._evaluate_keys) as evaluate_keys:
+            evaluations = self.evaluator.evaluate(requests)
+            self.evaluator.evaluate(requests)
+        evaluate_keys.assert_called_once_with([('chfid', 'STEST', None), ('chfid', None, 'ITEST')])
+        self.assertEqual(3, len(evaluations))
+        self.assertEqual(evaluations[0], evaluations[1])
+
+    @mock.patch.object(CoverageEligibilityEvaluator, 'get_visible_chf_ids', mock.Mock(return_value=set()))
+    def test_insuree_not_visible_to_user(self):
+        with mock.patch.object(CoverageEligibilityEvaluator, 'evaluate_keys', side_effect=self._evaluate_keys):
+            evaluation, = self.evaluator.evaluate([EligibilityRequest('chfid', 'STEST', None)])
+        self.assertIsNone(evaluation.patient)
+        self.assertEqual([], evaluation.insurances)
+
+    @mock.patch.object(CoverageEligibilityEvaluator, 'get_visible_chf_ids', mock.Mock(return_value={'chfid'}))
+    def test_fallback_evaluation_not_cached(self):
+        def evaluate_keys(keys):
+            return {key: evaluation._replace(fallback=True) for key, evaluation in self._evaluate_keys(keys).items()}
+
+        requests = [EligibilityRequest('chfid', 'STEST', None)]
+        with mock.patch.object(CoverageEligibilityEvaluator, 'evaluate_keys',
+                               side_effect=evaluate_keys) as mocked_evaluate_keys:
+            self.evaluator.evaluate(requests)
+            self.evaluator.evaluate(requests)
+        self.assertEqual(2, mocked_evaluate_keys.call_count)
+
+
+class CoverageEligibilityEvaluatorQueryCountTestCase(TestCase):
+    _TEST_CHF_ID_PREFIX = 'TEQ'
+    _TEST_SERVICE_CODE = 'SEQ01'
+    _TEST_ITEM_CODE = 'IEQ01'
+    # insurees, policies, products, covered services and covered items
+    _EXPECTED_QUERIES = 5
+
+    def setUp(self):
+        super().setUp()
+        self.product = create_test_product('TEQP1')
+        service = create_test_service('D', custom_props={'code': self._TEST_SERVICE_CODE})
+        item = create_test_item('D', custom_props={'code': self._TEST_ITEM_CODE})
+        create_test_product_service(self.product, service)
+        create_test_product_item(self.product, item)
+        self.evaluator = CoverageEligibilityEvaluator(mock.Mock())
+
+    def _create_insurees(self, count):
+        chf_ids = []
+        for index in range(count):
+            insuree = create_test_insuree(custom_props={'chf_id': f'{self._TEST_CHF_ID_PREFIX}{index:05}'})
+            create_test_policy(self.product, insuree, custom_props={'status': Policy.STATUS_ACTIVE})
+            chf_ids.append(insuree.chf_id)
+        return chf_ids
+
+    def _enquiry(self, key):
+        return CoverageEligibilityEvaluator._build_default_enquiry()._replace(prod_id=self.product.id)
+
+    def test_evaluate_keys_query_count_independent_of_insuree_count(self):
+        chf_ids = self._create_insurees(5)
+        keys = [(chf_id, self._TEST_SERVICE_CODE, self._TEST_ITEM_CODE) for chf_id in chf_ids] \
+            + [('unknown', self._TEST_SERVICE_CODE, None)]
+        # the stored procedure is executed for every key, without any other query
+        with mock.patch.object(CoverageEligibilityEvaluator, '_run_service_item_enquiry', side_effect=self._enquiry):
+            with self.assertNumQueries(self._EXPECTED_QUERIES):
+                self.evaluator.evaluate_keys(keys[:1])
+            with self.assertNumQueries(self._EXPECTED_QUERIES):
+                evaluations = self.evaluator.evaluate_keys(keys)
+
+        self.assertEqual(len(keys), len(evaluations))
+        for key in keys[:-1]:
+            evaluation = evaluations[key]
+            self.assertEqual(self.product.code, evaluation.product_code)
+            self.assertTrue(evaluation.service_covered)
+            self.assertTrue(evaluation.item_covered)
+            self.assertEqual(1, len(evaluation.insurances))
+        self.assertIsNone(evaluations[keys[-1]].patient)
+        self.assertIsNone(evaluations[keys[-1]].enquiry)
+
+    def test_failed_enquiry_marked_as_fallback(self):
+        key = (self._create_insurees(1)[0], self._TEST_SERVICE_CODE, None)
+        with mock.patch.object(CoverageEligibilityEvaluator, '_run_service_item_enquiry', return_value=None):
+            evaluation = self.evaluator.evaluate_keys([key])[key]
+        self.assertTrue(evaluation.fallback)
+        self.assertIsNone(evaluation.enquiry.prod_id)
+        self.assertFalse(evaluation.service_covered)
+
+
+class CoverageEligibilityRequestBatchTestCase(TestCase):
+    _TEST_REQUEST_JSON_PATH = '/test/test_coverageEligibilityRequest.json'
+
+    def setUp(self):
+        super().setUp()
+        dir_path = os.path.dirname(os.path.realpath(__file__))
+        with open(dir_path + self._TEST_REQUEST_JSON_PATH) as file:
+            self.request_resource = json.load(file)
+        self.serializer = CoverageEligibilityRequestSerializer(
+            context={'request': SimpleNamespace(user=mock.Mock())})
+
+    def _evaluate(self, eligibility_requests):
+        return [CoverageEligibilityEvaluator.get_key(request) for request in eligibility_requests]
+
+    def _bundle(self, *resources, bundle_type='batch'):
+        return {'resourceType': 'Bundle', 'type': bundle_type,
+                'entry': [{'resource': resource} for resource in resources]}
+
+    @mock.patch.object(CoverageEligibilityRequestSerializer, 'to_representation', lambda self, obj: {'keys': obj})
+    def test_create_batch(self):
+        bundle = self._bundle(self.request_resource, {'resourceType': 'Patient'}, self.request_resource)
+        with mock.patch.object(CoverageEligibilityEvaluator, 'evaluate', autospec=True,
+                               side_effect=lambda evaluator, requests: self._evaluate(requests)) as evaluate:
+            response = self.serializer.create_batch(bundle)
+
+        # requests of all valid entries are evaluated at once
+        evaluate.assert_called_once()
+        self.assertEqual(2, len(evaluate.call_args[0][1]))
+        self.assertEqual('batch-response', response['type'])
+        self.assertEqual(['200 OK', '400 Bad Request', '200 OK'],
+                         [entry['response']['status'] for entry in response['entry']])
+        expected_keys = [('chfid', 'STEST', 'ITEST')]
+        self.assertEqual(expected_keys, response['entry'][0]['resource']['keys'])
+        self.assertEqual(expected_keys, response['entry'][2]['resource']['keys'])
+        self.assertEqual('OperationOutcome', response['entry'][1]['response']['outcome']['resourceType'])
+
+    def test_create_batch_rejected(self):
+        with self.assertRaises(ValidationError):
+            self.serializer.create_batch(self._bundle(self.request_resource, bundle_type='transaction'))
+        with mock.patch.object(R4CoverageEligibilityConfiguration, 'get_eligibility_max_batch_size', return_value=1):
+            with self.assertRaises(ValidationError):
+                self.serializer.create_batch(self._bundle(self.request_resource, self.request_resource))
@@ -1,8 +1,20 @@
+import datetime
+
+from django.test import TestCase
+from rest_framework.test import APITestCase
+
+from api_fhir_r4.configurations import GeneralConfiguration
 from api_fhir_r4.converters import GroupConverter
 
 from fhir.resources.group import Group
-from api_fhir_r4.tests import GroupTestMixin
+from api_fhir_r4.tests import GroupTestMixin, GenericFhirAPITestMixin, FhirApiQueryCountTestMixin
 from api_fhir_r4.tests.mixin import ConvertToImisTestMixin, ConvertToFhirTestMixin, ConvertJsonToFhirTestMixin
+from api_fhir_r4.views.fhir.group import GroupViewSet
+from insuree.models import Family, Insuree
+from insuree.test_helpers import create_test_insuree
+from policy.models import Policy
+from policy.test_helpers import create_test_policy
+from product.test_helpers import create_test_product
 
 
 class GroupConverterTestCase(GroupTestMixin,
@@ -12,3 +24,80 @@ class GroupConverterTestCase(GroupTestMixin,
     converter = GroupConverter
     fhir_resource = Group
     json_repr = 'test/test_group.json'
+
+    def test_to_fhir_obj_uses_annotated_aggregates(self):
+        imis_instance = self.create_test_imis_instance()
+        imis_instance.has_active_policy = True
+        imis_instance.active_members_count = 1
+        fhir_group = Group.construct()
+        with self.assertNumQueries(0):
+            self.converter.build_fhir_active(fhir_group, imis_instance)
+            self.converter.build_fhir_quantity(fhir_group, imis_instance)
+        self.assertTrue(fhir_group.active)
+        self.assertEqual(1, fhir_group.quantity)
+
+
+class GroupAggregatesTestMixin(object):
+    _TEST_AGGREGATES_PRODUCT_CODE = 'TGAP1'
+    _TEST_AGGREGATES_CHF_ID_PREFIX = 'TGA'
+
+    def create_test_family(self, index, covered, members=1, left_members=0):
+        """
+        Family of `members` current insurees and `left_members` insurees no longer valid, the head is covered
+        by an active policy if `covered`.
+        """
+        chf_id = f'{self._TEST_AGGREGATES_CHF_ID_PREFIX}{index:03}'
+        head = create_test_insuree(custom_props={'chf_id': f'{chf_id}00'})
+        for member in range(1, members + left_members):
+            insuree = create_test_insuree(
+                with_family=False, custom_props={'chf_id': f'{chf_id}{member:02}', 'family': head.family})
+            if member >= members:
+                Insuree.objects.filter(id=insuree.id).update(validity_to=datetime.datetime.now())
+        if covered:
+            create_test_policy(self._get_aggregates_product(), head, custom_props={'status': Policy.STATUS_ACTIVE})
+        return head.family
+
+    def _get_aggregates_product(self):
+        if getattr(self, '_aggregates_product', None) is None:
+            self._aggregates_product = create_test_product(self._TEST_AGGREGATES_PRODUCT_CODE)
+        return self._aggregates_product
+
+
+class GroupAggregatesTestCase(GroupAggregatesTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.covered_family = self.create_test_family(0, covered=True, members=2, left_members=1)
+        self.uncovered_family = self.create_test_family(1, covered=False)
+
+    def _build_aggregates(self, imis_family):
+        fhir_group = Group.construct()
+        GroupConverter.build_fhir_active(fhir_group, imis_family)
+        GroupConverter.build_fhir_quantity(fhir_group, imis_family)
+        return fhir_group.active, fhir_group.quantity
+
+    def test_annotated_aggregates_match_converter(self):
+        families = [self.covered_family, self.uncovered_family]
+        annotated = {family.id: family for family in GroupViewSet.annotate_group_aggregates(
+            Family.objects.filter(id__in=[family.id for family in families]))}
+        self.assertEqual((True, 2), self._build_aggregates(annotated[self.covered_family.id]))
+        self.assertEqual((False, 1), self._build_aggregates(annotated[self.uncovered_family.id]))
+        for family in families:
+            with self.subTest(family=family.id):
+                # family loaded without the annotations is evaluated by the converter queries
+                self.assertEqual(self._build_aggregates(Family.objects.get(id=family.id)),
+                                 self._build_aggregates(annotated[family.id]))
+
+
+class GroupListQueryCountAPITests(GroupAggregatesTestMixin, GenericFhirAPITestMixin, FhirApiQueryCountTestMixin,
+                                  APITestCase):
+    base_url = GeneralConfiguration.get_base_url() + 'Group/'
+
+    def setUp(self):
+        super().setUp()
+        for index in range(self._QUERY_COUNT_PAGE_SIZE):
+            self.create_test_family(index, covered=index % 2 == 0, members=2)
+        self.login()
+
+    def test_list_query_count_independent_of_page_size(self):
+        self.assertQueryCountIndependentOfPageSize(self.base_url)
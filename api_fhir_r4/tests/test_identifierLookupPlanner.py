@@ -0,0 +1,80 @@
+from django.db.models import Q
+from django.test import TestCase
+from location.models import Location
+
+from api_fhir_r4.model_retrievers import IdentifierKind, IdentifierLookupPlanner, UUIDIdentifierModelRetriever, \
+    DatabaseIdentifierModelRetriever, CodeIdentifierModelRetriever, CHFIdentifierModelRetriever
+from api_fhir_r4.tests import LocationTestMixin
+
+
+class HistoricalCodeIdentifierModelRetriever(CodeIdentifierModelRetriever):
+
+    @classmethod
+    def get_additional_filter(cls):
+        return Q(validity_to__isnull=False)
+
+
+class ExcludingCodeIdentifierModelRetriever(CodeIdentifierModelRetriever):
+
+    @classmethod
+    def retriever_additional_queryset_filtering(cls, queryset):
+        return queryset.none()
+
+
+class IdentifierLookupPlannerTestCase(TestCase):
+    _RETRIEVERS = [UUIDIdentifierModelRetriever, DatabaseIdentifierModelRetriever, CodeIdentifierModelRetriever]
+
+    def setUp(self):
+        super().setUp()
+        self.village = LocationTestMixin().create_test_imis_instance()
+        self.village.save()
+        self.queryset = Location.objects.filter(validity_to__isnull=True)
+
+    def test_classify(self):
+        self.assertEqual(IdentifierKind.UUID, IdentifierKind.classify('0d8d6d3f-6b0c-4d4a-9b7e-2c5d7e0a1f3b'))
+        self.assertEqual(IdentifierKind.INTEGER, IdentifierKind.classify('123'))
+        self.assertEqual(IdentifierKind.INTEGER, IdentifierKind.classify(123))
+        self.assertEqual(IdentifierKind.CODE, IdentifierKind.classify('RTDTMTVT'))
+
+    def test_resolve_by_uuid(self):
+        with self.assertNumQueries(1):
+            retriever, location = IdentifierLookupPlanner.resolve(
+                self.queryset, self._RETRIEVERS, str(self.village.uuid))
+        self.assertEqual(UUIDIdentifierModelRetriever, retriever)
+        self.assertEqual(self.village.id, location.id)
+
+    def test_resolve_by_code(self):
+        with self.assertNumQueries(1):
+            retriever, location = IdentifierLookupPlanner.resolve(self.queryset, self._RETRIEVERS, self.village.code)
+        self.assertEqual(CodeIdentifierModelRetriever, retriever)
+        self.assertEqual(self.village.id, location.id)
+
+    def test_resolve_by_id_before_code(self):
+        with self.assertNumQueries(1):
+            retriever, location = IdentifierLookupPlanner.resolve(
+                self.queryset, self._RETRIEVERS, str(self.village.id))
+        self.assertEqual(DatabaseIdentifierModelRetriever, retriever)
+        self.assertEqual(self.village.id, location.id)
+
+    def test_not_found(self):
+        self.assertEqual((None, None), IdentifierLookupPlanner.resolve(
+            self.queryset, self._RETRIEVERS, 'NOT-EXISTING'))
+
+    def test_retriever_of_missing_field_skipped(self):
+        retriever, location = IdentifierLookupPlanner.resolve(
+            self.queryset, [CHFIdentifierModelRetriever, CodeIdentifierModelRetriever], self.village.code)
+        self.assertEqual(CodeIdentifierModelRetriever, retriever)
+        self.assertEqual(self.village.id, location.id)
+
+    def test_additional_filtering_applied_to_own_lookup(self):
+        for retrievers in ([CodeIdentifierModelRetriever, HistoricalCodeIdentifierModelRetriever],
+                           [HistoricalCodeIdentifierModelRetriever, CodeIdentifierModelRetriever],
+                           [ExcludingCodeIdentifierModelRetriever, CodeIdentifierModelRetriever]):
+            with self.assertNumQueries(1):
+                retriever, location = IdentifierLookupPlanner.resolve(self.queryset, retrievers, self.village.code)
+            self.assertEqual(CodeIdentifierModelRetriever, retriever)
+            self.assertEqual(self.village.id, location.id)
+
+    def test_additional_filtering_of_single_retriever(self):
+        self.assertEqual((None, None), IdentifierLookupPlanner.resolve(
+            self.queryset, [HistoricalCodeIdentifierModelRetriever], self.village.code))
@@ -0,0 +1,46 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from api_fhir_r4.cache import LocationIndex
+from api_fhir_r4.cache.generations import ProcessCacheValidity
+from api_fhir_r4.tests import LocationTestMixin
+
+
+class LocationIndexTestCase(TestCase):
+
+    def setUp(self):
+        self.village = LocationTestMixin().create_test_imis_instance()
+        self.village.save()
+        LocationIndex.invalidate()
+
+    def test_lookups(self):
+        self.assertEqual(self.village.id, LocationIndex.get_by_code(self.village.code).id)
+        self.assertEqual(self.village.code, LocationIndex.get_by_uuid(self.village.uuid).code)
+        self.assertEqual(self.village.code, LocationIndex.get_by_uuid(str(self.village.uuid).upper()).code)
+        self.assertIsNone(LocationIndex.get_by_code('NOT-EXISTING'))
+
+    def test_ancestors_without_queries(self):
+        LocationIndex.get_by_id(self.village.id)
+        with self.assertNumQueries(0):
+            self.assertEqual('RTDTMT', LocationIndex.get_ancestor(self.village, 1).code)
+            self.assertEqual('RT', LocationIndex.get_ancestor(self.village, 3).code)
+
+    def test_filter_by_name(self):
+        district = LocationIndex.filter_by_name(LocationTestMixin._TEST_NAME, LocationTestMixin._TEST_NAME, 'D')
+        self.assertEqual(['RTDT'], [location.code for location in district])
+
+    def test_reloaded_after_save(self):
+        LocationIndex.get_by_id(self.village.id)
+        self.village.name = 'RENAMED'
+        self.village.save()
+        self.assertEqual('RENAMED', LocationIndex.get_by_id(self.village.id).name)
+
+    @mock.patch.object(ProcessCacheValidity, 'GENERATION_CHECK_INTERVAL', 0)
+    @mock.patch.object(ProcessCacheValidity, 'get_max_age', mock.Mock(return_value=0))
+    def test_reloaded_after_max_age(self):
+        with mock.patch.object(LocationIndex, '_get_generation', mock.Mock(return_value=1)):
+            LocationIndex.get_by_id(self.village.id)
+            # update without signals, as done by another process with a process local cache
+            type(self.village).objects.filter(id=self.village.id).update(name='RENAMED')
+            self.assertEqual('RENAMED', LocationIndex.get_by_id(self.village.id).name)
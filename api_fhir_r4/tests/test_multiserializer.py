@@ -0,0 +1,117 @@
+from unittest import mock
+
+from django.test import TestCase
+from location.models import Location
+
+from api_fhir_r4.cache import QueryCountCache
+from api_fhir_r4.multiserializer.mixins import _JoinedQuerysets, GenericMultiSerializerViewsetMixin, \
+    _MultiserializerPermissionClassWrapper
+from api_fhir_r4.permissions import FHIRApiHFPermissions, FHIRApiInsureePermissions
+
+
+class JoinedQuerysetsTestCase(TestCase):
+
+    def setUp(self):
+        self.joined = _JoinedQuerysets([0, 1, 2], [], [3, 4])
+
+    def test_len(self):
+        self.assertEqual(len(self.joined), 5)
+        self.assertEqual(self.joined.count(), 5)
+
+    def test_index(self):
+        self.assertEqual(self.joined[0], 0)
+        self.assertEqual(self.joined[3], 3)
+        self.assertEqual(self.joined[-1], 4)
+        with self.assertRaises(IndexError):
+            self.joined[5]
+
+    def test_slice_across_parts(self):
+        self.assertEqual(self.joined[1:4], [1, 2, 3])
+        self.assertEqual(self.joined[3:10], [3, 4])
+        self.assertEqual(self.joined[:2], [0, 1])
+        self.assertEqual(self.joined[5:7], [])
+
+    def test_iteration(self):
+        self.assertEqual(list(self.joined), [0, 1, 2, 3, 4])
+
+
+@mock.patch.object(QueryCountCache, 'get_count',
+                   mock.Mock(side_effect=lambda queryset, real_count, **kwargs: real_count()))
+class JoinedQuerysetsQuerysetTestCase(TestCase):
+    _TEST_FIRST_CODES = ['JQ1', 'JQ2', 'JQ3']
+    _TEST_SECOND_CODES = ['JQ4', 'JQ5', 'JQ6']
+
+    def setUp(self):
+        super().setUp()
+        for code in self._TEST_FIRST_CODES + self._TEST_SECOND_CODES:
+            Location(code=code, name=code, type='R').save()
+        self.joined = _JoinedQuerysets(
+            Location.objects.filter(code__in=self._TEST_FIRST_CODES).order_by('code'),
+            Location.objects.filter(code__in=self._TEST_SECOND_CODES).order_by('code'))
+
+    def _codes(self, locations):
+        return [location.code for location in locations]
+
+    def test_slices_pushed_down_to_parts(self):
+        # parts are counted once, every part overlapping with the slice is queried with its own limits
+        with self.assertNumQueries(4):
+            self.assertEqual(['JQ3', 'JQ4'], self._codes(self.joined[2:4]))
+        with self.assertNumQueries(1):
+            self.assertEqual(['JQ1', 'JQ2'], self._codes(self.joined[0:2]))
+        with self.assertNumQueries(1):
+            self.assertEqual(['JQ5', 'JQ6'], self._codes(self.joined[4:10]))
+        with self.assertNumQueries(0):
+            self.assertEqual(6, self.joined.count())
+            self.assertEqual([], self.joined[6:8])
+
+    def test_index(self):
+        with self.assertNumQueries(3):
+            self.assertEqual('JQ4', self.joined[3].code)
+        with self.assertNumQueries(1):
+            self.assertEqual('JQ6', self.joined[-1].code)
+
+
+class MultiSerializerRequestMemoTestCase(TestCase):
+
+    class TestView(GenericMultiSerializerViewsetMixin):
+        def __init__(self, request):
+            self.request = request
+            self.serializers_built = 0
+
+        @property
+        def serializers(self):
+            self.serializers_built += 1
+            return {
+                'hf': (Location.objects.all(), lambda context: True, (FHIRApiHFPermissions,)),
+                'insuree': (Location.objects.all(), lambda context: True, (FHIRApiInsureePermissions,)),
+            }
+
+        def get_serializer_context(self):
+            return {'request': self.request}
+
+        def permission_denied(self, request, message=None):
+            raise AssertionError(message)
+
+    def _build_request(self, permitted):
+        request = mock.Mock(method='GET')
+        request.user.has_perms.side_effect = lambda perms: perms == permitted
+        return request
+
+    def test_evaluated_once_per_request(self):
+        request = self._build_request(FHIRApiHFPermissions.permissions_get)
+        view = self.TestView(request)
+        view.validate_single_eligible_serializer()
+        self.assertEqual(['hf'], [serializer for serializer, _ in view.get_eligible_serializers_iterator()])
+        self.assertEqual(1, view.serializers_built)
+        self.assertEqual(2, request.user.has_perms.call_count)
+
+    def test_evaluated_again_for_other_request(self):
+        view = self.TestView(self._build_request(FHIRApiHFPermissions.permissions_get))
+        self.assertEqual(['hf'], view.get_eligible_serializers())
+        view.request = self._build_request(FHIRApiInsureePermissions.permissions_get)
+        self.assertEqual(['insuree'], view.get_eligible_serializers())
+        self.assertEqual(2, view.serializers_built)
+
+    def test_permission_wrapper_built_once(self):
+        self.assertIs(_MultiserializerPermissionClassWrapper(FHIRApiHFPermissions),
+                      _MultiserializerPermissionClassWrapper(FHIRApiHFPermissions))
@@ -0,0 +1,154 @@
+import json
+from unittest import mock
+
+from django.http import StreamingHttpResponse
+from django.test import TestCase
+from location.models import Location
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api_fhir_r4.configurations import GeneralConfiguration
+from api_fhir_r4.paginations import FhirBundleResultsSetPagination, KeysetPaginator
+from api_fhir_r4.renderers import FHIRJSONRenderer
+from api_fhir_r4.utils import TimeUtils
+
+
+class FhirBundleResultsSetPaginationCursorTestCase(TestCase):
+    _TEST_URL = '/api_fhir_r4/Organization/'
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+
+    def _request(self, **params):
+        return Request(self.factory.get(self._TEST_URL, params))
+
+    def test_cursor_round_trip(self):
+        pagination = FhirBundleResultsSetPagination()
+        position = {'p': 1, 'v': '2021-01-01T00:00:00', 'k': 15}
+        cursor = pagination.encode_cursor(position)
+        self.assertEqual(pagination.decode_cursor(cursor), position)
+
+    def test_invalid_cursor(self):
+        pagination = FhirBundleResultsSetPagination()
+        with self.assertRaises(ValidationError):
+            pagination.decode_cursor('not-a-cursor')
+
+    def test_page_number_mode_by_default(self):
+        pagination = FhirBundleResultsSetPagination()
+        page = pagination.paginate_queryset(list(range(5)), self._request(_count=2))
+        self.assertFalse(pagination.cursor_mode)
+        self.assertEqual(page, [0, 1])
+
+    def test_cursor_mode_for_list(self):
+        data = list(range(5))
+        pagination = FhirBundleResultsSetPagination()
+        page = pagination.paginate_queryset(data, self._request(_count=2, _cursor=''))
+        self.assertTrue(pagination.cursor_mode)
+        self.assertEqual(page, [0, 1])
+        self.assertEqual(pagination.get_total_count(), 5)
+
+        pagination = FhirBundleResultsSetPagination()
+        cursor = FhirBundleResultsSetPagination.encode_cursor({'o': 4})
+        page = pagination.paginate_queryset(data, self._request(_count=2, _cursor=cursor))
+        self.assertEqual(page, [4])
+        self.assertIsNone(pagination.get_next_link())
+
+
+class FhirBundleResultsSetPaginationStreamingTestCase(TestCase):
+    _TEST_URL = '/api_fhir_r4/Patient/'
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+
+    def _request(self, **params):
+        return Request(self.factory.get(self._TEST_URL, params))
+
+    @mock.patch.object(GeneralConfiguration, 'get_stream_response_page_size', mock.Mock(return_value=3))
+    def test_streamed_bundle_matches_built_bundle(self):
+        data = [{'resourceType': 'Patient', 'id': str(i)} for i in range(5)]
+        pagination = FhirBundleResultsSetPagination()
+        page = pagination.paginate_queryset(data, self._request(_count=3))
+        response = pagination.get_paginated_response(iter(page))
+        self.assertIsInstance(response, StreamingHttpResponse)
+        streamed = json.loads(b''.join(response.streaming_content))
+
+        expected = json.loads(json.dumps(pagination.build_bundle_set(page).dict(), default=str))
+        self.assertEqual(expected, streamed)
+        self.assertEqual(5, streamed['total'])
+        self.assertEqual(['0', '1', '2'], [entry['resource']['id'] for entry in streamed['entry']])
+
+    @mock.patch.object(GeneralConfiguration, 'get_stream_response_page_size', mock.Mock(return_value=3))
+    def test_streamed_bundle_pretty(self):
+        data = [{'resourceType': 'Patient', 'id': str(i)} for i in range(5)]
+        request = self._request(_count=3, _pretty='true')
+        request.accepted_renderer = FHIRJSONRenderer()
+        pagination = FhirBundleResultsSetPagination()
+        page = pagination.paginate_queryset(data, request)
+        content = b''.join(pagination.get_paginated_response(page).streaming_content)
+        self.assertIn(b'\n  "resource": {', content)
+        self.assertEqual(['0', '1', '2'], [entry['resource']['id'] for entry in json.loads(content)['entry']])
+
+    @mock.patch.object(GeneralConfiguration, 'get_stream_response_page_size', mock.Mock(return_value=3))
+    def test_small_page_not_streamed(self):
+        pagination = FhirBundleResultsSetPagination()
+        pagination.paginate_queryset(list(range(5)), self._request(_count=2))
+        self.assertFalse(pagination.is_streaming_response())
+
+
+class KeysetPaginatorTestCase(TestCase):
+    # ordering values with ties, pages of two rows end in the middle of the ties
+    _TEST_LOCATIONS = [
+        ('KP1', '2021-01-01'), ('KP2', '2021-01-02'), ('KP3', '2021-01-02'), ('KP4', '2021-01-02'),
+        ('KP5', '2021-01-03'),
+    ]
+    _TEST_OTHER_CODES = ['KP6', 'KP7']
+
+    def setUp(self):
+        super().setUp()
+        for code, validity_from in self._TEST_LOCATIONS:
+            Location(code=code, name=code, type='R', validity_from=TimeUtils.str_to_date(validity_from)).save()
+        for code in self._TEST_OTHER_CODES:
+            Location(code=code, name=code, type='R').save()
+
+    def _queryset(self, codes, ordering='validity_from'):
+        return Location.objects.filter(code__in=codes).order_by(ordering)
+
+    def _get_pages(self, querysets, page_size):
+        pages = []
+        position = None
+        while True:
+            page, position = KeysetPaginator(querysets).get_page(position, page_size)
+            pages.append([location.code for location in page])
+            if position is None:
+                return pages
+            # position is passed to the next request in the cursor
+            position = FhirBundleResultsSetPagination().decode_cursor(
+                FhirBundleResultsSetPagination.encode_cursor(position))
+
+    def test_pages_with_ties(self):
+        codes = [code for code, _ in self._TEST_LOCATIONS]
+        self.assertEqual([['KP1', 'KP2'], ['KP3', 'KP4'], ['KP5']], self._get_pages([self._queryset(codes)], 2))
+
+    def test_descending_pages_with_ties(self):
+        codes = [code for code, _ in self._TEST_LOCATIONS]
+        pages = self._get_pages([self._queryset(codes, '-validity_from')], 2)
+        self.assertEqual([['KP5', 'KP4'], ['KP3', 'KP2'], ['KP1']], pages)
+
+    def test_filter_after(self):
+        queryset = self._queryset([code for code, _ in self._TEST_LOCATIONS])
+        last = queryset.get(code='KP3')
+        after = KeysetPaginator([queryset]).filter_after(queryset, 'validity_from', False, last.validity_from, last.pk)
+        self.assertEqual(['KP4', 'KP5'], [location.code for location in after.order_by('validity_from', 'pk')])
+
+    def test_page_ending_at_part_boundary(self):
+        first_part = self._queryset(['KP1', 'KP2'])
+        with self.assertNumQueries(2):
+            # rows of the part and existence of rows in the following ones, the empty queryset needs no query
+            page, position = KeysetPaginator([first_part, Location.objects.none(), self._queryset(['KP0'])]) \
+                .get_page(None, 2)
+        self.assertEqual(['KP1', 'KP2'], [location.code for location in page])
+        self.assertIsNone(position)
+
+        pages = self._get_pages([first_part, Location.objects.none(), self._queryset(self._TEST_OTHER_CODES, 'pk')], 2)
+        self.assertEqual([['KP1', 'KP2'], ['KP6', 'KP7']], pages)
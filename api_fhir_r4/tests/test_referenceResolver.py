@@ -0,0 +1,114 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import TestCase
+
+from api_fhir_r4.cache import ReferenceResolver, QueryCountCache
+from api_fhir_r4.cache.generations import ProcessCacheValidity
+from api_fhir_r4.configurations import R4ReferenceCacheConfig
+
+
+class ReferenceResolverTestCase(TestCase):
+    _CACHED_LABEL = 'medical.Diagnosis'
+    _REQUEST_SCOPED_LABEL = 'location.HealthFacility'
+
+    def setUp(self):
+        super().setUp()
+        ReferenceResolver.invalidate()
+        self._enabled = mock.patch.object(
+            R4ReferenceCacheConfig, 'get_reference_cache_enabled', mock.Mock(return_value=True))
+        self._max_entries = mock.patch.object(
+            R4ReferenceCacheConfig, 'get_reference_cache_max_entries', mock.Mock(return_value=5000))
+        self._generation = mock.patch.object(
+            QueryCountCache, 'get_table_generation', mock.Mock(return_value=1))
+        for patch in (self._enabled, self._max_entries, self._generation):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        ReferenceResolver.invalidate()
+        super().tearDown()
+
+    def _create_model(self, label):
+        model = SimpleNamespace(
+            _meta=SimpleNamespace(label=label, db_table=f'tbl{label.split(".")[1]}'),
+            objects=mock.Mock())
+        model.objects.get.side_effect = lambda **lookup: SimpleNamespace(**lookup)
+        return model
+
+    def test_reference_data_resolved_once(self):
+        model = self._create_model(self._CACHED_LABEL)
+        first = ReferenceResolver.get(model, code='A00')
+        second = ReferenceResolver.get(model, code='A00')
+        self.assertIs(first, second)
+        model.objects.get.assert_called_once_with(code='A00')
+
+    def test_reference_data_resolved_after_invalidation(self):
+        model = self._create_model(self._CACHED_LABEL)
+        ReferenceResolver.get(model, code='A00')
+        ReferenceResolver.invalidate(model)
+        ReferenceResolver.get(model, code='A00')
+        self.assertEqual(2, model.objects.get.call_count)
+
+    @mock.patch.object(ProcessCacheValidity, 'GENERATION_CHECK_INTERVAL', 0)
+    def test_reference_data_resolved_after_generation_change(self):
+        model = self._create_model(self._CACHED_LABEL)
+        ReferenceResolver.get(model, code='A00')
+        ReferenceResolver.get(model, code='A00')
+        model.objects.get.assert_called_once()
+        with mock.patch.object(QueryCountCache, 'get_table_generation', mock.Mock(return_value=2)):
+            ReferenceResolver.get(model, code='A00')
+        self.assertEqual(2, model.objects.get.call_count)
+
+    @mock.patch.object(ProcessCacheValidity, 'get_max_age', mock.Mock(return_value=0))
+    def test_reference_data_resolved_after_max_age(self):
+        model = self._create_model(self._CACHED_LABEL)
+        ReferenceResolver.get(model, code='A00')
+        ReferenceResolver.get(model, code='A00')
+        self.assertEqual(2, model.objects.get.call_count)
+
+    def test_least_recently_used_removed(self):
+        R4ReferenceCacheConfig.get_reference_cache_max_entries.return_value = 2
+        model = self._create_model(self._CACHED_LABEL)
+        ReferenceResolver.get(model, code='A00')
+        ReferenceResolver.get(model, code='A01')
+        ReferenceResolver.get(model, code='A00')
+        ReferenceResolver.get(model, code='A02')
+        model.objects.get.reset_mock()
+        ReferenceResolver.get(model, code='A00')
+        model.objects.get.assert_not_called()
+        ReferenceResolver.get(model, code='A01')
+        model.objects.get.assert_called_once_with(code='A01')
+
+    def test_other_models_resolved_once_per_request(self):
+        model = self._create_model(self._REQUEST_SCOPED_LABEL)
+        with ReferenceResolver.request_scope():
+            first = ReferenceResolver.get(model, uuid='hf-uuid')
+            with ReferenceResolver.request_scope():
+                second = ReferenceResolver.get(model, uuid='hf-uuid')
+        self.assertIs(first, second)
+        model.objects.get.assert_called_once()
+        with ReferenceResolver.request_scope():
+            ReferenceResolver.get(model, uuid='hf-uuid')
+        self.assertEqual(2, model.objects.get.call_count)
+
+    def test_other_models_not_kept_outside_of_request(self):
+        model = self._create_model(self._REQUEST_SCOPED_LABEL)
+        ReferenceResolver.get(model, uuid='hf-uuid')
+        ReferenceResolver.get(model, uuid='hf-uuid')
+        self.assertEqual(2, model.objects.get.call_count)
+
+    def test_request_scope_cleared(self):
+        model = self._create_model(self._REQUEST_SCOPED_LABEL)
+        with ReferenceResolver.request_scope():
+            ReferenceResolver.get(model, uuid='hf-uuid')
+            ReferenceResolver.clear_request_scope()
+            ReferenceResolver.get(model, uuid='hf-uuid')
+        self.assertEqual(2, model.objects.get.call_count)
+
+    def test_disabled(self):
+        R4ReferenceCacheConfig.get_reference_cache_enabled.return_value = False
+        model = self._create_model(self._CACHED_LABEL)
+        ReferenceResolver.get(model, code='A00')
+        ReferenceResolver.get(model, code='A00')
+        self.assertEqual(2, model.objects.get.call_count)
@@ -0,0 +1,57 @@
+import datetime
+import decimal
+import io
+import uuid
+
+from django.test import TestCase
+from rest_framework.exceptions import NotAcceptable, ParseError
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api_fhir_r4.parsers import FHIRJSONParser
+from api_fhir_r4.renderers import FHIRApplicationJSONRenderer, FHIRContentNegotiation, FHIRJSONRenderer
+
+
+class FHIRJSONRendererTestCase(TestCase):
+    _TEST_UUID = uuid.UUID('9a1c7f8e-7b0e-4c55-9d8e-1b7f0a6c2d33')
+
+    def setUp(self):
+        super().setUp()
+        self.factory = APIRequestFactory()
+        self.renderers = [FHIRApplicationJSONRenderer(), FHIRJSONRenderer()]
+
+    def _get_request(self, path):
+        return Request(self.factory.get(path))
+
+    def test_render_types(self):
+        rendered = FHIRJSONRenderer().render({
+            'id': self._TEST_UUID,
+            'amount': decimal.Decimal('10.50'),
+            'date': datetime.date(2022, 3, 1),
+        })
+        self.assertEqual(b'{"id":"9a1c7f8e-7b0e-4c55-9d8e-1b7f0a6c2d33","amount":10.5,"date":"2022-03-01"}', rendered)
+
+    def test_render_pretty(self):
+        rendered = FHIRJSONRenderer().render(
+            {'resourceType': 'Patient'}, renderer_context={'request': self._get_request('/Patient/?_pretty=true')})
+        self.assertEqual(b'{\n  "resourceType": "Patient"\n}', rendered)
+
+    def test_negotiation_format(self):
+        negotiation = FHIRContentNegotiation()
+        renderer, media_type = negotiation.select_renderer(self._get_request('/Patient/?_format=json'), self.renderers)
+        self.assertEqual('application/fhir+json', media_type)
+        renderer, media_type = negotiation.select_renderer(
+            self._get_request('/Patient/?_format=application/fhir+json'), self.renderers)
+        self.assertEqual('application/fhir+json', media_type)
+        renderer, media_type = negotiation.select_renderer(self._get_request('/Patient/'), self.renderers)
+        self.assertEqual('application/json', media_type)
+
+    def test_negotiation_unsupported_format(self):
+        with self.assertRaises(NotAcceptable):
+            FHIRContentNegotiation().select_renderer(self._get_request('/Patient/?_format=xml'), self.renderers)
+
+    def test_parse(self):
+        parsed = FHIRJSONParser().parse(io.BytesIO(b'{"resourceType": "Patient", "active": true}'))
+        self.assertEqual({'resourceType': 'Patient', 'active': True}, parsed)
+        with self.assertRaises(ParseError):
+            FHIRJSONParser().parse(io.BytesIO(b'{"resourceType": '))
@@ -0,0 +1,116 @@
+from unittest import mock
+
+from django.db import connection
+from django.http import HttpResponse
+from django.test import TestCase, RequestFactory
+
+from api_fhir_r4.configurations import GeneralConfiguration, R4RequestTimingConfig
+from api_fhir_r4.instrumentation import RequestTiming, LatencyAggregates, FHIRRequestTimingMiddleware
+
+
+class RequestTimingTestCase(TestCase):
+
+    def test_phases_measured_when_active(self):
+        with RequestTiming.phase(RequestTiming.PHASE_CONVERT):
+            self.assertIsNone(RequestTiming.current())
+
+        timing = RequestTiming('Claim')
+        with RequestTiming.activate(timing):
+            with RequestTiming.phase(RequestTiming.PHASE_CONVERT):
+                # contained resources are converted within the conversion of the resource
+                with mock.patch.object(timing, 'add', wraps=timing.add) as add:
+                    with RequestTiming.phase(RequestTiming.PHASE_CONVERT):
+                        pass
+                    add.assert_not_called()
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+        self.assertIsNone(RequestTiming.current())
+        self.assertIn(RequestTiming.PHASE_CONVERT, timing.durations)
+        self.assertEqual(1, timing.sql_count)
+        self.assertGreater(timing.durations[RequestTiming.PHASE_SQL], 0)
+
+    def test_server_timing_header(self):
+        timing = RequestTiming('Claim')
+        timing.add(RequestTiming.PHASE_SQL, 0.0125)
+        timing.add(RequestTiming.PHASE_DICT, 0.002)
+        timing.sql_count = 3
+        self.assertEqual('sql;dur=12.5;desc="3 queries", dict;dur=2.0', timing.build_server_timing_header())
+
+
+@mock.patch.object(R4RequestTimingConfig, 'get_request_timing_sample_size', mock.Mock(return_value=100))
+class LatencyAggregatesTestCase(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        LatencyAggregates.reset()
+
+    def tearDown(self):
+        LatencyAggregates.reset()
+        super().tearDown()
+
+    def test_percentiles(self):
+        for duration in range(1, 101):
+            timing = RequestTiming('Patient')
+            timing.add(RequestTiming.PHASE_CONVERT, duration / 1000)
+            timing.sql_count = duration % 2
+            LatencyAggregates.record(timing)
+
+        summary = LatencyAggregates.get_summary()['Patient']
+        self.assertEqual(100, summary['requests'])
+        self.assertEqual({'p50': 50.0, 'p95': 95.0, 'p99': 99.0}, summary['phases'][RequestTiming.PHASE_CONVERT])
+        self.assertEqual({'p50': 0, 'p95': 1, 'p99': 1}, summary[LatencyAggregates.SQL_COUNT])
+
+    def test_samples_limited(self):
+        with mock.patch.object(R4RequestTimingConfig, 'get_request_timing_sample_size', return_value=2):
+            for duration in (100, 1, 1):
+                timing = RequestTiming('Patient')
+                timing.add(RequestTiming.PHASE_VIEW, duration / 1000)
+                LatencyAggregates.record(timing)
+        summary = LatencyAggregates.get_summary()['Patient']
+        self.assertEqual(3, summary['requests'])
+        self.assertEqual(1.0, summary['phases'][RequestTiming.PHASE_VIEW]['p99'])
+
+
+@mock.patch.object(R4RequestTimingConfig, 'get_request_timing_enabled', mock.Mock(return_value=True))
+@mock.patch.object(R4RequestTimingConfig, 'get_request_timing_header_enabled', mock.Mock(return_value=True))
+@mock.patch.object(R4RequestTimingConfig, 'get_request_timing_log_enabled', mock.Mock(return_value=False))
+@mock.patch.object(R4RequestTimingConfig, 'get_request_timing_sample_size', mock.Mock(return_value=100))
+class FHIRRequestTimingMiddlewareTestCase(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.factory = RequestFactory()
+        LatencyAggregates.reset()
+
+    def tearDown(self):
+        LatencyAggregates.reset()
+        super().tearDown()
+
+    def _get_response(self, request):
+        with RequestTiming.phase(RequestTiming.PHASE_VIEW):
+            return HttpResponse()
+
+    def test_fhir_request_measured(self):
+        middleware = FHIRRequestTimingMiddleware(self._get_response)
+        response = middleware(self.factory.get(f'{GeneralConfiguration.get_base_url()}Claim/'))
+
+        metrics = [metric.split(';')[0] for metric in response[FHIRRequestTimingMiddleware.HEADER].split(', ')]
+        self.assertEqual([RequestTiming.PHASE_TOTAL, RequestTiming.PHASE_VIEW, RequestTiming.PHASE_SQL], metrics)
+        self.assertEqual(1, LatencyAggregates.get_summary()['Claim']['requests'])
+
+    def test_unknown_resource_types_aggregated_together(self):
+        middleware = FHIRRequestTimingMiddleware(self._get_response)
+        for path in ('Unknown1/', 'Unknown2/x'):
+            middleware(self.factory.get(f'{GeneralConfiguration.get_base_url()}{path}'))
+        middleware(self.factory.get(GeneralConfiguration.get_base_url()))
+        summary = LatencyAggregates.get_summary()
+        self.assertEqual(
+            {FHIRRequestTimingMiddleware.OTHER_RESOURCE_TYPE, FHIRRequestTimingMiddleware.ROOT_RESOURCE_TYPE},
+            set(summary))
+        self.assertEqual(2, summary[FHIRRequestTimingMiddleware.OTHER_RESOURCE_TYPE]['requests'])
+
+    def test_other_request_not_measured(self):
+        middleware = FHIRRequestTimingMiddleware(self._get_response)
+        response = middleware(self.factory.get('/api/graphql'))
+        self.assertFalse(response.has_header(FHIRRequestTimingMiddleware.HEADER))
+        self.assertEqual({}, LatencyAggregates.get_summary())
@@ -0,0 +1,93 @@
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
+from django.test import TestCase
+from django.utils.http import parse_http_date_safe
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+
+from api_fhir_r4.cache import FHIRResponseCache
+from api_fhir_r4.configurations import R4ResponseCacheConfig
+from api_fhir_r4.utils import ConditionalRequestUtils
+from product.test_helpers import create_test_product
+
+
+@mock.patch.object(R4ResponseCacheConfig, 'get_response_cache_enabled', mock.Mock(return_value=True))
+class FHIRResponseCacheTestCase(TestCase):
+    _TEST_URL = '/api_fhir_r4/Medication/'
+    _TEST_RESOURCE_TYPE = 'Medication'
+    _TEST_ETAG = 'W/"3"'
+    _TEST_LAST_MODIFIED = 1646389230
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.calls = 0
+
+    def _request(self, params=None, **headers):
+        request = Request(self.factory.get(self._TEST_URL, params or {}, **headers))
+        request.user = AnonymousUser()
+        return request
+
+    def _handler(self, request, *args, **kwargs):
+        self.calls += 1
+        response = Response({'resourceType': 'Bundle', 'total': self.calls})
+        return ConditionalRequestUtils.set_validators(response, self._TEST_ETAG, self._TEST_LAST_MODIFIED)
+
+    def test_query_string_is_normalized(self):
+        first = FHIRResponseCache.get_key(self._TEST_RESOURCE_TYPE, self._request({'_count': 2, 'page-offset': 1}))
+        second = FHIRResponseCache.get_key(self._TEST_RESOURCE_TYPE, self._request({'page-offset': 1, '_count': 2}))
+        self.assertEqual(first, second)
+
+    def test_response_cached_until_invalidated(self):
+        handler = FHIRResponseCache.wrap_handler(self._TEST_RESOURCE_TYPE, self._handler)
+        first = handler(self._request())
+        second = handler(self._request())
+        self.assertEqual(1, self.calls)
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(first['ETag'], second['ETag'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            FHIRResponseCache.invalidate(self._TEST_RESOURCE_TYPE)
+        third = handler(self._request())
+        self.assertEqual(2, self.calls)
+        self.assertEqual(2, third.data['total'])
+
+    def test_invalidated_after_commit(self):
+        handler = FHIRResponseCache.wrap_handler(self._TEST_RESOURCE_TYPE, self._handler)
+        handler(self._request())
+        with self.captureOnCommitCallbacks() as callbacks:
+            FHIRResponseCache.invalidate(self._TEST_RESOURCE_TYPE)
+            # a read before the commit still gets the old entry and doesn't store anything under a new generation
+            handler(self._request())
+            self.assertEqual(1, self.calls)
+        for callback in callbacks:
+            callback()
+        handler(self._request())
+        self.assertEqual(2, self.calls)
+
+    def test_not_modified(self):
+        handler = FHIRResponseCache.wrap_handler(self._TEST_RESOURCE_TYPE, self._handler)
+        response = handler(self._request())
+        self.assertEqual(self._TEST_ETAG, response['ETag'])
+        response = handler(self._request(HTTP_IF_NONE_MATCH=self._TEST_ETAG))
+        self.assertEqual(status.HTTP_304_NOT_MODIFIED, response.status_code)
+        self.assertEqual(self._TEST_ETAG, response['ETag'])
+        self.assertEqual(self._TEST_LAST_MODIFIED, parse_http_date_safe(response['Last-Modified']))
+        self.assertEqual(1, self.calls)
+
+    @mock.patch.object(R4ResponseCacheConfig, 'get_response_cache_scope', mock.Mock(return_value='rights'))
+    def test_rights_scope_includes_districts(self):
+        first, second = self._request(), self._request()
+        with mock.patch.object(FHIRResponseCache, 'get_location_scope', side_effect=['1', '2']):
+            self.assertNotEqual(FHIRResponseCache.get_key(self._TEST_RESOURCE_TYPE, first),
+                                FHIRResponseCache.get_key(self._TEST_RESOURCE_TYPE, second))
+
+    def test_invalidated_by_product_change(self):
+        handler = FHIRResponseCache.wrap_handler('InsurancePlan', self._handler)
+        handler(self._request())
+        with self.captureOnCommitCallbacks(execute=True):
+            create_test_product('FHIRCP')
+        handler(self._request())
+        self.assertEqual(2, self.calls)
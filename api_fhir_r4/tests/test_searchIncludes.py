@@ -0,0 +1,103 @@
+import json
+from types import SimpleNamespace
+from unittest import mock
+
+from django.db.models import Q
+from django.test import TestCase, RequestFactory
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api_fhir_r4.configurations import GeneralConfiguration
+from api_fhir_r4.paginations import FhirBundleResultsSetPagination
+from api_fhir_r4.search_includes import SearchIncludes, SearchInclude, SEARCH_INCLUDES, SEARCH_REVINCLUDES
+
+
+class SearchIncludesTestCase(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.factory = RequestFactory()
+
+    def _from_query(self, resource_type, query):
+        return SearchIncludes.from_request(self.factory.get(f'/{resource_type}/?{query}'), resource_type)
+
+    def _build_target(self, resource_type, objects, permitted=True):
+        target = mock.Mock(resource_type=resource_type)
+        target.has_permission.return_value = permitted
+        target.serializer.return_value.data = [{'resourceType': resource_type, 'id': obj} for obj in objects]
+        return target
+
+    def test_from_request(self):
+        includes = self._from_query('Claim', '_include=Claim:patient&_include=Claim:provider:Organization')
+        self.assertEqual(
+            [SEARCH_INCLUDES['Claim']['Claim:patient'], SEARCH_INCLUDES['Claim']['Claim:provider']],
+            includes.includes)
+        includes = self._from_query('Patient', '_revinclude=Claim:patient')
+        self.assertEqual([SEARCH_REVINCLUDES['Patient']['Claim:patient']], includes.includes)
+
+    def test_unsupported_ignored(self):
+        self.assertIsNone(self._from_query('Claim', ''))
+        self.assertIsNone(self._from_query('Claim', '_include=Claim:unknown&_revinclude=Claim:patient'))
+        self.assertIsNone(self._from_query('Claim', '_include=Claim:provider:Practitioner'))
+        self.assertIsNone(self._from_query('Location', '_include=Claim:patient'))
+        self.assertIsNone(SearchIncludes.from_request(self.factory.get('/?_include=Claim:patient'), None))
+
+    def test_load_one_query_per_type(self):
+        patients = self._build_target('Patient', ['p1'])
+        practitioners = self._build_target('Practitioner', ['a1'], permitted=False)
+        includes = SearchIncludes([
+            SearchInclude(patients, lambda page: Q(id__in={obj.insuree_id for obj in page})),
+            SearchInclude(patients, lambda page: Q(id__in={obj.head_insuree_id for obj in page})),
+            SearchInclude(practitioners, lambda page: Q(id__in={obj.admin_id for obj in page})),
+        ])
+        page = [SimpleNamespace(insuree_id=1, head_insuree_id=2, admin_id=3),
+                SimpleNamespace(insuree_id=1, head_insuree_id=2, admin_id=3)]
+        request = SimpleNamespace(user=mock.Mock())
+
+        resources = includes.load(page, request)
+        self.assertEqual([('Patient', {'resourceType': 'Patient', 'id': 'p1'})], resources)
+        patients.get_queryset.return_value.filter.assert_called_once_with(Q(id__in={1}) | Q(id__in={2}))
+        practitioners.get_queryset.assert_not_called()
+
+    def test_load_empty_page(self):
+        patients = self._build_target('Patient', ['p1'])
+        self.assertEqual([], SearchIncludes([SearchInclude(patients, lambda page: Q())]).load([], None))
+        patients.get_queryset.assert_not_called()
+
+
+class FhirBundleResultsSetPaginationIncludeTestCase(TestCase):
+    _TEST_URL = '/api_fhir_r4/Claim/'
+
+    def setUp(self):
+        super().setUp()
+        self.factory = APIRequestFactory()
+        self.search_includes = mock.Mock()
+        self.search_includes.load.return_value = [('Patient', {'resourceType': 'Patient', 'id': 'p1'})]
+
+    def _paginate(self, data, **params):
+        pagination = FhirBundleResultsSetPagination()
+        view = SimpleNamespace(search_includes=self.search_includes)
+        page = pagination.paginate_queryset(data, Request(self.factory.get(self._TEST_URL, params)), view=view)
+        return pagination, page
+
+    def test_include_entries(self):
+        data = [{'resourceType': 'Claim', 'id': str(i)} for i in range(2)]
+        pagination, page = self._paginate(data, _count=2)
+        bundle = json.loads(json.dumps(pagination.build_bundle_set(page).dict(), default=str))
+
+        self.assertEqual(['match', 'match', 'include'], [entry['search']['mode'] for entry in bundle['entry']])
+        self.assertEqual(2, bundle['total'])
+        self.assertTrue(bundle['entry'][2]['fullUrl'].endswith(f'{GeneralConfiguration.get_base_url()}Patient/p1'))
+        self.search_includes.load.assert_called_once_with(data, pagination.request)
+
+    @mock.patch.object(GeneralConfiguration, 'get_stream_response_page_size', mock.Mock(return_value=2))
+    def test_streamed_include_entries(self):
+        data = [{'resourceType': 'Claim', 'id': str(i)} for i in range(3)]
+        pagination, page = self._paginate(data, _count=2)
+        streamed = json.loads(b''.join(pagination.get_paginated_response(iter(page)).streaming_content))
+
+        expected = json.loads(json.dumps(pagination.build_bundle_set(page).dict(), default=str))
+        self.assertEqual(expected, streamed)
+        self.assertEqual(['0', '1', 'p1'], [entry['resource']['id'] for entry in streamed['entry']])
+        # the page is loaded once, also when the Bundle is built again
+        self.search_includes.load.assert_called_once()
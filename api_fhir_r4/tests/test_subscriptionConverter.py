@@ -1,5 +1,9 @@
+from unittest import mock
+
 from fhir.resources.subscription import Subscription
 
+from api_fhir_r4.configurations import R4SubscriptionConfig
+from api_fhir_r4.exceptions import FHIRException
 from api_fhir_r4.subscriptions import SubscriptionConverter
 from api_fhir_r4.tests.mixin import ConvertToImisTestMixin, ConvertToFhirTestMixin, ConvertJsonToFhirTestMixin
 from api_fhir_r4.tests.mixin.SubscriptionTestMixin import SubscriptionTestMixin
@@ -19,4 +23,20 @@ class SubscriptionConverterTestCase(SubscriptionTestMixin,
         json_repr['end'] = TimeUtils.str_iso_to_date(json_repr['end'])
         return json_repr
 
+    def _batched_fhir_instance(self):
+        fhir_subscription = self.create_test_fhir_instance().dict()
+        fhir_subscription['extension'] = [{
+            'url': SubscriptionConverter.get_notification_batch_extension_url(),
+            'extension': [{'url': 'maxBatchSize', 'valuePositiveInt': 10}],
+        }]
+        return fhir_subscription
+
+    @mock.patch.object(R4SubscriptionConfig, 'get_subscription_outbox_enabled', mock.Mock(return_value=True))
+    def test_batched_subscription(self):
+        imis_subscription = SubscriptionConverter.to_imis_obj(self._batched_fhir_instance(), None)
+        self.assertEqual(10, imis_subscription.batch_size)
 
+    @mock.patch.object(R4SubscriptionConfig, 'get_subscription_outbox_enabled', mock.Mock(return_value=False))
+    def test_batched_subscription_without_outbox_rejected(self):
+        with self.assertRaises(FHIRException):
+            SubscriptionConverter.to_imis_obj(self._batched_fhir_instance(), None)
@@ -0,0 +1,196 @@
+import datetime
+import json
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from api_fhir_r4.configurations import R4SubscriptionConfig
+from api_fhir_r4.models import Subscription, SubscriptionNotificationResult, SubscriptionOutboxEntry
+from api_fhir_r4.subscriptions.notificationClient import SubscriberNotificationOutput
+from api_fhir_r4.subscriptions.notificationManager import RestSubscriptionNotificationManager
+from api_fhir_r4.subscriptions.notificationWorker import SubscriptionNotificationWorker
+from api_fhir_r4.tests.mixin.logInMixin import LogInMixin
+
+
+@mock.patch.object(R4SubscriptionConfig, 'get_subscription_outbox_enabled', mock.Mock(return_value=True))
+class SubscriptionOutboxTestCase(LogInMixin, TestCase):
+    _TEST_HEADERS = 'test-header: 123'
+    _TEST_CONTENT = {'resourceType': 'Patient', 'id': 'c3a8e4c2-6a1b-4b4e-9d55-1c3d0a9f8f10'}
+
+    def setUp(self):
+        super().setUp()
+        self._test_user = self.get_or_create_user_api()
+        self._test_subscription = Subscription(
+            status=1, channel=0, endpoint='http://test-subscription-endpoint.io/post_uri/',
+            headers=self._TEST_HEADERS, expiring=datetime.datetime.now() + datetime.timedelta(days=10)
+        )
+        self._test_subscription.save(username=self._test_user.username)
+        self._test_resource = mock.Mock(uuid=self._TEST_CONTENT['id'])
+        self._test_converter = mock.Mock()
+        self._test_converter.to_fhir_obj.return_value.dict.return_value = self._TEST_CONTENT
+        self._test_client = mock.Mock()
+        self._test_client.normalize_payload.return_value = b'{"resourceType":"Patient"}'
+
+    def _enqueue(self):
+        RestSubscriptionNotificationManager(self._test_converter, client=self._test_client) \
+            .notify_subscribers_with_resource(self._test_resource, [self._test_subscription])
+        return SubscriptionOutboxEntry.objects.get(subscription=self._test_subscription)
+
+    def test_notification_stored_in_outbox(self):
+        entry = self._enqueue()
+        self._test_client.propagate_notifications.assert_not_called()
+        self.assertEqual('Patient', entry.resource_type)
+        self.assertEqual(self._TEST_CONTENT['id'], entry.resource_id)
+        self.assertEqual('{"resourceType":"Patient"}', entry.payload)
+        self.assertEqual(SubscriptionOutboxEntry.EntryStatus.PENDING, entry.status)
+
+    def test_due_entries_claimed_once(self):
+        self._enqueue()
+        worker = SubscriptionNotificationWorker(client=self._test_client)
+        self.assertEqual(1, len(worker.claim_due_entries()))
+        self.assertEqual([], worker.claim_due_entries())
+
+    def test_lease_renewed_before_delivery(self):
+        self._enqueue()
+        worker = SubscriptionNotificationWorker(client=self._test_client)
+        entries = worker.claim_due_entries()
+        SubscriptionOutboxEntry.objects.filter(id=entries[0].id) \
+            .update(next_attempt=timezone.now() + datetime.timedelta(seconds=1))
+        self.assertTrue(worker.renew_lease(entries))
+        entries[0].refresh_from_db()
+        self.assertGreater(entries[0].next_attempt, timezone.now() + datetime.timedelta(seconds=60))
+
+    def test_lease_taken_over_not_renewed(self):
+        self._enqueue()
+        worker = SubscriptionNotificationWorker(client=self._test_client)
+        entries = worker.claim_due_entries()
+        # lease ended while the entry waited for the endpoint and another worker claimed it
+        SubscriptionOutboxEntry.objects.filter(id=entries[0].id).update(next_attempt=timezone.now())
+        self.assertEqual(1, len(worker.claim_due_entries()))
+        self.assertFalse(worker.renew_lease(entries))
+
+    def test_delivered_entry_removed(self):
+        entry = self._enqueue()
+        SubscriptionNotificationWorker(client=self._test_client).record_result(
+            entry, SubscriberNotificationOutput(self._test_subscription, True))
+        self.assertFalse(SubscriptionOutboxEntry.objects.filter(id=entry.id).exists())
+        result = SubscriptionNotificationResult.objects.subscriber_notifications(self._test_subscription).get()
+        self.assertTrue(result.notified_successfully)
+
+    def test_failed_entry_retried(self):
+        entry = self._enqueue()
+        SubscriptionNotificationWorker(client=self._test_client).record_result(
+            entry, SubscriberNotificationOutput(self._test_subscription, False, 'Endpoint Unavailable'))
+        entry.refresh_from_db()
+        self.assertEqual(1, entry.attempts)
+        self.assertEqual(SubscriptionOutboxEntry.EntryStatus.PENDING, entry.status)
+        self.assertGreater(entry.next_attempt, timezone.now())
+        self.assertEqual('Endpoint Unavailable', entry.last_error)
+
+    @mock.patch.object(R4SubscriptionConfig, 'get_subscription_outbox_max_attempts', mock.Mock(return_value=1))
+    def test_dead_letter_after_max_attempts(self):
+        entry = self._enqueue()
+        SubscriptionNotificationWorker(client=self._test_client).record_result(
+            entry, SubscriberNotificationOutput(self._test_subscription, False, 'Endpoint Unavailable'))
+        entry.refresh_from_db()
+        self.assertEqual(SubscriptionOutboxEntry.EntryStatus.DEAD_LETTER, entry.status)
+        result = SubscriptionNotificationResult.objects.subscriber_notifications(self._test_subscription).get()
+        self.assertFalse(result.notified_successfully)
+        self.assertTrue(result.dead_letter)
+
+    @mock.patch.object(R4SubscriptionConfig, 'get_subscription_outbox_retry_delay', mock.Mock(return_value=10))
+    @mock.patch.object(R4SubscriptionConfig, 'get_subscription_outbox_max_retry_delay', mock.Mock(return_value=60))
+    def test_retry_delay_backoff(self):
+        self.assertLessEqual(SubscriptionNotificationWorker.get_retry_delay(1), datetime.timedelta(seconds=10))
+        self.assertGreaterEqual(SubscriptionNotificationWorker.get_retry_delay(3), datetime.timedelta(seconds=20))
+        self.assertLessEqual(SubscriptionNotificationWorker.get_retry_delay(10), datetime.timedelta(seconds=60))
+
+
+@mock.patch.object(R4SubscriptionConfig, 'get_subscription_outbox_enabled', mock.Mock(return_value=True))
+class SubscriptionBatchedOutboxTestCase(LogInMixin, TestCase):
+    _TEST_HEADERS = 'test-header: 123'
+    _TEST_BATCH_SIZE = 3
+    _TEST_RESOURCE_IDS = [
+        'c3a8e4c2-6a1b-4b4e-9d55-1c3d0a9f8f10',
+        '0f9d5a57-2d1c-4a36-a4a4-5b3cfa3b8f21',
+        '7be0c0a6-83a5-4c8e-9a40-2a8b8b4f0c32',
+    ]
+
+    def setUp(self):
+        super().setUp()
+        self._test_user = self.get_or_create_user_api()
+        self._test_subscription = Subscription(
+            status=1, channel=0, endpoint='http://test-subscription-endpoint.io/post_uri/',
+            headers=self._TEST_HEADERS, expiring=datetime.datetime.now() + datetime.timedelta(days=10),
+            batch_size=self._TEST_BATCH_SIZE, batch_linger=60,
+            batch_bundle_type=Subscription.NotificationBundleType.HISTORY
+        )
+        self._test_subscription.save(username=self._test_user.username)
+        self._test_client = mock.Mock()
+        self._test_client.normalize_payload.side_effect = \
+            lambda content: f'{{"resourceType":"Patient","id":"{content["id"]}","name":"{content["name"]}"}}'
+
+    def _enqueue(self, resource_id, name='Test'):
+        converter = mock.Mock()
+        converter.to_fhir_obj.return_value.dict.return_value = \
+            {'resourceType': 'Patient', 'id': resource_id, 'name': name}
+        RestSubscriptionNotificationManager(converter, client=self._test_client) \
+            .notify_subscribers_with_resource(mock.Mock(uuid=resource_id), [self._test_subscription])
+
+    def _get_entries(self):
+        return list(SubscriptionOutboxEntry.objects.filter(subscription=self._test_subscription).order_by('created'))
+
+    def test_notifications_wait_for_linger(self):
+        self._enqueue(self._TEST_RESOURCE_IDS[0])
+        self._enqueue(self._TEST_RESOURCE_IDS[1])
+        entries = self._get_entries()
+        self.assertEqual(2, len(entries))
+        self.assertEqual(entries[0].next_attempt, entries[1].next_attempt)
+        self.assertGreater(entries[0].next_attempt, timezone.now())
+        self.assertEqual([], SubscriptionNotificationWorker(client=self._test_client).claim_due_entries())
+
+    def test_repeated_updates_collapsed(self):
+        self._enqueue(self._TEST_RESOURCE_IDS[0], name='First')
+        self._enqueue(self._TEST_RESOURCE_IDS[0], name='Second')
+        entries = self._get_entries()
+        self.assertEqual(1, len(entries))
+        self.assertIn('"name":"Second"', entries[0].payload)
+
+    def test_full_batch_due_at_once(self):
+        for resource_id in self._TEST_RESOURCE_IDS:
+            self._enqueue(resource_id)
+        worker = SubscriptionNotificationWorker(client=self._test_client)
+        batches = worker.group_entries(worker.claim_due_entries())
+        self.assertEqual(1, len(batches))
+        self.assertEqual(self._TEST_BATCH_SIZE, len(batches[0]))
+
+    def test_bundle_payload(self):
+        for resource_id in self._TEST_RESOURCE_IDS:
+            self._enqueue(resource_id)
+        bundle = json.loads(SubscriptionNotificationWorker.build_bundle_payload(self._get_entries()))
+        self.assertEqual('Bundle', bundle['resourceType'])
+        self.assertEqual('history', bundle['type'])
+        self.assertEqual(self._TEST_RESOURCE_IDS, [entry['resource']['id'] for entry in bundle['entry']])
+        self.assertEqual(f'Patient/{self._TEST_RESOURCE_IDS[0]}', bundle['entry'][0]['request']['url'])
+
+    def test_subscription_notification_bundle_payload(self):
+        Subscription.objects.filter(id=self._test_subscription.id) \
+            .update(batch_bundle_type=Subscription.NotificationBundleType.SUBSCRIPTION_NOTIFICATION)
+        self._enqueue(self._TEST_RESOURCE_IDS[0])
+        bundle = json.loads(SubscriptionNotificationWorker.build_bundle_payload(self._get_entries()))
+        self.assertEqual('subscription-notification', bundle['type'])
+        self.assertEqual('SubscriptionStatus', bundle['entry'][0]['resource']['resourceType'])
+        self.assertEqual(self._TEST_RESOURCE_IDS[0], bundle['entry'][1]['resource']['id'])
+
+    def test_failed_batch_retried_together(self):
+        for resource_id in self._TEST_RESOURCE_IDS[:2]:
+            self._enqueue(resource_id)
+        entries = self._get_entries()
+        SubscriptionNotificationWorker(client=self._test_client).record_batch_result(
+            entries, SubscriberNotificationOutput(self._test_subscription, False, 'Endpoint Unavailable'))
+        retried = self._get_entries()
+        self.assertEqual({1}, {entry.attempts for entry in retried})
+        self.assertEqual(1, len({entry.next_attempt for entry in retried}))
+        self.assertEqual(1, SubscriptionNotificationResult.objects
+                         .subscriber_notifications(self._test_subscription).count())
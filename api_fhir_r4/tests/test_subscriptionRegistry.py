@@ -0,0 +1,86 @@
+import datetime
+from unittest import mock
+
+from django.test import TestCase
+from insuree.test_helpers import create_test_insuree
+
+from api_fhir_r4.cache.generations import ProcessCacheValidity
+from api_fhir_r4.models import Subscription
+from api_fhir_r4.subscriptions.subscriptionCriteriaFilter import SubscriptionCriteriaFilter
+from api_fhir_r4.subscriptions.subscriptionRegistry import SubscriptionRegistry, SubscriptionCriteriaMatcher, \
+    RegisteredSubscription
+from api_fhir_r4.tests.mixin.logInMixin import LogInMixin
+
+
+class SubscriptionRegistryTestCase(LogInMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self._test_user = self.get_or_create_user_api()
+        self._test_insuree = create_test_insuree()
+        SubscriptionRegistry.invalidate()
+
+    def _create_subscription(self, criteria, expiring_in_days=10):
+        subscription = Subscription(
+            status=1, channel=0, endpoint='http://test-subscription-endpoint.io/post_uri/',
+            headers='test-header: 123', criteria=criteria,
+            expiring=datetime.datetime.now() + datetime.timedelta(days=expiring_in_days)
+        )
+        subscription.save(username=self._test_user.username)
+        SubscriptionRegistry.invalidate()
+        return subscription
+
+    def test_candidates_indexed_by_resource_type(self):
+        any_type = self._create_subscription({'resource': 'Invoice'})
+        policy_type = self._create_subscription({'resource': 'Invoice', 'resource_type': 'policy'})
+        self._create_subscription({'resource': 'Patient'})
+
+        def candidates(resource_type):
+            return {entry.subscription.id for entry in SubscriptionRegistry.get_candidates('Invoice', resource_type)}
+
+        self.assertEqual({any_type.id, policy_type.id}, candidates('policy'))
+        self.assertEqual({any_type.id}, candidates('contribution'))
+
+    @mock.patch.object(ProcessCacheValidity, 'GENERATION_CHECK_INTERVAL', 0)
+    @mock.patch.object(ProcessCacheValidity, 'get_max_age', mock.Mock(return_value=0))
+    def test_reloaded_after_max_age(self):
+        # change made by another process, which isn't visible through the generation of a process local cache
+        with mock.patch.object(SubscriptionRegistry, '_get_generation', mock.Mock(return_value=1)):
+            self.assertEqual([], SubscriptionRegistry.get_candidates('Patient'))
+            subscription = Subscription(
+                status=1, channel=0, endpoint='http://test-subscription-endpoint.io/post_uri/',
+                headers='test-header: 123', criteria={'resource': 'Patient'},
+                expiring=datetime.datetime.now() + datetime.timedelta(days=10)
+            )
+            subscription.save(username=self._test_user.username)
+            self.assertEqual([subscription.id],
+                             [entry.subscription.id for entry in SubscriptionRegistry.get_candidates('Patient')])
+
+    def test_expired_subscription_not_candidate(self):
+        self._create_subscription({'resource': 'Patient'}, expiring_in_days=-1)
+        self.assertEqual([], SubscriptionRegistry.get_candidates('Patient'))
+
+    def test_equality_criteria_matched_in_memory(self):
+        matcher = SubscriptionCriteriaMatcher(self._test_insuree)
+        self.assertTrue(matcher.match_in_memory({'chf_id': self._test_insuree.chf_id}))
+        self.assertFalse(matcher.match_in_memory({'chf_id__exact': f'{self._test_insuree.chf_id}0'}))
+        self.assertIsNone(matcher.match_in_memory({'chf_id__startswith': self._test_insuree.chf_id[:2]}))
+        self.assertIsNone(matcher.match_in_memory({'family__location__code': 'R1'}))
+
+    def test_lookup_criteria_matched_in_database(self):
+        matching = self._create_subscription(
+            {'resource': 'Patient', 'chf_id__startswith': self._test_insuree.chf_id[:2]})
+        self._create_subscription({'resource': 'Patient', 'chf_id__startswith': 'not-matching'})
+        plain = self._create_subscription({'resource': 'Patient'})
+        result = SubscriptionCriteriaFilter(self._test_insuree, 'Patient', None).get_filtered_subscriptions()
+        self.assertEqual({matching.id, plain.id}, {subscription.id for subscription in result})
+
+    def test_database_criteria_evaluated_by_one_query(self):
+        registered = [
+            RegisteredSubscription(self._create_subscription({'resource': 'Patient'}), None,
+                                   {'chf_id__startswith': self._test_insuree.chf_id[:i]})
+            for i in range(1, 4)
+        ]
+        with self.assertNumQueries(1):
+            result = SubscriptionCriteriaMatcher(self._test_insuree).get_matching(registered)
+        self.assertEqual(3, len(result))
@@ -1,6 +1,6 @@
 
 from collections import OrderedDict
-from django.urls import include, path
+from django.urls import include, path, re_path
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
 from rest_framework.routers import DefaultRouter
 from openIMIS.openimisapps import openimis_apps
@@ -12,6 +12,8 @@ imis_modules = openimis_apps()
 
 
 router = DefaultRouter()
+# service base accepts batch and transaction Bundles (POST), GET is still the API root
+router.APIRootView = fhir_viewsets.BundleView
 
 router.register(r'login', LoginView, basename="login")
 router.register(r'Subscription', fhir_viewsets.SubscriptionViewSet, basename='Subscription_R4')
@@ -118,8 +120,18 @@ urlpatterns = [
     path('docs/', SpectacularAPIView.as_view(), name='docs'),
     path('docs/swagger/', SpectacularSwaggerView.as_view(url_name='docs'), name='swagger-ui'),
     path('docs/redoc/', SpectacularRedocView.as_view(url_name='docs'), name='redoc'),
+    path('$export', fhir_viewsets.BulkExportView.as_view(), name='bulk-export'),
+    path('$export/<uuid:job_id>/', fhir_viewsets.BulkExportStatusView.as_view(), name='bulk-export-status'),
+    path('$export/<uuid:job_id>/<str:resource_type>.ndjson', fhir_viewsets.BulkExportFileView.as_view(),
+         name='bulk-export-file'),
+    path('$timing', fhir_viewsets.RequestTimingView.as_view(), name='request-timing'),
 ]
 
+if 'claim' in imis_modules:
+    # content of claim attachments, referenced from Attachment.url
+    urlpatterns.append(re_path(r'^Binary/(?P<attachment_id>[0-9a-fA-F-]{36})/?$', fhir_viewsets.BinaryView.as_view(),
+                               name='binary'))
+
 # Find and update the lookup regex for the 'Organization' URL pattern
 # for pattern in urlpatterns[0].url_patterns:
 #     print(pattern.__str__())
@@ -0,0 +1,120 @@
+import base64
+import hashlib
+import io
+import os
+
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+
+
+class AttachmentUtils(object):
+    """
+    Access to the content of claim attachments, stored either as a file in `claim_attachments_root_path`
+    or base64 encoded in the `document` column.
+    """
+    HASH_CACHE_KEY_PREFIX = 'fhir-attachment-hash'
+    HASH_CACHE_TIMEOUT = 60 * 60 * 24
+    READ_CHUNK_SIZE = 64 * 1024
+
+    @classmethod
+    def get_file_path(cls, imis_attachment):
+        from claim.apps import ClaimConfig
+        file_root = ClaimConfig.claim_attachments_root_path
+        if file_root and imis_attachment.url:
+            return '%s/%s' % (file_root, imis_attachment.url)
+        return None
+
+    @classmethod
+    def open(cls, imis_attachment):
+        """
+        Binary file-like object with the attachment content, None if the attachment has no content.
+        """
+        file_path = cls.get_file_path(imis_attachment)
+        if file_path:
+            return open(file_path, 'rb')
+        if not imis_attachment.url and imis_attachment.document:
+            return io.BytesIO(base64.b64decode(imis_attachment.document))
+        return None
+
+    @classmethod
+    def get_base64_content(cls, imis_attachment):
+        file_path = cls.get_file_path(imis_attachment)
+        if file_path:
+            with open(file_path, 'rb') as file:
+                return base64.b64encode(file.read())
+        if not imis_attachment.url and imis_attachment.document:
+            return imis_attachment.document
+        return None
+
+    @classmethod
+    def get_size_and_hash(cls, imis_attachment):
+        """
+        Size in bytes and base64 encoded SHA-1 of the content (as in FHIR Attachment.hash). Hash of a file
+        is computed once and cached until the file is changed, size and hash of a document are cached by the
+        attachment id, so documents deferred by the query are loaded only once. Returns (None, None) if content
+        isn't available.
+        """
+        file_path = cls.get_file_path(imis_attachment)
+        if file_path:
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                return None, None
+            key = f'{cls.HASH_CACHE_KEY_PREFIX}:{imis_attachment.id}:{stat.st_size}:{stat.st_mtime_ns}'
+            content_hash = cache.get(key)
+            if content_hash is None:
+                with open(file_path, 'rb') as file:
+                    content_hash = cls._get_hash(file)
+                cache.set(key, content_hash, cls.HASH_CACHE_TIMEOUT)
+            return stat.st_size, content_hash
+        if not imis_attachment.url:
+            key = cls._get_document_cache_key(imis_attachment.id)
+            size_and_hash = cache.get(key)
+            if size_and_hash is None:
+                size_and_hash = cls._get_document_size_and_hash(cls._get_document(imis_attachment))
+                cache.set(key, size_and_hash, cls.HASH_CACHE_TIMEOUT)
+            return size_and_hash
+        return None, None
+
+    @classmethod
+    def invalidate(cls, attachment_id):
+        cache.delete(cls._get_document_cache_key(attachment_id))
+
+    @classmethod
+    def _get_document_cache_key(cls, attachment_id):
+        return f'{cls.HASH_CACHE_KEY_PREFIX}:{attachment_id}:document'
+
+    @classmethod
+    def _get_document(cls, imis_attachment):
+        # the document is usually deferred by the query, it's loaded without refreshing the other fields
+        deferred_fields = getattr(imis_attachment, 'get_deferred_fields', lambda: ())()
+        if 'document' in deferred_fields:
+            return type(imis_attachment).objects.filter(id=imis_attachment.id) \
+                .values_list('document', flat=True).first()
+        return imis_attachment.document
+
+    @classmethod
+    def _get_document_size_and_hash(cls, document):
+        if not document:
+            return None, None
+        content = base64.b64decode(document)
+        return len(content), base64.b64encode(hashlib.sha1(content).digest()).decode('ascii')
+
+    @classmethod
+    def _get_hash(cls, file):
+        sha1 = hashlib.sha1()
+        for chunk in iter(lambda: file.read(cls.READ_CHUNK_SIZE), b''):
+            sha1.update(chunk)
+        return base64.b64encode(sha1.digest()).decode('ascii')
+
+
+def on_attachment_changed(sender, instance, **kwargs):
+    AttachmentUtils.invalidate(instance.id)
+
+
+def bind_attachment_cache_signals():
+    from claim.models import ClaimAttachment
+    post_save.connect(on_attachment_changed, sender=ClaimAttachment,
+                      dispatch_uid='api_fhir_r4_attachment_cache_post_save')
+    post_delete.connect(on_attachment_changed, sender=ClaimAttachment,
+                        dispatch_uid='api_fhir_r4_attachment_cache_post_delete')
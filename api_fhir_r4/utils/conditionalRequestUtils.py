@@ -0,0 +1,70 @@
+import hashlib
+
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+
+
+class ConditionalRequestUtils(object):
+    # query parameters changing the representation of the resource, they are part of its ETag
+    REPRESENTATION_PARAMS = ('contained', 'attachmentData', '_summary', '_elements', '_format')
+
+    @classmethod
+    def get_resource_validators(cls, converter, imis_obj, request=None):
+        """
+        Returns (ETag, Last-Modified timestamp) of the resource built from imis_obj, (None, None) if the object
+        doesn't track its updates or the converter builds the resource also from related rows.
+        """
+        if converter is None or imis_obj is None or not hasattr(converter, 'get_imis_obj_last_updated') \
+                or not getattr(converter, 'fhir_validators_supported', True):
+            return None, None
+        last_updated = converter.get_imis_obj_last_updated(imis_obj)
+        if last_updated is None:
+            return None, None
+        version = converter.get_imis_obj_version_id(imis_obj)
+        representation = cls.get_representation_tag(request)
+        if representation:
+            version = f'{version}-{representation}'
+        return f'W/"{version}"', int(last_updated.timestamp())
+
+    @classmethod
+    def get_representation_tag(cls, request):
+        """
+        Short hash of the normalized representation parameters of the request, None if none of them is used.
+        """
+        query_params = getattr(request, 'GET', None)
+        if not query_params:
+            return None
+        params = []
+        for name in cls.REPRESENTATION_PARAMS:
+            values = sorted(value.strip() for value in query_params.getlist(name) if value.strip())
+            if values:
+                params.append(f'{name}={",".join(values)}')
+        if not params:
+            return None
+        return hashlib.md5('&'.join(params).encode('utf-8')).hexdigest()[:12]
+
+    @classmethod
+    def is_not_modified(cls, request, etag, last_modified):
+        # If-None-Match takes precedence over If-Modified-Since (RFC 7232, section 6)
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match:
+            if not etag:
+                return False
+            etags = [cls._get_opaque_tag(tag) for tag in parse_etags(if_none_match)]
+            return '*' in etags or cls._get_opaque_tag(etag) in etags
+        if last_modified is None:
+            return False
+        if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+        return if_modified_since is not None and last_modified <= if_modified_since
+
+    @classmethod
+    def set_validators(cls, response, etag, last_modified):
+        if etag:
+            response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    @classmethod
+    def _get_opaque_tag(cls, etag):
+        # weak comparison is used for conditional GET
+        return etag[2:] if etag.startswith('W/') else etag
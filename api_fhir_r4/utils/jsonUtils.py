@@ -0,0 +1,29 @@
+import decimal
+
+import orjson
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+
+
+class JsonUtils(object):
+
+    @classmethod
+    def dumps(cls, data, options=0):
+        return orjson.dumps(data, default=cls._default, option=options | orjson.OPT_UTC_Z)
+
+    @classmethod
+    def loads(cls, data):
+        return orjson.loads(data)
+
+    @classmethod
+    def _default(cls, obj):
+        # types which orjson doesn't serialize natively, rendered the same way as by the DRF JSON encoder
+        if isinstance(obj, decimal.Decimal):
+            return float(obj)
+        if isinstance(obj, Promise):
+            return force_str(obj)
+        if hasattr(obj, 'tolist'):
+            return obj.tolist()
+        if hasattr(obj, '__iter__'):
+            return list(obj)
+        raise TypeError(f'Type {type(obj).__name__} is not JSON serializable')
@@ -29,3 +29,7 @@ from api_fhir_r4.views.fhir.practitioner import PractitionerViewSet
 from api_fhir_r4.views.fhir.practitioner_role import PractitionerRoleViewSet
 from api_fhir_r4.views.fhir.subscription import SubscriptionViewSet
 from api_fhir_r4.views.fhir.payment_notice import PaymentNoticeViewSet
+from api_fhir_r4.views.fhir.bulk_export import BulkExportView, BulkExportStatusView, BulkExportFileView
+from api_fhir_r4.views.fhir.bundle import BundleView
+from api_fhir_r4.views.fhir.binary import BinaryView
+from api_fhir_r4.views.fhir.request_timing import RequestTimingView
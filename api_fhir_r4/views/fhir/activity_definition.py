@@ -16,6 +16,7 @@ class ActivityDefinitionViewSet(BaseFHIRView, MultiIdentifierRetrieverMixin, Mul
     retrievers = [UUIDIdentifierModelRetriever, CodeIdentifierModelRetriever]
     serializer_class = ActivityDefinitionSerializer
     permission_classes = (FHIRApiActivityDefinitionPermissions,)
+    response_cache_resource_type = 'ActivityDefinition'
 
     def get_queryset(self):
         queryset = Service.get_queryset(None, self.request.user)
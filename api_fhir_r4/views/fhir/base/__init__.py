@@ -1,8 +1,18 @@
+from rest_framework import status
+from rest_framework.parsers import JSONParser
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.renderers import JSONRenderer
 from rest_framework.views import APIView
 
+from api_fhir_r4.cache import FHIRResponseCache, ReferenceResolver
+from api_fhir_r4.element_selection import ElementSelection
+from api_fhir_r4.instrumentation import RequestTiming
 from api_fhir_r4.multiserializer import MultiSerializerSerializerClass
 from api_fhir_r4.paginations import FhirBundleResultsSetPagination
+from api_fhir_r4.parsers import FHIRApplicationJSONParser, FHIRJSONParser
 from api_fhir_r4.permissions import FHIRApiPermissions
+from api_fhir_r4.renderers import FHIRApplicationJSONRenderer, FHIRContentNegotiation, FHIRJSONRenderer
+from api_fhir_r4.search_includes import SearchIncludes
 from api_fhir_r4.views import CsrfExemptSessionAuthentication
 
 
@@ -10,6 +20,43 @@ class BaseFHIRView(APIView):
     pagination_class = FhirBundleResultsSetPagination
     permission_classes = (FHIRApiPermissions,)
     authentication_classes = [CsrfExemptSessionAuthentication] + APIView.settings.DEFAULT_AUTHENTICATION_CLASSES
+    # JSON is rendered and parsed with orjson, application/json stays the default for clients accepting any type
+    renderer_classes = [FHIRApplicationJSONRenderer, FHIRJSONRenderer] + [
+        renderer for renderer in APIView.settings.DEFAULT_RENDERER_CLASSES if not issubclass(renderer, JSONRenderer)]
+    parser_classes = [FHIRApplicationJSONParser, FHIRJSONParser] + [
+        parser for parser in APIView.settings.DEFAULT_PARSER_CLASSES if not issubclass(parser, JSONParser)]
+    content_negotiation_class = FHIRContentNegotiation
+    # Resource type used for caching read and search responses, views without it are not cached.
+    response_cache_resource_type = None
+    # `_summary`/`_elements` of the request, views drop prefetches of elements which aren't selected
+    element_selection = None
+    # Resource type of the search supporting `_include`/`_revinclude`, see search_includes.SEARCH_INCLUDES
+    search_include_resource_type = None
+    search_includes = None
+
+    def dispatch(self, request, *args, **kwargs):
+        # references resolved by inbound converters are shared within the request
+        with ReferenceResolver.request_scope(), RequestTiming.phase(RequestTiming.PHASE_VIEW), \
+                ElementSelection.activate(ElementSelection.from_request(request, strict=False)):
+            return super().dispatch(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # invalid `_summary` is reported here, where the exception is handled by the view
+        self.element_selection = ElementSelection.from_request(request)
+        self.search_includes = SearchIncludes.from_request(request, self.search_include_resource_type)
+        # included resources of other types aren't covered by the invalidation of the cached responses
+        if self.response_cache_resource_type and request.method == 'GET' and FHIRResponseCache.is_enabled() \
+                and self.search_includes is None:
+            # Handler is resolved after initial(), at this point the request is already authenticated and permitted.
+            self.get = FHIRResponseCache.wrap_handler(self.response_cache_resource_type, self.get)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        # the generation is bumped when the transaction of the change (e.g. of a transaction Bundle) is committed
+        if self.response_cache_resource_type and request.method not in SAFE_METHODS \
+                and status.is_success(response.status_code):
+            FHIRResponseCache.invalidate(self.response_cache_resource_type)
+        return super().finalize_response(request, response, *args, **kwargs)
 
 
 class BaseMultiserializerFHIRView(BaseFHIRView):
@@ -0,0 +1,84 @@
+import re
+
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from rest_framework import status
+
+from api_fhir_r4.permissions import FHIRApiClaimPermissions
+from api_fhir_r4.utils import AttachmentUtils
+from api_fhir_r4.views.fhir.base import BaseFHIRView
+from claim.models import Claim, ClaimAttachment
+
+
+class BinaryView(BaseFHIRView):
+    """
+    Content of claim attachments referenced by `Attachment.url` of Claim resources. Content is streamed in chunks,
+    single range requests (`Range: bytes=start-end`) are answered with 206 Partial Content.
+    """
+    permission_classes = (FHIRApiClaimPermissions,)
+    _RANGE_PATTERN = re.compile(r'^bytes=(\d*)-(\d*)$')
+    _STREAM_CHUNK_SIZE = 64 * 1024
+
+    def get(self, request, attachment_id, *args, **kwargs):
+        attachment = get_object_or_404(self.get_queryset(), id=attachment_id)
+        content = AttachmentUtils.open(attachment)
+        if content is None:
+            raise Http404
+        size = self._get_size(content)
+        content_range = self._get_range(request.META.get('HTTP_RANGE'), size)
+        if content_range is False:
+            content.close()
+            response = HttpResponse(status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+        if content_range is None:
+            response = FileResponse(content, content_type=attachment.mime or 'application/octet-stream',
+                                    filename=attachment.filename)
+        else:
+            start, end = content_range
+            response = StreamingHttpResponse(self._stream_range(content, start, end),
+                                             status=status.HTTP_206_PARTIAL_CONTENT,
+                                             content_type=attachment.mime or 'application/octet-stream')
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            response['Content-Length'] = str(end - start + 1)
+        response['Accept-Ranges'] = 'bytes'
+        return response
+
+    def get_queryset(self):
+        claims = Claim.get_queryset(None, self.request.user)
+        return ClaimAttachment.objects.filter(validity_to__isnull=True, claim__in=claims)
+
+    def _get_size(self, content):
+        content.seek(0, 2)
+        size = content.tell()
+        content.seek(0)
+        return size
+
+    def _get_range(self, range_header, size):
+        """
+        (start, end) of the requested range, None if the whole content is requested (also for unsupported,
+        e.g. multi-range, headers), False if the range can't be satisfied.
+        """
+        match = self._RANGE_PATTERN.match(range_header or '')
+        if not match or not any(match.groups()):
+            return None
+        start, end = match.groups()
+        if start:
+            start, end = int(start), min(int(end), size - 1) if end else size - 1
+        else:
+            # suffix range, last N bytes
+            start, end = max(size - int(end), 0), size - 1
+        if start > end or start >= size:
+            return False
+        return start, end
+
+    def _stream_range(self, content, start, end):
+        with content:
+            content.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = content.read(min(self._STREAM_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
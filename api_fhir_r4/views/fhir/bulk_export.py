@@ -0,0 +1,128 @@
+import os
+
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404
+from rest_framework import status
+from rest_framework.exceptions import ValidationError, PermissionDenied
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from api_fhir_r4.bulkExport import BulkExportJobRunner, get_export_resources
+from api_fhir_r4.exceptions import FHIRException
+from api_fhir_r4.models import BulkExportJob
+from api_fhir_r4.views.fhir.base import BaseFHIRView
+from api_fhir_r4.views.filters.requestParameterFilter import QuerysetSinceParameter
+
+
+class BulkExportView(BaseFHIRView):
+    """
+    System level `$export` kick-off. Export runs in background, the response points to the status endpoint
+    in Content-Location header.
+    """
+    permission_classes = (IsAuthenticated,)
+    _accepted_output_formats = ('application/fhir+ndjson', 'application/ndjson', 'ndjson')
+
+    def get(self, request, *args, **kwargs):
+        resources = get_export_resources()
+        resource_types = self._get_resource_types(request, resources)
+        since = self._get_since(request)
+        output_format = request.query_params.get('_outputFormat')
+        if output_format and output_format not in self._accepted_output_formats:
+            raise ValidationError({'_outputFormat': f'Unsupported output format: {output_format}'})
+        denied = [resource_type for resource_type in resource_types
+                  if not resources[resource_type].has_permission(request.user)]
+        if denied:
+            raise PermissionDenied(f'Not allowed to export: {", ".join(denied)}')
+
+        job = BulkExportJob.objects.create(
+            user=request.user,
+            resource_types=resource_types,
+            since=since,
+            request_url=request.build_absolute_uri(),
+        )
+        BulkExportJobRunner.start(job)
+        response = Response(status=status.HTTP_202_ACCEPTED)
+        response['Content-Location'] = request.build_absolute_uri(f'{request.path.rstrip("/")}/{job.id}/')
+        return response
+
+    def _get_resource_types(self, request, resources):
+        requested = request.query_params.get('_type')
+        if not requested:
+            return list(resources.keys())
+        resource_types = [resource_type.strip() for resource_type in requested.split(',') if resource_type.strip()]
+        unknown = [resource_type for resource_type in resource_types if resource_type not in resources]
+        if unknown:
+            raise ValidationError({'_type': f'Unsupported resource types: {", ".join(unknown)}'})
+        return list(dict.fromkeys(resource_types))
+
+    def _get_since(self, request):
+        since = request.query_params.get('_since')
+        if not since:
+            return None
+        try:
+            return QuerysetSinceParameter('validity_from').build_filter(since).value
+        except ValueError as e:
+            raise ValidationError({'_since': str(e).format(request_parameter='_since')})
+
+
+class BulkExportStatusView(BaseFHIRView):
+    """
+    Status of the export job. 202 with X-Progress header while the job is running, completion manifest when
+    all files are written.
+    """
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request, job_id, *args, **kwargs):
+        job = get_user_export_job(request, job_id)
+        if job.status in (BulkExportJob.JobStatus.ACCEPTED, BulkExportJob.JobStatus.IN_PROGRESS):
+            BulkExportJobRunner.resume_if_stale(job)
+            response = Response(status=status.HTTP_202_ACCEPTED)
+            response['X-Progress'] = self._get_progress_description(job)
+            response['Retry-After'] = '10'
+            return response
+        if job.status == BulkExportJob.JobStatus.FAILED:
+            raise FHIRException(f'Bulk export failed: {job.error}')
+        return Response(self._build_manifest(request, job))
+
+    def _get_progress_description(self, job):
+        done = [resource_type for resource_type in job.resource_types
+                if job.progress.get(resource_type, {}).get('done')]
+        exported = sum(job.progress.get(resource_type, {}).get('count', 0) for resource_type in job.resource_types)
+        return f'{len(done)}/{len(job.resource_types)} resource types, {exported} resources exported'
+
+    def _build_manifest(self, request, job):
+        output = []
+        for resource_type in job.resource_types:
+            progress = job.progress.get(resource_type, {})
+            if not progress.get('count'):
+                continue
+            output.append({
+                'type': resource_type,
+                'url': request.build_absolute_uri(f'{request.path.rstrip("/")}/{resource_type}.ndjson'),
+                'count': progress['count'],
+            })
+        return {
+            'transactionTime': job.transaction_time.isoformat(),
+            'request': job.request_url,
+            'requiresAccessToken': True,
+            'output': output,
+            'error': [],
+        }
+
+
+class BulkExportFileView(BaseFHIRView):
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request, job_id, resource_type, *args, **kwargs):
+        job = get_user_export_job(request, job_id)
+        if job.status != BulkExportJob.JobStatus.COMPLETED or resource_type not in job.resource_types:
+            raise Http404
+        path = BulkExportJobRunner.get_output_path(job, resource_type)
+        if not os.path.exists(path):
+            raise Http404
+        return FileResponse(open(path, 'rb'), content_type='application/fhir+ndjson')
+
+
+def get_user_export_job(request, job_id):
+    # Jobs are visible only to the user who started the export
+    return get_object_or_404(BulkExportJob, id=job_id, user=request.user)
@@ -0,0 +1,226 @@
+import io
+import logging
+from urllib.parse import urlsplit
+
+from django.db import transaction
+from django.http import Http404, HttpRequest, QueryDict
+from django.urls import resolve, Resolver404
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.routers import APIRootView
+
+from api_fhir_r4.cache import ReferenceResolver
+from api_fhir_r4.converters import OperationOutcomeConverter
+from api_fhir_r4.utils import JsonUtils
+from api_fhir_r4.views.fhir.base import BaseFHIRView
+
+logger = logging.getLogger(__name__)
+
+
+class BundleView(APIRootView):
+    """
+    Service base endpoint. POST accepts `batch` and `transaction` Bundles, entries are dispatched to the resource
+    views as if they were separate requests of the same user. GET keeps the browsable API root.
+    """
+    authentication_classes = BaseFHIRView.authentication_classes
+    renderer_classes = BaseFHIRView.renderer_classes
+    parser_classes = BaseFHIRView.parser_classes
+    content_negotiation_class = BaseFHIRView.content_negotiation_class
+
+    def get_permissions(self):
+        if self.request.method == 'POST':
+            # Every entry is checked by permissions of its resource view
+            return [IsAuthenticated()]
+        return super().get_permissions()
+
+    def post(self, request, *args, **kwargs):
+        bundle_type, entries = self._get_bundle_entries(request.data)
+        dispatcher = BundleEntryDispatcher(request)
+        # entries share references resolved by the inbound converters
+        with ReferenceResolver.request_scope():
+            if bundle_type == 'transaction':
+                return self._process_transaction(dispatcher, entries)
+            return Response(self._build_response_bundle('batch-response', [
+                dispatcher.dispatch_in_savepoint(entry) for entry in entries
+            ]))
+
+    def _process_transaction(self, dispatcher, entries):
+        responses = [None] * len(entries)
+        try:
+            with transaction.atomic():
+                for index in sorted(range(len(entries)), key=lambda i: self._get_transaction_order(entries[i])):
+                    responses[index] = dispatcher.dispatch(entries[index])
+                    if responses[index]['status_code'] >= 400:
+                        raise _TransactionEntryFailed(responses[index])
+        except _TransactionEntryFailed as e:
+            # Transaction is processed as a whole, outcome of the failed entry is returned instead of the Bundle
+            return Response(e.entry_response['response']['outcome'], status=e.entry_response['status_code'])
+        return Response(self._build_response_bundle('transaction-response', responses))
+
+    def _get_bundle_entries(self, data):
+        if not isinstance(data, dict) or data.get('resourceType') != 'Bundle':
+            raise ValidationError('Request body has to be a Bundle')
+        bundle_type = data.get('type')
+        if bundle_type not in ('batch', 'transaction'):
+            raise ValidationError(f'Unsupported Bundle type: {bundle_type}, expected batch or transaction')
+        entries = data.get('entry') or []
+        for index, entry in enumerate(entries):
+            entry_request = entry.get('request') if isinstance(entry, dict) else None
+            if not isinstance(entry_request, dict) or not entry_request.get('method') or not entry_request.get('url'):
+                raise ValidationError(f'Bundle.entry[{index}].request with method and url is required')
+        return bundle_type, entries
+
+    def _get_transaction_order(self, entry):
+        # FHIR transaction processing order, entries of the same method keep order of the Bundle
+        return BundleEntryDispatcher.transaction_method_order.get(entry['request']['method'].upper(), 4)
+
+    def _build_response_bundle(self, bundle_type, responses):
+        return {
+            'resourceType': 'Bundle',
+            'type': bundle_type,
+            'entry': [{key: value for key, value in entry.items() if key != 'status_code'} for entry in responses],
+        }
+
+
+class BundleEntryDispatcher:
+    """
+    Dispatches Bundle entries to the views resolved from `entry.request.url`. Sub-requests reuse the user
+    authenticated for the Bundle request, no additional authentication is done per entry.
+    """
+    transaction_method_order = {'DELETE': 0, 'POST': 1, 'PUT': 2, 'PATCH': 2, 'GET': 3, 'HEAD': 3}
+    _read_methods = ('GET', 'HEAD')
+    _server_error_text = 'Internal server error'
+    _conditional_headers = {
+        'ifNoneMatch': 'HTTP_IF_NONE_MATCH',
+        'ifModifiedSince': 'HTTP_IF_MODIFIED_SINCE',
+        'ifMatch': 'HTTP_IF_MATCH',
+        'ifNoneExist': 'HTTP_IF_NONE_EXIST',
+    }
+
+    def __init__(self, request):
+        self.request = request
+        self.base_path = request.path if request.path.endswith('/') else f'{request.path}/'
+
+    def dispatch_in_savepoint(self, entry):
+        # Failed batch entry doesn't affect the others, changes done before the failure are rolled back
+        with transaction.atomic():
+            entry_response = self.dispatch(entry)
+            if entry_response['status_code'] >= 400:
+                transaction.set_rollback(True)
+                # objects resolved by the entry could be changed by the rolled back changes
+                ReferenceResolver.clear_request_scope()
+        return entry_response
+
+    def dispatch(self, entry):
+        entry_request = entry['request']
+        method = entry_request['method'].upper()
+        path, query = self._get_path_and_query(entry_request['url'])
+        try:
+            match = resolve(path)
+        except Resolver404:
+            return self._build_error_entry(status.HTTP_404_NOT_FOUND, f'Unknown resource url: {entry_request["url"]}')
+
+        sub_request = self._build_sub_request(method, path, query, entry.get('resource'), entry_request)
+        sub_request.resolver_match = match
+        try:
+            response = match.func(sub_request, *match.args, **match.kwargs)
+        except Exception:
+            logger.exception(f'Bundle entry {method} {entry_request["url"]} failed')
+            # the exception is logged, its text isn't returned to the client
+            return self._build_error_entry(status.HTTP_500_INTERNAL_SERVER_ERROR, self._server_error_text)
+        entry_response = self._build_entry_response(response)
+        if method not in self._read_methods and entry_response['status_code'] < 400:
+            # objects resolved by the following entries could be changed by this one
+            ReferenceResolver.clear_request_scope()
+        return entry_response
+
+    def _get_path_and_query(self, url):
+        url = urlsplit(url)
+        path = url.path
+        if not path.startswith(self.base_path):
+            # Relative urls (e.g. `Patient/<uuid>`) and absolute ones of this server are both accepted
+            path = self.base_path + path.split(self.base_path, 1)[-1].lstrip('/')
+        if not path.endswith('/'):
+            path = f'{path}/'
+        return path, url.query
+
+    def _build_sub_request(self, method, path, query, resource, entry_request):
+        body = JsonUtils.dumps(resource) if resource is not None else b''
+        sub_request = HttpRequest()
+        sub_request.method = method
+        sub_request.path = sub_request.path_info = path
+        sub_request.META = {
+            key: value for key, value in self.request.META.items()
+            if key not in self._conditional_headers.values()
+        }
+        sub_request.META.update({
+            'REQUEST_METHOD': method,
+            'PATH_INFO': path,
+            'QUERY_STRING': query,
+            'CONTENT_TYPE': 'application/json',
+            'CONTENT_LENGTH': str(len(body)),
+        })
+        for entry_field, header in self._conditional_headers.items():
+            if entry_request.get(entry_field):
+                sub_request.META[header] = entry_request[entry_field]
+        sub_request.GET = QueryDict(query)
+        sub_request._stream = io.BytesIO(body)
+        sub_request._read_started = False
+        sub_request.user = self.request.user
+        # Consumed by rest_framework Request, the entry is processed as the Bundle request user
+        sub_request._force_auth_user = self.request.user
+        sub_request._force_auth_token = self.request.auth
+        return sub_request
+
+    def _build_entry_response(self, response):
+        entry_response = {
+            'status': f'{response.status_code} {response.reason_phrase}',
+        }
+        if response.has_header('Location'):
+            entry_response['location'] = response['Location']
+        if response.has_header('ETag'):
+            entry_response['etag'] = response['ETag']
+        if response.has_header('Last-Modified'):
+            entry_response['lastModified'] = response['Last-Modified']
+
+        data = self._get_response_data(response)
+        entry = {'status_code': response.status_code, 'response': entry_response}
+        if status.is_success(response.status_code):
+            if data:
+                entry['resource'] = data
+        elif isinstance(data, dict) and data.get('resourceType') == 'OperationOutcome':
+            entry_response['outcome'] = data
+        else:
+            entry_response['outcome'] = self._build_outcome(response.status_code, response.reason_phrase)
+        return entry
+
+    def _get_response_data(self, response):
+        if hasattr(response, 'data'):
+            return JsonUtils.loads(JsonUtils.dumps(response.data)) if response.data is not None else None
+        if response.streaming:
+            return JsonUtils.loads(b''.join(response.streaming_content))
+        return JsonUtils.loads(response.content) if response.content else None
+
+    def _build_error_entry(self, status_code, details_text):
+        return {
+            'status_code': status_code,
+            'response': {
+                'status': str(status_code),
+                'outcome': self._build_outcome(status_code, details_text),
+            },
+        }
+
+    def _build_outcome(self, status_code, details_text):
+        if status.is_server_error(status_code):
+            return OperationOutcomeConverter.build_for_generic_error(Exception(self._server_error_text)).dict()
+        if status_code == status.HTTP_404_NOT_FOUND:
+            return OperationOutcomeConverter.build_for_404(Http404(details_text)).dict()
+        return OperationOutcomeConverter.build_for_400_bad_request(details_text).dict()
+
+
+class _TransactionEntryFailed(Exception):
+    def __init__(self, entry_response):
+        super().__init__(entry_response['response']['status'])
+        self.entry_response = entry_response
@@ -1,19 +1,18 @@
 import datetime
 
-from django.db.models import Prefetch
 from rest_framework import mixins
-from rest_framework.response import Response
 from rest_framework.serializers import ValidationError
 from rest_framework.viewsets import GenericViewSet
 
+from api_fhir_r4.converters import ClaimConverter
 from api_fhir_r4.mixins import MultiIdentifierRetrieverMixin
 from api_fhir_r4.model_retrievers import UUIDIdentifierModelRetriever, CodeIdentifierModelRetriever
 from api_fhir_r4.permissions import FHIRApiClaimPermissions
 from api_fhir_r4.serializers import ClaimSerializer
 from api_fhir_r4.views.fhir.base import BaseFHIRView
 from api_fhir_r4.views.filters import ValidityFromRequestParameterFilter
-from claim.models import Claim, ClaimItem, ClaimService
-from insuree.models import Insuree, InsureePolicy
+from claim.models import Claim
+from insuree.models import Insuree
 
 
 class ClaimViewSet(BaseFHIRView, MultiIdentifierRetrieverMixin, mixins.ListModelMixin,
@@ -21,6 +20,7 @@ class ClaimViewSet(BaseFHIRView, MultiIdentifierRetrieverMixin, mixins.ListModel
     retrievers = [UUIDIdentifierModelRetriever, CodeIdentifierModelRetriever]
     serializer_class = ClaimSerializer
     permission_classes = (FHIRApiClaimPermissions,)
+    search_include_resource_type = 'Claim'
 
     def list(self, request, *args, **kwargs):
         queryset = self.get_queryset()
@@ -28,6 +28,7 @@ class ClaimViewSet(BaseFHIRView, MultiIdentifierRetrieverMixin, mixins.ListModel
         identifier = request.GET.get("identifier")
         patient = request.GET.get("patient")
         contained = bool(request.GET.get("contained"))
+        attachment_data = bool(request.GET.get("attachmentData"))
 
         if identifier is not None:
             return self.retrieve(request, *args, **{**kwargs, 'identifier': identifier})
@@ -44,27 +45,31 @@ class ClaimViewSet(BaseFHIRView, MultiIdentifierRetrieverMixin, mixins.ListModel
                 for_patient = Insuree.objects.get(uuid=patient)
                 queryset = queryset.filter(insuree=for_patient)
 
-        serializer = ClaimSerializer(self.paginate_queryset(queryset), many=True, context={'contained': contained})
+        serializer = ClaimSerializer(self.paginate_queryset(queryset), many=True,
+                                     context={'contained': contained, 'attachment_data': attachment_data})
         return self.get_paginated_response(serializer.data)
 
     def retrieve(self, request, *args, **kwargs):
         contained = bool(request.GET.get("contained"))
+        attachment_data = bool(request.GET.get("attachmentData"))
         ref_type, instance = self._get_object_with_first_valid_retriever(kwargs['identifier'])
-        serializer = self.get_serializer(instance, context={'contained': contained}, reference_type=ref_type)
-        return Response(serializer.data)
+        serializer = self.get_serializer(instance, context={'contained': contained, 'attachment_data': attachment_data},
+                                         reference_type=ref_type)
+        return self._get_conditional_response(serializer.fhirConverter, instance, lambda: serializer.data)
 
     def get_queryset(self):
         queryset = Claim.get_queryset(None, self.request.user).order_by('validity_from') \
             .select_related('insuree') \
             .select_related('health_facility') \
+            .select_related('admin') \
             .select_related('icd') \
             .select_related('icd_1') \
             .select_related('icd_2') \
             .select_related('icd_3') \
-            .select_related('icd_4') \
-            .prefetch_related(Prefetch('items', queryset=ClaimItem.objects.filter(validity_to__isnull=True))) \
-            .prefetch_related(Prefetch('services', queryset=ClaimService.objects.filter(validity_to__isnull=True))) \
-            .prefetch_related(Prefetch('insuree__insuree_policies',
-                                       queryset=InsureePolicy.objects.filter(validity_to__isnull=True).select_related(
-                                           "policy")))
+            .select_related('icd_4')
+        # relations of elements not selected by `_summary`/`_elements` aren't loaded
+        if ClaimConverter.is_fhir_step_selected('build_fhir_items', self.element_selection):
+            queryset = queryset.prefetch_related(*ClaimConverter.get_fhir_items_prefetch_lookups())
+        if ClaimConverter.is_fhir_step_selected('build_fhir_insurance', self.element_selection):
+            queryset = queryset.prefetch_related(*ClaimConverter.get_fhir_insurance_prefetch_lookups())
         return ValidityFromRequestParameterFilter(self.request).filter_queryset(queryset)
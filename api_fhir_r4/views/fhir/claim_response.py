@@ -1,6 +1,7 @@
 from rest_framework import mixins
 from rest_framework.viewsets import GenericViewSet
 
+from api_fhir_r4.converters import ClaimResponseConverter
 from api_fhir_r4.mixins import MultiIdentifierRetrieverMixin
 from api_fhir_r4.model_retrievers import UUIDIdentifierModelRetriever, CodeIdentifierModelRetriever
 from api_fhir_r4.permissions import FHIRApiClaimPermissions
@@ -17,5 +18,7 @@ class ClaimResponseViewSet(BaseFHIRView, MultiIdentifierRetrieverMixin, mixins.L
     permission_classes = (FHIRApiClaimPermissions,)
 
     def get_queryset(self):
-        queryset = Claim.get_queryset(None, self.request.user).order_by('validity_from')
+        queryset = Claim.get_queryset(None, self.request.user).order_by('validity_from') \
+            .select_related('insuree', 'admin', 'feedback') \
+            .prefetch_related(*ClaimResponseConverter.get_fhir_prefetch_lookups())
         return ValidityFromRequestParameterFilter(self.request).filter_queryset(queryset)
@@ -0,0 +1,115 @@
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, HttpResponse
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from api_fhir_r4.cache import CodeSystemCache
+from api_fhir_r4.serializers import CodeSystemSerializer
+from api_fhir_r4.utils import ConditionalRequestUtils
+from api_fhir_r4.views import CsrfExemptSessionAuthentication
+
+
+class BaseCodeSystemViewSet(viewsets.ViewSet):
+    """
+    CodeSystem built from openIMIS reference data. The resource is served from the CodeSystemCache with an ETag,
+    `$lookup` and `$validate-code` operations are answered from the cached concepts.
+    """
+    serializer_class = CodeSystemSerializer
+    permission_classes = (IsAuthenticated,)
+    authentication_classes = [CsrfExemptSessionAuthentication] + APIView.settings.DEFAULT_AUTHENTICATION_CLASSES
+
+    # FHIRApiPermissions class of the resource the code system belongs to, only authentication is required if not set
+    resource_permissions = None
+    # id, name, title, description, code_field and display_field of the CodeSystem
+    code_system = None
+    # model of the concepts, code systems without a model override `load_data()`
+    model_name = None
+    _model_class = None
+
+    def list(self, request):
+        self.check_code_system_permissions(request)
+        entry = self.get_code_system_entry()
+        if ConditionalRequestUtils.is_not_modified(request, entry.etag, entry.last_modified):
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            body = CodeSystemCache.get_body(entry, self.code_system, request.build_absolute_uri(request.path))
+            response = HttpResponse(body, content_type='application/json')
+        return ConditionalRequestUtils.set_validators(response, entry.etag, entry.last_modified)
+
+    @action(detail=False, methods=['get', 'post'], url_path=r'\$lookup', url_name='lookup')
+    def lookup(self, request):
+        self.check_code_system_permissions(request)
+        code = self._get_required_code(request)
+        display = self.get_code_system_entry().concepts.get(code)
+        if display is None:
+            raise Http404(f'Code `{code}` not found in CodeSystem `{self.code_system["id"]}`')
+        return Response(self._build_parameters([
+            {'name': 'name', 'valueString': self.code_system['name']},
+            {'name': 'display', 'valueString': display},
+        ]))
+
+    @action(detail=False, methods=['get', 'post'], url_path=r'\$validate-code', url_name='validate-code')
+    def validate_code(self, request):
+        self.check_code_system_permissions(request)
+        code = self._get_required_code(request)
+        expected_display = self._get_operation_parameter(request, 'display')
+        concepts = self.get_code_system_entry().concepts
+        if code not in concepts:
+            message = f'Code `{code}` not found in CodeSystem `{self.code_system["id"]}`'
+            return Response(self._build_parameters([
+                {'name': 'result', 'valueBoolean': False},
+                {'name': 'message', 'valueString': message},
+            ]))
+        parameters = [
+            {'name': 'result', 'valueBoolean': not expected_display or expected_display == concepts[code]},
+            {'name': 'display', 'valueString': concepts[code]},
+        ]
+        if expected_display and expected_display != concepts[code]:
+            parameters.append({'name': 'message', 'valueString': f'Display of code `{code}` is `{concepts[code]}`'})
+        return Response(self._build_parameters(parameters))
+
+    def check_code_system_permissions(self, request):
+        if self.resource_permissions and not request.user.has_perms(self.resource_permissions.permissions_get):
+            raise PermissionDenied("unauthorized")
+
+    def get_code_system_entry(self):
+        model_class = self.get_model_class()
+        return CodeSystemCache.get_entry(
+            f'{type(self).__module__}.{type(self).__name__}', self.code_system, self.load_data,
+            model_class._meta.db_table if model_class else None)
+
+    def get_model_class(self):
+        if not self.model_name:
+            return None
+        view_class = type(self)
+        if view_class._model_class is None:
+            view_class._model_class = ContentType.objects.get(model=self.model_name.lower()).model_class()
+        return view_class._model_class
+
+    def load_data(self):
+        return self.get_model_class().objects.all()
+
+    def _get_required_code(self, request):
+        code = self._get_operation_parameter(request, 'code')
+        if not code:
+            raise ValidationError('`code` parameter is required')
+        return code
+
+    def _get_operation_parameter(self, request, name):
+        if request.method == 'GET':
+            return request.query_params.get(name)
+        parameters = request.data.get('parameter', []) if isinstance(request.data, dict) else []
+        parameters = {parameter.get('name'): parameter for parameter in parameters if isinstance(parameter, dict)}
+        if name in parameters:
+            return parameters[name].get('valueCode') or parameters[name].get('valueString')
+        if name in ('code', 'display') and 'coding' in parameters:
+            return (parameters['coding'].get('valueCoding') or {}).get(name)
+        return None
+
+    def _build_parameters(self, parameters):
+        return {'resourceType': 'Parameters', 'parameter': parameters}
@@ -1,37 +1,15 @@
-from api_fhir_r4.serializers import CodeSystemSerializer
-
-from rest_framework import viewsets
-from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
 from api_fhir_r4.permissions import FHIRApiClaimPermissions
-
-from rest_framework.views import APIView
-from api_fhir_r4.views import CsrfExemptSessionAuthentication
-from django.core.exceptions import PermissionDenied
-
-
-class CodeSystemOpenIMISDiagnosisViewSet(viewsets.ViewSet):
-
-    serializer_class = CodeSystemSerializer
-    permission_classes = (IsAuthenticated,)
-    authentication_classes = [CsrfExemptSessionAuthentication] + APIView.settings.DEFAULT_AUTHENTICATION_CLASSES
-
-    def list(self, request, *args, **kwargs):
-        # we don't use typical instance, we only indicate the model and the field to be mapped into CodeSystem
-        if not request.user.has_perms(FHIRApiClaimPermissions.permissions_get):
-            raise PermissionDenied("unauthorized")
-        serializer = CodeSystemSerializer(
-            instance=None,
-            **{
-                "model_name": 'Diagnosis',
-                "code_field": 'code',
-                "display_field": 'name',
-                "id": 'diagnosis-ICD10-level1',
-                "name": 'DiagnosisICD10Level1CS',
-                "title": 'ICD 10 Level 1 diagnosis (Claim)',
-                "description": "The actual list of diagnosis configured in openIMIS.",
-                "url": self.request.build_absolute_uri()
-            }
-        )
-        data = serializer.to_representation(obj=None)
-        return Response(data)
+from api_fhir_r4.views.fhir.code_systems.base import BaseCodeSystemViewSet
+
+
+class CodeSystemOpenIMISDiagnosisViewSet(BaseCodeSystemViewSet):
+    resource_permissions = FHIRApiClaimPermissions
+    model_name = 'Diagnosis'
+    code_system = {
+        "code_field": 'code',
+        "display_field": 'name',
+        "id": 'diagnosis-ICD10-level1',
+        "name": 'DiagnosisICD10Level1CS',
+        "title": 'ICD 10 Level 1 diagnosis (Claim)',
+        "description": "The actual list of diagnosis configured in openIMIS."
+    }
@@ -1,4 +1,5 @@
 from rest_framework import mixins
+from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
 from api_fhir_r4.permissions import FHIRApiCoverageEligibilityRequestPermissions
@@ -13,6 +14,12 @@ class CoverageEligibilityRequestViewSet(BaseFHIRView, mixins.CreateModelMixin, G
     serializer_class = CoverageEligibilityRequestSerializer
     permission_classes = (FHIRApiCoverageEligibilityRequestPermissions,)
 
+    def create(self, request, *args, **kwargs):
+        if isinstance(request.data, dict) and request.data.get('resourceType') == 'Bundle':
+            # batch of requests, e.g. from a point of care device, is evaluated at once
+            return Response(self.get_serializer().create_batch(request.data))
+        return super().create(request, *args, **kwargs)
+
     def get_queryset(self):
         queryset = Insuree.get_queryset(None, self.request.user)
         return ValidityFromRequestParameterFilter(self.request).filter_queryset(queryset)
@@ -15,6 +15,7 @@ class CoverageRequestQuerySet(BaseFHIRView, mixins.RetrieveModelMixin, mixins.Li
     lookup_field = 'uuid'
     serializer_class = CoverageSerializer
     permission_classes = (FHIRApiCoverageRequestPermissions,)
+    search_include_resource_type = 'Coverage'
 
     def list(self, request, *args, **kwargs):
         queryset = self.get_queryset()
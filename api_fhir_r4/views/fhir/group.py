@@ -1,3 +1,4 @@
+from django.db.models import Count, Exists, OuterRef, Q
 from rest_framework import viewsets
 
 from api_fhir_r4.mixins import MultiIdentifierRetrieverMixin, MultiIdentifierUpdateMixin
@@ -6,7 +7,8 @@ from api_fhir_r4.permissions import FHIRApiGroupPermissions
 from api_fhir_r4.serializers import GroupSerializer
 from api_fhir_r4.views.fhir.base import BaseFHIRView
 from api_fhir_r4.views.filters import ValidityFromRequestParameterFilter
-from insuree.models import Family
+from insuree.models import Family, InsureePolicy
+from policy.models import Policy
 
 
 class GroupViewSet(BaseFHIRView, MultiIdentifierRetrieverMixin,
@@ -14,6 +16,8 @@ class GroupViewSet(BaseFHIRView, MultiIdentifierRetrieverMixin,
     retrievers = [UUIDIdentifierModelRetriever, GroupIdentifierModelRetriever]
     serializer_class = GroupSerializer
     permission_classes = (FHIRApiGroupPermissions,)
+    response_cache_resource_type = 'Group'
+    search_include_resource_type = 'Group'
 
     def list(self, request, *args, **kwargs):
         queryset = self.get_queryset()
@@ -21,7 +25,7 @@ class GroupViewSet(BaseFHIRView, MultiIdentifierRetrieverMixin,
         if identifier:
             return self.retrieve(request, *args, **{**kwargs, 'identifier': identifier})
         else:
-            queryset = queryset.filter(validity_to__isnull=True)
+            queryset = self.annotate_group_aggregates(queryset.filter(validity_to__isnull=True))
         serializer = GroupSerializer(self.paginate_queryset(queryset), many=True)
         return self.get_paginated_response(serializer.data)
 
@@ -32,3 +36,18 @@ class GroupViewSet(BaseFHIRView, MultiIdentifierRetrieverMixin,
     def get_queryset(self):
         queryset = Family.objects.all().order_by('validity_from')
         return ValidityFromRequestParameterFilter(self.request).filter_queryset(queryset)
+
+    @classmethod
+    def annotate_group_aggregates(cls, queryset):
+        # Values consumed by GroupConverter instead of running separate queries for every family on the page
+        active_policies = InsureePolicy.objects.filter(
+            insuree__family_id=OuterRef('id'),
+            policy__status=Policy.STATUS_ACTIVE,
+            validity_to__isnull=True
+        )
+        return queryset \
+            .select_related('head_insuree', 'family_type', 'confirmation_type', 'location__parent__parent__parent') \
+            .prefetch_related('members') \
+            .annotate(has_active_policy=Exists(active_policies)) \
+            .annotate(active_members_count=Count(
+                'members', filter=Q(members__validity_to__isnull=True), distinct=True))
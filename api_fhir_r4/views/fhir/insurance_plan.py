@@ -13,6 +13,7 @@ class ProductViewSet(BaseFHIRView, MultiIdentifierRetrieverMixin, viewsets.ReadO
     retrievers = [UUIDIdentifierModelRetriever, CodeIdentifierModelRetriever]
     serializer_class = InsurancePlanSerializer
     permission_classes = (FHIRApiProductPermissions,)
+    response_cache_resource_type = 'InsurancePlan'
 
     def list(self, request, *args, **kwargs):
         queryset = self.get_queryset()
@@ -4,7 +4,7 @@ from django.db.models import OuterRef, Exists
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 
-from api_fhir_r4.converters import OperationOutcomeConverter
+from api_fhir_r4.converters import OperationOutcomeConverter, PatientConverter
 from api_fhir_r4.mixins import MultiIdentifierRetrieverMixin, MultiIdentifierUpdateMixin
 from api_fhir_r4.model_retrievers import UUIDIdentifierModelRetriever, CHFIdentifierModelRetriever
 from api_fhir_r4.permissions import FHIRApiInsureePermissions
@@ -20,6 +20,8 @@ class InsureeViewSet(BaseFHIRView, MultiIdentifierRetrieverMixin,
     retrievers = [UUIDIdentifierModelRetriever, CHFIdentifierModelRetriever]
     serializer_class = PatientSerializer
     permission_classes = (FHIRApiInsureePermissions,)
+    response_cache_resource_type = 'Patient'
+    search_include_resource_type = 'Patient'
 
     def list(self, request, *args, **kwargs):
         queryset = self.get_queryset()
@@ -58,7 +60,9 @@ class InsureeViewSet(BaseFHIRView, MultiIdentifierRetrieverMixin,
     def get_queryset(self):
         queryset = Insuree.get_queryset(None, self.request.user) \
             .select_related('gender') \
-            .select_related('photo') \
             .select_related('family__location')
+        # photo isn't joined when it's not selected by `_summary`/`_elements`
+        if PatientConverter.is_fhir_step_selected('build_fhir_photo', self.element_selection):
+            queryset = queryset.select_related('photo')
 
         return ValidityFromRequestParameterFilter(self.request).filter_queryset(queryset)
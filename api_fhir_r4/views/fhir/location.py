@@ -14,6 +14,7 @@ class LocationViewSet(BaseFHIRView, MultiIdentifierRetrieverMixin,
     retrievers = [UUIDIdentifierModelRetriever, CodeIdentifierModelRetriever]
     serializer_class = LocationSerializer
     permission_classes = (FHIRApiHFPermissions,)
+    response_cache_resource_type = 'Location'
 
     def list(self, request, *args, **kwargs):
         identifier = request.GET.get("identifier")
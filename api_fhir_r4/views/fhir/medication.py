@@ -13,6 +13,7 @@ class MedicationViewSet(BaseFHIRView, MultiIdentifierRetrieverMixin, MultiIdenti
     retrievers = [UUIDIdentifierModelRetriever, CodeIdentifierModelRetriever]
     serializer_class = MedicationSerializer
     permission_classes = (FHIRApiMedicationPermissions,)
+    response_cache_resource_type = 'Medication'
 
     def list(self, request, *args, **kwargs):
         queryset = self.get_queryset()
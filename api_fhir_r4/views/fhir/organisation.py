@@ -3,9 +3,7 @@ from collections import defaultdict, OrderedDict
 from datetime import datetime as py_datetime
 from django.db.models import Q
 from django.http import Http404
-from itertools import chain
 from rest_framework.request import Request
-from rest_framework.response import Response
 from rest_framework import viewsets
 
 from api_fhir_r4.defaultConfig import DEFAULT_CFG
@@ -113,7 +111,7 @@ class OrganisationViewSet(BaseMultiserializerFHIRView,
         # if insurance organisation queryset is empty - take the default one
         if resource_type is None or resource_type == 'ins':
             if (ModuleConfiguration, InsuranceOrganizationSerializer) in filtered_querysets:
-                if len(filtered_querysets[ModuleConfiguration, InsuranceOrganizationSerializer]) == 0:
+                if not filtered_querysets[ModuleConfiguration, InsuranceOrganizationSerializer].exists():
                     filtered_querysets[ModuleConfiguration, InsuranceOrganizationSerializer] = \
                         [DEFAULT_CFG['R4_fhir_insurance_organisation_config']]
                 else:
@@ -121,7 +119,8 @@ class OrganisationViewSet(BaseMultiserializerFHIRView,
                     filtered_querysets[ModuleConfiguration, InsuranceOrganizationSerializer] = \
                         self._get_insurance_organisations_as_list()
 
-        page = self.paginate_queryset(list(chain(*filtered_querysets.values())))
+        joined = self._join_querysets([*filtered_querysets.values()]) if filtered_querysets else []
+        page = self.paginate_queryset(joined)
         data = self.__dispatch_page_data(page)
         serialized_data = self._serialize_dispatched_data(data, dict(filtered_querysets.keys()))
         data = self.get_paginated_response(serialized_data)
@@ -142,21 +141,23 @@ class OrganisationViewSet(BaseMultiserializerFHIRView,
                 if instance:
                     serializer = serializer(instance, reference_type=ref_type)
                     if serializer.data:
-                        retrieved.append(serializer.data)
+                        retrieved.append((serializer.data, serializer.fhirConverter, instance))
             else:
                 if qs.count() > 0:
                     data = self._get_insurance_organisation(kwargs.get('identifier', None))
                 else:
                     data = self._get_insurance_organisation_default(kwargs.get('identifier', None))
                 if data:
-                    retrieved.append(data)
+                    # insurance organisations from module configuration don't track updates
+                    retrieved.append((data, None, None))
 
         if len(retrieved) > 1:
             raise ValueError("Ambiguous retrieve result, object found for multiple serializers.")
         if len(retrieved) == 0:
             raise Http404(f"Resource for identifier {kwargs['identifier']} not found")
 
-        return Response(retrieved[0])
+        data, converter, instance = retrieved[0]
+        return self._get_conditional_response(converter, instance, lambda: data)
 
     def _get_insurance_organisations_as_list(self):
         data = []
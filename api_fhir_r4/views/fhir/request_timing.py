@@ -0,0 +1,21 @@
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+from api_fhir_r4.instrumentation import LatencyAggregates
+from api_fhir_r4.views.fhir.base import BaseFHIRView
+
+
+class RequestTimingView(BaseFHIRView):
+    """
+    Latency percentiles (p50, p95, p99) of FHIR requests by resource type, measured by
+    FHIRRequestTimingMiddleware in the process which serves the request. DELETE clears the collected samples.
+    """
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request, *args, **kwargs):
+        return Response(LatencyAggregates.get_summary())
+
+    def delete(self, request, *args, **kwargs):
+        LatencyAggregates.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
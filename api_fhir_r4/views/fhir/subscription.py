@@ -7,6 +7,7 @@ from api_fhir_r4.openapi_schema_extensions import get_inline_error_serializer
 from api_fhir_r4.permissions import FHIRApiSubscriptionPermissions
 from api_fhir_r4.subscriptions import SubscriptionSerializer
 from api_fhir_r4.services import SubscriptionService
+from api_fhir_r4.subscriptions.subscriptionRegistry import SubscriptionRegistry
 from api_fhir_r4.subscriptions.subscriptionSerializer import SubscriptionSerializerSchema
 from api_fhir_r4.views.fhir.base import BaseFHIRView
 from api_fhir_r4.views.filters import DateUpdatedRequestParameterFilter
@@ -38,6 +39,14 @@ class SubscriptionViewSet(BaseFHIRView, ModelViewSet):
         queryset = Subscription.objects.filter(is_deleted=False).order_by('date_created')
         return DateUpdatedRequestParameterFilter(self.request).filter_queryset(queryset)
 
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        SubscriptionRegistry.invalidate()
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        SubscriptionRegistry.invalidate()
+
     def perform_destroy(self, instance):
         if not self.check_if_owner(self.request.user, instance):
             raise PermissionDenied(
@@ -45,6 +54,7 @@ class SubscriptionViewSet(BaseFHIRView, ModelViewSet):
         service = SubscriptionService(self.request.user)
         result = service.delete({'id': instance.uuid})
         self.check_error_message(result)
+        SubscriptionRegistry.invalidate()
 
     @staticmethod
     def check_error_message(result):
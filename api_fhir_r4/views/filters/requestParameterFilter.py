@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
-from datetime import timedelta
+from datetime import datetime as py_datetime, timedelta
 
 from django.db.models import QuerySet
+from django.utils import timezone
 from typing import Dict, Callable, Any
 
 from core.datetimes.ad_datetime import datetime
@@ -114,6 +115,27 @@ class QuerysetLastUpdatedParameter(QuerysetParameterABC):
             raise ValueError('{request_parameter} value is not a valid datetime')
 
 
+class QuerysetSinceParameter(QuerysetLastUpdatedParameter):
+    """
+    `_since` instant, only resources updated at or after given time are returned. Value can be a date or a datetime
+    with optional timezone, zoned values are converted to the server timezone used by IMIS timestamps.
+    """
+
+    def _get_prefix_filter_mapping(self):
+        return {
+            'eq': lambda field, value: QuerysetGreaterThanEqualFilter(field, value),
+        }
+
+    def _parse_value(self, value):
+        try:
+            since = py_datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except Exception:
+            raise ValueError('{request_parameter} value is not a valid instant')
+        if timezone.is_aware(since):
+            since = timezone.make_naive(since)
+        return since
+
+
 class RequestParameterFilterABC(ABC):
     def __init__(self, request):
         self.request = request
@@ -149,6 +171,7 @@ class ValidityFromRequestParameterFilter(RequestParameterFilterABC):
     def _get_parameter_mapping(self):
         return {
             '_lastUpdated': lambda: QuerysetLastUpdatedParameter('validity_from'),
+            '_since': lambda: QuerysetSinceParameter('validity_from'),
         }
 
 
@@ -156,4 +179,5 @@ class DateUpdatedRequestParameterFilter(RequestParameterFilterABC):
     def _get_parameter_mapping(self):
         return {
             '_lastUpdated': lambda: QuerysetLastUpdatedParameter('date_updated'),
+            '_since': lambda: QuerysetSinceParameter('date_updated'),
         }